@@ -0,0 +1,94 @@
+"""A Python package for Structural Causal Models.
+
+The main classes and functions of the package are available from the package
+itself (e.g. StructuralCausalModels.LinearStructuralCausalModel). They are
+imported the first time they are accessed, so that importing the package is
+cheap : pandas and scipy are only imported by the methods which need them.
+"""
+import importlib
+
+
+# The names available from the package, and the modules defining them
+_lazy_attributes = {
+    'Graph': 'graph',
+    'GraphBatch': 'graph_batch',
+    'DirectedGraph': 'directed_graph',
+    'DirectedAcyclicGraph': 'dag',
+    'StructuralEquation': 'structural_equation',
+    'LinearStructuralEquation': 'linear_structural_equation',
+    'StructuralCausalModel': 'structural_causal_model',
+    'LinearStructuralCausalModel': 'linear_structural_causal_model',
+    'LinearStructuralCausalModelFitter': 'linear_fitting',
+    'SufficientStatistics': 'linear_fitting',
+    'HillClimbingSearch': 'hill_climbing',
+    'GaussianBICScore': 'scores',
+    'BGeScore': 'scores',
+    'PCAlgorithm': 'pc_algorithm',
+    'FisherZTest': 'pc_algorithm',
+    'dag_to_cpdag': 'cpdag',
+    'dags_to_cpdags': 'cpdag',
+    'consistent_extensions': 'markov_equivalence',
+    'markov_equivalence_class_size': 'markov_equivalence',
+    'structural_intervention_distance': 'intervention_distance',
+    'structural_intervention_distances': 'intervention_distance',
+    'random_dag_adjacency_matrices': 'random_graphs',
+    'random_dags': 'random_graphs',
+    'random_weights': 'random_graphs',
+    'random_linear_scms': 'random_graphs',
+    'NoiseSamplingPlan': 'noise_sampling',
+    'SamplingProfiler': 'profiling',
+    'DistributionSpec': 'serialization',
+    'FunctionReference': 'serialization',
+    'register_function': 'serialization',
+    'save_graph': 'persistence',
+    'load_graph': 'persistence',
+    'save_graph_csr': 'persistence',
+    'load_graph_csr': 'persistence',
+    'save_linear_structural_causal_model': 'persistence',
+    'load_linear_structural_causal_model': 'persistence',
+}
+
+__all__ = list(_lazy_attributes.keys())
+
+
+def __getattr__(name):
+    """
+    Imports the names available from the package the first time they are
+    accessed.
+
+    Parameters
+    ----------
+    name : str
+        The name accessed.
+
+    Returns
+    -------
+    object
+        The object of that name.
+
+    Raises
+    ------
+    AttributeError
+        If the name is not available from the package.
+    """
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f"{__name__}.{_lazy_attributes[name]}")
+    value = getattr(module, name)
+    # Later accesses do not go through __getattr__
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    """
+    Lists the names available from the package.
+
+    Returns
+    -------
+    list
+        The names available from the package.
+    """
+    return sorted(set(globals().keys()) | set(__all__))
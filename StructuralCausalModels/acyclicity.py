@@ -0,0 +1,254 @@
+import numpy as np
+
+from StructuralCausalModels.linear_structural_causal_model import \
+    InvalidWeightedAdjacencyMatrix
+
+
+class AcyclicityMethodNotImplemented(Exception):
+    """Raised when the requested acyclicity measure is not implemented.
+    """
+    pass
+
+
+def _squared_weights(weights):
+    """
+    Checks the shape of (a batch of) weighted adjacency matrices and returns
+    the matrices of their squared entries.
+
+    Parameters
+    ----------
+    weights : array_like
+        A weighted adjacency matrix, of shape (d, d), or a batch of weighted
+        adjacency matrices, of shape (..., d, d).
+
+    Returns
+    -------
+    tuple
+        The weighted adjacency matrices as an array of floats, and the matrices
+        of their squared entries.
+
+    Raises
+    ------
+    InvalidWeightedAdjacencyMatrix
+        If the matrices are not square.
+    """
+    weights = np.asarray(weights, dtype=float)
+    if weights.ndim < 2 or weights.shape[-1] != weights.shape[-2]:
+        msg = "The weighted adjacency matrices should be square, of shape "
+        msg += "(..., d, d) !"
+        raise InvalidWeightedAdjacencyMatrix(msg)
+
+    return weights, weights * weights
+
+
+def exponential_acyclicity(weights):
+    """
+    Computes the acyclicity measure of NOTEARS [1]_ and its gradient.
+
+    The measure is :math:`h(W) = \\operatorname{tr}(e^{W \\circ W}) - d`,
+    where :math:`\\circ` is the entrywise product and :math:`d` the number of
+    vertices : it is non-negative, and equal to 0 if and only if the graph of
+    :math:`W` is acyclic. Its gradient is
+    :math:`\\nabla h(W) = (e^{W \\circ W})^T \\circ 2 W`.
+
+    Parameters
+    ----------
+    weights : array_like
+        A weighted adjacency matrix, of shape (d, d), or a batch of weighted
+        adjacency matrices, of shape (..., d, d).
+
+    Returns
+    -------
+    tuple
+        The value of the measure, of shape (...), and its gradient, of shape
+        (..., d, d).
+
+    Raises
+    ------
+    InvalidWeightedAdjacencyMatrix
+        If the matrices are not square.
+
+    Notes
+    -----
+    .. [1] Zheng, X., Aragam, B., Ravikumar, P. and Xing, E. P. "DAGs with NO
+       TEARS : Continuous Optimization for Structure Learning". *Advances in
+       Neural Information Processing Systems*, volume 31, pp. 9472-9483, 2018.
+    """
+    from scipy.linalg import expm
+
+    weights, squared_weights = _squared_weights(weights)
+    nb_vertices = weights.shape[-1]
+    # expm computes the exponentials of a batch of matrices at once
+    exponential = expm(squared_weights)
+    value = np.trace(exponential, axis1=-2, axis2=-1) - nb_vertices
+    gradient = np.swapaxes(exponential, -1, -2) * 2 * weights
+
+    return value, gradient
+
+
+def polynomial_acyclicity(weights):
+    """
+    Computes the polynomial acyclicity measure of DAG-GNN [1]_ and its
+    gradient.
+
+    The measure is
+    :math:`h(W) = \\operatorname{tr}((I + W \\circ W / d)^d) - d`, where
+    :math:`\\circ` is the entrywise product and :math:`d` the number of
+    vertices : it is non-negative, and equal to 0 if and only if the graph of
+    :math:`W` is acyclic. Its gradient is
+    :math:`\\nabla h(W) = ((I + W \\circ W / d)^{d - 1})^T \\circ 2 W`.
+    Unlike the exponential of NOTEARS, it only involves matrix products.
+
+    Parameters
+    ----------
+    weights : array_like
+        A weighted adjacency matrix, of shape (d, d), or a batch of weighted
+        adjacency matrices, of shape (..., d, d).
+
+    Returns
+    -------
+    tuple
+        The value of the measure, of shape (...), and its gradient, of shape
+        (..., d, d).
+
+    Raises
+    ------
+    InvalidWeightedAdjacencyMatrix
+        If the matrices are not square.
+
+    Notes
+    -----
+    .. [1] Yu, Y., Chen, J., Gao, T. and Yu, M. "DAG-GNN : DAG Structure
+       Learning with Graph Neural Networks". *Proceedings of the 36th
+       International Conference on Machine Learning*, PMLR 97, pp. 7154-7163,
+       2019.
+    """
+    weights, squared_weights = _squared_weights(weights)
+    nb_vertices = weights.shape[-1]
+    matrix = np.identity(nb_vertices) + squared_weights / nb_vertices
+    # matrix_power computes the powers of a batch of matrices at once, by
+    # repeated squaring
+    power = np.linalg.matrix_power(matrix, nb_vertices - 1)
+    value = np.trace(power @ matrix, axis1=-2, axis2=-1) - nb_vertices
+    gradient = np.swapaxes(power, -1, -2) * 2 * weights
+
+    return value, gradient
+
+
+def log_det_acyclicity(weights, s=1.0):
+    """
+    Computes the log-determinant acyclicity measure of DAGMA [1]_ and its
+    gradient.
+
+    The measure is
+    :math:`h^s(W) = -\\log \\det(s I - W \\circ W) + d \\log s`, where
+    :math:`\\circ` is the entrywise product and :math:`d` the number of
+    vertices. On the matrices whose spectral radius of :math:`W \\circ W` is
+    smaller than :math:`s`, it is non-negative, and equal to 0 if and only if
+    the graph of :math:`W` is acyclic. Its gradient is
+    :math:`\\nabla h^s(W) = 2 (s I - W \\circ W)^{-T} \\circ W`.
+
+    Parameters
+    ----------
+    weights : array_like
+        A weighted adjacency matrix, of shape (d, d), or a batch of weighted
+        adjacency matrices, of shape (..., d, d).
+    s : float, optional
+        The scale :math:`s` of the measure (default is 1).
+
+    Returns
+    -------
+    tuple
+        The value of the measure, of shape (...), and its gradient, of shape
+        (..., d, d). Outside of the domain of the measure, the value is
+        infinite and the gradient is not a number.
+
+    Raises
+    ------
+    InvalidWeightedAdjacencyMatrix
+        If the matrices are not square.
+
+    Notes
+    -----
+    .. [1] Bello, K., Aragam, B. and Ravikumar, P. "DAGMA : Learning DAGs via
+       M-matrices and a Log-Determinant Acyclicity Characterization".
+       *Advances in Neural Information Processing Systems*, volume 35,
+       pp. 8226-8239, 2022.
+    """
+    weights, squared_weights = _squared_weights(weights)
+    nb_vertices = weights.shape[-1]
+    matrix = s * np.identity(nb_vertices) - squared_weights
+    spectral_radius = np.abs(np.linalg.eigvals(squared_weights)).max(axis=-1)
+    # The measure is only defined on the M-matrices s I - W o W
+    in_domain = spectral_radius < s
+
+    _, log_det = np.linalg.slogdet(matrix)
+    value = np.where(in_domain, nb_vertices * np.log(s) - log_det, np.inf)
+    # The matrices out of the domain may be singular
+    safe_matrix = np.where(in_domain[..., np.newaxis, np.newaxis], matrix,
+                           np.identity(nb_vertices))
+    gradient = 2 * np.swapaxes(np.linalg.inv(safe_matrix), -1, -2) * weights
+    gradient = np.where(in_domain[..., np.newaxis, np.newaxis], gradient,
+                        np.nan)
+
+    return value, gradient
+
+
+# The acyclicity measures, by name
+_measures = {
+    'exponential': exponential_acyclicity,
+    'polynomial': polynomial_acyclicity,
+    'log_det': log_det_acyclicity,
+}
+
+
+def acyclicity(weights, method='exponential', **kwargs):
+    """
+    Computes a differentiable acyclicity measure and its gradient.
+
+    The measures characterise acyclicity as a smooth equality constraint
+    :math:`h(W) = 0` on weighted adjacency matrices (e.g. the coefficient
+    matrix of a LinearStructuralCausalModel), for continuous optimisation
+    learners : they are 0 if and only if the graph of :math:`W` is acyclic, and
+    positive otherwise. They all depend on :math:`W` through :math:`W \\circ W`
+    only : as shown by D. Wei, T. Gao and Y. Yu [1]_, their gradients vanish
+    exactly on the acyclic graphs, which calls for augmented Lagrangian (rather
+    than Lagrangian) methods.
+
+    Parameters
+    ----------
+    weights : array_like
+        A weighted adjacency matrix, of shape (d, d), or a batch of weighted
+        adjacency matrices, of shape (..., d, d).
+    method : str, optional
+        The measure : 'exponential' (see exponential_acyclicity),
+        'polynomial' (see polynomial_acyclicity) or 'log_det' (see
+        log_det_acyclicity) (default is 'exponential').
+    **kwargs
+        The parameters of the measure (e.g. s for 'log_det').
+
+    Returns
+    -------
+    tuple
+        The value of the measure, of shape (...), and its gradient, of shape
+        (..., d, d).
+
+    Raises
+    ------
+    AcyclicityMethodNotImplemented
+        If the measure requested is not implemented.
+    InvalidWeightedAdjacencyMatrix
+        If the matrices are not square.
+
+    Notes
+    -----
+    .. [1] Wei, D., Gao, T. and Yu, Y. "DAGs with No Fears : A Closer Look
+       at Continuous Optimization for Learning Bayesian
+       Networks". *Advances in Neural Information Processing Systems*,
+       volume 33, pp. 3895-3906, 2020.
+    """
+    if method not in _measures:
+        msg = f"The acyclicity measure {method} is not implemented !"
+        raise AcyclicityMethodNotImplemented(msg)
+
+    return _measures[method](weights, **kwargs)
@@ -0,0 +1,266 @@
+import numpy as np
+
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    GraphViaAdjacencyMatrix, InvalidAdjacencyMatrix
+
+
+def compelled_parents(dag):
+    """
+    Labels the edges of a DAG as compelled or reversible, with the algorithm
+    of D. M. Chickering [1]_.
+
+    The edges are ordered by increasing position of their heads in a causal
+    order, and then by decreasing position of their tails. For each vertex
+    :math:`y`, in causal order, the edges into :math:`y` are all labelled when
+    the first of them, :math:`x \\rightarrow y`, is processed : they are all
+    compelled if some compelled edge :math:`w \\rightarrow x` has :math:`w`
+    not adjacent to :math:`y`, or if some other parent of :math:`y` is not a
+    parent of :math:`x` ; otherwise only the edges :math:`w \\rightarrow y`
+    with :math:`w \\rightarrow x` compelled are compelled. The number of
+    operations is linear in the number of edges, up to the degrees of the
+    vertices.
+
+    Parameters
+    ----------
+    dag : DirectedAcyclicGraph
+        The DAG.
+
+    Returns
+    -------
+    list
+        The compelled parents of each vertex, as a set, in the natural order
+        of the vertices. The other parents are reversible.
+
+    Notes
+    -----
+    .. [1] Chickering, D. M. "A Transformational Characterization of
+       Equivalent Bayesian Network Structures". *Proceedings of the Eleventh
+       Conference on Uncertainty in Artificial Intelligence*, pp. 87-98, 1995.
+    """
+    causal_order = dag.compute_causal_order()
+    position = np.empty(len(causal_order), dtype=np.int64)
+    position[causal_order] = np.arange(len(causal_order))
+    parent_sets = [frozenset(parents) for parents in dag.parent_lists()]
+    compelled = [set() for _ in range(len(causal_order))]
+
+    for y in causal_order:
+
+        parents = parent_sets[y]
+        if not parents:
+            continue
+        # The tail of the first edge into y is its last parent in causal order
+        x = max(parents, key=position.__getitem__)
+        if any(w not in parents for w in compelled[x]):
+            compelled[y] = set(parents)
+            continue
+        compelled[y] = set(compelled[x])
+        parents_x = parent_sets[x]
+        if any(z != x and z not in parents_x for z in parents):
+            compelled[y] = set(parents)
+
+    return compelled
+
+
+def dag_to_cpdag(dag, name=''):
+    """
+    Computes the CPDAG (completed partially directed acyclic graph) of the
+    Markov equivalence class of a DAG.
+
+    The CPDAG has the skeleton of the DAG, its compelled edges directed and
+    its reversible edges undirected (see compelled_parents) : an undirected
+    edge is represented by two 1's in the adjacency matrix, at :math:`(i, j)`
+    and :math:`(j, i)`. Two DAGs are Markov equivalent if and only if they
+    have the same CPDAG, so that the Structural Hamming Distance between
+    CPDAGs compares Markov equivalence classes.
+
+    Parameters
+    ----------
+    dag : DirectedAcyclicGraph
+        The DAG.
+    name : str, optional
+        The name of the CPDAG (default is '').
+
+    Returns
+    -------
+    Graph
+        The CPDAG, whose adjacency matrix is a scipy.sparse matrix if the one
+        of the DAG is, and an array of bytes otherwise.
+    """
+    compelled = compelled_parents(dag)
+    sources = []
+    targets = []
+    for y, parents in enumerate(dag.parent_lists()):
+        for x in parents:
+            sources.append(x)
+            targets.append(y)
+            if x not in compelled[y]:
+                sources.append(y)
+                targets.append(x)
+
+    nb_vertices = len(compelled)
+    if GraphViaAdjacencyMatrix.is_sparse(dag.adjacency_matrix):
+        from scipy.sparse import csr_matrix
+        adjacency_matrix = csr_matrix(
+            (np.ones(len(sources), dtype=np.uint8), (sources, targets)),
+            shape=(nb_vertices, nb_vertices)
+        )
+    else:
+        adjacency_matrix = np.zeros((nb_vertices, nb_vertices),
+                                    dtype=np.uint8)
+        adjacency_matrix[sources, targets] = 1
+
+    return Graph(adjacency_matrix=adjacency_matrix, name=name, validate=False)
+
+
+def _topological_levels(matrices):
+    """
+    Computes the topological levels of the vertices of a batch of DAGs.
+
+    The vertices of level 0 have no parents, those of level :math:`l > 0`
+    have all their parents in the levels smaller than :math:`l`. The levels
+    of all the DAGs are computed at once, one level after the other.
+
+    Parameters
+    ----------
+    matrices : numpy.ndarray
+        The adjacency matrices of the DAGs, as booleans, of shape (k, n, n).
+
+    Returns
+    -------
+    numpy.ndarray
+        The level of each vertex of each DAG, of shape (k, n).
+
+    Raises
+    ------
+    InvalidAdjacencyMatrix
+        If some adjacency matrix has a cycle.
+    """
+    nb_graphs, nb_vertices, _ = matrices.shape
+    levels = np.zeros((nb_graphs, nb_vertices), dtype=np.int64)
+    remaining = np.ones((nb_graphs, nb_vertices), dtype=bool)
+
+    for level in range(nb_vertices + 1):
+        if not remaining.any():
+            return levels
+        has_remaining_parents = np.any(matrices & remaining[:, :, np.newaxis],
+                                       axis=1)
+        sources = remaining & ~has_remaining_parents
+        if not sources.any(axis=1)[remaining.any(axis=1)].all():
+            break
+        levels[sources] = level
+        remaining &= ~sources
+
+    msg = 'Adjacency matrix provided not valid for a DAG.'
+    raise InvalidAdjacencyMatrix(msg)
+
+
+def _cpdag_adjacency_matrices(matrices):
+    """
+    Computes the adjacency matrices of the CPDAGs of a batch of DAGs.
+
+    The vertices of each DAG are permuted in causal order, so that the
+    vertices of all the DAGs can be processed together, in the same order,
+    with the algorithm of compelled_parents : each step labels the edges into
+    one vertex of every DAG at once.
+
+    Parameters
+    ----------
+    matrices : numpy.ndarray
+        The adjacency matrices of the DAGs, of shape (k, n, n).
+
+    Returns
+    -------
+    numpy.ndarray
+        The adjacency matrices of the CPDAGs, as bytes, of shape (k, n, n).
+
+    Raises
+    ------
+    InvalidAdjacencyMatrix
+        If some adjacency matrix has a cycle.
+    """
+    matrices = np.asarray(matrices) != 0
+    nb_graphs, nb_vertices, _ = matrices.shape
+    graphs = np.arange(nb_graphs)
+    # The causal orders sort the vertices by level
+    orders = np.argsort(_topological_levels(matrices), axis=1, kind='stable')
+    rows = orders[:, :, np.newaxis]
+    columns = orders[:, np.newaxis, :]
+    # Strictly upper triangular
+    permuted = matrices[graphs[:, np.newaxis, np.newaxis], rows, columns]
+    compelled = np.zeros_like(permuted)
+
+    for y in range(nb_vertices):
+
+        parents = permuted[:, :, y]
+        has_parents = parents.any(axis=1)
+        # The last parent of y in causal order
+        x = nb_vertices - 1 - np.argmax(parents[:, ::-1], axis=1)
+        parents_x = permuted[graphs, :, x]
+        compelled_x = compelled[graphs, :, x]
+        all_compelled = (compelled_x & ~parents).any(axis=1)
+        other_parents = parents.copy()
+        other_parents[graphs, x] = False
+        all_compelled |= (other_parents & ~parents_x).any(axis=1)
+        compelled[:, :, y] = np.where(
+            all_compelled[:, np.newaxis], parents,
+            compelled_x & has_parents[:, np.newaxis]
+        )
+
+    reversible = permuted & ~compelled
+    cpdags = np.empty((nb_graphs, nb_vertices, nb_vertices), dtype=np.uint8)
+    cpdags[graphs[:, np.newaxis, np.newaxis], rows, columns] = \
+        permuted | np.swapaxes(reversible, 1, 2)
+
+    return cpdags
+
+
+def dags_to_cpdags(dags, names=None):
+    """
+    Computes the CPDAGs of the Markov equivalence classes of a batch of DAGs.
+
+    All the DAGs must have the same number of vertices. Their CPDAGs are
+    computed together, with vectorised operations across the batch, which is
+    much faster than calling dag_to_cpdag on many small DAGs.
+
+    Parameters
+    ----------
+    dags : array_like or list
+        The adjacency matrices of the DAGs, of shape (k, n, n), or a list of
+        k DirectedAcyclicGraph objects.
+    names : list, optional
+        The names of the CPDAGs (default is None, in which case they are all
+        '').
+
+    Returns
+    -------
+    list
+        The CPDAGs, as Graph objects whose adjacency matrices are arrays of
+        bytes (see dag_to_cpdag).
+
+    Raises
+    ------
+    InvalidAdjacencyMatrix
+        If the adjacency matrices are not square, of the same size, or if some
+        of them has a cycle.
+    """
+    if isinstance(dags, (list, tuple)) and dags and \
+            isinstance(dags[0], Graph):
+        is_sparse = GraphViaAdjacencyMatrix.is_sparse
+        dags = [dag.adjacency_matrix.toarray()
+                if is_sparse(dag.adjacency_matrix)
+                else np.asarray(dag.adjacency_matrix) for dag in dags]
+    try:
+        matrices = np.asarray(dags)
+    except ValueError:
+        matrices = None
+    if matrices is None or matrices.ndim != 3 or \
+            matrices.shape[1] != matrices.shape[2]:
+        msg = 'The adjacency matrices should be square and of the same size, '
+        msg += 'of shape (k, n, n) !'
+        raise InvalidAdjacencyMatrix(msg)
+    if names is None:
+        names = [''] * len(matrices)
+
+    return [Graph(adjacency_matrix=cpdag, name=name, validate=False)
+            for cpdag, name in zip(_cpdag_adjacency_matrices(matrices), names)]
@@ -1,8 +1,10 @@
 import copy
 import numpy as np
 
+from collections import deque
+
 from StructuralCausalModels.graph_via_adjacency_matrix import \
-    InvalidAdjacencyMatrix
+    GraphViaAdjacencyMatrix, InvalidAdjacencyMatrix
 from StructuralCausalModels.directed_graph import DirectedGraph
 
 
@@ -30,10 +32,13 @@ class DirectedAcyclicGraph(DirectedGraph):
 
     Parameters
     ----------
-    adjacency_matrix : array_like
+    adjacency_matrix : array_like or scipy.sparse matrix
         The adjacency matrix of the graph.
     name : str, optional
         The name of the object created (default is '').
+    validate : bool, optional
+        Whether to check that the adjacency matrix is valid (default is True).
+        Only meant to be disabled for adjacency matrices known to be valid.
 
     Raises
     ------
@@ -41,31 +46,40 @@ class DirectedAcyclicGraph(DirectedGraph):
         If the adjacency matrix does not define a directed and acyclic graph.
     """
 
-    def __init__(self, adjacency_matrix, name=''):
+    def __init__(self, adjacency_matrix, name='', validate=True):
 
-        if not DirectedAcyclicGraph.validate_dag_adjacency_matrix(
+        if validate and not DirectedAcyclicGraph.validate_dag_adjacency_matrix(
                 adjacency_matrix):
             msg = 'Adjacency matrix provided not valid for a DAG.'
             raise InvalidAdjacencyMatrix(msg)
 
         super().__init__(name=name,
-                         adjacency_matrix=adjacency_matrix)
+                         adjacency_matrix=adjacency_matrix,
+                         validate=False)
 
     @staticmethod
-    def validate_dag_adjacency_matrix(matrix, atol=1e-6):
+    def validate_dag_adjacency_matrix(matrix, atol=1e-6, block_size=None):
         """
         Checks that a matrix is a valid adjacency matrix for a directed acyclic
         graph. Uses the characterisation of acyclicity established by D. Wei, T.
         Gao and Y. Yu in [1]_ : a directed graph is acyclic if and only if its
         adjacency matrix is nilpotent.
 
+        The eigenvalues of memory-mapped and scipy.sparse adjacency matrices are
+        not computed : acyclicity is then checked by removing the vertices
+        without parents one after the other (as in Kahn's algorithm), after
+        converting the adjacency matrix to adjacency lists in blocks of rows.
+
         Parameters
         ----------
-        matrix : array_like
+        matrix : array_like or scipy.sparse matrix
             The matrix to check.
         atol : float, optional
             The absolute tolerance used to check that the eigenvalues are all
             equal to 0 (default is :math:`10^{-6}`).
+        block_size : int, optional
+            The number of rows checked at once (default is None, in which case
+            the blocks contain about BLOCK_NB_ENTRIES entries).
 
         Returns
         -------
@@ -80,14 +94,58 @@ class DirectedAcyclicGraph(DirectedGraph):
            Networks". *Advances in Neural Information Processing Systems*,
            volume 33, pp. 3895-3906, 2020.
         """
-        if not DirectedGraph.validate_directed_graph_adjacency_matrix(matrix):
+        if not DirectedGraph.validate_directed_graph_adjacency_matrix(
+                matrix, block_size=block_size):
             return False
 
+        if (isinstance(matrix, np.memmap) or
+                GraphViaAdjacencyMatrix.is_sparse(matrix)):
+            adjacency_lists = DirectedGraph.adjacency_matrix_to_adjacency_lists(
+                matrix, block_size=block_size
+            )
+            return DirectedAcyclicGraph._eliminate_vertices_without_parents(
+                adjacency_lists
+            )
+
         eigenvalues = np.linalg.eigvals(matrix)
         comparand = np.zeros_like(eigenvalues)
 
         return np.allclose(eigenvalues, comparand, atol=atol)
 
+    @staticmethod
+    def _eliminate_vertices_without_parents(adjacency_lists):
+        """
+        Checks whether a directed graph is acyclic by removing the vertices
+        without parents one after the other.
+
+        Parameters
+        ----------
+        adjacency_lists : list
+            The adjacency lists of the directed graph.
+
+        Returns
+        -------
+        bool
+            Whether all the vertices could be removed, i.e. whether the directed
+            graph is acyclic.
+        """
+        indegrees = np.zeros(len(adjacency_lists), dtype=np.int64)
+        for adjacency_list in adjacency_lists:
+            indegrees[adjacency_list] += 1
+        stack = np.where(indegrees == 0)[0].tolist()
+        nb_removed = 0
+
+        while stack:
+
+            current_node = stack.pop()
+            nb_removed += 1
+            for neighbour in adjacency_lists[current_node]:
+                indegrees[neighbour] -= 1
+                if indegrees[neighbour] == 0:
+                    stack.append(neighbour)
+
+        return nb_removed == len(adjacency_lists)
+
     def kahn_algorithm(self):
         """
         An implementation of Kahn's algorithm for topological ordering of a
@@ -100,12 +158,12 @@ class DirectedAcyclicGraph(DirectedGraph):
         """
         list_repr_graph = self.adjacency_list_representation
         indegrees = copy.deepcopy(list_repr_graph.indegrees)
-        queue = np.where(np.asarray(indegrees) == 0)[0].tolist()
+        queue = deque(np.where(np.asarray(indegrees) == 0)[0].tolist())
         topological_ordering = []
 
         while queue:
 
-            current_node = queue.pop(0)
+            current_node = queue.popleft()
             topological_ordering.append(current_node)
 
             for neighbour in list_repr_graph.adjacency_lists[current_node]:
@@ -115,6 +173,40 @@ class DirectedAcyclicGraph(DirectedGraph):
 
         return topological_ordering
 
+    def compute_topological_generations(self):
+        """
+        Computes the topological generations of the DAG.
+
+        The first generation is made of the vertices without parents ; the
+        :math:`k`-th generation is made of the vertices all of whose parents
+        are in the previous generations, and at least one of whose parents is
+        in generation :math:`k - 1`. The vertices of a generation are never
+        adjacent to each other.
+
+        Returns
+        -------
+        list
+            The list of the generations, each generation being the list of its
+            vertices.
+        """
+        list_repr_graph = self.adjacency_list_representation
+        indegrees = copy.deepcopy(list_repr_graph.indegrees)
+        generation = np.where(np.asarray(indegrees) == 0)[0].tolist()
+        generations = []
+
+        while generation:
+
+            generations.append(generation)
+            next_generation = []
+            for current_node in generation:
+                for neighbour in list_repr_graph.adjacency_lists[current_node]:
+                    indegrees[neighbour] -= 1
+                    if indegrees[neighbour] == 0:
+                        next_generation.append(neighbour)
+            generation = next_generation
+
+        return generations
+
     # TODO to correct, does not work ! Uncomment then
     # def depth_first_search(self):
     #     """
@@ -158,6 +250,8 @@ class DirectedAcyclicGraph(DirectedGraph):
         """
         Computes a causal order of the DAG using the method chosen by the user.
 
+        The causal order is computed once and cached.
+
         Parameters
         ----------
         method : str, optional
@@ -175,7 +269,10 @@ class DirectedAcyclicGraph(DirectedGraph):
         """
         if method == 'kahn':
 
-            return self.kahn_algorithm()
+            if 'causal_order' not in self._cache:
+                self._cache['causal_order'] = self.kahn_algorithm()
+
+            return list(self._cache['causal_order'])
 
         # TODO uncomment when dfs works
         # elif method == 'dfs':
@@ -232,6 +329,80 @@ class DirectedAcyclicGraph(DirectedGraph):
 
         return True
 
+    def descendant_bitsets(self):
+        """
+        Returns the descendants of each vertex of the DAG, as bitsets.
+
+        Row :math:`i` has bit :math:`j` set if and only if :math:`X_j` is a
+        descendant of :math:`X_i` or :math:`X_i` itself (the rows of the
+        reflexive transitive closure of the adjacency matrix, packed with
+        numpy.packbits). They are computed by taking, in reverse causal order,
+        the union of the bitsets of the children of each vertex, and cached
+        until the adjacency matrix changes. The ancestors of :math:`X_j` are
+        the rows with bit :math:`j` set.
+
+        Returns
+        -------
+        numpy.ndarray
+            The bitsets, of shape (n, ceil(n / 8)), as bytes.
+        """
+        if 'descendant_bitsets' not in self._cache:
+            nb_vertices = self.nb_vertices
+            adjacency_lists = \
+                self.adjacency_list_representation.adjacency_lists
+            bitsets = np.zeros((nb_vertices, (nb_vertices + 7) // 8),
+                               dtype=np.uint8)
+            for vertex in reversed(self.compute_causal_order()):
+                children = adjacency_lists[vertex]
+                if len(children) > 0:
+                    bitsets[vertex] = np.bitwise_or.reduce(bitsets[children],
+                                                           axis=0)
+                bitsets[vertex, vertex >> 3] |= 0x80 >> (vertex & 7)
+            self._cache['descendant_bitsets'] = bitsets
+
+        return self._cache['descendant_bitsets'].copy()
+
+    def structural_intervention_distance(self, other):
+        """
+        Computes the Structural Intervention Distance from the DAG to an
+        estimate of it (see
+        intervention_distance.structural_intervention_distance).
+
+        Parameters
+        ----------
+        other : DirectedAcyclicGraph
+            The estimated DAG.
+
+        Returns
+        -------
+        int
+            The Structural Intervention Distance.
+        """
+        from StructuralCausalModels.intervention_distance import \
+            structural_intervention_distance
+
+        return structural_intervention_distance(self, other)
+
+    def compute_cpdag(self, name=''):
+        """
+        Computes the CPDAG of the Markov equivalence class of the DAG (see
+        cpdag.dag_to_cpdag).
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the CPDAG (default is '').
+
+        Returns
+        -------
+        Graph
+            The CPDAG, whose compelled edges are directed and whose reversible
+            edges are undirected.
+        """
+        from StructuralCausalModels.cpdag import dag_to_cpdag
+
+        return dag_to_cpdag(self, name=name)
+
     @staticmethod
     def causal_order_to_dag(causal_order):
         """
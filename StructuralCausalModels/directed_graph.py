@@ -2,7 +2,7 @@ import numpy as np
 
 from StructuralCausalModels.graph import Graph
 from StructuralCausalModels.graph_via_adjacency_matrix import \
-    InvalidAdjacencyMatrix
+    GraphViaAdjacencyMatrix, InvalidAdjacencyMatrix
 
 
 class DirectedGraph(Graph):
@@ -15,10 +15,13 @@ class DirectedGraph(Graph):
 
     Parameters
     ----------
-    adjacency_matrix : array_like
+    adjacency_matrix : array_like or scipy.sparse matrix
         The adjacency matrix of the graph.
     name : str, optional
         The name of the object created (default is '').
+    validate : bool, optional
+        Whether to check that the adjacency matrix is valid (default is True).
+        Only meant to be disabled for adjacency matrices known to be valid.
 
     Raises
     ------
@@ -26,25 +29,35 @@ class DirectedGraph(Graph):
         If the adjacency matrix does not define a directed graph.
     """
 
-    def __init__(self, adjacency_matrix, name=''):
+    def __init__(self, adjacency_matrix, name='', validate=True):
 
-        if not DirectedGraph.validate_directed_graph_adjacency_matrix(
-                adjacency_matrix):
+        if validate and not \
+                DirectedGraph.validate_directed_graph_adjacency_matrix(
+                    adjacency_matrix):
             msg = 'Adjacency matrix provided not valid for a directed graph.'
             raise InvalidAdjacencyMatrix(msg)
 
         super().__init__(name=name,
-                         adjacency_matrix=adjacency_matrix)
+                         adjacency_matrix=adjacency_matrix,
+                         validate=False)
 
     @staticmethod
-    def validate_directed_graph_adjacency_matrix(matrix):
+    def validate_directed_graph_adjacency_matrix(matrix, block_size=None):
         """
         Checks that a matrix is a valid adjacency matrix for a directed graph.
 
+        The matrix is checked in pairs of transposed blocks : an entry
+        :math:`M_{i,j}` and its transposed entry :math:`M_{j,i}` may not both
+        be 1 (which also rules out self-loops).
+
         Parameters
         ----------
-        matrix : array_like
+        matrix : array_like or scipy.sparse matrix
             The matrix to check.
+        block_size : int, optional
+            The number of rows (and columns) of the blocks checked at once
+            (default is None, in which case the blocks contain about
+            BLOCK_NB_ENTRIES entries).
 
         Returns
         -------
@@ -52,19 +65,41 @@ class DirectedGraph(Graph):
             Whether the matrix to check is a valid adjacency matrix for a
             directed graph.
         """
-        if not Graph.validate_binary_matrix(matrix):
+        if not Graph.validate_binary_matrix(matrix, block_size=block_size):
             return False
 
-        # Check that there are no self-loops
-        no_self_loops = np.asarray([matrix[i, i] == 0 for i in
-                                    range(matrix.shape[0])])
-        if not np.all(no_self_loops):
-            return False
+        if GraphViaAdjacencyMatrix.is_sparse(matrix):
+            return matrix.multiply(matrix.T).count_nonzero() == 0
 
-        # Check that there are no undirected edges
-        for i in range(matrix.shape[0]):
-            for j in range(i):
-                if matrix[i, j] == 1 and matrix[j, i] == 1:
-                    return False
+        for _, _, block, transposed_block in \
+                GraphViaAdjacencyMatrix.iterate_transposed_block_pairs(
+                    matrix, block_size=block_size):
+            if np.any(np.logical_and(block != 0, transposed_block != 0)):
+                return False
 
         return True
+
+    def parent_lists(self):
+        """
+        Returns the parents of each vertex of the graph.
+
+        The parent lists are computed from the adjacency lists the first time
+        they are requested, and cached until the adjacency matrix changes.
+
+        Returns
+        -------
+        list
+            The parents of each vertex, as a tuple in increasing order, in the
+            natural order of the vertices.
+        """
+        if 'parent_lists' not in self._cache:
+            adjacency_lists = \
+                self.adjacency_list_representation.adjacency_lists
+            parent_lists = [[] for _ in range(len(adjacency_lists))]
+            for j, children in enumerate(adjacency_lists):
+                for i in children:
+                    parent_lists[i].append(j)
+            self._cache['parent_lists'] = [tuple(parents)
+                                           for parents in parent_lists]
+
+        return list(self._cache['parent_lists'])
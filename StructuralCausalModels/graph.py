@@ -5,7 +5,8 @@ from StructuralCausalModels.graph_via_adjacency_lists import \
 from StructuralCausalModels.graph_via_adjacency_matrix import \
     GraphViaAdjacencyMatrix
 from StructuralCausalModels.graph_via_edges import EdgeType, GraphViaEdges, \
-    ImpossibleEdgeConfiguration
+    GraphsCannotBeCompared, ImpossibleEdgeConfiguration
+from StructuralCausalModels.memory import deep_sizeof, total_memory_usage
 
 
 class Graph:
@@ -16,15 +17,23 @@ class Graph:
     is arguably easiest to think of a graph in terms of its adjacency matrix
     which is why this implementation is 'adjacency matrix'-driven. Other
     representations can be more convenient depending on context, which is
-    why these representations are automatically generated upon construction
-    and stored as attributes of the Graph object.
+    why these representations are automatically generated, the first time they
+    are accessed, and stored as attributes of the Graph object.
+
+    The adjacency matrix may be a memory-mapped array (e.g. loaded with
+    numpy.load(..., mmap_mode='r')) or a scipy.sparse matrix : it is not copied,
+    and validation, conversions, degrees and Structural Hamming Distances are
+    computed in blocks of rows.
 
     Parameters
     ----------
-    adjacency_matrix : array_like
+    adjacency_matrix : array_like or scipy.sparse matrix
         The adjacency matrix of the graph.
     name : str, optional
         The name of the object created (default is '').
+    validate : bool, optional
+        Whether to check that the adjacency matrix is valid (default is True).
+        Only meant to be disabled for adjacency matrices known to be valid.
 
     Attributes
     ----------
@@ -37,41 +46,35 @@ class Graph:
         edges.
     """
 
-    def __init__(self, adjacency_matrix, name=''):
+    def __init__(self, adjacency_matrix, name='', validate=True):
         # Representation of the graph via an adjacency matrix
         matrix_based = GraphViaAdjacencyMatrix(
             adjacency_matrix=adjacency_matrix,
-            name=name
-        )
-        # Representation of the graph via adjacency lists
-        adjacency_lists = Graph.adjacency_matrix_to_adjacency_lists(
-            adjacency_matrix=adjacency_matrix
+            name=name,
+            validate=validate
         )
-        list_based = GraphViaAdjacencyLists(
-            nb_vertices=len(adjacency_lists),
-            adjacency_lists=adjacency_lists,
-            name=name
-        )
-        # Representation of the graph via edges
-        edges = Graph.adjacency_matrix_to_edges(
-            adjacency_matrix=adjacency_matrix
-        )
-        edge_based = GraphViaEdges(edges=edges,
-                                   name=name)
         self.adjacency_matrix_representation = matrix_based
-        self.adjacency_list_representation = list_based
-        self.edge_representation = edge_based
+        # The representations via adjacency lists and via edges are generated
+        # the first time they are accessed
+        self._adjacency_list_representation = None
+        self._edge_representation = None
+        # Structure derived from the graph (e.g. a causal order), cleared
+        # whenever the adjacency matrix changes
+        self._cache = dict()
 
     @staticmethod
-    def validate_binary_matrix(matrix):
+    def validate_binary_matrix(matrix, block_size=None):
         """Validates that a matrix is a proper adjacency matrix.
 
         A proper adjacency matrix contains only 0's and 1's.
 
         Parameters
         ----------
-        matrix : array_like
+        matrix : array_like or scipy.sparse matrix
             The matrix to validate.
+        block_size : int, optional
+            The number of rows checked at once (default is None, in which case
+            the blocks contain about BLOCK_NB_ENTRIES entries).
 
         Returns
         -------
@@ -79,7 +82,9 @@ class Graph:
             Whether the matrix is a valid adjacency matrix.
         """
 
-        return GraphViaAdjacencyMatrix.validate_binary_matrix(matrix)
+        return GraphViaAdjacencyMatrix.validate_binary_matrix(
+            matrix, block_size=block_size
+        )
 
     @property
     def adjacency_matrix(self):
@@ -91,6 +96,38 @@ class Graph:
         """str: the name of the graph."""
         return self.adjacency_matrix_representation.name
 
+    @property
+    def nb_vertices(self):
+        """int: the number of vertices in the graph."""
+        return self.adjacency_matrix.shape[0]
+
+    @property
+    def adjacency_list_representation(self):
+        """GraphViaAdjacencyLists: the representation of the graph based on the
+        adjacency lists."""
+        if self._adjacency_list_representation is None:
+            adjacency_lists = Graph.adjacency_matrix_to_adjacency_lists(
+                adjacency_matrix=self.adjacency_matrix
+            )
+            self._adjacency_list_representation = GraphViaAdjacencyLists(
+                nb_vertices=len(adjacency_lists),
+                adjacency_lists=adjacency_lists,
+                name=self.name
+            )
+        return self._adjacency_list_representation
+
+    @property
+    def edge_representation(self):
+        """GraphViaEdges: the representation of the graph based on the typed
+        edges."""
+        if self._edge_representation is None:
+            edges = Graph.adjacency_matrix_to_edges(
+                adjacency_matrix=self.adjacency_matrix
+            )
+            self._edge_representation = GraphViaEdges(edges=edges,
+                                                      name=self.name)
+        return self._edge_representation
+
     @adjacency_matrix.setter
     def adjacency_matrix(self, new_adjacency_matrix):
         """Sets adjacency matrix of a graph to a new value.
@@ -100,7 +137,7 @@ class Graph:
 
         Parameters
         ----------
-        new_adjacency_matrix : array_like
+        new_adjacency_matrix : array_like or scipy.sparse matrix
             The new adjacency matrix of the graph.
         """
 
@@ -109,28 +146,105 @@ class Graph:
             adjacency_matrix=new_adjacency_matrix,
             name=self.name
         )
-        # Likewise, regenerate the representation via adjacency lists
-        new_adjacency_lists = Graph.adjacency_matrix_to_adjacency_lists(
-            adjacency_matrix=new_adjacency_matrix
-        )
-        new_list_based = GraphViaAdjacencyLists(
-            nb_vertices=len(new_adjacency_lists),
-            adjacency_lists=new_adjacency_lists,
-            name=self.name
-        )
-        # Likewise, regenerate the representation via edges
-        new_edges = Graph.adjacency_matrix_to_edges(
-            adjacency_matrix=new_adjacency_matrix
-        )
-        new_edge_based = GraphViaEdges(edges=new_edges,
-                                       name=self.name)
         self.adjacency_matrix_representation = new_matrix_based
-        self.adjacency_list_representation = new_list_based
-        self.edge_representation = new_edge_based
+        # Likewise, the other representations will be re-generated when next
+        # accessed
+        self._adjacency_list_representation = None
+        self._edge_representation = None
+        self._cache = dict()
+
+    def memory_usage(self):
+        """Returns the number of bytes held by each representation of the graph.
+
+        The representations which have not been generated yet hold no bytes.
+        The objects shared between representations (e.g. the name of the graph)
+        are counted once, in the first representation holding them.
+
+        Returns
+        -------
+        dict
+            The number of bytes held by the representation via the adjacency
+            matrix ('adjacency_matrix'), the representation via adjacency lists
+            ('adjacency_lists'), the representation via typed edges ('edges')
+            and the structure cached ('cache'), including the Python object
+            overhead (see deep_sizeof), and their sum ('total').
+        """
+        seen = set()
+        usage = {
+            'adjacency_matrix': deep_sizeof(
+                self.adjacency_matrix_representation, seen
+            ),
+            'adjacency_lists': deep_sizeof(
+                self._adjacency_list_representation, seen
+            ),
+            'edges': deep_sizeof(self._edge_representation, seen),
+            'cache': deep_sizeof(self._cache, seen),
+        }
+
+        return total_memory_usage(usage)
+
+    def out_degrees(self, block_size=None):
+        """Computes the out-degrees of the vertices of the graph.
+
+        An undirected edge counts in the out-degrees (and in the in-degrees) of
+        both its vertices.
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of rows of the adjacency matrix processed at once
+            (default is None, in which case the blocks contain about
+            BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        numpy.ndarray
+            The out-degrees, in the natural order of the vertices.
+        """
+        if GraphViaAdjacencyMatrix.is_sparse(self.adjacency_matrix):
+            return np.asarray(
+                (self.adjacency_matrix != 0).sum(axis=1), dtype=np.int64
+            ).ravel()
+
+        out_degrees = np.zeros(self.nb_vertices, dtype=np.int64)
+        for start, block in GraphViaAdjacencyMatrix.iterate_row_blocks(
+                self.adjacency_matrix, block_size=block_size):
+            out_degrees[start:start + block.shape[0]] = \
+                np.count_nonzero(block, axis=1)
+
+        return out_degrees
+
+    def in_degrees(self, block_size=None):
+        """Computes the in-degrees of the vertices of the graph.
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of rows of the adjacency matrix processed at once
+            (default is None, in which case the blocks contain about
+            BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        numpy.ndarray
+            The in-degrees, in the natural order of the vertices.
+        """
+        if GraphViaAdjacencyMatrix.is_sparse(self.adjacency_matrix):
+            return np.asarray(
+                (self.adjacency_matrix != 0).sum(axis=0), dtype=np.int64
+            ).ravel()
+
+        in_degrees = np.zeros(self.nb_vertices, dtype=np.int64)
+        for _, block in GraphViaAdjacencyMatrix.iterate_row_blocks(
+                self.adjacency_matrix, block_size=block_size):
+            in_degrees += np.count_nonzero(block, axis=0)
+
+        return in_degrees
 
     def structural_hamming_distance(self,
                                     other,
-                                    penalty_edge_mismatch_func=None):
+                                    penalty_edge_mismatch_func=None,
+                                    block_size=None):
         """Computes the Structural Hamming Distance between two graphs.
 
         By default, the Structural Hamming Distance (SHD) is equal to the number
@@ -139,6 +253,9 @@ class Graph:
         penalise the presence of an edge in the opposite direction more than the
         absence of an edge, for example).
 
+        The default SHD is computed directly from the adjacency matrices, in
+        blocks of rows ; a user-provided penalty scheme is applied edge by edge.
+
         Parameters
         ----------
         other : Graph
@@ -146,6 +263,10 @@ class Graph:
         penalty_edge_mismatch_func : callable, optional
             The edge mismatch penalty scheme (default is None in which case a
             built-in function is used).
+        block_size : int, optional
+            The number of rows of the adjacency matrices processed at once by
+            the default scheme (default is None, in which case the blocks
+            contain about BLOCK_NB_ENTRIES entries).
 
         Returns
         -------
@@ -159,6 +280,15 @@ class Graph:
             Raised if the graphs do not have the same vertex set.
         """
 
+        if penalty_edge_mismatch_func is None:
+            if self.adjacency_matrix.shape != other.adjacency_matrix.shape:
+                msg = 'The Structural Hamming Distances cannot be computed : '
+                msg += 'the graphs cannot be compared.'
+                raise GraphsCannotBeCompared(msg)
+            return Graph.count_edge_mismatches(self.adjacency_matrix,
+                                               other.adjacency_matrix,
+                                               block_size=block_size)
+
         res = self.edge_representation.structural_hamming_distance(
             other=other.edge_representation,
             penalty_edge_mismatch_func=penalty_edge_mismatch_func
@@ -167,13 +297,68 @@ class Graph:
         return res
 
     @staticmethod
-    def adjacency_matrix_to_adjacency_lists(adjacency_matrix):
+    def count_edge_mismatches(matrix_1, matrix_2, block_size=None):
+        """Counts the pairs of vertices whose edges differ in two graphs.
+
+        The edge between :math:`X_i` and :math:`X_j` (:math:`i \\leq j`)
+        differs if :math:`(M_{i,j}, M_{j,i})` differs between the two adjacency
+        matrices. The adjacency matrices are compared in pairs of transposed
+        blocks.
+
+        Parameters
+        ----------
+        matrix_1 : array_like or scipy.sparse matrix
+            The adjacency matrix of the first graph.
+        matrix_2 : array_like or scipy.sparse matrix
+            The adjacency matrix of the second graph, of the same shape.
+        block_size : int, optional
+            The number of rows (and columns) of the blocks processed at once
+            (default is None, in which case the blocks contain about
+            BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        int
+            The number of pairs of vertices whose edges differ.
+        """
+        is_sparse = GraphViaAdjacencyMatrix.is_sparse
+        if is_sparse(matrix_1) and is_sparse(matrix_2):
+            differences = (matrix_1.tocsr() != matrix_2.tocsr()).astype(np.int8)
+            mismatches = differences + differences.T
+            rows, columns = mismatches.nonzero()
+            return int(np.count_nonzero(rows <= columns))
+
+        def block_pairs(matrix):
+            return GraphViaAdjacencyMatrix.iterate_transposed_block_pairs(
+                matrix, block_size=block_size
+            )
+
+        nb_mismatches = 0
+        for (row_start, column_start, block_1, transposed_block_1), \
+                (_, _, block_2, transposed_block_2) in \
+                zip(block_pairs(matrix_1), block_pairs(matrix_2)):
+            mismatches = np.logical_or(block_1 != block_2,
+                                       transposed_block_1 != transposed_block_2)
+            if row_start == column_start:
+                # Only counts the pairs (i, j) with i <= j
+                mismatches = np.triu(mismatches)
+            nb_mismatches += int(np.count_nonzero(mismatches))
+
+        return nb_mismatches
+
+    @staticmethod
+    def adjacency_matrix_to_adjacency_lists(adjacency_matrix, block_size=None):
         """Converts an adjacency matrix to the corresponding adjacency lists.
 
+        The adjacency matrix is processed in blocks of rows.
+
         Parameters
         ----------
-        adjacency_matrix : array_like
+        adjacency_matrix : array_like or scipy.sparse matrix
             The adjacency matrix.
+        block_size : int, optional
+            The number of rows processed at once (default is None, in which case
+            the blocks contain about BLOCK_NB_ENTRIES entries).
 
         Returns
         -------
@@ -181,14 +366,25 @@ class Graph:
             The adjacency lists.
         """
 
-        nb_vertices = adjacency_matrix.shape[0]
-
         # Build the adjacency lists
         adjacency_lists = []
-        for i in range(nb_vertices):
-            adjacency_lists.append(
-                np.where(adjacency_matrix[i, :] != 0)[0].tolist()
-            )
+        if GraphViaAdjacencyMatrix.is_sparse(adjacency_matrix):
+            csr_matrix = adjacency_matrix.tocsr()
+            indptr = csr_matrix.indptr
+            for i in range(csr_matrix.shape[0]):
+                row = slice(indptr[i], indptr[i + 1])
+                indices = csr_matrix.indices[row][csr_matrix.data[row] != 0]
+                adjacency_lists.append(np.sort(indices).tolist())
+            return adjacency_lists
+
+        for _, block in GraphViaAdjacencyMatrix.iterate_row_blocks(
+                adjacency_matrix, block_size=block_size):
+            rows, columns = np.nonzero(block)
+            bounds = np.searchsorted(rows, np.arange(block.shape[0] + 1))
+            for k in range(block.shape[0]):
+                adjacency_lists.append(
+                    columns[bounds[k]:bounds[k + 1]].tolist()
+                )
 
         return adjacency_lists
 
@@ -0,0 +1,578 @@
+import numpy as np
+
+from StructuralCausalModels.cpdag import _cpdag_adjacency_matrices
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    BLOCK_NB_ENTRIES, GraphViaAdjacencyMatrix, InvalidAdjacencyMatrix
+from StructuralCausalModels.graph_via_edges import GraphsCannotBeCompared
+from StructuralCausalModels.memory import deep_sizeof, total_memory_usage
+from StructuralCausalModels.random_graphs import \
+    random_dag_adjacency_matrices
+
+
+class GraphBatch:
+    """A class to represent a batch of graphs on the same number of vertices.
+
+    The adjacency matrices of the graphs are stored in one contiguous array of
+    bytes, of shape (k, n, n), or of bits, packed along the rows, of shape
+    (k, n, ceil(n / 8)), which divides the memory by 8. Validation, acyclicity
+    checks, degrees and Structural Hamming Distances are computed for all the
+    graphs at once, in blocks of graphs, with vectorised operations. A Graph
+    object is only created when a graph of the batch is requested : its
+    adjacency matrix is then a read-only view on the array of bytes (or is
+    unpacked from the array of bits), so that the batch cannot be modified
+    through the graph.
+
+    Parameters
+    ----------
+    adjacency_matrices : array_like
+        The adjacency matrices of the graphs, of shape (k, n, n).
+    names : list, optional
+        The names of the graphs, one per adjacency matrix (default is None, in
+        which case they are all '').
+    validate : bool, optional
+        Whether to check that the adjacency matrices are valid (default is
+        True). Only meant to be disabled for adjacency matrices known to be
+        valid.
+    packed : bool, optional
+        Whether to store the adjacency matrices as packed bits (default is
+        False).
+
+    Raises
+    ------
+    InvalidAdjacencyMatrix
+        If the adjacency matrices are not of shape (k, n, n), if some of them
+        contains other values than 0's and 1's, or if the number of names is
+        not k.
+    """
+
+    def __init__(self, adjacency_matrices, names=None, validate=True,
+                 packed=False):
+
+        matrices = np.asarray(adjacency_matrices)
+        if matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2]:
+            msg = 'The adjacency matrices should be square and of the same '
+            msg += 'size, of shape (k, n, n) !'
+            raise InvalidAdjacencyMatrix(msg)
+        if names is not None and len(names) != len(matrices):
+            msg = f'There are {len(names)} names for {len(matrices)} '
+            msg += 'adjacency matrices !'
+            raise InvalidAdjacencyMatrix(msg)
+        if validate:
+            invalid = np.flatnonzero(
+                ~GraphBatch.validate_binary_matrices(matrices)
+            )
+            if len(invalid) > 0:
+                msg = f'Adjacency matrices provided not valid : {invalid} !'
+                raise InvalidAdjacencyMatrix(msg)
+
+        self._nb_vertices = matrices.shape[1]
+        if packed:
+            self._matrices = np.packbits(matrices != 0, axis=2)
+        else:
+            self._matrices = np.ascontiguousarray(matrices, dtype=np.uint8)
+        self.packed = packed
+        self.names = list(names) if names is not None \
+            else [''] * len(matrices)
+
+    @classmethod
+    def from_graphs(cls, graphs, packed=False):
+        """Creates a batch from Graph objects on the same number of vertices.
+
+        Parameters
+        ----------
+        graphs : list
+            The graphs.
+        packed : bool, optional
+            Whether to store the adjacency matrices as packed bits (default is
+            False).
+
+        Returns
+        -------
+        GraphBatch
+            The batch of graphs, with their names.
+        """
+        is_sparse = GraphViaAdjacencyMatrix.is_sparse
+        matrices = [graph.adjacency_matrix.toarray()
+                    if is_sparse(graph.adjacency_matrix)
+                    else np.asarray(graph.adjacency_matrix)
+                    for graph in graphs]
+        try:
+            matrices = np.stack(matrices)
+        except ValueError:
+            msg = 'The graphs should have the same number of vertices !'
+            raise InvalidAdjacencyMatrix(msg)
+
+        return cls(matrices, names=[graph.name for graph in graphs],
+                   validate=False, packed=packed)
+
+    @classmethod
+    def random_dags(cls, nb_graphs, nb_vertices, model='erdos_renyi',
+                    nb_parents=1, ordering=None, packed=False,
+                    random_state=None):
+        """Draws a batch of random DAGs (see random_dag_adjacency_matrices).
+
+        Parameters
+        ----------
+        nb_graphs : int
+            The number of DAGs.
+        nb_vertices : int
+            The number of vertices of each DAG.
+        model : str, optional
+            The random graph model (default is 'erdos_renyi').
+        nb_parents : float, optional
+            The (expected) number of parents of a vertex (default is 1).
+        ordering : array_like or str, optional
+            The ordering of the vertices (default is None).
+        packed : bool, optional
+            Whether to store the adjacency matrices as packed bits (default is
+            False).
+        random_state : int or numpy.random.Generator, optional
+            The seed of the random number generator, or the generator (default
+            is None).
+
+        Returns
+        -------
+        GraphBatch
+            The batch of DAGs.
+        """
+        matrices = random_dag_adjacency_matrices(
+            nb_vertices, model=model, nb_parents=nb_parents,
+            nb_graphs=nb_graphs, ordering=ordering, random_state=random_state
+        )
+
+        return cls(matrices, validate=False, packed=packed)
+
+    @staticmethod
+    def validate_binary_matrices(matrices):
+        """Checks which matrices of a batch contain only 0's and 1's.
+
+        Parameters
+        ----------
+        matrices : array_like
+            The matrices, of shape (k, n, n).
+
+        Returns
+        -------
+        numpy.ndarray
+            Whether each matrix contains only 0's and 1's, of shape (k,).
+        """
+        matrices = np.asarray(matrices)
+        if matrices.dtype == bool:
+            return np.ones(len(matrices), dtype=bool)
+
+        return np.all((matrices == 0) | (matrices == 1), axis=(1, 2))
+
+    @property
+    def nb_graphs(self):
+        """int: the number of graphs in the batch."""
+        return self._matrices.shape[0]
+
+    @property
+    def nb_vertices(self):
+        """int: the number of vertices of each graph."""
+        return self._nb_vertices
+
+    @property
+    def adjacency_matrices(self):
+        """numpy.ndarray: the adjacency matrices of the graphs, as bytes, of
+        shape (k, n, n) (unpacked if the batch stores bits, a read-only view on
+        the batch otherwise)."""
+        if self.packed:
+            return np.unpackbits(self._matrices, axis=2,
+                                 count=self._nb_vertices)
+        matrices = self._matrices.view()
+        matrices.flags.writeable = False
+
+        return matrices
+
+    def __len__(self):
+        """
+        Returns the number of graphs in the batch.
+
+        Returns
+        -------
+        int
+            The number of graphs in the batch.
+        """
+        return self.nb_graphs
+
+    def __getitem__(self, index):
+        """Returns a graph of the batch, or a batch of some of its graphs.
+
+        Parameters
+        ----------
+        index : int or slice or array_like
+            The index of the graph, or the indices of the graphs.
+
+        Returns
+        -------
+        Graph or GraphBatch
+            The graph, whose adjacency matrix is a read-only view on the batch
+            if it stores bytes, or the batch of the graphs (a view on the batch
+            if index is a slice).
+        """
+        if isinstance(index, (int, np.integer)):
+            return self.graph(index)
+
+        batch = GraphBatch.__new__(GraphBatch)
+        batch._nb_vertices = self._nb_vertices
+        batch._matrices = self._matrices[index]
+        batch.packed = self.packed
+        batch.names = np.array(self.names, dtype=object)[index].tolist()
+
+        return batch
+
+    def __iter__(self):
+        """
+        Iterates over the graphs of the batch, creating their Graph objects one
+        after the other.
+
+        Yields
+        ------
+        Graph
+            The graphs of the batch.
+        """
+        for index in range(self.nb_graphs):
+            yield self.graph(index)
+
+    def graph(self, index, graph_class=Graph):
+        """Creates a Graph object for a graph of the batch.
+
+        Parameters
+        ----------
+        index : int
+            The index of the graph.
+        graph_class : type, optional
+            The class of the object created, e.g. DirectedAcyclicGraph (default
+            is Graph). The adjacency matrix is not validated.
+
+        Returns
+        -------
+        Graph
+            The graph, whose adjacency matrix is a read-only view on the batch
+            if it stores bytes.
+        """
+        matrix = self._matrices[index]
+        if self.packed:
+            matrix = np.unpackbits(matrix, axis=1, count=self._nb_vertices)
+        matrix.flags.writeable = False
+
+        return graph_class(adjacency_matrix=matrix, name=self.names[index],
+                           validate=False)
+
+    def iterate_blocks(self, block_size=None):
+        """Iterates over the blocks of consecutive graphs of the batch.
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of graphs in a block (default is None, in which case the
+            blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Yields
+        ------
+        tuple
+            The index of the first graph of the block, and its adjacency
+            matrices as booleans, of shape (b, n, n).
+        """
+        if block_size is None:
+            block_size = max(1, BLOCK_NB_ENTRIES // max(1, self._nb_vertices
+                                                        ** 2))
+
+        for start in range(0, self.nb_graphs, block_size):
+            block = self._matrices[start:start + block_size]
+            if self.packed:
+                block = np.unpackbits(block, axis=2, count=self._nb_vertices)
+            yield start, block != 0
+
+    def _map_blocks(self, func, block_size=None):
+        """Applies a function to the blocks of graphs and concatenates the
+        results.
+
+        Parameters
+        ----------
+        func : callable
+            The function, which maps adjacency matrices of shape (b, n, n) to
+            an array of shape (b, ...).
+        block_size : int, optional
+            The number of graphs processed at once (default is None).
+
+        Returns
+        -------
+        numpy.ndarray
+            The results for all the graphs.
+        """
+        results = [func(block)
+                   for _, block in self.iterate_blocks(block_size=block_size)]
+        if not results:
+            return func(np.zeros((0, self._nb_vertices, self._nb_vertices),
+                                 dtype=bool))
+
+        return np.concatenate(results)
+
+    def is_directed(self, block_size=None):
+        """Checks which graphs of the batch are directed graphs.
+
+        A graph is directed if :math:`M_{i,j}` and :math:`M_{j,i}` are never
+        both 1 (which also rules out self-loops).
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of graphs processed at once (default is None, in which
+            case the blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        numpy.ndarray
+            Whether each graph is directed, of shape (k,).
+        """
+        return self._map_blocks(
+            lambda block: ~np.any(block & np.swapaxes(block, 1, 2),
+                                  axis=(1, 2)),
+            block_size=block_size
+        )
+
+    @staticmethod
+    def _acyclic(matrices):
+        """
+        Checks which graphs of a block are acyclic, by removing the vertices
+        without parents, level after level, from all the graphs at once.
+
+        Parameters
+        ----------
+        matrices : numpy.ndarray
+            The adjacency matrices, as booleans, of shape (b, n, n).
+
+        Returns
+        -------
+        numpy.ndarray
+            Whether each graph is acyclic, of shape (b,).
+        """
+        remaining = np.ones(matrices.shape[:2], dtype=bool)
+        stalled = np.zeros(len(matrices), dtype=bool)
+
+        while True:
+            active = remaining.any(axis=1) & ~stalled
+            if not active.any():
+                return ~remaining.any(axis=1)
+            has_parents = np.any(
+                matrices[active] & remaining[active][:, :, np.newaxis], axis=1
+            )
+            sources = remaining[active] & ~has_parents
+            # A graph whose remaining vertices all have parents has a cycle
+            stalled[np.flatnonzero(active)[~sources.any(axis=1)]] = True
+            remaining[active] &= ~sources
+
+    def is_acyclic(self, block_size=None):
+        """Checks which graphs of the batch are directed acyclic graphs.
+
+        The number of vectorised steps is the length of the longest path of
+        the DAGs of a block, rather than their number of vertices.
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of graphs processed at once (default is None, in which
+            case the blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        numpy.ndarray
+            Whether each graph is a DAG, of shape (k,).
+        """
+        return self.is_directed(block_size=block_size) & self._map_blocks(
+            GraphBatch._acyclic, block_size=block_size
+        )
+
+    def out_degrees(self, block_size=None):
+        """Computes the out-degrees of the vertices of the graphs.
+
+        An undirected edge counts in the out-degrees (and in the in-degrees) of
+        both its vertices.
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of graphs processed at once (default is None, in which
+            case the blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        numpy.ndarray
+            The out-degrees, of shape (k, n).
+        """
+        return self._map_blocks(
+            lambda block: np.count_nonzero(block, axis=2).astype(np.int64),
+            block_size=block_size
+        )
+
+    def in_degrees(self, block_size=None):
+        """Computes the in-degrees of the vertices of the graphs.
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of graphs processed at once (default is None, in which
+            case the blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        numpy.ndarray
+            The in-degrees, of shape (k, n).
+        """
+        return self._map_blocks(
+            lambda block: np.count_nonzero(block, axis=1).astype(np.int64),
+            block_size=block_size
+        )
+
+    def degree_statistics(self, block_size=None):
+        """Computes statistics of the degrees of the vertices of each graph.
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of graphs processed at once (default is None, in which
+            case the blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        dict
+            The number of 1's of each adjacency matrix ('nb_edges'), the mean
+            degree, i.e. the mean in-degree or out-degree ('mean_degree'), the
+            largest in-degree ('max_in_degree'), the largest out-degree
+            ('max_out_degree') and the number of vertices without edges
+            ('nb_isolated_vertices'), each of shape (k,).
+        """
+        in_degrees = self.in_degrees(block_size=block_size)
+        out_degrees = self.out_degrees(block_size=block_size)
+        nb_edges = out_degrees.sum(axis=1)
+
+        return {
+            'nb_edges': nb_edges,
+            'mean_degree': nb_edges / max(1, self._nb_vertices),
+            'max_in_degree': in_degrees.max(axis=1, initial=0),
+            'max_out_degree': out_degrees.max(axis=1, initial=0),
+            'nb_isolated_vertices': np.count_nonzero(
+                (in_degrees == 0) & (out_degrees == 0), axis=1
+            ),
+        }
+
+    def structural_hamming_distances(self, other, block_size=None):
+        """Computes the Structural Hamming Distances between the graphs of the
+        batch and other graphs.
+
+        As in Graph.structural_hamming_distance, the SHD is the number of pairs
+        of vertices :math:`X_i` and :math:`X_j` (:math:`i \\leq j`) whose edges
+        differ, i.e. such that :math:`(M_{i,j}, M_{j,i})` differs between the
+        two adjacency matrices.
+
+        Parameters
+        ----------
+        other : GraphBatch or Graph or array_like
+            The graphs compared to the graphs of the batch, one for each graph,
+            as a batch or as adjacency matrices of shape (k, n, n), or one
+            graph compared to all the graphs, as a Graph or as an adjacency
+            matrix of shape (n, n).
+        block_size : int, optional
+            The number of graphs processed at once (default is None, in which
+            case the blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        numpy.ndarray
+            The Structural Hamming Distances, of shape (k,).
+
+        Raises
+        ------
+        GraphsCannotBeCompared
+            If the graphs do not have the same vertex set, or if the batches
+            are not of the same size.
+        """
+        if isinstance(other, GraphBatch):
+            other = other.adjacency_matrices
+        elif isinstance(other, Graph):
+            other = other.adjacency_matrix
+        if GraphViaAdjacencyMatrix.is_sparse(other):
+            other = other.toarray()
+        other = np.asarray(other) != 0
+        shape = (self._nb_vertices, self._nb_vertices)
+        if other.shape not in (shape, (self.nb_graphs,) + shape):
+            msg = 'The Structural Hamming Distances cannot be computed : '
+            msg += 'the graphs cannot be compared.'
+            raise GraphsCannotBeCompared(msg)
+
+        distances = np.empty(self.nb_graphs, dtype=np.int64)
+        for start, block in self.iterate_blocks(block_size=block_size):
+            stop = start + len(block)
+            mismatches = block != (other if other.ndim == 2
+                                   else other[start:stop])
+            symmetric = mismatches | np.swapaxes(mismatches, 1, 2)
+            # Each pair i < j is counted twice, each pair i = i once
+            distances[start:stop] = (
+                np.count_nonzero(symmetric, axis=(1, 2)) +
+                np.count_nonzero(np.diagonal(mismatches, axis1=1, axis2=2),
+                                 axis=1)
+            ) // 2
+
+        return distances
+
+    def compute_cpdags(self, block_size=None):
+        """Computes the CPDAGs of the Markov equivalence classes of the DAGs of
+        the batch (see dags_to_cpdags).
+
+        Parameters
+        ----------
+        block_size : int, optional
+            The number of graphs processed at once (default is None, in which
+            case the blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Returns
+        -------
+        GraphBatch
+            The batch of the CPDAGs, stored as the batch of the DAGs.
+
+        Raises
+        ------
+        InvalidAdjacencyMatrix
+            If some adjacency matrix has a cycle.
+        """
+        cpdags = self._map_blocks(_cpdag_adjacency_matrices,
+                                  block_size=block_size)
+
+        return GraphBatch(cpdags, names=self.names, validate=False,
+                          packed=self.packed)
+
+    def memory_usage(self):
+        """Returns the number of bytes held by the batch.
+
+        Returns
+        -------
+        dict
+            The number of bytes held by the adjacency matrices
+            ('adjacency_matrices') and by the names of the graphs ('names'),
+            including the Python object overhead (see deep_sizeof), and their
+            sum ('total').
+        """
+        seen = set()
+        usage = {
+            'adjacency_matrices': deep_sizeof(self._matrices, seen),
+            'names': deep_sizeof(self.names, seen),
+        }
+
+        return total_memory_usage(usage)
+
+    def __str__(self):
+        """
+        Returns a user-friendly string representation of the object.
+
+        Returns
+        -------
+        str
+            A user-friendly string representation of the object.
+        """
+        s = f"GraphBatch of {self.nb_graphs} graphs on {self._nb_vertices} "
+        s += f"vertices, stored as {'bits' if self.packed else 'bytes'}"
+
+        return s
@@ -1,3 +1,6 @@
+from StructuralCausalModels.memory import deep_sizeof
+
+
 class InvalidAdjacencyLists(Exception):
     """Raised when the adjacency lists are not valid for the graph.
     """
@@ -45,10 +48,26 @@ class GraphViaAdjacencyLists:
         self.name = name
         self.nb_vertices = nb_vertices
         self.adjacency_lists = adjacency_lists
-        self.indegrees = []
-        for i in range(self.nb_vertices):
-            count = sum([int(i in adj_l) for adj_l in self.adjacency_lists])
-            self.indegrees.append(count)
+        self.indegrees = [0] * self.nb_vertices
+        for adjacency_list in self.adjacency_lists:
+            for j in set(adjacency_list):
+                self.indegrees[j] += 1
+
+    def memory_usage(self):
+        """
+        Returns the number of bytes held by the object.
+
+        Each vertex in an adjacency list is a Python integer, and each
+        adjacency list a Python list, so that the adjacency lists hold several
+        times as many bytes as the indices of a sparse adjacency matrix.
+
+        Returns
+        -------
+        int
+            The number of bytes held by the object, including the Python object
+            overhead of its attributes (see deep_sizeof).
+        """
+        return deep_sizeof(self)
 
     def __str__(self):
         """
@@ -1,5 +1,13 @@
+import math
 import numpy as np
 
+from StructuralCausalModels.memory import deep_sizeof
+
+
+# Number of entries of the adjacency matrix loaded at once by the blockwise
+# methods (i.e. 4 MiB for adjacency matrices of bytes)
+BLOCK_NB_ENTRIES = 1 << 22
+
 
 class InvalidAdjacencyMatrix(Exception):
     """Raised if the adjacency matrix does not contain only 0's and 1's.
@@ -10,12 +18,20 @@ class InvalidAdjacencyMatrix(Exception):
 class GraphViaAdjacencyMatrix:
     """Implements a graph structure using an adjacency matrix representation.
 
+    The adjacency matrix is never copied : it may be a memory-mapped array
+    (e.g. loaded with numpy.load(..., mmap_mode='r')) or a scipy.sparse matrix,
+    in which case it is only ever processed in blocks of rows, so that graphs
+    larger than memory can be handled.
+
     Parameters
     ----------
-    adjacency_matrix : array_like
+    adjacency_matrix : array_like or scipy.sparse matrix
         The adjacency matrix of the graph.
     name : str, optional
         The name of the object created (default is '').
+    validate : bool, optional
+        Whether to check that the adjacency matrix is valid (default is True).
+        Only meant to be disabled for adjacency matrices known to be valid.
 
     Raises
     ------
@@ -23,9 +39,10 @@ class GraphViaAdjacencyMatrix:
         If the adjacency matrix provided does not contain only 0's and 1's.
     """
 
-    def __init__(self, adjacency_matrix, name=''):
+    def __init__(self, adjacency_matrix, name='', validate=True):
 
-        if not GraphViaAdjacencyMatrix.validate_binary_matrix(adjacency_matrix):
+        if validate and not GraphViaAdjacencyMatrix.validate_binary_matrix(
+                adjacency_matrix):
             msg = 'Adjacency matrix provided not valid.'
             raise InvalidAdjacencyMatrix(msg)
 
@@ -33,15 +50,115 @@ class GraphViaAdjacencyMatrix:
         self.adjacency_matrix = adjacency_matrix
 
     @staticmethod
-    def validate_binary_matrix(matrix):
+    def is_sparse(matrix):
+        """
+        Checks whether a matrix is a scipy.sparse matrix.
+
+        Parameters
+        ----------
+        matrix : array_like or scipy.sparse matrix
+            The matrix to check.
+
+        Returns
+        -------
+        bool
+            Whether the matrix is a scipy.sparse matrix.
+        """
+        return hasattr(matrix, 'tocsr')
+
+    @staticmethod
+    def iterate_row_blocks(matrix, block_size=None):
+        """
+        Iterates over the blocks of consecutive rows of a matrix.
+
+        Parameters
+        ----------
+        matrix : array_like or scipy.sparse matrix
+            The matrix, of shape (nb_rows, nb_columns).
+        block_size : int, optional
+            The number of rows in a block (default is None, in which case the
+            blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Yields
+        ------
+        tuple
+            The index of the first row of the block, and the block as a dense
+            numpy.ndarray.
+        """
+        nb_rows = matrix.shape[0]
+        if block_size is None:
+            block_size = max(1, BLOCK_NB_ENTRIES // max(1, matrix.shape[1]))
+
+        is_sparse = GraphViaAdjacencyMatrix.is_sparse(matrix)
+        if is_sparse:
+            matrix = matrix.tocsr()
+
+        for start in range(0, nb_rows, block_size):
+            block = matrix[start:start + block_size]
+            yield start, (block.toarray() if is_sparse else np.asarray(block))
+
+    @staticmethod
+    def iterate_transposed_block_pairs(matrix, block_size=None):
+        """
+        Iterates over the pairs of square blocks of a square matrix which are
+        transposed of each other.
+
+        For the blocks of rows :math:`I` and :math:`J` (:math:`I \\leq J`),
+        the block :math:`M_{I,J}` is paired with the transpose of the block
+        :math:`M_{J,I}`, so that an entry :math:`M_{i,j}` and its transposed
+        entry :math:`M_{j,i}` always sit at the same position. Each entry of
+        the matrix is read at most twice, which bounds the I/O on memory-mapped
+        matrices, unlike reading a full slab of columns for each block of rows.
+
+        Parameters
+        ----------
+        matrix : array_like or scipy.sparse matrix
+            The square matrix, of shape (nb_rows, nb_rows).
+        block_size : int, optional
+            The number of rows (and columns) of a block (default is None, in
+            which case the blocks contain about BLOCK_NB_ENTRIES entries).
+
+        Yields
+        ------
+        tuple
+            The index of the first row of the block, the index of its first
+            column, the block and the transpose of its transposed block, as
+            dense numpy.ndarray's.
+        """
+        nb_rows = matrix.shape[0]
+        if block_size is None:
+            block_size = max(1, math.isqrt(BLOCK_NB_ENTRIES))
+
+        is_sparse = GraphViaAdjacencyMatrix.is_sparse(matrix)
+        if is_sparse:
+            matrix = matrix.tocsr()
+
+        def read(rows, columns):
+            block = matrix[rows, columns]
+            return block.toarray() if is_sparse else np.asarray(block)
+
+        for row_start in range(0, nb_rows, block_size):
+            rows = slice(row_start, row_start + block_size)
+            for column_start in range(row_start, nb_rows, block_size):
+                columns = slice(column_start, column_start + block_size)
+                yield (row_start, column_start, read(rows, columns),
+                       read(columns, rows).T)
+
+    @staticmethod
+    def validate_binary_matrix(matrix, block_size=None):
         """
         Checks that a matrix is an adjacency matrix (i.e. a square matrix
         containing only 0's and 1's).
 
+        The matrix is checked in blocks of rows.
+
         Parameters
         ----------
-        matrix : array_like
+        matrix : array_like or scipy.sparse matrix
             The matrix to check.
+        block_size : int, optional
+            The number of rows checked at once (default is None, in which case
+            the blocks contain about BLOCK_NB_ENTRIES entries).
 
         Returns
         -------
@@ -54,11 +171,32 @@ class GraphViaAdjacencyMatrix:
         if matrix.shape[0] != matrix.shape[1]:
             return False
 
-        if not np.all(np.logical_or(matrix == 1, matrix == 0)):
-            return False
+        if GraphViaAdjacencyMatrix.is_sparse(matrix):
+            data = matrix.tocsr().data
+            return bool(np.all(np.logical_or(data == 1, data == 0)))
+
+        for _, block in GraphViaAdjacencyMatrix.iterate_row_blocks(
+                matrix, block_size=block_size):
+            if not np.all(np.logical_or(block == 1, block == 0)):
+                return False
 
         return True
 
+    def memory_usage(self):
+        """
+        Returns the number of bytes held by the object.
+
+        The data of the adjacency matrix is only counted if the adjacency
+        matrix owns it (e.g. not for memory-mapped adjacency matrices).
+
+        Returns
+        -------
+        int
+            The number of bytes held by the object, including the Python object
+            overhead of its attributes (see deep_sizeof).
+        """
+        return deep_sizeof(self)
+
     def __str__(self):
         """
         Returns a user-friendly string representation of the object.
@@ -1,5 +1,7 @@
 from enum import Enum
 
+from StructuralCausalModels.memory import deep_sizeof
+
 
 class EdgeType(Enum):
     """An enumeration to represent possible types of edges between vertices.
@@ -148,6 +150,23 @@ class GraphViaEdges:
 
         return shd
 
+    def memory_usage(self):
+        """
+        Returns the number of bytes held by the object.
+
+        The typed edges are a dictionary with an entry for each of the
+        :math:`n(n+1)/2` pairs of vertices, whether they are adjacent or not,
+        keyed by a tuple of two Python integers : they typically dominate the
+        memory held by a Graph.
+
+        Returns
+        -------
+        int
+            The number of bytes held by the object, including the Python object
+            overhead of its attributes (see deep_sizeof).
+        """
+        return deep_sizeof(self)
+
     def __str__(self):
         """
         Returns a user-friendly string representation of the object.
@@ -0,0 +1,585 @@
+import itertools
+import os
+
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import numpy as np
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.linear_fitting import InvalidData
+from StructuralCausalModels.structural_causal_model import InvalidExecutor
+
+
+# The minimum number of local scores computed by a task submitted to an
+# executor : smaller tasks cost more to send than to compute
+MIN_TASK_SIZE = 64
+
+# The score used by the tasks of the workers of a process pool, set once per
+# worker rather than sent with every task
+_worker_score = None
+
+
+def _initialize_worker(score):
+    """
+    Sets the score used by the tasks of a worker of a process pool.
+
+    Parameters
+    ----------
+    score : DecomposableScore
+        The score.
+    """
+    global _worker_score
+    _worker_score = score
+
+
+def _compute_family_deltas(score, node, parents, candidates):
+    """
+    Computes the changes of the local score of a variable when each candidate
+    is added to (or removed from) its parent set (see
+    DecomposableScore.local_score_changes).
+
+    Parameters
+    ----------
+    score : DecomposableScore
+        The score, or None to use the score of the worker of a process pool.
+    node : int
+        The index of the variable.
+    parents : tuple
+        The indices of its parents.
+    candidates : numpy.ndarray
+        The indices of the candidate parents, which are added to the parent set
+        if they are not in it and removed from it otherwise.
+
+    Returns
+    -------
+    numpy.ndarray
+        The change of the local score for each candidate.
+    """
+    if score is None:
+        score = _worker_score
+
+    return score.local_score_changes(node, parents, candidates)
+
+
+class HillClimbingSearch:
+    """A class to learn DAGs by greedy hill climbing (or tabu search) on a
+    decomposable score.
+
+    Starting from a DAG (by default the empty DAG), the search repeatedly
+    applies the edge addition, removal or reversal which increases the score
+    the most, among those which keep the graph acyclic. The search maintains :
+
+    - a table of the change of the score for toggling each edge
+      :math:`i \\rightarrow j` (adding it if absent, removing it otherwise),
+      which only depends on the family of :math:`j` : after a move, only the
+      columns of the families changed are recomputed, through the cache of
+      local scores of the score (the change for reversing
+      :math:`i \\rightarrow j` is the sum of the changes for toggling
+      :math:`i \\rightarrow j` and :math:`j \\rightarrow i`).
+    - the reachability matrix of the DAG, updated after each move, so that
+      :math:`i \\rightarrow j` may be added if and only if :math:`j` does not
+      reach :math:`i`, and reversed if and only if :math:`i` reaches no other
+      parent of :math:`j`.
+
+    The columns of the table are computed on an executor when one is given :
+    the initial table, which requires :math:`n (n - 1)` local scores for
+    :math:`n` variables, is by far the costliest step of the search.
+
+    With tabu_length greater than 0, the search is a tabu search : when no move
+    increases the score, the best move is applied anyway, and the vertex pairs
+    of the last tabu_length moves may not be changed again unless the move
+    improves on the best DAG found. The search stops after max_non_improving
+    moves which did not improve on the best DAG found, which is returned.
+
+    Parameters
+    ----------
+    score : DecomposableScore
+        The score (e.g. GaussianBICScore or BGeScore).
+    max_parents : int, optional
+        The maximum number of parents of a variable (default is None, in which
+        case the number of parents is not limited).
+    tabu_length : int, optional
+        The number of recent moves whose vertex pairs are tabu (default is 0,
+        for hill climbing).
+    max_non_improving : int, optional
+        The number of consecutive moves not improving on the best DAG found
+        after which the tabu search stops (default is 10).
+    max_iter : int, optional
+        The maximum number of moves (default is None, in which case the number
+        of moves is not limited).
+    executor : str or concurrent.futures.Executor, optional
+        The executor on which the local scores are computed : either
+        'processes', in which case a process pool is created for the duration
+        of each search, or an existing executor (default is None, in which
+        case the local scores are computed in the calling thread). The score is
+        sent to the workers of the process pool once, and with every task to an
+        existing executor.
+    nb_workers : int, optional
+        The number of worker processes when executor is 'processes', and the
+        number of tasks per family submitted to the executor (default is None,
+        in which case it is the number of CPUs).
+    tolerance : float, optional
+        The minimum increase of the score for a move to count as an
+        improvement (default is 1e-9).
+
+    Attributes
+    ----------
+    best_score : float
+        The score of the DAG learnt by the last search.
+    moves : list
+        The moves applied by the last search, as tuples (operation, source,
+        target, score change) where operation is 'add', 'remove' or 'reverse'.
+
+    Raises
+    ------
+    InvalidExecutor
+        If executor is neither None, 'processes' nor a
+        concurrent.futures.Executor.
+    """
+
+    def __init__(self, score, max_parents=None, tabu_length=0,
+                 max_non_improving=10, max_iter=None, executor=None,
+                 nb_workers=None, tolerance=1e-9):
+
+        if not (executor is None or executor == 'processes' or
+                isinstance(executor, Executor)):
+            msg = "The executor must be either 'processes' or a "
+            msg += "concurrent.futures.Executor !"
+            raise InvalidExecutor(msg)
+
+        self.score = score
+        self.max_parents = max_parents
+        self.tabu_length = tabu_length
+        self.max_non_improving = max_non_improving
+        self.max_iter = max_iter
+        self.executor = executor
+        self.nb_workers = nb_workers
+        self.tolerance = tolerance
+        self.best_score = None
+        self.moves = []
+
+    def fit(self, initial_dag=None, name=''):
+        """Learns a DAG.
+
+        Parameters
+        ----------
+        initial_dag : DirectedAcyclicGraph, optional
+            The DAG the search starts from (default is None, in which case it
+            starts from the empty DAG).
+        name : str, optional
+            The name of the DAG learnt (default is '').
+
+        Returns
+        -------
+        DirectedAcyclicGraph
+            The DAG learnt.
+
+        Raises
+        ------
+        InvalidData
+            If the initial DAG does not have one vertex per variable.
+        """
+        if self.executor == 'processes':
+            with ProcessPoolExecutor(max_workers=self.nb_workers,
+                                     initializer=_initialize_worker,
+                                     initargs=(self.score, )) as pool:
+                return self._search(initial_dag, name, pool, None)
+
+        return self._search(initial_dag, name, self.executor, self.score)
+
+    def _search(self, initial_dag, name, executor, task_score):
+        """
+        Runs the search.
+
+        Parameters
+        ----------
+        initial_dag : DirectedAcyclicGraph or None
+            The DAG the search starts from.
+        name : str
+            The name of the DAG learnt.
+        executor : concurrent.futures.Executor or None
+            The executor on which the local scores are computed.
+        task_score : DecomposableScore or None
+            The score sent with the tasks (None for the workers of a process
+            pool, which hold the score).
+
+        Returns
+        -------
+        DirectedAcyclicGraph
+            The DAG learnt.
+        """
+        nb_var = self.score.nb_var
+        if initial_dag is None:
+            adjacency_matrix = np.zeros((nb_var, nb_var), dtype=bool)
+        else:
+            if initial_dag.nb_vertices != nb_var:
+                msg = f"The initial DAG should have {nb_var} vertices, one "
+                msg += "per variable !"
+                raise InvalidData(msg)
+            adjacency_matrix = np.asarray(initial_dag.adjacency_matrix != 0)
+            if hasattr(adjacency_matrix, 'toarray'):
+                adjacency_matrix = adjacency_matrix.toarray()
+            adjacency_matrix = np.array(adjacency_matrix, dtype=bool)
+
+        self._adjacency_matrix = adjacency_matrix
+        self._reachability = HillClimbingSearch.reachability_matrix(
+            adjacency_matrix
+        )
+        # The change of the score for toggling i -> j is stored in the row of
+        # the family of j, at deltas[j, i]
+        self._deltas = np.full((nb_var, nb_var), -np.inf)
+        # The best addition into each family
+        self._best_sources = np.zeros(nb_var, dtype=np.intp)
+        self._best_gains = np.full(nb_var, -np.inf)
+        sources, targets = np.nonzero(adjacency_matrix)
+        self._edges = set(zip(sources.tolist(), targets.tolist()))
+        self._update_deltas(range(nb_var), executor, task_score)
+        self._update_best_additions(np.arange(nb_var))
+
+        current_score = self.score.score(DirectedAcyclicGraph(
+            adjacency_matrix.astype(np.int8), validate=False
+        ))
+        best_score = current_score
+        self.moves = []
+        nb_best_moves = 0
+        tabu_counts = np.zeros((nb_var, nb_var), dtype=np.int64)
+        tabu_pairs = deque()
+        nb_non_improving = 0
+
+        while self.max_iter is None or len(self.moves) < self.max_iter:
+
+            move = self._best_move(None)
+            if move is None:
+                break
+            # Aspiration : a tabu move is applied if it improves on the best
+            # DAG found
+            if self.tabu_length > 0 and \
+                    current_score + move[3] <= best_score + self.tolerance:
+                move = self._best_move(tabu_counts > 0)
+                if move is None:
+                    break
+            operation, source, target, gain = move
+            if gain <= self.tolerance and self.tabu_length == 0:
+                break
+
+            changed_rows = self._apply(operation, source, target)
+            self._update_deltas(
+                [source, target] if operation == 'reverse' else [target],
+                executor, task_score
+            )
+            self._update_best_additions(
+                np.union1d(changed_rows, [source, target])
+            )
+            current_score += gain
+            self.moves.append(move)
+
+            if current_score > best_score + self.tolerance:
+                best_score = current_score
+                nb_best_moves = len(self.moves)
+                nb_non_improving = 0
+            else:
+                nb_non_improving += 1
+                if nb_non_improving >= self.max_non_improving:
+                    break
+
+            if self.tabu_length > 0:
+                tabu_pairs.append((source, target))
+                tabu_counts[source, target] += 1
+                tabu_counts[target, source] += 1
+                if len(tabu_pairs) > self.tabu_length:
+                    old_source, old_target = tabu_pairs.popleft()
+                    tabu_counts[old_source, old_target] -= 1
+                    tabu_counts[old_target, old_source] -= 1
+
+        # Undoes the moves applied after the best DAG was found
+        for operation, source, target, _ in reversed(
+                self.moves[nb_best_moves:]):
+            if operation == 'add':
+                self._adjacency_matrix[source, target] = False
+            elif operation == 'remove':
+                self._adjacency_matrix[source, target] = True
+            else:
+                self._adjacency_matrix[target, source] = False
+                self._adjacency_matrix[source, target] = True
+        self.moves = self.moves[:nb_best_moves]
+        self.best_score = best_score
+
+        return DirectedAcyclicGraph(
+            adjacency_matrix=self._adjacency_matrix.astype(np.int8),
+            name=name,
+            validate=False
+        )
+
+    @staticmethod
+    def reachability_matrix(adjacency_matrix):
+        """
+        Computes the reachability matrix of a DAG.
+
+        Parameters
+        ----------
+        adjacency_matrix : numpy.ndarray
+            The boolean adjacency matrix of the DAG.
+
+        Returns
+        -------
+        numpy.ndarray
+            The boolean matrix whose entry :math:`(i, j)` is whether there is a
+            directed path from :math:`i` to :math:`j` (of length at least 1).
+        """
+        nb_vertices = adjacency_matrix.shape[0]
+        dag = DirectedAcyclicGraph(adjacency_matrix.astype(np.int8),
+                                   validate=False)
+        reachability = np.zeros((nb_vertices, nb_vertices), dtype=bool)
+        # The descendants of the children of a vertex are known before those
+        # of the vertex
+        for vertex in reversed(dag.compute_causal_order()):
+            children = np.flatnonzero(adjacency_matrix[vertex])
+            reachability[vertex] = adjacency_matrix[vertex]
+            if children.size:
+                reachability[vertex] |= reachability[children].any(axis=0)
+
+        return reachability
+
+    def _update_deltas(self, nodes, executor, task_score):
+        """
+        Recomputes the changes of the score for toggling the edges into some
+        variables.
+
+        Parameters
+        ----------
+        nodes : iterable
+            The indices of the variables whose families changed.
+        executor : concurrent.futures.Executor or None
+            The executor on which the local scores are computed.
+        task_score : DecomposableScore or None
+            The score sent with the tasks.
+        """
+        adjacency_matrix = self._adjacency_matrix
+        nb_var = adjacency_matrix.shape[0]
+        tasks = []
+        for node in nodes:
+            parents = tuple(np.flatnonzero(adjacency_matrix[:, node]).tolist())
+            is_candidate = np.ones(nb_var, dtype=bool)
+            is_candidate[node] = False
+            if self.max_parents is not None and \
+                    len(parents) >= self.max_parents:
+                # Only the parents may be toggled (i.e. removed)
+                is_candidate &= adjacency_matrix[:, node]
+            candidates = np.flatnonzero(is_candidate)
+            self._deltas[node] = -np.inf
+            tasks.append((node, parents, candidates))
+
+        if executor is None:
+            for node, parents, candidates in tasks:
+                self._deltas[node, candidates] = _compute_family_deltas(
+                    self.score, node, parents, candidates
+                )
+            return
+
+        # About one task per worker and family
+        nb_workers = self.nb_workers or os.cpu_count() or 1
+        chunks = []
+        for node, parents, candidates in tasks:
+            chunk_size = max(MIN_TASK_SIZE, -(-len(candidates) // nb_workers))
+            for start in range(0, len(candidates), chunk_size):
+                chunks.append((node, parents,
+                               candidates[start:start + chunk_size]))
+        results = executor.map(
+            _compute_family_deltas,
+            [task_score] * len(chunks),
+            *zip(*chunks)
+        ) if chunks else []
+        for (node, _, candidates), deltas in zip(chunks, results):
+            self._deltas[node, candidates] = deltas
+
+    def _update_best_additions(self, nodes):
+        """
+        Recomputes the best legal edge addition into some variables.
+
+        Parameters
+        ----------
+        nodes : numpy.ndarray
+            The indices of the variables whose deltas, parents, children or
+            descendants changed.
+        """
+        nodes = np.asarray(nodes, dtype=np.intp)
+        adjacency_matrix = self._adjacency_matrix
+        # i -> j may be added if neither i -> j nor j -> i is an edge and j
+        # does not reach i
+        blocked = adjacency_matrix[:, nodes].T | adjacency_matrix[nodes] | \
+            self._reachability[nodes]
+        blocked[np.arange(len(nodes)), nodes] = True
+        gains = np.where(blocked, -np.inf, self._deltas[nodes])
+        best_sources = np.argmax(gains, axis=1)
+        self._best_sources[nodes] = best_sources
+        self._best_gains[nodes] = gains[np.arange(len(nodes)), best_sources]
+
+    def _best_move(self, tabu_mask):
+        """
+        Finds the legal move increasing the score the most.
+
+        Parameters
+        ----------
+        tabu_mask : numpy.ndarray or None
+            Whether each vertex pair is tabu (None if no pair is tabu).
+
+        Returns
+        -------
+        tuple or None
+            The move, as (operation, source, target, score change), or None if
+            no move is legal.
+        """
+        adjacency_matrix = self._adjacency_matrix
+        deltas = self._deltas
+
+        best_move = None
+        best_gain = -np.inf
+        if tabu_mask is None:
+            target = np.argmax(self._best_gains)
+            if self._best_gains[target] > best_gain:
+                best_gain = self._best_gains[target]
+                best_move = ('add', self._best_sources[target], target)
+        else:
+            # The best additions do not account for the tabu pairs : all the
+            # additions are scanned
+            blocked = adjacency_matrix | adjacency_matrix.T | \
+                self._reachability | tabu_mask
+            np.fill_diagonal(blocked, True)
+            add_gains = np.where(blocked, -np.inf, deltas)
+            index = np.argmax(add_gains)
+            if add_gains.flat[index] > best_gain:
+                best_gain = add_gains.flat[index]
+                target, source = np.unravel_index(index, add_gains.shape)
+                best_move = ('add', source, target)
+
+        edges = np.fromiter(itertools.chain.from_iterable(self._edges),
+                            dtype=np.intp,
+                            count=2 * len(self._edges)).reshape(-1, 2)
+        sources, targets = edges[:, 0], edges[:, 1]
+        if tabu_mask is not None:
+            is_allowed = ~tabu_mask[sources, targets]
+            sources, targets = sources[is_allowed], targets[is_allowed]
+        remove_gains = deltas[targets, sources]
+        if remove_gains.size:
+            k = np.argmax(remove_gains)
+            if remove_gains[k] > best_gain:
+                best_gain = remove_gains[k]
+                best_move = ('remove', sources[k], targets[k])
+
+        # The reversals are checked for acyclicity, by decreasing score
+        # change, until one is legal or cannot beat the best move
+        reverse_gains = remove_gains + deltas[sources, targets]
+        for k in np.argsort(-reverse_gains, kind='stable'):
+            if not reverse_gains[k] > best_gain:
+                break
+            source, target = sources[k], targets[k]
+            # Reversing source -> target creates a cycle if and only if
+            # source reaches another parent of target
+            other_parents = adjacency_matrix[:, target].copy()
+            other_parents[source] = False
+            if not np.any(self._reachability[source, other_parents]):
+                best_gain = reverse_gains[k]
+                best_move = ('reverse', source, target)
+                break
+
+        if best_move is None:
+            return None
+        operation, source, target = best_move
+
+        return operation, int(source), int(target), float(best_gain)
+
+    def _apply(self, operation, source, target):
+        """
+        Applies a move, updating the adjacency and reachability matrices.
+
+        Parameters
+        ----------
+        operation : str
+            'add', 'remove' or 'reverse'.
+        source : int
+            The source of the edge.
+        target : int
+            The target of the edge.
+
+        Returns
+        -------
+        numpy.ndarray
+            The vertices whose rows of the reachability matrix may have
+            changed.
+        """
+        changed_rows = np.zeros(0, dtype=np.intp)
+        if operation in ('remove', 'reverse'):
+            self._adjacency_matrix[source, target] = False
+            self._edges.discard((source, target))
+            changed_rows = self._update_reachability_after_removal(source)
+        if operation == 'reverse':
+            changed_rows = np.union1d(changed_rows,
+                                      self._add_edge(target, source))
+        elif operation == 'add':
+            changed_rows = self._add_edge(source, target)
+
+        return changed_rows
+
+    def _add_edge(self, source, target):
+        """
+        Adds an edge, updating the reachability matrix.
+
+        Parameters
+        ----------
+        source : int
+            The source of the edge.
+        target : int
+            The target of the edge.
+
+        Returns
+        -------
+        numpy.ndarray
+            The vertices whose rows of the reachability matrix changed, i.e.
+            the source and its ancestors.
+        """
+        self._adjacency_matrix[source, target] = True
+        self._edges.add((source, target))
+        reachability = self._reachability
+        # The source and its ancestors now reach the target and its
+        # descendants
+        ancestors = reachability[:, source].copy()
+        ancestors[source] = True
+        descendants = reachability[target].copy()
+        descendants[target] = True
+        reachability[ancestors] |= descendants
+
+        return np.flatnonzero(ancestors)
+
+    def _update_reachability_after_removal(self, source):
+        """
+        Recomputes the rows of the reachability matrix which may change after
+        the removal of an edge.
+
+        Parameters
+        ----------
+        source : int
+            The source of the edge removed.
+
+        Returns
+        -------
+        numpy.ndarray
+            The vertices whose rows of the reachability matrix were
+            recomputed, i.e. the source and its ancestors.
+        """
+        adjacency_matrix = self._adjacency_matrix
+        reachability = self._reachability
+        # Only the source and its ancestors may reach fewer vertices. Along an
+        # edge u -> v, u reached strictly more vertices than v before the
+        # removal : sorting by the former numbers of vertices reached
+        # recomputes the children before their parents
+        affected = np.flatnonzero(reachability[:, source])
+        affected = np.append(affected, source)
+        order = np.argsort(reachability[affected].sum(axis=1), kind='stable')
+        for vertex in affected[order]:
+            children = np.flatnonzero(adjacency_matrix[vertex])
+            reachability[vertex] = adjacency_matrix[vertex]
+            if children.size:
+                reachability[vertex] |= reachability[children].any(axis=0)
+
+        return affected
@@ -0,0 +1,383 @@
+import os
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import numpy as np
+
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    GraphViaAdjacencyMatrix
+from StructuralCausalModels.graph_via_edges import GraphsCannotBeCompared
+from StructuralCausalModels.structural_causal_model import InvalidExecutor
+
+
+# The true DAG used by the tasks of the workers of a process pool, set once
+# per worker rather than sent with every task
+_worker_true_dag = None
+
+
+def _initialize_worker(true_dag):
+    """
+    Sets the true DAG used by the tasks of a worker of a process pool.
+
+    Parameters
+    ----------
+    true_dag : tuple
+        The true DAG, as returned by _prepare_true_dag.
+    """
+    global _worker_true_dag
+    _worker_true_dag = true_dag
+
+
+def _prepare_true_dag(dag):
+    """
+    Precomputes the structure of the true DAG used to compare estimates to
+    it.
+
+    Parameters
+    ----------
+    dag : DirectedAcyclicGraph
+        The true DAG.
+
+    Returns
+    -------
+    tuple
+        The adjacency matrix, as a scipy.sparse CSR matrix of floats, and the
+        descendants (including itself) of each vertex, as a matrix of
+        booleans.
+    """
+    from scipy.sparse import csr_matrix
+
+    nb_vertices = dag.nb_vertices
+    adjacency_lists = dag.adjacency_list_representation.adjacency_lists
+    sources = np.repeat(np.arange(nb_vertices),
+                        [len(children) for children in adjacency_lists])
+    targets = np.fromiter((child for children in adjacency_lists
+                           for child in children),
+                          dtype=np.int64, count=len(sources))
+    adjacency_matrix = csr_matrix(
+        (np.ones(len(sources), dtype=np.float32), (sources, targets)),
+        shape=(nb_vertices, nb_vertices)
+    )
+    descendants = np.unpackbits(dag.descendant_bitsets(), axis=1,
+                                count=nb_vertices).astype(bool)
+
+    return adjacency_matrix, descendants
+
+
+def _d_connected(adjacency_matrix, starts_up, starts_down, conditioning,
+                 conditioning_ancestors, blocked):
+    """
+    Finds the vertices d-connected to sources given conditioning sets, for
+    many sources at once.
+
+    Each row is a search of the Bayes-ball algorithm, from a source whose
+    first steps are given : a vertex reached from one of its children (going
+    'up') passes the ball on to its parents and children if it is not
+    conditioned on, and a vertex reached from one of its parents (going
+    'down') passes it on to its children if it is not conditioned on, and to
+    its parents if it is an ancestor of a conditioning vertex (an open
+    collider). All the searches advance together, one step at a time, with
+    products of the matrices of the vertices reached and the sparse
+    adjacency matrix.
+
+    Parameters
+    ----------
+    adjacency_matrix : scipy.sparse.csr_matrix
+        The adjacency matrix of the DAG.
+    starts_up : numpy.ndarray
+        The vertices first reached going up by each search, of shape (r, n).
+    starts_down : numpy.ndarray
+        The vertices first reached going down by each search, of shape (r, n).
+    conditioning : numpy.ndarray
+        The conditioning set of each search, of shape (r, n).
+    conditioning_ancestors : numpy.ndarray
+        The ancestors of the conditioning vertices (including themselves) of
+        each search, of shape (r, n).
+    blocked : numpy.ndarray
+        The vertices which the ball does not pass through in each search (its
+        source), of shape (r, n).
+
+    Returns
+    -------
+    numpy.ndarray
+        The vertices d-connected to the source of each search, of shape
+        (r, n).
+    """
+    transposed = adjacency_matrix.T.tocsr()
+    open_vertices = ~conditioning & ~blocked
+    colliders = conditioning_ancestors & ~blocked
+    reached_up = starts_up.copy()
+    reached_down = starts_down.copy()
+    frontier_up = reached_up
+    frontier_down = reached_down
+
+    while frontier_up.any() or frontier_down.any():
+        # The vertices passing the ball to their parents and children
+        to_parents = (frontier_up & open_vertices) | (frontier_down & colliders)
+        to_children = (frontier_up | frontier_down) & open_vertices
+        parents = (adjacency_matrix @ to_parents.T.astype(np.float32)).T > 0
+        children = (transposed @ to_children.T.astype(np.float32)).T > 0
+        frontier_up = parents & ~reached_up
+        frontier_down = children & ~reached_down
+        reached_up |= frontier_up
+        reached_down |= frontier_down
+
+    return (reached_up | reached_down) & open_vertices
+
+
+def _intervention_errors(true_dag, estimate):
+    """
+    Finds the pairs of vertices whose interventional distributions are
+    inferred wrongly from an estimated DAG.
+
+    Parameters
+    ----------
+    true_dag : tuple
+        The true DAG, as returned by _prepare_true_dag, or None to use the one
+        of the worker of a process pool.
+    estimate : numpy.ndarray
+        The adjacency matrix of the estimated DAG.
+
+    Returns
+    -------
+    numpy.ndarray
+        The matrix whose entry :math:`(i, j)` is True if and only if the
+        distribution of :math:`X_j` under interventions on :math:`X_i` is
+        inferred wrongly.
+    """
+    if true_dag is None:
+        true_dag = _worker_true_dag
+    adjacency_matrix, descendants = true_dag
+    nb_vertices = len(descendants)
+    identity = np.identity(nb_vertices, dtype=bool)
+    strict_descendants = descendants & ~identity
+    # Row i holds the estimated parents of X_i, the adjustment set
+    adjustment_sets = np.asarray(estimate).T != 0
+
+    # The parents of X_i in the estimate have no effect under interventions
+    # on X_i : wrong for its descendants
+    errors = adjustment_sets & strict_descendants
+
+    # The adjustment sets containing a descendant of a vertex W on a causal
+    # path from X_i to X_j are not valid for X_j : the vertices X_j are the
+    # descendants of the descendants W of X_i which are ancestors of the
+    # adjustment set
+    ancestors = (adjustment_sets.astype(np.float32) @
+                 descendants.T.astype(np.float32)) > 0
+    forbidden = np.zeros_like(errors)
+    rows = np.flatnonzero((strict_descendants & ancestors).any(axis=1))
+    if len(rows) > 0:
+        forbidden[rows] = ((strict_descendants[rows] & ancestors[rows])
+                           .astype(np.float32) @
+                           descendants.astype(np.float32)) > 0
+
+    # The adjustment sets must block the non-causal paths from X_i to X_j :
+    # those starting with an edge into X_i (back-door paths), and those
+    # starting with an edge X_i -> c such that c is not an ancestor of X_j
+    parents = (adjacency_matrix.T.toarray() != 0)
+    connected = _d_connected(adjacency_matrix, parents,
+                             np.zeros_like(parents), adjustment_sets,
+                             ancestors, identity)
+    # The paths starting with an edge out of X_i are only open if the
+    # adjustment set contains a descendant of X_i
+    sources = np.flatnonzero((adjustment_sets & strict_descendants).any(axis=1))
+    if len(sources) > 0:
+        children = adjacency_matrix[sources].tolil().rows
+        rows = np.repeat(sources, [len(c) for c in children])
+        first_vertices = np.concatenate(children).astype(np.int64)
+        starts_down = np.zeros((len(rows), nb_vertices), dtype=bool)
+        starts_down[np.arange(len(rows)), first_vertices] = True
+        connected_out = _d_connected(
+            adjacency_matrix, np.zeros_like(starts_down), starts_down,
+            adjustment_sets[rows], ancestors[rows], identity[rows]
+        ) & ~descendants[first_vertices]
+        np.logical_or.at(connected, rows, connected_out)
+
+    errors |= ~adjustment_sets & (forbidden | connected)
+    errors &= ~identity
+
+    return errors
+
+
+def _compute_distances(true_dag, estimates):
+    """
+    Computes the Structural Intervention Distances from the true DAG to
+    estimates.
+
+    Parameters
+    ----------
+    true_dag : tuple
+        The true DAG, as returned by _prepare_true_dag, or None to use the one
+        of the worker of a process pool.
+    estimates : list
+        The adjacency matrices of the estimated DAGs.
+
+    Returns
+    -------
+    list
+        The distances.
+    """
+    return [int(np.count_nonzero(_intervention_errors(true_dag, estimate)))
+            for estimate in estimates]
+
+
+def _estimate_matrix(estimate, nb_vertices):
+    """
+    Returns the adjacency matrix of an estimated DAG as a dense array.
+
+    Parameters
+    ----------
+    estimate : Graph or array_like
+        The estimated DAG, or its adjacency matrix.
+    nb_vertices : int
+        The number of vertices of the true DAG.
+
+    Returns
+    -------
+    numpy.ndarray
+        The adjacency matrix.
+
+    Raises
+    ------
+    GraphsCannotBeCompared
+        If the estimate does not have nb_vertices vertices.
+    """
+    if isinstance(estimate, Graph):
+        estimate = estimate.adjacency_matrix
+    if GraphViaAdjacencyMatrix.is_sparse(estimate):
+        estimate = estimate.toarray()
+    estimate = np.asarray(estimate)
+    if estimate.shape != (nb_vertices, nb_vertices):
+        msg = 'The Structural Intervention Distance cannot be computed : the '
+        msg += 'graphs cannot be compared.'
+        raise GraphsCannotBeCompared(msg)
+
+    return estimate
+
+
+def structural_intervention_distance(true_dag, estimate):
+    """
+    Computes the Structural Intervention Distance (SID) of J. Peters and P.
+    Bühlmann [1]_ from a true DAG to an estimated DAG.
+
+    The SID counts the pairs :math:`(i, j)`, :math:`i \\neq j`, such that the
+    distribution of :math:`X_j` under interventions on :math:`X_i` is inferred
+    wrongly by adjusting for the parents :math:`Z` of :math:`X_i` in the
+    estimate. If :math:`X_j` is in :math:`Z`, the estimate implies that
+    interventions on :math:`X_i` have no effect on it, which is wrong if
+    :math:`X_j` is a descendant of :math:`X_i` in the true DAG. Otherwise, the
+    inference is right if and only if :math:`Z` is an adjustment set for
+    :math:`(X_i, X_j)` in the true DAG [2]_ : it contains no descendant of a
+    vertex :math:`W \\neq X_i` on a causal path from :math:`X_i` to
+    :math:`X_j`, and blocks all the non-causal paths from :math:`X_i` to
+    :math:`X_j`. Unlike the Structural Hamming Distance, it is not symmetric.
+
+    For each :math:`X_i`, the pairs are all checked at once : the descendants
+    of the vertices of the true DAG are precomputed as bitsets (see
+    DirectedAcyclicGraph.descendant_bitsets), from which the vertices
+    :math:`X_j` forbidding :math:`Z` follow by matrix products, and the
+    vertices d-connected to :math:`X_i` by non-causal paths are found by
+    Bayes-ball searches from all the vertices at once.
+
+    Parameters
+    ----------
+    true_dag : DirectedAcyclicGraph
+        The true DAG.
+    estimate : DirectedAcyclicGraph or array_like
+        The estimated DAG, or its adjacency matrix.
+
+    Returns
+    -------
+    int
+        The Structural Intervention Distance.
+
+    Raises
+    ------
+    GraphsCannotBeCompared
+        If the DAGs do not have the same number of vertices.
+
+    Notes
+    -----
+    .. [1] Peters, J. and Bühlmann, P. "Structural Intervention Distance for
+       Evaluating Causal Graphs". *Neural Computation*, volume 27, number 3,
+       pp. 771-799, 2015.
+    .. [2] Shpitser, I., VanderWeele, T. and Robins, J. M. "On the Validity of
+       Covariate Adjustment for Estimating Causal Effects". *Proceedings of
+       the Twenty-Sixth Conference on Uncertainty in Artificial Intelligence*,
+       pp. 527-536, 2010.
+    """
+    estimate = _estimate_matrix(estimate, true_dag.nb_vertices)
+
+    return _compute_distances(_prepare_true_dag(true_dag), [estimate])[0]
+
+
+def structural_intervention_distances(true_dag, estimates, executor=None,
+                                      nb_workers=None):
+    """
+    Computes the Structural Intervention Distances from a true DAG to many
+    estimated DAGs (see structural_intervention_distance).
+
+    The structure of the true DAG is precomputed once for all the estimates,
+    which are compared to it in chunks, on an executor when one is given.
+
+    Parameters
+    ----------
+    true_dag : DirectedAcyclicGraph
+        The true DAG.
+    estimates : list or array_like
+        The estimated DAGs, or their adjacency matrices (e.g. of shape
+        (k, n, n)).
+    executor : str or concurrent.futures.Executor, optional
+        The executor on which the distances are computed : either 'processes',
+        in which case a process pool is created for the duration of the call,
+        or an existing executor (default is None, in which case the distances
+        are computed in the calling thread). The structure of the true DAG is
+        sent to the workers of the process pool once, and with every task to
+        an existing executor.
+    nb_workers : int, optional
+        The number of worker processes when executor is 'processes', and the
+        number of tasks submitted to the executor (default is None, in which
+        case it is the number of CPUs).
+
+    Returns
+    -------
+    list
+        The Structural Intervention Distance of each estimate.
+
+    Raises
+    ------
+    GraphsCannotBeCompared
+        If some estimate does not have the same number of vertices as the true
+        DAG.
+    InvalidExecutor
+        If executor is neither None, 'processes' nor a
+        concurrent.futures.Executor.
+    """
+    if not (executor is None or executor == 'processes' or
+            isinstance(executor, Executor)):
+        msg = "The executor must be either 'processes' or a "
+        msg += "concurrent.futures.Executor !"
+        raise InvalidExecutor(msg)
+
+    estimates = [_estimate_matrix(estimate, true_dag.nb_vertices)
+                 for estimate in estimates]
+    prepared = _prepare_true_dag(true_dag)
+    if executor is None or len(estimates) == 0:
+        return _compute_distances(prepared, estimates)
+
+    nb_tasks = nb_workers or os.cpu_count() or 1
+    chunk_size = -(-len(estimates) // nb_tasks)
+    chunks = [estimates[start:start + chunk_size]
+              for start in range(0, len(estimates), chunk_size)]
+    if executor == 'processes':
+        with ProcessPoolExecutor(max_workers=nb_workers,
+                                 initializer=_initialize_worker,
+                                 initargs=(prepared,)) as pool:
+            results = list(pool.map(_compute_distances,
+                                    [None] * len(chunks), chunks))
+    else:
+        results = list(executor.map(_compute_distances,
+                                    [prepared] * len(chunks), chunks))
+
+    return [distance for result in results for distance in result]
@@ -0,0 +1,409 @@
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.structural_causal_model import InvalidExecutor
+
+
+class InvalidData(Exception):
+    """Raised if the data does not have one column per variable.
+    """
+    pass
+
+
+class InsufficientData(Exception):
+    """Raised if there are no samples to estimate the parameters from.
+    """
+    pass
+
+
+class SufficientStatistics:
+    """A class to accumulate the sufficient statistics of linear Gaussian
+    models.
+
+    The means and the scatter matrix (i.e. the sum of the outer products of the
+    centred samples) of the variables are sufficient to fit any linear model
+    of some variables onto others by least squares. They are accumulated chunk
+    by chunk, with the pairwise update of T. F. Chan, G. H. Golub and R. J.
+    LeVeque [1]_, which is numerically stable.
+
+    Parameters
+    ----------
+    nb_var : int
+        The number of variables.
+
+    Attributes
+    ----------
+    nb_samples : int
+        The number of samples accumulated.
+    means : numpy.ndarray
+        The means of the variables.
+    scatter_matrix : numpy.ndarray
+        The scatter matrix of the variables.
+
+    Notes
+    -----
+    .. [1] Chan, T. F., Golub, G. H. and LeVeque, R. J. "Algorithms for
+       Computing the Sample Variance: Analysis and Recommendations". *The
+       American Statistician*, volume 37, number 3, pp. 242-247, 1983.
+    """
+
+    def __init__(self, nb_var):
+        self.nb_var = nb_var
+        self.nb_samples = 0
+        self.means = np.zeros(nb_var)
+        self.scatter_matrix = np.zeros((nb_var, nb_var))
+
+    @staticmethod
+    def from_data(data):
+        """Computes the sufficient statistics of a dataset.
+
+        Parameters
+        ----------
+        data : array_like
+            The samples, with one row per sample and column :math:`i`
+            containing the samples of :math:`X_i` (e.g. the dataframe returned
+            by StructuralCausalModel.generate_data).
+
+        Returns
+        -------
+        SufficientStatistics
+            The sufficient statistics of the samples.
+        """
+        data = np.asarray(data, dtype=float)
+        statistics = SufficientStatistics(nb_var=data.shape[1])
+        statistics.update(data)
+
+        return statistics
+
+    def update(self, data):
+        """Accumulates the sufficient statistics of a chunk of samples.
+
+        Parameters
+        ----------
+        data : array_like
+            The chunk of samples, with one row per sample and column :math:`i`
+            containing the samples of :math:`X_i`.
+
+        Returns
+        -------
+        SufficientStatistics
+            The updated sufficient statistics (i.e. the object itself).
+
+        Raises
+        ------
+        InvalidData
+            If the chunk does not have one column per variable.
+        """
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 2 or data.shape[1] != self.nb_var:
+            msg = f"The data should have {self.nb_var} columns, one per "
+            msg += "variable !"
+            raise InvalidData(msg)
+        if data.shape[0] == 0:
+            return self
+
+        means = data.mean(axis=0)
+        centred_data = data - means
+        # The Gram matrix of the centred chunk
+        scatter_matrix = centred_data.T @ centred_data
+
+        return self._merge(data.shape[0], means, scatter_matrix)
+
+    def merge(self, other):
+        """Accumulates the sufficient statistics of other samples.
+
+        Parameters
+        ----------
+        other : SufficientStatistics
+            The sufficient statistics of the other samples.
+
+        Returns
+        -------
+        SufficientStatistics
+            The updated sufficient statistics (i.e. the object itself).
+
+        Raises
+        ------
+        InvalidData
+            If the sufficient statistics are not of the same variables.
+        """
+        if other.nb_var != self.nb_var:
+            msg = "The sufficient statistics should be of the same variables !"
+            raise InvalidData(msg)
+
+        return self._merge(other.nb_samples, other.means, other.scatter_matrix)
+
+    def _merge(self, nb_samples, means, scatter_matrix):
+        """Accumulates the sufficient statistics of other samples, given by
+        their number, means and scatter matrix.
+
+        Parameters
+        ----------
+        nb_samples : int
+            The number of other samples.
+        means : numpy.ndarray
+            The means of the other samples.
+        scatter_matrix : numpy.ndarray
+            The scatter matrix of the other samples.
+
+        Returns
+        -------
+        SufficientStatistics
+            The updated sufficient statistics (i.e. the object itself).
+        """
+        if nb_samples == 0:
+            return self
+
+        total = self.nb_samples + nb_samples
+        delta = means - self.means
+        self.scatter_matrix = (
+            self.scatter_matrix + scatter_matrix +
+            np.outer(delta, delta) * (self.nb_samples * nb_samples / total)
+        )
+        self.means = self.means + delta * (nb_samples / total)
+        self.nb_samples = total
+
+        return self
+
+    def regress(self, node, parents):
+        """Regresses a variable onto other variables, with an intercept, by
+        ordinary least squares.
+
+        The normal equations only involve the entries of the scatter matrix of
+        the variables regressed. If the regressors are collinear, the minimum
+        norm solution is returned.
+
+        Parameters
+        ----------
+        node : int
+            The index of the variable regressed.
+        parents : array_like
+            The indices of the regressors.
+
+        Returns
+        -------
+        tuple
+            The coefficients of the regressors and the residual sum of squares.
+        """
+        parents = np.asarray(parents, dtype=np.intp)
+        residual_scatter = self.scatter_matrix[node, node]
+        if parents.size == 0:
+            return np.zeros(0), max(residual_scatter, 0.0)
+
+        gram = self.scatter_matrix[np.ix_(parents, parents)]
+        moments = self.scatter_matrix[parents, node]
+        try:
+            weights = np.linalg.solve(gram, moments)
+        except np.linalg.LinAlgError:
+            # Collinear regressors : minimum norm solution
+            weights = np.linalg.lstsq(gram, moments, rcond=None)[0]
+        residual_scatter -= moments @ weights
+
+        return weights, max(residual_scatter, 0.0)
+
+    def covariance(self, ddof=0):
+        """Returns the covariance matrix of the variables.
+
+        Parameters
+        ----------
+        ddof : int, optional
+            The "delta degrees of freedom" : the scatter matrix is divided by
+            nb_samples - ddof (default is 0, for the maximum likelihood
+            estimate).
+
+        Returns
+        -------
+        numpy.ndarray
+            The covariance matrix.
+
+        Raises
+        ------
+        InsufficientData
+            If there are not more samples than ddof.
+        """
+        if self.nb_samples <= ddof:
+            raise InsufficientData("There are not enough samples !")
+
+        return self.scatter_matrix / (self.nb_samples - ddof)
+
+
+class LinearStructuralCausalModelFitter:
+    """A class to fit the coefficients of a linear SCM with a known DAG.
+
+    Each variable is regressed onto its parents in the DAG, with an intercept,
+    by ordinary least squares. All the regressions are solved from the
+    sufficient statistics of the data (see SufficientStatistics), which are
+    computed once (or accumulated chunk by chunk with partial_fit) : the
+    normal equations of each variable only involve the entries of the scatter
+    matrix of its family. The regressions of the different variables are
+    independent, and can be solved concurrently.
+
+    The exogenous variables of the fitted linear SCM are Gaussian, with the
+    intercepts as means and the maximum likelihood estimates of the variances
+    of the residuals as variances.
+
+    Parameters
+    ----------
+    dag : DirectedAcyclicGraph
+        The DAG of the linear SCM.
+    executor : str or concurrent.futures.ThreadPoolExecutor, optional
+        The executor used to solve the regressions of the different variables
+        concurrently : either 'threads', in which case a thread pool is created
+        for the duration of each fit, or an existing ThreadPoolExecutor
+        (default is None, in which case the regressions are solved
+        sequentially). The regressions write their results in arrays shared
+        with the fitter, so that process pools are not supported. The linear
+        algebra routines of numpy release the GIL, so that threads solve the
+        regressions in parallel.
+    nb_workers : int, optional
+        The number of worker threads when executor is 'threads' (default is
+        None, in which case the default of ThreadPoolExecutor is used).
+
+    Attributes
+    ----------
+    statistics : SufficientStatistics
+        The sufficient statistics of the data accumulated so far.
+
+    Raises
+    ------
+    InvalidExecutor
+        If executor is neither None, 'threads' nor a
+        concurrent.futures.ThreadPoolExecutor.
+    """
+
+    def __init__(self, dag, executor=None, nb_workers=None):
+
+        if not (executor is None or executor == 'threads' or
+                isinstance(executor, ThreadPoolExecutor)):
+            msg = "The executor must be either 'threads' or a "
+            msg += "concurrent.futures.ThreadPoolExecutor !"
+            raise InvalidExecutor(msg)
+
+        self.dag = dag
+        self.executor = executor
+        self.nb_workers = nb_workers
+        nb_var = dag.adjacency_matrix.shape[0]
+        self.statistics = SufficientStatistics(nb_var=nb_var)
+
+    def partial_fit(self, data):
+        """Accumulates the sufficient statistics of a chunk of samples.
+
+        Parameters
+        ----------
+        data : array_like
+            The chunk of samples, with one row per sample and column :math:`i`
+            containing the samples of :math:`X_i`.
+
+        Returns
+        -------
+        LinearStructuralCausalModelFitter
+            The fitter (i.e. the object itself).
+        """
+        self.statistics.update(data)
+
+        return self
+
+    def fit(self, data, name=''):
+        """Fits a linear SCM to a dataset.
+
+        The sufficient statistics accumulated so far are discarded.
+
+        Parameters
+        ----------
+        data : array_like
+            The samples, with one row per sample and column :math:`i`
+            containing the samples of :math:`X_i`.
+        name : str, optional
+            The name of the linear SCM (default is '').
+
+        Returns
+        -------
+        LinearStructuralCausalModel
+            The fitted linear SCM.
+        """
+        self.statistics = SufficientStatistics.from_data(data)
+
+        return self.to_linear_structural_causal_model(name=name)
+
+    def estimate_parameters(self):
+        """Estimates the parameters of the linear SCM from the sufficient
+        statistics accumulated so far.
+
+        Returns
+        -------
+        tuple
+            The coefficient matrix :math:`B` (:math:`B_{j, i}` being the
+            coefficient of :math:`X_j` in the structural equation of
+            :math:`X_i`), the intercepts and the variances of the residuals.
+
+        Raises
+        ------
+        InsufficientData
+            If no samples have been accumulated.
+        """
+        statistics = self.statistics
+        if statistics.nb_samples == 0:
+            raise InsufficientData("There are no samples to fit from !")
+
+        nb_var = statistics.nb_var
+        parent_lists = self.dag.parent_lists()
+        coefficients = np.zeros((nb_var, nb_var))
+        intercepts = np.zeros(nb_var)
+        variances = np.zeros(nb_var)
+
+        def regress(i):
+            parents = np.asarray(parent_lists[i], dtype=np.intp)
+            weights, residual_scatter = statistics.regress(i, parents)
+            coefficients[parents, i] = weights
+            intercepts[i] = statistics.means[i] - \
+                statistics.means[parents] @ weights
+            variances[i] = residual_scatter / statistics.nb_samples
+
+        if self.executor is None:
+            for i in range(nb_var):
+                regress(i)
+        elif self.executor == 'threads':
+            with ThreadPoolExecutor(max_workers=self.nb_workers) as pool:
+                list(pool.map(regress, range(nb_var)))
+        else:
+            # Consuming the results re-raises the exceptions of the workers
+            list(self.executor.map(regress, range(nb_var)))
+
+        return coefficients, intercepts, variances
+
+    def to_linear_structural_causal_model(self, name=''):
+        """Creates the linear SCM fitted to the sufficient statistics
+        accumulated so far.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the linear SCM (default is '').
+
+        Returns
+        -------
+        LinearStructuralCausalModel
+            The fitted linear SCM, whose exogenous variables are Gaussian.
+
+        Raises
+        ------
+        InsufficientData
+            If no samples have been accumulated.
+        """
+        from scipy.stats import norm
+
+        coefficients, intercepts, variances = self.estimate_parameters()
+        exogenous_variables = [
+            norm(loc=intercept, scale=np.sqrt(variance))
+            for intercept, variance in zip(intercepts, variances)
+        ]
+
+        return LinearStructuralCausalModel.create_from_coefficient_matrix(
+            matrix=coefficients,
+            causal_order=self.dag.compute_causal_order(),
+            exogenous_variables=exogenous_variables,
+            name=name
+        )
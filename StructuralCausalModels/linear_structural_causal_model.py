@@ -1,7 +1,9 @@
 import numpy as np
 
 from StructuralCausalModels.directed_graph import DirectedGraph
-from StructuralCausalModels.structural_equation import StructuralEquation
+from StructuralCausalModels.linear_structural_equation import \
+    LinearStructuralEquation
+from StructuralCausalModels.serialization import DistributionSpec
 from StructuralCausalModels.structural_causal_model import StructuralCausalModel
 
 
@@ -20,6 +22,16 @@ class InvalidNumberOfExogenousVariables(Exception):
     pass
 
 
+class NonLinearStructuralEquation(Exception):
+    """Raised if a structural equation of a linear SCM is not known to be
+    linear.
+
+    The structural equations of a linear SCM are known to be linear if they are
+    LinearStructuralEquation objects.
+    """
+    pass
+
+
 class LinearStructuralCausalModel(StructuralCausalModel):
     """A class to represent linear Structural Causal Models.
 
@@ -100,32 +112,12 @@ class LinearStructuralCausalModel(StructuralCausalModel):
 
         for i in causal_order:
 
-            index_lhs = i
             indices_rhs = sorted(np.where(matrix[:, i] != 0)[0].tolist())
-            exogenous_variable = exogenous_variables[i]
-
-            def generate_partial_function(lhs_index, rhs_indices):
-
-                def func(u, *inputs):
-                    if not inputs:
-                        return u
-                    else:
-                        res = u.astype(float)
-                        for j in range(len(rhs_indices)):
-                            # TODO are we sure the right coeff will always go
-                            #  with the right input ?
-                            res += matrix[rhs_indices[j], lhs_index] * inputs[j]
-                        return res
-
-                return func
-
-            f = generate_partial_function(index_lhs, indices_rhs)
-
-            structural_equation = StructuralEquation(
-                index_lhs=index_lhs,
+            structural_equation = LinearStructuralEquation(
+                index_lhs=i,
                 indices_rhs=indices_rhs,
-                exogenous_variable=exogenous_variable,
-                function=f
+                coefficients=matrix[indices_rhs, i].tolist(),
+                exogenous_variable=exogenous_variables[i]
             )
             structural_equations.append(structural_equation)
 
@@ -136,3 +128,417 @@ class LinearStructuralCausalModel(StructuralCausalModel):
         )
 
         return linear_scm
+
+    def __reduce__(self):
+        """
+        Returns the information needed to pickle the object.
+
+        If all its structural equations are linear, the linear SCM is pickled
+        declaratively and compactly : the parents and coefficients of all the
+        structural equations are stored in two shared arrays (in a compressed
+        sparse column layout), the exogenous variables as DistributionSpec
+        objects when possible. The unpickled structural equations hold views on
+        the shared arrays, and the unpickled SCM is not validated again.
+
+        Returns
+        -------
+        tuple
+            The callable re-creating the object and its arguments.
+        """
+        if not all(isinstance(eqn, LinearStructuralEquation) for eqn in
+                   self.structural_equations):
+            return super().__reduce__()
+
+        return _restore_linear_structural_causal_model, (self.to_arrays(),)
+
+    def to_arrays(self):
+        """Returns a declarative representation of the linear SCM.
+
+        Returns
+        -------
+        dict
+            A dictionary with entries 'name' and 'nb_var' ; 'indices_lhs', the
+            array of the indices of the left-hand side variables of the
+            structural equations ; 'indptr', 'indices_rhs' and 'coefficients',
+            the parents and the coefficients of the structural equations in a
+            compressed sparse column layout (those of the :math:`k`-th
+            structural equation being in positions indptr[k] to
+            indptr[k + 1]) ; 'exogenous_variables', the list of the distinct
+            exogenous variables (as DistributionSpec objects when possible) and
+            'exogenous_indices', the position in that list of the exogenous
+            variable of each structural equation ; 'causal_order', a causal
+            order if it has already been computed (None otherwise).
+
+        Raises
+        ------
+        NonLinearStructuralEquation
+            If one of the structural equations of the SCM is not a
+            LinearStructuralEquation.
+        """
+        nb_parents = []
+        exogenous_variables = []
+        exogenous_indices = []
+        exogenous_positions = dict()
+        for structural_equation in self.structural_equations:
+            if not isinstance(structural_equation, LinearStructuralEquation):
+                msg = "The structural equation of X_"
+                msg += f"{structural_equation.index_lhs} is not known to be "
+                msg += "linear !"
+                raise NonLinearStructuralEquation(msg)
+            nb_parents.append(len(structural_equation.parent_indices))
+            exogenous_variable = structural_equation.exogenous_variable
+            if id(exogenous_variable) not in exogenous_positions:
+                exogenous_positions[id(exogenous_variable)] = len(
+                    exogenous_variables)
+                spec = DistributionSpec.from_exogenous_variable(
+                    exogenous_variable)
+                exogenous_variables.append(
+                    exogenous_variable if spec is None else spec
+                )
+            exogenous_indices.append(
+                exogenous_positions[id(exogenous_variable)]
+            )
+
+        indptr = np.zeros(len(self.structural_equations) + 1, dtype=np.intp)
+        np.cumsum(nb_parents, out=indptr[1:])
+        indices_rhs = np.concatenate(
+            [np.empty(0, dtype=np.intp)] +
+            [eqn.parent_indices for eqn in self.structural_equations]
+        )
+        coefficients = np.concatenate(
+            [np.empty(0)] +
+            [eqn.coefficients for eqn in self.structural_equations]
+        )
+
+        arrays = {
+            'name': self.name,
+            'nb_var': self.nb_var,
+            'indices_lhs': np.asarray([eqn.index_lhs for eqn in
+                                       self.structural_equations],
+                                      dtype=np.intp),
+            'indptr': indptr,
+            'indices_rhs': indices_rhs,
+            'coefficients': coefficients,
+            'exogenous_variables': exogenous_variables,
+            'exogenous_indices': np.asarray(exogenous_indices, dtype=np.intp),
+            'causal_order': self._causal_order,
+        }
+
+        return arrays
+
+    @staticmethod
+    def from_arrays(arrays):
+        """Creates a linear SCM from its declarative representation.
+
+        The structural equations created hold views on the arrays of parents
+        and coefficients, which are thus shared rather than copied. The linear
+        SCM is not validated : the representation must come from to_arrays.
+
+        Parameters
+        ----------
+        arrays : dict
+            The declarative representation of the linear SCM, as returned by
+            to_arrays.
+
+        Returns
+        -------
+        LinearStructuralCausalModel
+            The linear SCM.
+        """
+        exogenous_variables = [
+            u.freeze() if isinstance(u, DistributionSpec) else u
+            for u in arrays['exogenous_variables']
+        ]
+        indptr = arrays['indptr']
+        indices_rhs = arrays['indices_rhs']
+        coefficients = arrays['coefficients']
+
+        structural_equations = []
+        for k, index_lhs in enumerate(arrays['indices_lhs']):
+            start, stop = indptr[k], indptr[k + 1]
+            structural_equation = LinearStructuralEquation(
+                index_lhs=int(index_lhs),
+                indices_rhs=indices_rhs[start:stop].tolist(),
+                coefficients=coefficients[start:stop],
+                exogenous_variable=exogenous_variables[
+                    arrays['exogenous_indices'][k]
+                ]
+            )
+            # Share the arrays rather than copy them
+            structural_equation.parent_indices = indices_rhs[start:stop]
+            structural_equations.append(structural_equation)
+
+        causal_order = arrays['causal_order']
+        if causal_order is not None:
+            causal_order = [int(i) for i in causal_order]
+
+        return LinearStructuralCausalModel._create_without_validation(
+            nb_var=int(arrays['nb_var']),
+            structural_equations=structural_equations,
+            name=str(arrays['name']),
+            causal_order=causal_order
+        )
+
+    def coefficient_matrix(self, sparse=False):
+        """Returns the coefficient matrix of the linear SCM.
+
+        The coefficient matrix is the weighted adjacency matrix :math:`B` of the
+        graph associated to the linear SCM : :math:`B_{j, i}` is the coefficient
+        of :math:`X_j` in the structural equation of :math:`X_i`.
+
+        Parameters
+        ----------
+        sparse : bool, optional
+            Whether to return the coefficient matrix as a sparse matrix (default
+            is False).
+
+        Returns
+        -------
+        numpy.ndarray or scipy.sparse.csc_matrix
+            The coefficient matrix.
+
+        Raises
+        ------
+        NonLinearStructuralEquation
+            If one of the structural equations of the SCM is not a
+            LinearStructuralEquation.
+        """
+        rows, columns, coefficients = [], [], []
+        for structural_equation in self.structural_equations:
+            if not isinstance(structural_equation, LinearStructuralEquation):
+                msg = "The structural equation of X_"
+                msg += f"{structural_equation.index_lhs} is not known to be "
+                msg += "linear !"
+                raise NonLinearStructuralEquation(msg)
+            rows.extend(structural_equation.indices_rhs)
+            columns.extend([structural_equation.index_lhs] *
+                           len(structural_equation.indices_rhs))
+            coefficients.extend(structural_equation.coefficients)
+
+        if not sparse:
+            matrix = np.zeros((self.nb_var, self.nb_var))
+            np.add.at(matrix, (np.asarray(rows, dtype=np.intp),
+                               np.asarray(columns, dtype=np.intp)),
+                      coefficients)
+            return matrix
+
+        import scipy.sparse
+
+        matrix = scipy.sparse.csc_matrix(
+            (np.asarray(coefficients, dtype=float), (rows, columns)),
+            shape=(self.nb_var, self.nb_var)
+        )
+
+        return matrix
+
+    def _exogenous_moments(self):
+        """Returns the means and variances of the exogenous variables.
+
+        Returns
+        -------
+        tuple
+            The array of the means and the array of the variances of the
+            exogenous variables, entry :math:`i` corresponding to the
+            exogenous variable of the structural equation of :math:`X_i`.
+        """
+        means = np.empty(self.nb_var)
+        variances = np.empty(self.nb_var)
+        for structural_equation in self.structural_equations:
+            i = structural_equation.index_lhs
+            means[i] = structural_equation.exogenous_variable.mean()
+            variances[i] = structural_equation.exogenous_variable.var()
+
+        return means, variances
+
+    def _causally_ordered_system(self, sparse):
+        """Returns the matrix :math:`I - B` with rows and columns permuted to
+        follow a causal order.
+
+        Following a causal order, :math:`I - B` is upper triangular with a unit
+        diagonal.
+
+        Parameters
+        ----------
+        sparse : bool
+            Whether to use sparse matrices.
+
+        Returns
+        -------
+        tuple
+            The causal order and the permuted matrix :math:`I - B`.
+        """
+        causal_order = self.compute_causal_order()
+        matrix = self.coefficient_matrix(sparse=sparse)
+        if sparse:
+            import scipy.sparse
+
+            matrix = matrix.tocsr()[causal_order][:, causal_order]
+            system = (scipy.sparse.identity(self.nb_var, format='csr') -
+                      matrix).tocsr()
+        else:
+            matrix = matrix[np.ix_(causal_order, causal_order)]
+            system = np.identity(self.nb_var) - matrix
+
+        return causal_order, system
+
+    @staticmethod
+    def _solve_unit_triangular(system, rhs, lower):
+        """Solves a (dense or sparse) triangular system with a unit diagonal.
+
+        Parameters
+        ----------
+        system : numpy.ndarray or scipy.sparse.csr_matrix
+            The triangular matrix of the system.
+        rhs : numpy.ndarray
+            The right-hand side of the system.
+        lower : bool
+            Whether the matrix is lower triangular (rather than upper
+            triangular).
+
+        Returns
+        -------
+        numpy.ndarray
+            The solution of the system.
+        """
+        if hasattr(system, 'tocsr'):
+            import scipy.sparse.linalg
+
+            return scipy.sparse.linalg.spsolve_triangular(
+                system.tocsr(), rhs, lower=lower, unit_diagonal=True
+            )
+
+        import scipy.linalg
+
+        return scipy.linalg.solve_triangular(system, rhs, lower=lower,
+                                             unit_diagonal=True)
+
+    def mean(self, sparse=False):
+        """Computes the mean of the variables of the linear SCM.
+
+        As :math:`X = B^{T} X + U`, the mean of the variables is
+        :math:`(I - B)^{-T} \\mathbb{E}[U]`. It is obtained by a triangular
+        solve in a causal order, without sampling.
+
+        Parameters
+        ----------
+        sparse : bool, optional
+            Whether to use sparse matrices and sparse triangular solves, which
+            is faster for large sparse graphs (default is False).
+
+        Returns
+        -------
+        numpy.ndarray
+            The means of the variables, entry :math:`i` corresponding to
+            :math:`X_i`.
+
+        Raises
+        ------
+        NonLinearStructuralEquation
+            If one of the structural equations of the SCM is not a
+            LinearStructuralEquation.
+        """
+        causal_order, system = self._causally_ordered_system(sparse)
+        exogenous_means, _ = self._exogenous_moments()
+
+        ordered_means = self._solve_unit_triangular(
+            system.T, exogenous_means[causal_order], lower=True
+        )
+        means = np.empty(self.nb_var)
+        means[causal_order] = ordered_means
+
+        return means
+
+    def covariance(self, sparse=False):
+        """Computes the covariance matrix of the variables of the linear SCM.
+
+        The covariance matrix of the variables is
+        :math:`(I - B)^{-T} D (I - B)^{-1}` where :math:`D` is the (diagonal)
+        covariance matrix of the exogenous variables. It is obtained by
+        triangular solves in a causal order, without sampling.
+
+        Parameters
+        ----------
+        sparse : bool, optional
+            Whether to use sparse matrices and sparse triangular solves, which
+            is faster for large sparse graphs (default is False).
+
+        Returns
+        -------
+        numpy.ndarray
+            The covariance matrix of the variables, entry :math:`(i, j)`
+            corresponding to the covariance of :math:`X_i` and :math:`X_j`.
+
+        Raises
+        ------
+        NonLinearStructuralEquation
+            If one of the structural equations of the SCM is not a
+            LinearStructuralEquation.
+        """
+        causal_order, system = self._causally_ordered_system(sparse)
+        _, exogenous_variances = self._exogenous_moments()
+
+        # (I - B)^{-T} D (I - B)^{-1} = S S^T with S = (I - B)^{-T} D^{1/2}
+        factor = self._solve_unit_triangular(
+            system.T,
+            np.diag(np.sqrt(exogenous_variances[causal_order])),
+            lower=True
+        )
+        covariance = np.empty((self.nb_var, self.nb_var))
+        covariance[np.ix_(causal_order, causal_order)] = factor @ factor.T
+
+        return covariance
+
+    def total_effects(self, sparse=False):
+        """Computes the total causal effects between the variables.
+
+        The total causal effect of :math:`X_i` on :math:`X_j` is the sum, over
+        all the directed paths from :math:`X_i` to :math:`X_j`, of the products
+        of the coefficients along the paths ; the matrix of the total causal
+        effects is :math:`(I - B)^{-1}`. It is obtained by a triangular solve in
+        a causal order.
+
+        Parameters
+        ----------
+        sparse : bool, optional
+            Whether to use sparse matrices and sparse triangular solves, which
+            is faster for large sparse graphs (default is False).
+
+        Returns
+        -------
+        numpy.ndarray
+            The matrix of the total causal effects, entry :math:`(i, j)` being
+            the total causal effect of :math:`X_i` on :math:`X_j` (the diagonal
+            entries are equal to 1).
+
+        Raises
+        ------
+        NonLinearStructuralEquation
+            If one of the structural equations of the SCM is not a
+            LinearStructuralEquation.
+        """
+        causal_order, system = self._causally_ordered_system(sparse)
+
+        ordered_effects = self._solve_unit_triangular(
+            system, np.identity(self.nb_var), lower=False
+        )
+        effects = np.empty((self.nb_var, self.nb_var))
+        effects[np.ix_(causal_order, causal_order)] = ordered_effects
+
+        return effects
+
+
+def _restore_linear_structural_causal_model(arrays):
+    """Re-creates a pickled linear SCM.
+
+    Parameters
+    ----------
+    arrays : dict
+        The declarative representation of the linear SCM, as returned by
+        LinearStructuralCausalModel.to_arrays.
+
+    Returns
+    -------
+    LinearStructuralCausalModel
+        The linear SCM.
+    """
+    return LinearStructuralCausalModel.from_arrays(arrays)
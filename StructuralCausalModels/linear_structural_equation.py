@@ -0,0 +1,167 @@
+import numpy as np
+
+from StructuralCausalModels.structural_equation import StructuralEquation
+
+
+class InvalidLinearStructuralEquation(Exception):
+    """Raised if the coefficients of a linear structural equation do not match
+    the variables on its right-hand side.
+    """
+    pass
+
+
+class LinearStructuralEquation(StructuralEquation):
+    """A class to represent linear structural equations.
+
+    Linear structural equations are assignments of the sort
+
+    .. math::
+        X_{i} := \\sum_{j ~\\in ~J} b_{j, i} X_j + U_i,
+
+    where :math:`U_i` is an exogenous (random) variable.
+
+    The indices of the parents and the coefficients are stored as contiguous
+    arrays, aligned by construction, so that the structural equation can be
+    computed with a single matrix-vector product over the columns of the
+    parents.
+
+    Parameters
+    ----------
+    index_lhs : int
+        The index of the structural variable on the left-hand side of the
+        structural equation (the ":math:`i`").
+    indices_rhs : list
+        The indices of the structural variables on the right-hand side of the
+        structural equation (the ":math:`j`'s in :math:`J`").
+    coefficients : array_like
+        The coefficients of the structural variables on the right-hand side of
+        the structural equation (the ":math:`b_{j, i}`'s"), in the same order
+        as indices_rhs.
+    exogenous_variable : scipy.stats.rv_continuous or scipy.stats.rv_discrete
+        The exogenous variable (the ":math:`U_i`").
+
+    Raises
+    ------
+    InvalidLinearStructuralEquation
+        If there are not as many coefficients as variables on the right-hand
+        side of the structural equation.
+    """
+
+    def __init__(self, index_lhs, indices_rhs, coefficients,
+                 exogenous_variable):
+
+        if len(coefficients) != len(indices_rhs):
+            msg = 'There should be as many coefficients as there are variables '
+            msg += 'on the right-hand side of the structural equation !'
+            raise InvalidLinearStructuralEquation(msg)
+
+        self.parent_indices = np.asarray(indices_rhs, dtype=np.intp)
+        self.coefficients = np.ascontiguousarray(coefficients, dtype=float)
+        super().__init__(index_lhs=index_lhs,
+                         indices_rhs=indices_rhs,
+                         exogenous_variable=exogenous_variable,
+                         function=self.linear_function)
+
+    def __getstate__(self):
+        """
+        Returns the state of the object to pickle.
+
+        The function of a linear structural equation is not pickled : it is
+        restored from the coefficients.
+
+        Returns
+        -------
+        dict
+            The state of the object.
+        """
+        state = super().__getstate__()
+        del state['function']
+
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the state of an unpickled object.
+
+        Parameters
+        ----------
+        state : dict
+            The state of the object, as returned by __getstate__.
+        """
+        super().__setstate__(state)
+        self.function = self.linear_function
+
+    def linear_function(self, u, *inputs):
+        """The functional form of the linear structural equation.
+
+        Parameters
+        ----------
+        u : numpy.ndarray
+            The samples of the exogenous variable.
+        inputs : numpy.ndarray
+            The samples of the variables on the right-hand side of the
+            structural equation, in the same order as indices_rhs.
+
+        Returns
+        -------
+        numpy.ndarray
+            The samples of the variable on the left-hand side of the structural
+            equation.
+        """
+        if not inputs:
+            return u
+
+        return u + np.column_stack(inputs) @ self.coefficients
+
+    def compute(self, values, noise):
+        """Computes the left-hand side of the structural equation.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            An array containing the samples of the structural variables, with
+            column :math:`j` containing the samples of :math:`X_j`. It must
+            contain data at least for the structural variables on the
+            right-hand side of the structural equation.
+        noise : numpy.ndarray
+            The samples of the exogenous variable.
+
+        Returns
+        -------
+        numpy.ndarray
+            The samples of the structural variable on the left-hand side of the
+            structural equation.
+        """
+        if not self.parent_indices.size:
+            return noise
+
+        return noise + values[:, self.parent_indices] @ self.coefficients
+
+    @staticmethod
+    def create_hard_intervention(index_lhs, value):
+        """Creates the structural equation of a hard intervention.
+
+        The structural equation created corresponds to the hard intervention
+        :math:`do(X_{i} = v)`.
+
+        Parameters
+        ----------
+        index_lhs : int
+            The index of the structural variable intervened upon (the
+            ":math:`i`").
+        value : float
+            The value the structural variable is set to (the ":math:`v`").
+
+        Returns
+        -------
+        LinearStructuralEquation
+            The structural equation :math:`X_{i} := v`.
+        """
+        from scipy.stats import rv_discrete
+
+        exogenous_variable = rv_discrete(values=([value], [1.0]))
+
+        return LinearStructuralEquation(index_lhs=index_lhs,
+                                        indices_rhs=[],
+                                        coefficients=[],
+                                        exogenous_variable=exogenous_variable)
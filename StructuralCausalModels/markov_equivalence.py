@@ -0,0 +1,412 @@
+import heapq
+import math
+
+import numpy as np
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    GraphViaAdjacencyMatrix
+
+
+class InvalidCPDAG(Exception):
+    """Raised when a graph is not a valid CPDAG.
+    """
+    pass
+
+
+def _undirected_neighbours(cpdag):
+    """
+    Returns the neighbours of each vertex of a CPDAG through its undirected
+    edges.
+
+    Parameters
+    ----------
+    cpdag : Graph
+        The CPDAG.
+
+    Returns
+    -------
+    list
+        The undirected neighbours of each vertex, as a frozenset, in the
+        natural order of the vertices.
+    """
+    adjacency_lists = cpdag.adjacency_list_representation.adjacency_lists
+    children = [frozenset(adjacency_list) for adjacency_list in adjacency_lists]
+
+    return [frozenset(j for j in children[i] if i in children[j])
+            for i in range(len(children))]
+
+
+def _components(neighbours, vertices):
+    """
+    Returns the connected components, with at least two vertices, of an
+    undirected graph.
+
+    Parameters
+    ----------
+    neighbours : dict or list
+        The neighbours of each vertex, as a set.
+    vertices : iterable
+        The vertices of the graph.
+
+    Returns
+    -------
+    list
+        The vertices of each component, as a frozenset, in increasing order of
+        their smallest vertex.
+    """
+    visited = set()
+    components = []
+    for start in sorted(vertices):
+        if start in visited or not neighbours[start]:
+            continue
+        visited.add(start)
+        component = [start]
+        stack = [start]
+        while stack:
+            for neighbour in neighbours[stack.pop()]:
+                if neighbour not in visited:
+                    visited.add(neighbour)
+                    component.append(neighbour)
+                    stack.append(neighbour)
+        components.append(frozenset(component))
+
+    return components
+
+
+def _orient_from(neighbours, vertices, roots):
+    """
+    Orients a connected chordal graph from a sequence of first vertices and
+    orients the edges compelled by Meek's rules.
+
+    The edges between the roots follow their order, and the other edges of
+    the roots point away from them. In a chordal graph oriented from a clique,
+    Meek's first rule is enough [1]_ : it is applied from a queue of the
+    directed edges, each edge :math:`a \\rightarrow b` orienting the
+    undirected edges :math:`b - c` with :math:`c` not adjacent to :math:`a`
+    once.
+
+    Parameters
+    ----------
+    neighbours : list
+        The undirected neighbours of each vertex of the CPDAG, as a frozenset.
+    vertices : frozenset
+        The vertices of the chordal graph, a chain component, whose edges are
+        the undirected edges of the CPDAG between them.
+    roots : list
+        The first vertices, in order, which form a clique.
+
+    Returns
+    -------
+    tuple
+        The edges oriented, as (source, target) pairs, and the chain
+        components left (see _components).
+
+    Notes
+    -----
+    .. [1] He, Y., Jia, J. and Yu, B. "Counting and Exploring Sizes of Markov
+       Equivalence Classes of Directed Acyclic Graphs". *Journal of Machine
+       Learning Research*, volume 16, pp. 2589-2609, 2015.
+    """
+    undirected = {vertex: set(neighbours[vertex] & vertices)
+                  for vertex in vertices}
+    edges = []
+    for root in roots:
+        for target in undirected[root]:
+            undirected[target].discard(root)
+            edges.append((root, target))
+        undirected[root] = set()
+
+    queue = list(edges)
+    while queue:
+        source, target = queue.pop()
+        adjacent = neighbours[source]
+        heads = [head for head in undirected[target] if head not in adjacent]
+        for head in heads:
+            undirected[target].discard(head)
+            undirected[head].discard(target)
+            edges.append((target, head))
+            queue.append((target, head))
+
+    return edges, _components(undirected, vertices)
+
+
+def consistent_extensions(cpdag):
+    """
+    Iterates over the DAGs of the Markov equivalence class of a CPDAG.
+
+    Each chain component (connected component of the undirected edges) of a
+    CPDAG is an undirected chordal graph, oriented independently of the
+    others in the DAGs of the class. Following Y. He, J. Jia and B. Yu [1]_,
+    the orientations of a chain component are partitioned by their source
+    :math:`v` : orienting the edges of :math:`v` away from it and applying
+    Meek's rules gives the CPDAG of the DAGs whose source is :math:`v`, whose
+    chain components are oriented recursively.
+
+    The DAGs are generated lazily, depth first, on a single adjacency matrix :
+    each step only keeps the edges it orients, to restore them afterwards.
+
+    Parameters
+    ----------
+    cpdag : Graph
+        The CPDAG, whose undirected edges are represented by two 1's in the
+        adjacency matrix, at :math:`(i, j)` and :math:`(j, i)` (e.g. computed
+        by dag_to_cpdag or learnt by PCAlgorithm).
+
+    Yields
+    ------
+    DirectedAcyclicGraph
+        The DAGs of the Markov equivalence class, each once, whose adjacency
+        matrices are arrays of bytes.
+
+    Notes
+    -----
+    .. [1] He, Y., Jia, J. and Yu, B. "Counting and Exploring Sizes of Markov
+       Equivalence Classes of Directed Acyclic Graphs". *Journal of Machine
+       Learning Research*, volume 16, pp. 2589-2609, 2015.
+    """
+    matrix = cpdag.adjacency_matrix
+    if GraphViaAdjacencyMatrix.is_sparse(matrix):
+        matrix = matrix.toarray()
+    matrix = (np.asarray(matrix) != 0).astype(np.uint8)
+    neighbours = _undirected_neighbours(cpdag)
+    # Each level of the stack orients the first chain component left : it
+    # holds the component, the components after it, the sources left to try
+    # and the edges oriented by the current source
+    stack = []
+    components = _components(neighbours, range(len(neighbours)))
+
+    while True:
+
+        if not components:
+            yield DirectedAcyclicGraph(adjacency_matrix=matrix.copy(),
+                                       validate=False)
+        else:
+            sources = iter(sorted(components[0]))
+            stack.append((components[0], components[1:], sources, []))
+
+        # Moves to the next source of the deepest level left
+        while stack:
+            component, others, sources, edges = stack.pop()
+            for source, target in edges:
+                matrix[target, source] = 1
+            source = next(sources, None)
+            if source is not None:
+                edges, components = _orient_from(neighbours, component,
+                                                 [source])
+                for source, target in edges:
+                    matrix[target, source] = 0
+                components += others
+                stack.append((component, others, sources, edges))
+                break
+        else:
+            return
+
+
+def _maximal_cliques(neighbours, vertices):
+    """
+    Computes the maximal cliques and a clique tree of a connected chordal
+    graph, with a maximum cardinality search.
+
+    Parameters
+    ----------
+    neighbours : list
+        The undirected neighbours of each vertex of the CPDAG, as a frozenset.
+    vertices : frozenset
+        The vertices of the chordal graph.
+
+    Returns
+    -------
+    tuple
+        The maximal cliques, as frozensets, and the index of the parent of
+        each clique in the clique tree (-1 for the root, the first clique).
+
+    Raises
+    ------
+    InvalidCPDAG
+        If the graph is not chordal.
+    """
+    weights = dict.fromkeys(vertices, 0)
+    numbers = dict()
+    clique_of = dict()
+    cliques = []
+    parents = []
+    previous_weight = -1
+    # The unnumbered vertices by decreasing weight, with outdated entries
+    heap = [(0, vertex) for vertex in vertices]
+    heapq.heapify(heap)
+
+    for number in range(len(vertices)):
+        weight, vertex = heapq.heappop(heap)
+        while vertex in numbers or -weight != weights[vertex]:
+            weight, vertex = heapq.heappop(heap)
+        earlier = [neighbour for neighbour in neighbours[vertex]
+                   if neighbour in numbers]
+        # In a chordal graph, the numbered neighbours form a clique
+        earlier_set = frozenset(earlier)
+        if any(len(neighbours[neighbour] & earlier_set) != len(earlier) - 1
+               for neighbour in earlier):
+            raise InvalidCPDAG("The chain components are not chordal !")
+        if number == 0 or len(earlier) <= previous_weight:
+            if number > 0:
+                # The clique of the last numbered of its neighbours
+                last = max(earlier, key=numbers.__getitem__)
+                parents.append(clique_of[last])
+            else:
+                parents.append(-1)
+            cliques.append(set(earlier))
+        cliques[-1].add(vertex)
+        clique_of[vertex] = len(cliques) - 1
+        numbers[vertex] = number
+        for neighbour in neighbours[vertex] & vertices:
+            if neighbour not in numbers:
+                weights[neighbour] += 1
+                heapq.heappush(heap, (-weights[neighbour], neighbour))
+        previous_weight = len(earlier)
+
+    return [frozenset(clique) for clique in cliques], parents
+
+
+def _phi(vertices, prefixes, memo):
+    """
+    Counts the permutations of a set which do not start with any of a family
+    of subsets.
+
+    A permutation whose shortest forbidden prefix is :math:`R` is a
+    permutation of :math:`R` without any shorter forbidden prefix, followed by
+    a permutation of the rest of the set.
+
+    Parameters
+    ----------
+    vertices : frozenset
+        The set.
+    prefixes : frozenset
+        The forbidden prefixes, as frozensets.
+    memo : dict
+        The counts already computed.
+
+    Returns
+    -------
+    int
+        The number of permutations.
+    """
+    prefixes = frozenset(prefix for prefix in prefixes if prefix <= vertices)
+    if vertices in prefixes:
+        return 0
+    key = (vertices, prefixes)
+    if key not in memo:
+        count = math.factorial(len(vertices))
+        for prefix in prefixes:
+            shorter = frozenset(other for other in prefixes if other < prefix)
+            count -= math.factorial(len(vertices) - len(prefix)) * \
+                _phi(prefix, shorter, memo)
+        memo[key] = count
+
+    return memo[key]
+
+
+def _count_orientations(neighbours, vertices, memo, phi_memo):
+    """
+    Counts the acyclic orientations without v-structures of a connected
+    chordal graph, with the Clique-Picking algorithm.
+
+    Parameters
+    ----------
+    neighbours : list
+        The undirected neighbours of each vertex of the CPDAG, as a frozenset.
+    vertices : frozenset
+        The vertices of the chordal graph, a chain component.
+    memo : dict
+        The counts already computed, keyed by sets of vertices.
+    phi_memo : dict
+        The counts of permutations already computed (see _phi).
+
+    Returns
+    -------
+    int
+        The number of orientations.
+    """
+    if vertices in memo:
+        return memo[vertices]
+
+    nb_vertices = len(vertices)
+    nb_edges = sum(len(neighbours[vertex] & vertices)
+                   for vertex in vertices) // 2
+    if nb_edges == nb_vertices * (nb_vertices - 1) // 2:
+        # Any order of a clique
+        count = math.factorial(nb_vertices)
+    elif nb_edges == nb_vertices - 1:
+        # A tree is oriented away from any of its vertices
+        count = nb_vertices
+    else:
+        cliques, parents = _maximal_cliques(neighbours, vertices)
+        # The separators on the path from the root of the clique tree
+        separators = [frozenset()]
+        count = 0
+        for index, clique in enumerate(cliques):
+            if index > 0:
+                parent = parents[index]
+                separators.append(separators[parent] |
+                                  {clique & cliques[parent]})
+            nb_orientations = _phi(clique, separators[index], phi_memo)
+            if nb_orientations == 0:
+                continue
+            # The orientations starting with the clique, in any order
+            _, components = _orient_from(neighbours, vertices, sorted(clique))
+            for component in components:
+                nb_orientations *= _count_orientations(neighbours, component,
+                                                       memo, phi_memo)
+            count += nb_orientations
+
+    memo[vertices] = count
+
+    return count
+
+
+def markov_equivalence_class_size(cpdag):
+    """
+    Counts the DAGs of the Markov equivalence class of a CPDAG, without
+    enumerating them.
+
+    The number of DAGs is the product, over the chain components of the
+    CPDAG, of the numbers of acyclic orientations without v-structures of the
+    chain components. They are counted in polynomial time by the
+    Clique-Picking algorithm of M. Wienöbst, M. Bannach and M. Liśkiewicz
+    [1]_ : every orientation has a first maximal clique in the breadth-first
+    traversal of a clique tree, and the orientations starting with a clique
+    are counted from the permutations of the clique which do not start with a
+    separator on its path from the root, and recursively from the chain
+    components left after orienting the clique first. The counts of the
+    chain components are memoised.
+
+    Parameters
+    ----------
+    cpdag : Graph
+        The CPDAG, whose undirected edges are represented by two 1's in the
+        adjacency matrix, at :math:`(i, j)` and :math:`(j, i)`.
+
+    Returns
+    -------
+    int
+        The number of DAGs of the Markov equivalence class.
+
+    Raises
+    ------
+    InvalidCPDAG
+        If some chain component of the CPDAG is not chordal.
+
+    Notes
+    -----
+    .. [1] Wienöbst, M., Bannach, M. and Liśkiewicz, M. "Polynomial-Time
+       Algorithms for Counting and Sampling Markov Equivalent DAGs".
+       *Proceedings of the AAAI Conference on Artificial Intelligence*, volume
+       35, pp. 12198-12206, 2021.
+    """
+    neighbours = _undirected_neighbours(cpdag)
+    memo = dict()
+    phi_memo = dict()
+    size = 1
+    for component in _components(neighbours, range(len(neighbours))):
+        size *= _count_orientations(neighbours, component, memo, phi_memo)
+
+    return size
@@ -0,0 +1,95 @@
+import enum
+import sys
+import types
+
+import numpy as np
+
+
+# Objects which are not accounted for : they are shared by the whole process
+# rather than held by the objects referring to them
+_shared_types = (type, types.ModuleType, types.FunctionType,
+                 types.BuiltinFunctionType, types.MethodType, enum.Enum,
+                 bool, type(None))
+
+
+def deep_sizeof(obj, seen=None):
+    """Computes the number of bytes held by an object and the objects it refers
+    to.
+
+    Containers (dictionaries, lists, tuples, sets) are walked, as are the
+    attributes of objects ; the Python object overhead of each object is
+    counted. The data of a numpy array is counted once, with the array which
+    owns it (a view holds its base) ; the data of memory-mapped arrays, which
+    is not held in memory, is not counted. Objects which are shared by the
+    whole process (classes, modules, functions, members of enumerations, None
+    and booleans) are not counted.
+
+    Parameters
+    ----------
+    obj : object
+        The object.
+    seen : set, optional
+        The ids of the objects already counted, which are not counted again
+        (default is None, in which case every object referred to is counted
+        once). It is updated with the ids of the objects counted.
+
+    Returns
+    -------
+    int
+        The number of bytes.
+    """
+    if seen is None:
+        seen = set()
+
+    nb_bytes = 0
+    stack = [obj]
+    while stack:
+
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _shared_types):
+            continue
+        seen.add(id(current))
+
+        if isinstance(current, np.ndarray):
+            # Includes the data if and only if the array owns it ; the data of
+            # a view is held by its base
+            nb_bytes += sys.getsizeof(current)
+            if current.base is not None:
+                stack.append(current.base)
+            continue
+
+        nb_bytes += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, int, float, complex)):
+            pass
+        else:
+            if hasattr(current, '__dict__'):
+                stack.append(current.__dict__)
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+
+    return nb_bytes
+
+
+def total_memory_usage(usage):
+    """Adds the total to a breakdown of memory usage.
+
+    Parameters
+    ----------
+    usage : dict
+        The number of bytes held by each part of an object.
+
+    Returns
+    -------
+    dict
+        The breakdown, with an additional entry 'total'.
+    """
+    usage['total'] = sum(usage.values())
+
+    return usage
@@ -0,0 +1,156 @@
+import numpy as np
+
+
+class NoiseSamplingPlan:
+    """A class to plan the sampling of the exogenous variables of an SCM.
+
+    Drawing samples from a frozen scipy.stats distribution carries a heavy
+    per-call overhead. A NoiseSamplingPlan groups the structural equations whose
+    exogenous variables are frozen distributions of the same family with the
+    same shape parameters (e.g. all the normal distributions, or all the
+    Student's t distributions with 10 degrees of freedom). The samples of all
+    the exogenous variables in a group are then drawn in a single vectorised
+    call, as standardised samples that are scaled and shifted column by column.
+    The exogenous variables which are not frozen scipy.stats distributions are
+    sampled one structural equation at a time.
+
+    Parameters
+    ----------
+    structural_equations : list
+        The structural equations whose exogenous variables are to be sampled.
+
+    Attributes
+    ----------
+    groups : list
+        The groups of exogenous variables sampled together. Each group is a
+        tuple (distribution, shapes, indices, locations, scales) where
+        distribution is the scipy.stats distribution of the group, shapes its
+        shape parameters, indices the indices of the variables on the left-hand
+        sides of the structural equations in the group and locations and scales
+        the arrays of their location and scale parameters.
+    ungrouped_equations : list
+        The structural equations whose exogenous variables are sampled
+        individually.
+    """
+
+    def __init__(self, structural_equations):
+
+        grouped_parameters = dict()
+        self.ungrouped_equations = []
+
+        for structural_equation in structural_equations:
+            parameters = NoiseSamplingPlan.standardise(
+                structural_equation.exogenous_variable
+            )
+            if parameters is None:
+                self.ungrouped_equations.append(structural_equation)
+                continue
+            distribution, shapes, loc, scale = parameters
+            # Each frozen distribution holds its own instance of the
+            # distribution, hence the grouping by class
+            key = (type(distribution), distribution.name, shapes)
+            if key not in grouped_parameters:
+                grouped_parameters[key] = (distribution, [], [], [])
+            _, indices, locations, scales = grouped_parameters[key]
+            indices.append(structural_equation.index_lhs)
+            locations.append(loc)
+            scales.append(scale)
+
+        self.groups = []
+        for (_, _, shapes), parameters in grouped_parameters.items():
+            distribution, indices, locations, scales = parameters
+            self.groups.append((distribution,
+                                shapes,
+                                np.asarray(indices),
+                                np.asarray(locations, dtype=float),
+                                np.asarray(scales, dtype=float)))
+
+    @staticmethod
+    def standardise(exogenous_variable):
+        """Decomposes a frozen distribution into its family and parameters.
+
+        Parameters
+        ----------
+        exogenous_variable : object
+            The exogenous variable.
+
+        Returns
+        -------
+        tuple or None
+            The tuple (distribution, shapes, loc, scale) such that the
+            exogenous variable follows
+            distribution(\\*shapes, loc=loc, scale=scale), or None if the
+            exogenous variable is not a frozen scipy.stats distribution with
+            scalar parameters.
+        """
+        distribution = getattr(exogenous_variable, 'dist', None)
+        if distribution is None or not hasattr(distribution, '_parse_args'):
+            return None
+
+        try:
+            shapes, loc, scale = distribution._parse_args(
+                *exogenous_variable.args, **exogenous_variable.kwds
+            )
+            shapes = tuple(float(shape) for shape in shapes)
+            loc = float(loc)
+            scale = float(scale)
+        except (TypeError, ValueError):
+            return None
+
+        return distribution, shapes, loc, scale
+
+    def draw(self, nb_samples, nb_var, random_state=None, profiler=None):
+        """Draws samples from the exogenous variables.
+
+        Parameters
+        ----------
+        nb_samples : int
+            The number of samples to draw.
+        nb_var : int
+            The number of variables in the SCM.
+        random_state : int or numpy.random.Generator, optional
+            The seed or random number generator to use (default is None).
+        profiler : SamplingProfiler, optional
+            The profiler recording the time spent drawing the samples of each
+            exogenous variable (default is None).
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape (nb_samples, nb_var) whose column :math:`i`
+            contains the samples of the exogenous variable of the structural
+            equation which has :math:`X_i` on its left-hand side.
+        """
+        if random_state is not None:
+            random_state = np.random.default_rng(random_state)
+
+        noise = np.empty((nb_samples, nb_var), order='F')
+
+        for distribution, shapes, indices, locations, scales in self.groups:
+            if profiler is not None:
+                start = profiler.clock()
+            standardised_noise = distribution.rvs(
+                *shapes,
+                size=(nb_samples, len(indices)),
+                random_state=random_state
+            )
+            noise[:, indices] = standardised_noise * scales + locations
+            if profiler is not None:
+                # The cost of the group is shared between its variables
+                elapsed = (profiler.clock() - start) / len(indices)
+                for i in indices:
+                    profiler.record(int(i), 'noise', elapsed,
+                                    noise[:, i].nbytes)
+
+        for structural_equation in self.ungrouped_equations:
+            if profiler is not None:
+                start = profiler.clock()
+            noise[:, structural_equation.index_lhs] = \
+                structural_equation.generate_noise(nb_samples,
+                                                   random_state=random_state)
+            if profiler is not None:
+                profiler.record(structural_equation.index_lhs, 'noise',
+                                profiler.clock() - start,
+                                noise[:, structural_equation.index_lhs].nbytes)
+
+        return noise
@@ -0,0 +1,511 @@
+import itertools
+import math
+import os
+
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import numpy as np
+
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.linear_fitting import InsufficientData, \
+    SufficientStatistics
+from StructuralCausalModels.orientation import apply_meek_rules
+from StructuralCausalModels.scores import DEFAULT_CACHE_SIZE, \
+    InvalidCacheSize
+from StructuralCausalModels.structural_causal_model import InvalidExecutor
+
+
+# The number of conditional independence tests generated, and computed, at
+# once
+DEFAULT_BATCH_SIZE = 4096
+
+# The correlation matrix and number of samples used by the tasks of the
+# workers of a process pool, set once per worker rather than sent with every
+# task
+_worker_correlation_matrix = None
+_worker_nb_samples = None
+
+
+def _initialize_worker(correlation_matrix, nb_samples):
+    """
+    Sets the correlation matrix and number of samples used by the tasks of a
+    worker of a process pool.
+
+    Parameters
+    ----------
+    correlation_matrix : numpy.ndarray
+        The correlation matrix of the variables.
+    nb_samples : int
+        The number of samples.
+    """
+    global _worker_correlation_matrix, _worker_nb_samples
+    _worker_correlation_matrix = correlation_matrix
+    _worker_nb_samples = nb_samples
+
+
+def _fisher_z_p_values(correlation_matrix, nb_samples, variables):
+    """
+    Computes the p-values of Fisher-z tests of conditional independence.
+
+    Parameters
+    ----------
+    correlation_matrix : numpy.ndarray or None
+        The correlation matrix of the variables, or None to use the one of the
+        worker of a process pool.
+    nb_samples : int or None
+        The number of samples, or None to use the one of the worker of a
+        process pool.
+    variables : numpy.ndarray
+        The variables of the tests, of shape (k, l + 2) : the first two columns
+        are the variables tested, the others the conditioning variables.
+
+    Returns
+    -------
+    numpy.ndarray
+        The p-value of each test, which is not a number when there are not
+        enough samples to compute it.
+    """
+    if correlation_matrix is None:
+        correlation_matrix = _worker_correlation_matrix
+        nb_samples = _worker_nb_samples
+
+    nb_conditioning = variables.shape[1] - 2
+    submatrices = correlation_matrix[variables[:, :, np.newaxis],
+                                     variables[:, np.newaxis, :]]
+    try:
+        precisions = np.linalg.inv(submatrices)
+    except np.linalg.LinAlgError:
+        # Some conditioning variables are collinear
+        precisions = np.linalg.pinv(submatrices, hermitian=True)
+    partial_correlations = -precisions[:, 0, 1] / np.sqrt(
+        precisions[:, 0, 0] * precisions[:, 1, 1]
+    )
+    # Deterministic relations give infinite statistics, i.e. p-values of 0
+    partial_correlations = np.clip(partial_correlations, -1 + 1e-15,
+                                   1 - 1e-15)
+    dof = nb_samples - nb_conditioning - 3
+    if dof <= 0:
+        return np.full(len(variables), np.nan)
+    statistics = np.abs(np.arctanh(partial_correlations)) * math.sqrt(dof)
+
+    return np.asarray([math.erfc(statistic / math.sqrt(2))
+                       for statistic in statistics])
+
+
+class FisherZTest:
+    """A class to test conditional independence between Gaussian variables.
+
+    The Fisher-z test of the independence of :math:`X_i` and :math:`X_j` given
+    :math:`X_S` transforms the partial correlation :math:`r` of :math:`X_i`
+    and :math:`X_j` given :math:`X_S` into
+    :math:`z = \\sqrt{N - |S| - 3} \\operatorname{arctanh}(|r|)`, which is
+    standard normal under independence, :math:`N` being the number of samples.
+    All the partial correlations are computed from the correlation matrix of
+    the variables, computed once, by inverting its submatrices, in batches.
+
+    The p-values are kept in a cache keyed by the pair of variables tested
+    and the conditioning set, which holds at most cache_size p-values : when
+    full, the least recently used p-value is evicted.
+
+    Parameters
+    ----------
+    data : array_like or SufficientStatistics
+        The samples, with one row per sample and column :math:`i` containing
+        the samples of :math:`X_i` (e.g. the dataframe returned by
+        StructuralCausalModel.generate_data), or their sufficient statistics.
+    cache_size : int, optional
+        The maximum number of p-values kept in the cache (default is
+        DEFAULT_CACHE_SIZE). If None, the cache is unbounded.
+
+    Attributes
+    ----------
+    correlation_matrix : numpy.ndarray
+        The correlation matrix of the variables.
+    nb_samples : int
+        The number of samples.
+    nb_hits : int
+        The number of p-values found in the cache.
+    nb_misses : int
+        The number of p-values computed.
+
+    Raises
+    ------
+    InvalidCacheSize
+        If cache_size is neither None nor a positive integer.
+    InsufficientData
+        If there are fewer than two samples.
+    """
+
+    def __init__(self, data, cache_size=DEFAULT_CACHE_SIZE):
+
+        if cache_size is not None and \
+                (not isinstance(cache_size, (int, np.integer)) or
+                 isinstance(cache_size, bool) or cache_size <= 0):
+            msg = "The cache size must be a positive integer !"
+            raise InvalidCacheSize(msg)
+
+        if isinstance(data, SufficientStatistics):
+            statistics = data
+        else:
+            statistics = SufficientStatistics.from_data(data)
+        if statistics.nb_samples < 2:
+            raise InsufficientData("There are not enough samples to test !")
+
+        covariance = statistics.covariance()
+        standard_deviations = np.sqrt(np.diag(covariance))
+        self.correlation_matrix = covariance / np.outer(standard_deviations,
+                                                        standard_deviations)
+        self.nb_samples = statistics.nb_samples
+        self.cache_size = cache_size
+        self._p_values = OrderedDict()
+        self.nb_hits = 0
+        self.nb_misses = 0
+
+    @property
+    def nb_var(self):
+        """int: the number of variables."""
+        return self.correlation_matrix.shape[0]
+
+    @staticmethod
+    def _key(i, j, conditioning_set):
+        """
+        Returns the key of a test in the cache.
+
+        Parameters
+        ----------
+        i : int
+            The index of a variable tested.
+        j : int
+            The index of the other variable tested.
+        conditioning_set : iterable
+            The indices of the conditioning variables.
+
+        Returns
+        -------
+        tuple
+            The key, which does not depend on the order of the variables.
+        """
+        i, j = int(i), int(j)
+
+        return (min(i, j), max(i, j),
+                tuple(sorted(int(k) for k in conditioning_set)))
+
+    def p_values(self, tests, executor=None, nb_workers=None,
+                 in_workers=False):
+        """
+        Returns the p-values of a batch of tests.
+
+        Parameters
+        ----------
+        tests : list
+            The tests, as tuples (i, j, conditioning set).
+        executor : concurrent.futures.Executor, optional
+            The executor on which the p-values missing from the cache are
+            computed (default is None, in which case they are computed in the
+            calling thread).
+        nb_workers : int, optional
+            The number of tasks the p-values missing from the cache are split
+            into, when computed on an executor (default is None, in which case
+            it is the number of CPUs).
+        in_workers : bool, optional
+            Whether the workers of the executor hold the correlation matrix
+            (see _initialize_worker), rather than being sent it with every task
+            (default is False).
+
+        Returns
+        -------
+        numpy.ndarray
+            The p-value of each test.
+        """
+        keys = [FisherZTest._key(*test) for test in tests]
+        cache = self._p_values
+        # The tests missing from the cache, grouped by number of conditioning
+        # variables
+        missing = dict()
+        for key in keys:
+            if key in cache:
+                self.nb_hits += 1
+                cache.move_to_end(key)
+            elif key not in missing:
+                missing[key] = None
+        groups = dict()
+        for key in missing:
+            groups.setdefault(len(key[2]), []).append(key)
+
+        for group in groups.values():
+            variables = np.asarray([(i, j) + conditioning_set
+                                    for i, j, conditioning_set in group],
+                                   dtype=np.intp)
+            if executor is None:
+                p_values = _fisher_z_p_values(self.correlation_matrix,
+                                              self.nb_samples, variables)
+            else:
+                nb_tasks = nb_workers or os.cpu_count() or 1
+                chunk_size = -(-len(variables) // nb_tasks)
+                chunks = [variables[start:start + chunk_size]
+                          for start in range(0, len(variables), chunk_size)]
+                correlation_matrix = None if in_workers else \
+                    self.correlation_matrix
+                nb_samples = None if in_workers else self.nb_samples
+                p_values = np.concatenate(list(executor.map(
+                    _fisher_z_p_values,
+                    [correlation_matrix] * len(chunks),
+                    [nb_samples] * len(chunks),
+                    chunks
+                )))
+            self.nb_misses += len(group)
+            for key, p_value in zip(group, p_values):
+                missing[key] = float(p_value)
+
+        p_values = np.empty(len(keys))
+        for k, key in enumerate(keys):
+            p_values[k] = cache[key] if key in cache else missing[key]
+        for key, p_value in missing.items():
+            cache[key] = p_value
+            if self.cache_size is not None and len(cache) > self.cache_size:
+                # Evicts the least recently used p-value
+                cache.popitem(last=False)
+
+        return p_values
+
+    def p_value(self, i, j, conditioning_set=()):
+        """
+        Returns the p-value of the test of the independence of two variables
+        given others.
+
+        Parameters
+        ----------
+        i : int
+            The index of a variable tested.
+        j : int
+            The index of the other variable tested.
+        conditioning_set : iterable, optional
+            The indices of the conditioning variables (default is (), for the
+            test of marginal independence).
+
+        Returns
+        -------
+        float
+            The p-value.
+        """
+        return float(self.p_values([(i, j, tuple(conditioning_set))])[0])
+
+    def cache_info(self):
+        """
+        Returns the statistics of the cache of p-values.
+
+        Returns
+        -------
+        dict
+            The number of p-values found in the cache ('hits'), computed
+            ('misses'), currently in the cache ('size') and the maximum number
+            of p-values in the cache ('max_size').
+        """
+        return {
+            'hits': self.nb_hits,
+            'misses': self.nb_misses,
+            'size': len(self._p_values),
+            'max_size': self.cache_size,
+        }
+
+
+class PCAlgorithm:
+    """A class to learn the CPDAG of a DAG from data with the PC algorithm.
+
+    The PC algorithm [1]_ first learns the skeleton of the DAG, by removing
+    the edge between :math:`X_i` and :math:`X_j` as soon as they are found
+    independent given some set of variables adjacent to :math:`X_i` (the
+    separating set), for conditioning sets of increasing sizes. It then
+    orients the v-structures :math:`X_i \\rightarrow X_k \\leftarrow X_j` such
+    that :math:`X_k` is not in the separating set of :math:`X_i` and
+    :math:`X_j`, and the edges compelled by Meek's rules (see
+    apply_meek_rules). The result is the CPDAG of the Markov equivalence class
+    of the DAG, as a Graph with undirected edges.
+
+    The skeleton is learnt by the order-independent variant PC-stable of D.
+    Colombo and M. H. Maathuis [2]_ : the adjacencies used to generate the
+    conditioning sets of a given size are those at the start of the level,
+    so that all the tests of a level are independent of one another. They are
+    generated and computed in batches (on an executor when one is given),
+    the tests of the edges already removed being skipped ; the result does not
+    depend on the batch size, nor on the executor.
+
+    Parameters
+    ----------
+    data : array_like or SufficientStatistics or FisherZTest
+        The samples, with one row per sample and column :math:`i` containing
+        the samples of :math:`X_i` (e.g. the dataframe returned by
+        StructuralCausalModel.generate_data), their sufficient statistics, or
+        a FisherZTest of the samples (whose cached p-values are then
+        reused).
+    alpha : float, optional
+        The significance level of the tests (default is 0.01).
+    max_conditioning_set_size : int, optional
+        The maximum size of the conditioning sets (default is None, in which
+        case it is not limited).
+    batch_size : int, optional
+        The number of tests generated and computed at once (default is
+        DEFAULT_BATCH_SIZE).
+    executor : str or concurrent.futures.Executor, optional
+        The executor on which the tests are computed : either 'processes', in
+        which case a process pool is created for the duration of each fit, or
+        an existing executor (default is None, in which case the tests are
+        computed in the calling thread). The correlation matrix is sent to the
+        workers of the process pool once, and with every task to an existing
+        executor.
+    nb_workers : int, optional
+        The number of worker processes when executor is 'processes', and the
+        number of tasks per batch submitted to the executor (default is None,
+        in which case it is the number of CPUs).
+
+    Attributes
+    ----------
+    test : FisherZTest
+        The conditional independence test.
+    separating_sets : dict
+        The separating set found for each pair (i, j), i < j, of variables
+        found independent by the last fit.
+    skeleton : numpy.ndarray
+        The adjacency matrix of the skeleton learnt by the last fit.
+
+    Raises
+    ------
+    InvalidExecutor
+        If executor is neither None, 'processes' nor a
+        concurrent.futures.Executor.
+
+    Notes
+    -----
+    .. [1] Spirtes, P., Glymour, C. and Scheines, R. *Causation, Prediction,
+       and Search*. MIT Press, second edition, 2000.
+    .. [2] Colombo, D. and Maathuis, M. H. "Order-independent constraint-based
+       causal structure learning". *Journal of Machine Learning Research*,
+       volume 15, pp. 3741-3782, 2014.
+    """
+
+    def __init__(self, data, alpha=0.01, max_conditioning_set_size=None,
+                 batch_size=DEFAULT_BATCH_SIZE, executor=None,
+                 nb_workers=None):
+
+        if not (executor is None or executor == 'processes' or
+                isinstance(executor, Executor)):
+            msg = "The executor must be either 'processes' or a "
+            msg += "concurrent.futures.Executor !"
+            raise InvalidExecutor(msg)
+
+        self.test = data if isinstance(data, FisherZTest) else \
+            FisherZTest(data)
+        self.alpha = alpha
+        self.max_conditioning_set_size = max_conditioning_set_size
+        self.batch_size = batch_size
+        self.executor = executor
+        self.nb_workers = nb_workers
+        self.separating_sets = dict()
+        self.skeleton = None
+
+    def fit(self, name=''):
+        """Learns the CPDAG.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the CPDAG learnt (default is '').
+
+        Returns
+        -------
+        Graph
+            The CPDAG learnt, whose directed edges are compelled and whose
+            undirected edges are reversible.
+        """
+        if self.executor == 'processes':
+            with ProcessPoolExecutor(
+                    max_workers=self.nb_workers,
+                    initializer=_initialize_worker,
+                    initargs=(self.test.correlation_matrix,
+                              self.test.nb_samples)) as pool:
+                self._learn_skeleton(pool, in_workers=True)
+        else:
+            self._learn_skeleton(self.executor, in_workers=False)
+
+        cpdag = apply_meek_rules(self._orient_v_structures())
+
+        return Graph(adjacency_matrix=cpdag, name=name, validate=False)
+
+    def _learn_skeleton(self, executor, in_workers):
+        """
+        Learns the skeleton and the separating sets, with PC-stable.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor or None
+            The executor on which the tests are computed.
+        in_workers : bool
+            Whether the workers of the executor hold the correlation matrix.
+        """
+        nb_var = self.test.nb_var
+        skeleton = ~np.identity(nb_var, dtype=bool)
+        self.separating_sets = dict()
+        size = 0
+
+        while self.max_conditioning_set_size is None or \
+                size <= self.max_conditioning_set_size:
+
+            # The adjacencies are frozen for the whole level
+            adjacency_sets = [np.flatnonzero(skeleton[i]).tolist()
+                              for i in range(nb_var)]
+            if max(len(adjacency_set) for adjacency_set in adjacency_sets) \
+                    <= size:
+                break
+
+            def generate_tests():
+                for i in range(nb_var):
+                    for j in adjacency_sets[i]:
+                        others = [k for k in adjacency_sets[i] if k != j]
+                        for conditioning_set in itertools.combinations(
+                                others, size):
+                            # The tests of the edges removed are skipped
+                            if not skeleton[i, j]:
+                                break
+                            yield i, j, conditioning_set
+
+            tests = generate_tests()
+            while True:
+                batch = list(itertools.islice(tests, self.batch_size))
+                if not batch:
+                    break
+                p_values = self.test.p_values(batch, executor=executor,
+                                              nb_workers=self.nb_workers,
+                                              in_workers=in_workers)
+                # The edges are removed in the order of the tests, as if they
+                # were run one after the other
+                for (i, j, conditioning_set), p_value in zip(batch, p_values):
+                    if skeleton[i, j] and p_value > self.alpha:
+                        skeleton[i, j] = skeleton[j, i] = False
+                        self.separating_sets[(min(i, j), max(i, j))] = \
+                            conditioning_set
+            size += 1
+
+        self.skeleton = skeleton.astype(np.uint8)
+
+    def _orient_v_structures(self):
+        """
+        Orients the v-structures of the skeleton.
+
+        Returns
+        -------
+        numpy.ndarray
+            The adjacency matrix of the skeleton with the v-structures
+            oriented.
+        """
+        skeleton = self.skeleton.astype(bool)
+        matrix = skeleton.copy()
+        for (i, j), separating_set in sorted(self.separating_sets.items()):
+            for k in np.flatnonzero(skeleton[i] & skeleton[j]):
+                if k in separating_set:
+                    continue
+                # i -> k <- j, unless an edge was already oriented out of k
+                if matrix[i, k] and matrix[j, k]:
+                    matrix[k, i] = matrix[k, j] = False
+
+        return matrix.astype(np.uint8)
@@ -0,0 +1,564 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.directed_graph import DirectedGraph
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    GraphViaAdjacencyMatrix
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.serialization import DistributionSpec
+
+
+FORMAT_VERSION = 1
+
+_graph_classes = {
+    'Graph': Graph,
+    'DirectedGraph': DirectedGraph,
+    'DirectedAcyclicGraph': DirectedAcyclicGraph,
+}
+
+
+class InvalidFile(Exception):
+    """Raised if a file does not contain an object in the expected format.
+    """
+    pass
+
+
+class UnsupportedExogenousVariable(Exception):
+    """Raised if an exogenous variable cannot be saved.
+
+    Only the exogenous variables which can be represented by a DistributionSpec
+    can be saved.
+    """
+    pass
+
+
+def _compute_checksum(arrays, metadata):
+    """Computes the checksum of the content of a file.
+
+    Parameters
+    ----------
+    arrays : dict
+        The arrays saved in the file, by name.
+    metadata : str
+        The JSON-encoded metadata saved in the file.
+
+    Returns
+    -------
+    str
+        The SHA-256 hexadecimal digest of the arrays and metadata.
+    """
+    digest = hashlib.sha256(metadata.encode('utf-8'))
+    for key in sorted(arrays.keys()):
+        array = np.asarray(arrays[key])
+        if not array.flags.c_contiguous:
+            array = np.ascontiguousarray(array)
+        digest.update(key.encode('utf-8'))
+        digest.update(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+        # Hashes the buffer of the array, without copying it
+        digest.update(array.data)
+
+    return digest.hexdigest()
+
+
+def _save(file, kind, arrays, metadata):
+    """Saves arrays and metadata to an uncompressed .npz file, with a checksum.
+
+    Parameters
+    ----------
+    file : str or file-like object
+        The file (or the path to the file) to save to.
+    kind : str
+        The kind of object saved.
+    arrays : dict
+        The arrays to save, by name.
+    metadata : dict
+        The JSON-serialisable metadata to save.
+    """
+    metadata = dict(metadata, kind=kind, format_version=FORMAT_VERSION)
+    encoded_metadata = json.dumps(metadata, sort_keys=True)
+    checksum = _compute_checksum(arrays, encoded_metadata)
+
+    np.savez(file,
+             metadata=np.asarray(encoded_metadata),
+             checksum=np.asarray(checksum),
+             **arrays)
+
+
+def _load(file, kinds):
+    """Loads arrays and metadata saved by _save.
+
+    Parameters
+    ----------
+    file : str or file-like object
+        The file (or the path to the file) to load from.
+    kinds : iterable
+        The kinds of objects expected.
+
+    Returns
+    -------
+    tuple
+        The arrays (by name), the metadata and whether the checksum of the
+        content of the file matches the saved checksum.
+
+    Raises
+    ------
+    InvalidFile
+        If the file does not contain one of the kinds of objects expected.
+    """
+    with np.load(file, allow_pickle=False) as npz_file:
+        contents = {key: npz_file[key] for key in npz_file.files}
+
+    try:
+        encoded_metadata = str(contents.pop('metadata'))
+        checksum = str(contents.pop('checksum'))
+        metadata = json.loads(encoded_metadata)
+    except (KeyError, ValueError):
+        raise InvalidFile("The file does not contain valid metadata !")
+
+    if metadata.get('kind') not in kinds:
+        msg = f"The file contains a {metadata.get('kind')}, expected one of "
+        msg += f"{', '.join(kinds)} !"
+        raise InvalidFile(msg)
+
+    is_intact = checksum == _compute_checksum(contents, encoded_metadata)
+
+    return contents, metadata, is_intact
+
+
+def _to_json(value):
+    """Converts the numpy scalars and arrays in a value to Python objects.
+
+    Parameters
+    ----------
+    value : object
+        The value, e.g. a parameter of a distribution.
+
+    Returns
+    -------
+    object
+        The value, with its numpy scalars converted to Python scalars and its
+        numpy arrays to lists, which can be encoded in JSON.
+    """
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+
+    return value
+
+
+def save_graph(file, graph):
+    """Saves a graph to a binary file.
+
+    The adjacency matrix is stored in a sparse (compressed sparse row) format.
+    For DAGs, a causal order is stored as well.
+
+    Parameters
+    ----------
+    file : str or file-like object
+        The file (or the path to the file) to save to. The '.npz' extension is
+        appended to paths which do not have it.
+    graph : Graph
+        The graph to save (a Graph, DirectedGraph or DirectedAcyclicGraph).
+    """
+    kind = 'Graph'
+    for name, graph_class in _graph_classes.items():
+        if isinstance(graph, graph_class):
+            kind = name
+
+    adjacency_matrix = graph.adjacency_matrix
+    out_degrees = graph.out_degrees()
+    # scipy.sparse copies the indices which are not stored as 32-bit integers
+    # when they fit
+    index_dtype = (np.int32 if max(graph.nb_vertices, out_degrees.sum()) <
+                   2 ** 31 else np.int64)
+    indptr = np.zeros(graph.nb_vertices + 1, dtype=index_dtype)
+    np.cumsum(out_degrees, out=indptr[1:])
+    indices = [np.empty(0, dtype=index_dtype)]
+    for _, block in GraphViaAdjacencyMatrix.iterate_row_blocks(
+            adjacency_matrix):
+        indices.append(np.nonzero(block)[1].astype(index_dtype))
+    arrays = {
+        'indptr': indptr,
+        'indices': np.concatenate(indices),
+    }
+    if kind == 'DirectedAcyclicGraph':
+        arrays['causal_order'] = np.asarray(graph.compute_causal_order(),
+                                            dtype=np.int64)
+
+    metadata = {
+        'name': graph.name,
+        'nb_vertices': int(graph.nb_vertices),
+        'dtype': adjacency_matrix.dtype.str,
+    }
+
+    _save(file, kind, arrays, metadata)
+
+
+def load_graph(file):
+    """Loads a graph saved by save_graph.
+
+    The adjacency matrix of the graph is a scipy.sparse.csr_matrix holding the
+    arrays loaded from the file, without copying them. If the checksum of the
+    content of the file matches, the graph is not validated again and the
+    saved causal order of DAGs is re-used. The arrays of a .npz file cannot be
+    memory-mapped : save_graph_csr and load_graph_csr store graphs as arrays
+    which can be.
+
+    Parameters
+    ----------
+    file : str or file-like object
+        The file (or the path to the file) to load from.
+
+    Returns
+    -------
+    Graph
+        The graph, of the class it was saved from (Graph, DirectedGraph or
+        DirectedAcyclicGraph), whose adjacency matrix is a
+        scipy.sparse.csr_matrix.
+
+    Raises
+    ------
+    InvalidFile
+        If the file does not contain a graph, or if its adjacency matrix is
+        malformed.
+    InvalidAdjacencyMatrix
+        If the checksum does not match and the adjacency matrix is not valid
+        for the class of the graph.
+    """
+    arrays, metadata, is_intact = _load(file, _graph_classes.keys())
+
+    nb_vertices = metadata['nb_vertices']
+    indptr = arrays['indptr']
+    indices = arrays['indices']
+    if (len(indptr) != nb_vertices + 1 or indptr[0] != 0 or
+            indptr[-1] != len(indices) or np.any(np.diff(indptr) < 0) or
+            np.any(indices < 0) or np.any(indices >= nb_vertices)):
+        raise InvalidFile("The adjacency matrix in the file is malformed !")
+
+    import scipy.sparse
+
+    adjacency_matrix = scipy.sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.dtype(metadata['dtype'])), indices,
+         indptr),
+        shape=(nb_vertices, nb_vertices),
+        copy=False
+    )
+
+    graph = _graph_classes[metadata['kind']](adjacency_matrix=adjacency_matrix,
+                                             name=metadata['name'],
+                                             validate=not is_intact)
+    if is_intact and 'causal_order' in arrays:
+        graph._cache['causal_order'] = arrays['causal_order'].tolist()
+
+    return graph
+
+
+def save_graph_csr(directory, graph, block_size=None):
+    """Saves a graph to a directory of memory-mappable arrays.
+
+    The adjacency matrix is stored in the compressed sparse row format, as the
+    files 'indptr.npy', 'indices.npy' and 'data.npy', along with the metadata
+    in 'metadata.json'. The adjacency matrix of the graph is read in blocks of
+    rows and the arrays are written in place, so that graphs larger than
+    memory can be saved.
+
+    Parameters
+    ----------
+    directory : str
+        The path to the directory to save to, which is created if needed.
+    graph : Graph
+        The graph to save (a Graph, DirectedGraph or DirectedAcyclicGraph).
+    block_size : int, optional
+        The number of rows of the adjacency matrix processed at once (default
+        is None, in which case the blocks contain about BLOCK_NB_ENTRIES
+        entries).
+    """
+    kind = 'Graph'
+    for name, graph_class in _graph_classes.items():
+        if isinstance(graph, graph_class):
+            kind = name
+
+    os.makedirs(directory, exist_ok=True)
+    nb_vertices = graph.nb_vertices
+    out_degrees = graph.out_degrees(block_size=block_size)
+    nb_edges = int(out_degrees.sum())
+    # scipy.sparse copies the indices which are not stored as 32-bit integers
+    # when they fit
+    index_dtype = (np.int32 if max(nb_vertices, nb_edges) < 2 ** 31
+                   else np.int64)
+
+    indptr = np.lib.format.open_memmap(
+        os.path.join(directory, 'indptr.npy'), mode='w+', dtype=index_dtype,
+        shape=(nb_vertices + 1,)
+    )
+    indptr[0] = 0
+    np.cumsum(out_degrees, out=indptr[1:])
+    indices = np.lib.format.open_memmap(
+        os.path.join(directory, 'indices.npy'), mode='w+', dtype=index_dtype,
+        shape=(nb_edges,)
+    )
+    for start, block in GraphViaAdjacencyMatrix.iterate_row_blocks(
+            graph.adjacency_matrix, block_size=block_size):
+        _, columns = np.nonzero(block)
+        indices[indptr[start]:indptr[start + block.shape[0]]] = columns
+    np.save(os.path.join(directory, 'data.npy'),
+            np.ones(nb_edges, dtype=np.uint8))
+    indptr.flush()
+    indices.flush()
+    del indptr, indices
+
+    metadata = {
+        'name': graph.name,
+        'nb_vertices': int(nb_vertices),
+        'kind': kind,
+        'format_version': FORMAT_VERSION,
+    }
+    with open(os.path.join(directory, 'metadata.json'), 'w') as file:
+        json.dump(metadata, file)
+
+
+def load_graph_csr(directory, mmap_mode='r', validate=True):
+    """Loads a graph saved by save_graph_csr, without copying its arrays.
+
+    The adjacency matrix of the graph is a scipy.sparse.csr_matrix holding the
+    (by default memory-mapped) arrays of the directory.
+
+    Parameters
+    ----------
+    directory : str
+        The path to the directory to load from.
+    mmap_mode : str, optional
+        The mode in which the arrays are memory-mapped, as in numpy.load
+        (default is 'r' ; None loads the arrays in memory).
+    validate : bool, optional
+        Whether to check that the adjacency matrix is valid for the class of the
+        graph (default is True).
+
+    Returns
+    -------
+    Graph
+        The graph, of the class it was saved from (Graph, DirectedGraph or
+        DirectedAcyclicGraph).
+
+    Raises
+    ------
+    InvalidFile
+        If the directory does not contain a graph, or if its adjacency matrix
+        is malformed.
+    InvalidAdjacencyMatrix
+        If validate is True and the adjacency matrix is not valid for the class
+        of the graph.
+    """
+    try:
+        with open(os.path.join(directory, 'metadata.json')) as file:
+            metadata = json.load(file)
+    except (OSError, ValueError):
+        raise InvalidFile("The directory does not contain valid metadata !")
+
+    if metadata.get('kind') not in _graph_classes:
+        msg = f"The directory contains a {metadata.get('kind')}, expected one "
+        msg += f"of {', '.join(_graph_classes.keys())} !"
+        raise InvalidFile(msg)
+
+    arrays = {
+        key: np.load(os.path.join(directory, f"{key}.npy"),
+                     mmap_mode=mmap_mode, allow_pickle=False)
+        for key in ['indptr', 'indices', 'data']
+    }
+    nb_vertices = metadata['nb_vertices']
+    if (len(arrays['indptr']) != nb_vertices + 1 or
+            arrays['indptr'][-1] != len(arrays['indices']) or
+            len(arrays['data']) != len(arrays['indices'])):
+        raise InvalidFile("The adjacency matrix in the file is malformed !")
+
+    import scipy.sparse
+
+    adjacency_matrix = scipy.sparse.csr_matrix(
+        (arrays['data'], arrays['indices'], arrays['indptr']),
+        shape=(nb_vertices, nb_vertices),
+        copy=False
+    )
+
+    return _graph_classes[metadata['kind']](adjacency_matrix=adjacency_matrix,
+                                            name=metadata['name'],
+                                            validate=validate)
+
+
+def save_linear_structural_causal_model(file, linear_scm):
+    """Saves a linear SCM to a binary file.
+
+    The coefficients are stored in a sparse format, along with the
+    specifications of the exogenous variables, a causal order and the
+    topological generations of the DAG associated to the linear SCM.
+
+    Parameters
+    ----------
+    file : str or file-like object
+        The file (or the path to the file) to save to. The '.npz' extension is
+        appended to paths which do not have it.
+    linear_scm : LinearStructuralCausalModel
+        The linear SCM to save.
+
+    Raises
+    ------
+    NonLinearStructuralEquation
+        If one of the structural equations of the SCM is not a
+        LinearStructuralEquation.
+    UnsupportedExogenousVariable
+        If one of the exogenous variables cannot be represented by a
+        DistributionSpec.
+    """
+    linear_scm.compute_causal_order()
+    representation = linear_scm.to_arrays()
+
+    exogenous_variables = []
+    for spec in representation['exogenous_variables']:
+        if not isinstance(spec, DistributionSpec):
+            msg = f"The exogenous variable {spec} cannot be saved !"
+            raise UnsupportedExogenousVariable(msg)
+        kwds = {key: (np.asarray(value).tolist() if key == 'values'
+                      else _to_json(value))
+                for key, value in spec.kwds.items()}
+        exogenous_variables.append([spec.name, _to_json(list(spec.args)),
+                                    kwds])
+
+    generations = linear_scm.compute_topological_generations()
+    generation_indptr = np.zeros(len(generations) + 1, dtype=np.int64)
+    np.cumsum([len(g) for g in generations], out=generation_indptr[1:])
+
+    arrays = {
+        key: representation[key] for key in
+        ['indices_lhs', 'indptr', 'indices_rhs', 'coefficients',
+         'exogenous_indices']
+    }
+    arrays['causal_order'] = np.asarray(representation['causal_order'],
+                                        dtype=np.int64)
+    arrays['generations'] = np.concatenate(
+        [np.empty(0, dtype=np.int64)] +
+        [np.asarray(g, dtype=np.int64) for g in generations]
+    )
+    arrays['generation_indptr'] = generation_indptr
+
+    metadata = {
+        'name': representation['name'],
+        'nb_var': representation['nb_var'],
+        'exogenous_variables': exogenous_variables,
+    }
+
+    _save(file, 'LinearStructuralCausalModel', arrays, metadata)
+
+
+def _check_linear_scm_arrays(arrays, nb_var, nb_exogenous_variables):
+    """Checks that the arrays of a linear SCM are consistent with each other.
+
+    Parameters
+    ----------
+    arrays : dict
+        The arrays loaded from the file.
+    nb_var : int
+        The number of variables of the linear SCM.
+    nb_exogenous_variables : int
+        The number of distinct exogenous variables.
+
+    Raises
+    ------
+    InvalidFile
+        If some index is out of bounds, or if the arrays are not of
+        consistent lengths.
+    """
+    def in_range(array, stop):
+        return bool(np.all((array >= 0) & (array < stop)))
+
+    nb_equations = len(arrays['indices_lhs'])
+    indptr = arrays['indptr']
+    is_valid = (
+        len(indptr) == nb_equations + 1 and indptr[0] == 0 and
+        not np.any(np.diff(indptr) < 0) and
+        indptr[-1] == len(arrays['indices_rhs']) and
+        len(arrays['coefficients']) == len(arrays['indices_rhs']) and
+        len(arrays['exogenous_indices']) == nb_equations and
+        in_range(arrays['indices_lhs'], nb_var) and
+        in_range(arrays['indices_rhs'], nb_var) and
+        in_range(arrays['exogenous_indices'], nb_exogenous_variables) and
+        np.array_equal(np.sort(arrays['causal_order']), np.arange(nb_var))
+    )
+    if not is_valid:
+        raise InvalidFile("The linear SCM in the file is malformed !")
+
+
+def load_linear_structural_causal_model(file):
+    """Loads a linear SCM saved by save_linear_structural_causal_model.
+
+    If the checksum of the content of the file matches, the linear SCM is not
+    validated again, and the saved causal order and topological generations
+    are re-used ; its structural equations hold views on the loaded arrays of
+    parents and coefficients.
+
+    Parameters
+    ----------
+    file : str or file-like object
+        The file (or the path to the file) to load from.
+
+    Returns
+    -------
+    LinearStructuralCausalModel
+        The linear SCM.
+
+    Raises
+    ------
+    InvalidFile
+        If the file does not contain a linear SCM, or if the checksum does not
+        match and the arrays of the linear SCM are malformed (e.g. indices out
+        of bounds).
+    InconsistentStructuralCausalModelDefinition
+        If the checksum does not match and there are not as many structural
+        equations as variables.
+    CyclicityWarning
+        If the checksum does not match and the linear SCM is (highly likely to
+        be) cyclic.
+    """
+    arrays, metadata, is_intact = _load(file, ['LinearStructuralCausalModel'])
+    if not is_intact:
+        _check_linear_scm_arrays(arrays, metadata['nb_var'],
+                                 len(metadata['exogenous_variables']))
+
+    representation = {
+        key: arrays[key] for key in
+        ['indices_lhs', 'indptr', 'indices_rhs', 'coefficients',
+         'exogenous_indices']
+    }
+    representation['name'] = metadata['name']
+    representation['nb_var'] = metadata['nb_var']
+    representation['exogenous_variables'] = [
+        DistributionSpec(name=name, args=tuple(args), kwds=kwds)
+        for name, args, kwds in metadata['exogenous_variables']
+    ]
+    representation['causal_order'] = (arrays['causal_order'] if is_intact
+                                      else None)
+
+    linear_scm = LinearStructuralCausalModel.from_arrays(representation)
+
+    if not is_intact:
+        # Validates the linear SCM with the usual constructor
+        return LinearStructuralCausalModel(
+            name=linear_scm.name,
+            nb_var=linear_scm.nb_var,
+            structural_equations=linear_scm.structural_equations
+        )
+
+    generation_indptr = arrays['generation_indptr']
+    linear_scm._topological_generations = [
+        arrays['generations'][start:stop].tolist() for start, stop in
+        zip(generation_indptr[:-1], generation_indptr[1:])
+    ]
+
+    return linear_scm
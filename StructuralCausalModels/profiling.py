@@ -0,0 +1,243 @@
+import threading
+import time
+
+
+class InvalidProfilingStage(Exception):
+    """Raised if a measurement is recorded for an unknown sampling stage.
+    """
+    pass
+
+
+class EquationProfile:
+    """The costs of sampling a structural equation, accumulated over calls.
+
+    Parameters
+    ----------
+    index_lhs : int
+        The index of the structural variable on the left-hand side of the
+        structural equation.
+
+    Attributes
+    ----------
+    noise_time : float
+        The wall time (in seconds) spent drawing the samples of the exogenous
+        variable.
+    function_time : float
+        The wall time (in seconds) spent computing the structural equation from
+        its inputs.
+    write_time : float
+        The wall time (in seconds) spent writing the samples of the structural
+        variable into the array of samples.
+    noise_bytes : int
+        The size (in bytes) of the arrays of samples of the exogenous variable.
+    function_bytes : int
+        The size (in bytes) of the arrays returned by the structural equation.
+    nb_calls : int
+        The number of times the structural equation was computed.
+    """
+
+    def __init__(self, index_lhs):
+        self.index_lhs = index_lhs
+        self.noise_time = 0.0
+        self.function_time = 0.0
+        self.write_time = 0.0
+        self.noise_bytes = 0
+        self.function_bytes = 0
+        self.nb_calls = 0
+
+    @property
+    def total_time(self):
+        """float: the total wall time (in seconds) spent on the structural
+        equation."""
+        return self.noise_time + self.function_time + self.write_time
+
+    def to_dict(self):
+        """
+        Returns the profile as a dictionary.
+
+        Returns
+        -------
+        dict
+            The profile, with an entry per attribute and an entry
+            'total_time'.
+        """
+        return {
+            'index_lhs': self.index_lhs,
+            'noise_time': self.noise_time,
+            'function_time': self.function_time,
+            'write_time': self.write_time,
+            'total_time': self.total_time,
+            'noise_bytes': self.noise_bytes,
+            'function_bytes': self.function_bytes,
+            'nb_calls': self.nb_calls,
+        }
+
+    def __repr__(self):
+        """
+        Returns a string representation of the object.
+
+        Returns
+        -------
+        str
+            A string representation of the object.
+        """
+        s = f"EquationProfile(index_lhs={self.index_lhs}, "
+        s += f"noise_time={self.noise_time:.3g}, "
+        s += f"function_time={self.function_time:.3g}, "
+        s += f"write_time={self.write_time:.3g}, "
+        s += f"noise_bytes={self.noise_bytes}, "
+        s += f"function_bytes={self.function_bytes}, "
+        s += f"nb_calls={self.nb_calls})"
+
+        return s
+
+
+class SamplingProfiler:
+    """A class to profile the sampling of SCMs, structural equation by
+    structural equation.
+
+    A SamplingProfiler is passed to the sampling methods of an SCM (e.g.
+    StructuralCausalModel.generate_data), which then record the wall time spent
+    drawing the samples of each exogenous variable ('noise'), computing each
+    structural equation ('function') and writing its samples into the array of
+    samples ('write'), along with the sizes of the arrays allocated. When no
+    profiler is passed, the sampling methods do not time anything.
+
+    The exogenous variables sampled in groups (see NoiseSamplingPlan) are drawn
+    in a single call : the time of the call, and the size of the samples drawn,
+    are shared equally between the structural equations of the group.
+
+    A profiler accumulates the costs over all the calls it is passed to, and
+    can be shared by threads.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        A function called, for each measurement, as
+        callback(index_lhs, stage, elapsed, nb_bytes) where stage is one of
+        'noise', 'function' and 'write' (default is None).
+
+    Attributes
+    ----------
+    profiles : dict
+        The EquationProfile of each structural equation, by the index of the
+        variable on its left-hand side.
+    dataframe_time : float
+        The wall time (in seconds) spent building dataframes from the arrays of
+        samples.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.profiles = dict()
+        self.dataframe_time = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clock():
+        """
+        Returns the time used by the profiler.
+
+        Returns
+        -------
+        float
+            The value (in seconds) of a monotonic clock.
+        """
+        return time.perf_counter()
+
+    def record(self, index_lhs, stage, elapsed, nb_bytes=0):
+        """
+        Records a measurement.
+
+        Parameters
+        ----------
+        index_lhs : int
+            The index of the structural variable on the left-hand side of the
+            structural equation measured.
+        stage : str
+            What was measured : 'noise', 'function' or 'write'.
+        elapsed : float
+            The wall time (in seconds) measured.
+        nb_bytes : int, optional
+            The size (in bytes) of the array allocated (default is 0).
+
+        Raises
+        ------
+        InvalidProfilingStage
+            If the stage is not one of 'noise', 'function' and 'write'.
+        """
+        with self._lock:
+            if index_lhs not in self.profiles:
+                self.profiles[index_lhs] = EquationProfile(index_lhs)
+            profile = self.profiles[index_lhs]
+            if stage == 'noise':
+                profile.noise_time += elapsed
+                profile.noise_bytes += nb_bytes
+            elif stage == 'function':
+                profile.function_time += elapsed
+                profile.function_bytes += nb_bytes
+                profile.nb_calls += 1
+            elif stage == 'write':
+                profile.write_time += elapsed
+            else:
+                msg = "The stage must be one of 'noise', 'function' or "
+                msg += "'write' !"
+                raise InvalidProfilingStage(msg)
+
+        if self.callback is not None:
+            self.callback(index_lhs, stage, elapsed, nb_bytes)
+
+    def record_dataframe(self, elapsed):
+        """
+        Records the time spent building a dataframe.
+
+        Parameters
+        ----------
+        elapsed : float
+            The wall time (in seconds) measured.
+        """
+        with self._lock:
+            self.dataframe_time += elapsed
+
+    def report(self):
+        """
+        Returns the profiles of the structural equations, the most costly
+        first.
+
+        Returns
+        -------
+        list
+            The profiles, as dictionaries (see EquationProfile.to_dict), by
+            decreasing total time.
+        """
+        with self._lock:
+            profiles = sorted(self.profiles.values(),
+                              key=lambda profile: profile.total_time,
+                              reverse=True)
+            return [profile.to_dict() for profile in profiles]
+
+    def to_dataframe(self):
+        """
+        Returns the profiles of the structural equations as a dataframe.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with a row per structural equation, indexed by the index
+            of the variable on its left-hand side, the most costly first.
+        """
+        import pandas as pd
+
+        columns = list(EquationProfile(0).to_dict().keys())
+
+        return pd.DataFrame(self.report(), columns=columns).set_index(
+            'index_lhs'
+        )
+
+    def reset(self):
+        """
+        Discards all the measurements.
+        """
+        with self._lock:
+            self.profiles = dict()
+            self.dataframe_time = 0.0
@@ -0,0 +1,849 @@
+import copy
+import math
+
+import numpy as np
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.dag import InvalidOrdering
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.serialization import DistributionSpec
+
+
+class GraphModelNotImplemented(Exception):
+    """Raised when the requested random graph model is not implemented.
+    """
+    pass
+
+
+class NoiseFamilyNotImplemented(Exception):
+    """Raised when the requested family of noise distributions is not
+    implemented.
+    """
+    pass
+
+
+class InvalidNumberOfParents(Exception):
+    """Raised when the number of parents requested is not possible for the
+    random graph model.
+    """
+    pass
+
+
+def _pairs_from_ranks(ranks, nb_vertices):
+    """
+    Decodes the ranks of pairs of positions :math:`s < t`, in the row-major
+    order of the strictly upper triangle of an :math:`n \\times n` matrix.
+
+    Parameters
+    ----------
+    ranks : numpy.ndarray
+        The ranks of the pairs, between 0 and :math:`n (n - 1) / 2 - 1`.
+    nb_vertices : int
+        The number :math:`n` of positions.
+
+    Returns
+    -------
+    tuple
+        The positions :math:`s` and :math:`t` of the pairs.
+    """
+    n = nb_vertices
+    nb_pairs = n * (n - 1) // 2
+    sources = n - 2 - np.floor(
+        np.sqrt(4.0 * n * (n - 1) - 8.0 * ranks - 7) / 2 - 0.5
+    ).astype(np.int64)
+    # Correct the rounding errors of the square root, for large n
+    first_rank = nb_pairs - (n - sources) * (n - sources - 1) // 2
+    sources -= first_rank > ranks
+    first_rank = nb_pairs - (n - sources) * (n - sources - 1) // 2
+    too_small = ranks - first_rank >= n - 1 - sources
+    sources += too_small
+    first_rank = nb_pairs - (n - sources) * (n - sources - 1) // 2
+    targets = ranks - first_rank + sources + 1
+
+    return sources, targets
+
+
+def _erdos_renyi_edges(nb_graphs, nb_vertices, nb_parents, rng):
+    """
+    Draws the edges of Erdős–Rényi DAGs, in which each pair of positions
+    :math:`s < t` is an edge with probability :math:`p = 2 d / (n - 1)`.
+
+    The gaps between consecutive edges, in the sequence of the pairs of all
+    the graphs, are geometric : only the edges are drawn, so that the number
+    of operations is linear in the number of edges rather than in the number
+    of pairs.
+
+    Parameters
+    ----------
+    nb_graphs : int
+        The number of graphs.
+    nb_vertices : int
+        The number of vertices of each graph.
+    nb_parents : float
+        The expected number :math:`d` of parents of a vertex.
+    rng : numpy.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    tuple
+        The graphs, sources and targets of the edges, as positions in the
+        orderings of the graphs.
+
+    Raises
+    ------
+    InvalidNumberOfParents
+        If the probability of an edge is larger than 1.
+    """
+    nb_pairs = nb_vertices * (nb_vertices - 1) // 2
+    probability = 2 * nb_parents / (nb_vertices - 1) if nb_vertices > 1 else 0
+    if probability > 1:
+        msg = "The expected number of parents should be at most "
+        msg += f"{(nb_vertices - 1) / 2} for {nb_vertices} vertices !"
+        raise InvalidNumberOfParents(msg)
+    empty = np.empty(0, dtype=np.int64)
+    if probability <= 0 or nb_pairs == 0:
+        return empty, empty, empty
+
+    total = nb_graphs * nb_pairs
+    expected = total * probability
+    slots = []
+    last = -1
+    while last < total:
+        size = int(expected + 5 * math.sqrt(expected) + 10)
+        gaps = rng.geometric(probability, size=size)
+        chunk = last + np.cumsum(gaps)
+        slots.append(chunk)
+        last = chunk[-1]
+    slots = np.concatenate(slots)
+    slots = slots[slots < total]
+
+    graphs, ranks = np.divmod(slots, nb_pairs)
+    sources, targets = _pairs_from_ranks(ranks, nb_vertices)
+
+    return graphs, sources, targets
+
+
+def _distinct_draws(upper_bounds, nb_draws, rng):
+    """
+    Draws, for each upper bound :math:`t`, :math:`m` distinct integers
+    uniformly between 0 and :math:`t - 1`.
+
+    The integers are drawn with replacement, and the duplicates are drawn
+    again until there are none.
+
+    Parameters
+    ----------
+    upper_bounds : numpy.ndarray
+        The upper bounds :math:`t`, all larger than :math:`m`, of shape (r,).
+    nb_draws : int
+        The number :math:`m` of integers drawn for each upper bound.
+    rng : numpy.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    numpy.ndarray
+        The integers drawn, sorted, of shape (r, m).
+    """
+    bounds = np.broadcast_to(upper_bounds[:, np.newaxis],
+                             (len(upper_bounds), nb_draws))
+    draws = np.floor(rng.random(bounds.shape) * bounds).astype(np.int64)
+
+    while True:
+        draws.sort(axis=1)
+        duplicates = np.zeros(draws.shape, dtype=bool)
+        duplicates[:, 1:] = draws[:, 1:] == draws[:, :-1]
+        if not duplicates.any():
+            return draws
+        draws[duplicates] = np.floor(
+            rng.random(np.count_nonzero(duplicates)) * bounds[duplicates]
+        ).astype(np.int64)
+
+
+def _fixed_in_degree_edges(nb_graphs, nb_vertices, nb_parents, rng):
+    """
+    Draws the edges of DAGs in which the vertex at position :math:`t` has
+    :math:`\\min(d, t)` parents, drawn uniformly among the vertices at the
+    positions before :math:`t`.
+
+    Parameters
+    ----------
+    nb_graphs : int
+        The number of graphs.
+    nb_vertices : int
+        The number of vertices of each graph.
+    nb_parents : int
+        The number :math:`d` of parents of a vertex.
+    rng : numpy.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    tuple
+        The graphs, sources and targets of the edges, as positions in the
+        orderings of the graphs.
+    """
+    nb_parents = min(int(nb_parents), max(nb_vertices - 1, 0))
+    # The first vertices have all the vertices before them as parents
+    first_sources, first_targets = np.triu_indices(nb_parents + 1, k=1)
+    graphs = [np.repeat(np.arange(nb_graphs), len(first_sources))]
+    sources = [np.tile(first_sources, nb_graphs)]
+    targets = [np.tile(first_targets, nb_graphs)]
+
+    if nb_parents > 0 and nb_vertices > nb_parents + 1:
+        positions = np.arange(nb_parents + 1, nb_vertices)
+        upper_bounds = np.tile(positions, nb_graphs)
+        draws = _distinct_draws(upper_bounds, nb_parents, rng)
+        graphs.append(np.repeat(np.arange(nb_graphs),
+                                len(positions) * nb_parents))
+        sources.append(draws.ravel())
+        targets.append(np.repeat(upper_bounds, nb_parents))
+
+    return (np.concatenate(graphs).astype(np.int64),
+            np.concatenate(sources).astype(np.int64),
+            np.concatenate(targets).astype(np.int64))
+
+
+def _scale_free_edges(nb_graphs, nb_vertices, nb_parents, rng):
+    """
+    Draws the edges of scale-free DAGs, by preferential attachment : the
+    vertex at position :math:`t` has :math:`\\min(d, t)` parents, drawn among
+    the vertices before it with probabilities proportional to their numbers
+    of children plus one, as in the model of Barabási and Albert [1]_.
+
+    A vertex is drawn with these probabilities by drawing uniformly either one
+    of the vertices before :math:`t` or one of the sources of the edges
+    already drawn. The positions are processed one after the other, for all
+    the graphs at once.
+
+    Parameters
+    ----------
+    nb_graphs : int
+        The number of graphs.
+    nb_vertices : int
+        The number of vertices of each graph.
+    nb_parents : int
+        The number :math:`d` of parents of a vertex.
+    rng : numpy.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    tuple
+        The graphs, sources and targets of the edges, as positions in the
+        orderings of the graphs.
+
+    Notes
+    -----
+    .. [1] Barabási, A.-L., Albert, R. "Emergence of Scaling in Random
+       Networks". *Science*, 286(5439), pp. 509-512, 1999.
+    """
+    nb_parents = min(int(nb_parents), max(nb_vertices - 1, 0))
+    # As for the fixed in-degree, the first vertices are fully connected
+    first_sources, first_targets = np.triu_indices(nb_parents + 1, k=1)
+    graph_indices = np.arange(nb_graphs)
+    graphs = [np.repeat(graph_indices, len(first_sources))]
+    sources = [np.tile(first_sources, nb_graphs)]
+    targets = [np.tile(first_targets, nb_graphs)]
+
+    nb_edges = nb_parents * max(nb_vertices - nb_parents - 1, 0) + \
+        len(first_sources)
+    edge_sources = np.empty((nb_graphs, nb_edges), dtype=np.int64)
+    edge_sources[:, :len(first_sources)] = first_sources
+    nb_drawn = len(first_sources)
+
+    for position in range(nb_parents + 1, nb_vertices):
+        if nb_parents == 0:
+            break
+        total = position + nb_drawn
+        bounds = np.full((nb_graphs, nb_parents), total)
+        draws = np.floor(rng.random(bounds.shape) * total).astype(np.int64)
+        while True:
+            chosen = np.where(
+                draws < position, draws,
+                edge_sources[graph_indices[:, np.newaxis],
+                             np.clip(draws - position, 0, nb_edges - 1)]
+            )
+            order = np.argsort(chosen, axis=1)
+            draws = np.take_along_axis(draws, order, axis=1)
+            chosen = np.take_along_axis(chosen, order, axis=1)
+            duplicates = np.zeros(chosen.shape, dtype=bool)
+            duplicates[:, 1:] = chosen[:, 1:] == chosen[:, :-1]
+            if not duplicates.any():
+                break
+            draws[duplicates] = np.floor(
+                rng.random(np.count_nonzero(duplicates)) * total
+            ).astype(np.int64)
+        edge_sources[:, nb_drawn:nb_drawn + nb_parents] = chosen
+        nb_drawn += nb_parents
+
+    if nb_vertices > nb_parents + 1 and nb_parents > 0:
+        drawn = edge_sources[:, len(first_sources):]
+        graphs.append(np.repeat(graph_indices, drawn.shape[1]))
+        sources.append(drawn.ravel())
+        targets.append(np.tile(
+            np.repeat(np.arange(nb_parents + 1, nb_vertices), nb_parents),
+            nb_graphs
+        ))
+
+    return (np.concatenate(graphs).astype(np.int64),
+            np.concatenate(sources).astype(np.int64),
+            np.concatenate(targets).astype(np.int64))
+
+
+_models = {
+    'erdos_renyi': _erdos_renyi_edges,
+    'fixed_in_degree': _fixed_in_degree_edges,
+    'scale_free': _scale_free_edges,
+}
+
+
+def _orderings(ordering, nb_graphs, nb_vertices, rng):
+    """
+    Returns the orderings of the vertices of a batch of graphs.
+
+    Parameters
+    ----------
+    ordering : array_like or str or None
+        The vertex at each position of the ordering of all the graphs, 'random'
+        for a different random ordering for each graph, or None for the natural
+        order of the vertices.
+    nb_graphs : int
+        The number of graphs.
+    nb_vertices : int
+        The number of vertices of each graph.
+    rng : numpy.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    numpy.ndarray
+        The vertex at each position of the ordering of each graph, of shape
+        (k, n).
+
+    Raises
+    ------
+    InvalidOrdering
+        If the ordering is not a permutation of the vertices.
+    """
+    if ordering is None:
+        return np.broadcast_to(np.arange(nb_vertices), (nb_graphs, nb_vertices))
+    if isinstance(ordering, str) and ordering == 'random':
+        return rng.permuted(
+            np.broadcast_to(np.arange(nb_vertices), (nb_graphs, nb_vertices)),
+            axis=1
+        )
+
+    ordering = np.asarray(ordering, dtype=np.int64)
+    if ordering.shape != (nb_vertices,) or \
+            not np.array_equal(np.sort(ordering), np.arange(nb_vertices)):
+        msg = "The ordering should be a permutation of the vertices !"
+        raise InvalidOrdering(msg)
+
+    return np.broadcast_to(ordering, (nb_graphs, nb_vertices))
+
+
+def _random_edges(nb_vertices, model, nb_parents, nb_graphs, ordering, rng):
+    """
+    Draws the edges of a batch of random DAGs.
+
+    Parameters
+    ----------
+    nb_vertices : int
+        The number of vertices of each DAG.
+    model : str
+        The random graph model.
+    nb_parents : float
+        The (expected) number of parents of a vertex.
+    nb_graphs : int
+        The number of DAGs.
+    ordering : array_like or str or None
+        The ordering of the vertices (see random_dag_adjacency_matrices).
+    rng : numpy.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    tuple
+        The graphs, sources and targets of the edges, with the sources and
+        targets as vertices, and the orderings of the vertices, of shape
+        (k, n).
+
+    Raises
+    ------
+    GraphModelNotImplemented
+        If the random graph model is not implemented.
+    """
+    if model not in _models:
+        msg = f"The random graph model {model} is not implemented !"
+        raise GraphModelNotImplemented(msg)
+
+    orders = _orderings(ordering, nb_graphs, nb_vertices, rng)
+    graphs, sources, targets = _models[model](nb_graphs, nb_vertices,
+                                              nb_parents, rng)
+
+    return graphs, orders[graphs, sources], orders[graphs, targets], orders
+
+
+def _split_by_graph(graphs, nb_graphs, *arrays):
+    """
+    Splits arrays of edges into the edges of each graph.
+
+    Parameters
+    ----------
+    graphs : numpy.ndarray
+        The graph of each edge.
+    nb_graphs : int
+        The number of graphs.
+    *arrays : numpy.ndarray
+        The arrays of edges to split.
+
+    Returns
+    -------
+    list
+        For each graph, the list of the arrays restricted to its edges.
+    """
+    order = np.argsort(graphs, kind='stable')
+    bounds = np.concatenate(
+        ([0], np.cumsum(np.bincount(graphs, minlength=nb_graphs)))
+    )
+    arrays = [array[order] for array in arrays]
+
+    return [[array[bounds[g]:bounds[g + 1]] for array in arrays]
+            for g in range(nb_graphs)]
+
+
+def _assemble(graphs, sources, targets, values, nb_graphs, nb_vertices,
+              sparse, single):
+    """
+    Assembles the (weighted) adjacency matrices of a batch of graphs from
+    their edges.
+
+    Parameters
+    ----------
+    graphs, sources, targets : numpy.ndarray
+        The graphs, sources and targets of the edges.
+    values : numpy.ndarray
+        The value of each edge.
+    nb_graphs : int
+        The number of graphs.
+    nb_vertices : int
+        The number of vertices of each graph.
+    sparse : bool
+        Whether the matrices are scipy.sparse.csr_matrix.
+    single : bool
+        Whether to return the matrix of the only graph rather than a batch.
+
+    Returns
+    -------
+    numpy.ndarray or scipy.sparse.csr_matrix or list
+        The matrices, as an array of shape (k, n, n) or a list of
+        scipy.sparse.csr_matrix, or the only matrix.
+    """
+    if sparse:
+        from scipy.sparse import csr_matrix
+        matrices = [
+            csr_matrix((graph_values, (graph_sources, graph_targets)),
+                       shape=(nb_vertices, nb_vertices))
+            for graph_sources, graph_targets, graph_values in _split_by_graph(
+                graphs, nb_graphs, sources, targets, values
+            )
+        ]
+        return matrices[0] if single else matrices
+
+    matrices = np.zeros((nb_graphs, nb_vertices, nb_vertices),
+                        dtype=values.dtype)
+    matrices[graphs, sources, targets] = values
+
+    return matrices[0] if single else matrices
+
+
+def _edge_weights(nb_edges, low, high, rng):
+    """
+    Draws edge weights uniformly in :math:`[-h, -l] \\cup [l, h]`.
+
+    Parameters
+    ----------
+    nb_edges : int
+        The number of weights.
+    low, high : float
+        The bounds :math:`l` and :math:`h` of the absolute values.
+    rng : numpy.random.Generator
+        The random number generator.
+
+    Returns
+    -------
+    numpy.ndarray
+        The weights.
+    """
+    signs = np.where(rng.random(nb_edges) < 0.5, -1.0, 1.0)
+
+    return signs * rng.uniform(low, high, size=nb_edges)
+
+
+def random_dag_adjacency_matrices(nb_vertices, model='erdos_renyi',
+                                  nb_parents=1, nb_graphs=None, ordering=None,
+                                  sparse=False, random_state=None):
+    """
+    Draws the adjacency matrices of random DAGs.
+
+    The edges of each DAG go from earlier to later positions of an ordering of
+    its vertices, which is thus a causal order of the DAG. The models are :
+
+    - 'erdos_renyi' : each pair of vertices is an edge, independently, with
+      probability :math:`2 d / (n - 1)`, so that a vertex has :math:`d`
+      parents on average.
+    - 'fixed_in_degree' : the vertex at position :math:`t` has
+      :math:`\\min(d, t)` parents, drawn uniformly among the vertices before
+      it.
+    - 'scale_free' : the vertex at position :math:`t` has
+      :math:`\\min(d, t)` parents, drawn by preferential attachment on the
+      numbers of children, so that the out-degrees follow a power law.
+
+    The edges are drawn for all the DAGs at once, with vectorised operations,
+    and the number of operations is linear in the number of edges, so that
+    sparse DAGs with many vertices can be drawn without building dense
+    matrices.
+
+    Parameters
+    ----------
+    nb_vertices : int
+        The number of vertices :math:`n` of each DAG.
+    model : str, optional
+        The random graph model, 'erdos_renyi', 'fixed_in_degree' or
+        'scale_free' (default is 'erdos_renyi').
+    nb_parents : float, optional
+        The expected number :math:`d` of parents of a vertex for
+        'erdos_renyi', its number of parents (an int) otherwise (default is 1).
+    nb_graphs : int, optional
+        The number of DAGs (default is None, in which case one adjacency matrix
+        is returned, rather than a batch).
+    ordering : array_like or str, optional
+        The vertex at each position of the ordering of all the DAGs, or
+        'random' for a different random ordering for each DAG (default is None,
+        in which case the ordering is the natural order of the vertices and the
+        adjacency matrices are upper triangular).
+    sparse : bool, optional
+        Whether the adjacency matrices are scipy.sparse.csr_matrix (default is
+        False).
+    random_state : int or numpy.random.Generator, optional
+        The seed of the random number generator, or the generator (default is
+        None).
+
+    Returns
+    -------
+    numpy.ndarray or scipy.sparse.csr_matrix or list
+        The adjacency matrix (of 0's and 1's, as bytes), or the batch of
+        adjacency matrices, as an array of shape (k, n, n), or a list of
+        scipy.sparse.csr_matrix if sparse is True.
+
+    Raises
+    ------
+    GraphModelNotImplemented
+        If the random graph model is not implemented.
+    InvalidNumberOfParents
+        If the expected number of parents is larger than :math:`(n - 1) / 2`
+        for 'erdos_renyi'.
+    InvalidOrdering
+        If the ordering is not a permutation of the vertices.
+    """
+    rng = np.random.default_rng(random_state)
+    single = nb_graphs is None
+    nb_graphs = 1 if single else nb_graphs
+
+    graphs, sources, targets, _ = _random_edges(
+        nb_vertices, model, nb_parents, nb_graphs, ordering, rng
+    )
+
+    return _assemble(graphs, sources, targets,
+                     np.ones(len(graphs), dtype=np.uint8),
+                     nb_graphs, nb_vertices, sparse, single)
+
+
+def random_dags(nb_vertices, model='erdos_renyi', nb_parents=1,
+                nb_graphs=None, ordering=None, sparse=False, random_state=None,
+                name=''):
+    """
+    Draws random DAGs (see random_dag_adjacency_matrices).
+
+    The DAGs are acyclic by construction, and are created without validating
+    their adjacency matrices.
+
+    Parameters
+    ----------
+    nb_vertices : int
+        The number of vertices of each DAG.
+    model : str, optional
+        The random graph model (default is 'erdos_renyi').
+    nb_parents : float, optional
+        The (expected) number of parents of a vertex (default is 1).
+    nb_graphs : int, optional
+        The number of DAGs (default is None, in which case one DAG is returned,
+        rather than a list).
+    ordering : array_like or str, optional
+        The ordering of the vertices (default is None).
+    sparse : bool, optional
+        Whether the adjacency matrices are scipy.sparse.csr_matrix (default is
+        False).
+    random_state : int or numpy.random.Generator, optional
+        The seed of the random number generator, or the generator (default is
+        None).
+    name : str, optional
+        The name of the DAGs (default is '').
+
+    Returns
+    -------
+    DirectedAcyclicGraph or list
+        The DAG, or the list of DAGs.
+    """
+    matrices = random_dag_adjacency_matrices(
+        nb_vertices, model=model, nb_parents=nb_parents, nb_graphs=nb_graphs,
+        ordering=ordering, sparse=sparse, random_state=random_state
+    )
+    if nb_graphs is None:
+        return DirectedAcyclicGraph(adjacency_matrix=matrices, name=name,
+                                    validate=False)
+
+    return [DirectedAcyclicGraph(adjacency_matrix=matrix, name=name,
+                                 validate=False) for matrix in matrices]
+
+
+def random_weights(adjacency_matrices, low=0.5, high=2.0, random_state=None):
+    """
+    Draws weights for the edges of graphs, uniformly in
+    :math:`[-h, -l] \\cup [l, h]`.
+
+    Parameters
+    ----------
+    adjacency_matrices : array_like or scipy.sparse matrix or list
+        An adjacency matrix, a batch of adjacency matrices of shape (k, n, n),
+        or a list of scipy.sparse matrices.
+    low : float, optional
+        The smallest absolute value :math:`l` of a weight (default is 0.5).
+    high : float, optional
+        The largest absolute value :math:`h` of a weight (default is 2.0).
+    random_state : int or numpy.random.Generator, optional
+        The seed of the random number generator, or the generator (default is
+        None).
+
+    Returns
+    -------
+    numpy.ndarray or scipy.sparse.csr_matrix or list
+        The weighted adjacency matrices, of floats, in the same layout as the
+        adjacency matrices.
+    """
+    rng = np.random.default_rng(random_state)
+
+    if isinstance(adjacency_matrices, (list, tuple)):
+        return [random_weights(matrix, low=low, high=high, random_state=rng)
+                for matrix in adjacency_matrices]
+    if hasattr(adjacency_matrices, 'tocsr'):
+        weights = adjacency_matrices.tocsr().astype(float)
+        weights.eliminate_zeros()
+        weights.data = _edge_weights(weights.nnz, low, high, rng)
+        return weights
+
+    matrices = np.asarray(adjacency_matrices) != 0
+    weights = np.zeros(matrices.shape)
+    weights[matrices] = _edge_weights(np.count_nonzero(matrices), low, high,
+                                      rng)
+
+    return weights
+
+
+def _centred_noise(family, scale):
+    """
+    Returns the specification of a centred noise distribution of a given
+    standard deviation.
+
+    Parameters
+    ----------
+    family : str
+        The family of the distribution.
+    scale : float
+        The standard deviation of the distribution.
+
+    Returns
+    -------
+    DistributionSpec
+        The specification of the scipy.stats distribution.
+    """
+    scale = float(scale)
+    if family == 'gaussian':
+        return DistributionSpec('norm', args=(), kwds={'scale': scale})
+    if family == 'uniform':
+        width = scale * math.sqrt(12)
+        return DistributionSpec('uniform', args=(),
+                                kwds={'loc': -width / 2, 'scale': width})
+    if family == 'laplace':
+        return DistributionSpec('laplace', args=(),
+                                kwds={'scale': scale / math.sqrt(2)})
+    if family == 'gumbel':
+        beta = scale * math.sqrt(6) / math.pi
+        return DistributionSpec('gumbel_r', args=(),
+                                kwds={'loc': -beta * np.euler_gamma,
+                                      'scale': beta})
+    # Exponential
+    return DistributionSpec('expon', args=(),
+                            kwds={'loc': -scale, 'scale': scale})
+
+
+_noise_families = ('gaussian', 'uniform', 'laplace', 'gumbel', 'exponential')
+
+
+def _frozen_noises(family, scales):
+    """
+    Returns centred frozen noise distributions of a family, of given standard
+    deviations.
+
+    Freezing a scipy.stats distribution creates a new instance of the
+    distribution, whose docstrings are built, which takes about a millisecond.
+    The support of the standard distribution does not depend on the location
+    and scale, so that the frozen distributions are shallow copies of the first
+    one, with their own location and scale, sharing its instance (copying the
+    instance as well is about 30 times slower). The random state of a frozen
+    distribution is stored in the instance : setting the random_state of one
+    of the frozen distributions sets it for all of them.
+
+    Parameters
+    ----------
+    family : str
+        The family of the distributions.
+    scales : array_like
+        The standard deviations of the distributions.
+
+    Returns
+    -------
+    list
+        The frozen scipy.stats distributions.
+    """
+    first = _centred_noise(family, 1.0).freeze()
+    noises = []
+    for scale in scales:
+        noise = copy.copy(first)
+        noise.kwds = dict(_centred_noise(family, scale).kwds)
+        noises.append(noise)
+
+    return noises
+
+
+def random_linear_scms(nb_vertices, model='erdos_renyi', nb_parents=1,
+                       nb_scms=None, ordering=None, low=0.5, high=2.0,
+                       noise='gaussian', noise_scale=1.0, random_state=None,
+                       name=''):
+    """
+    Draws random linear SCMs, whose graphs are random DAGs (see
+    random_dag_adjacency_matrices).
+
+    The coefficients are drawn uniformly in :math:`[-h, -l] \\cup [l, h]`, and
+    the exogenous variables are centred, with a family of distributions and a
+    standard deviation shared by all the variables, or drawn for each variable.
+    The graphs and coefficients of all the SCMs are drawn at once, and the
+    SCMs are created from their declarative representation, in the causal
+    orders given by the orderings, without validating them.
+
+    The frozen distributions of the exogenous variables of all the SCMs share
+    one scipy.stats distribution instance, and hence one random state : the
+    random states should be passed to their rvs method (as generate_data
+    does), rather than set with their random_state attribute, which would
+    reseed all of them.
+
+    Parameters
+    ----------
+    nb_vertices : int
+        The number of variables of each SCM.
+    model : str, optional
+        The random graph model (default is 'erdos_renyi').
+    nb_parents : float, optional
+        The (expected) number of parents of a variable (default is 1).
+    nb_scms : int, optional
+        The number of SCMs (default is None, in which case one SCM is returned,
+        rather than a list).
+    ordering : array_like or str, optional
+        The ordering of the variables (default is None).
+    low : float, optional
+        The smallest absolute value :math:`l` of a coefficient (default is
+        0.5).
+    high : float, optional
+        The largest absolute value :math:`h` of a coefficient (default is 2.0).
+    noise : str, optional
+        The family of the distributions of the exogenous variables, 'gaussian',
+        'uniform', 'laplace', 'gumbel' or 'exponential' (default is
+        'gaussian').
+    noise_scale : float or tuple, optional
+        The standard deviation of the exogenous variables, or the bounds of the
+        uniform distribution from which the standard deviation of each
+        exogenous variable is drawn (default is 1.0).
+    random_state : int or numpy.random.Generator, optional
+        The seed of the random number generator, or the generator (default is
+        None).
+    name : str, optional
+        The name of the SCMs (default is '').
+
+    Returns
+    -------
+    LinearStructuralCausalModel or list
+        The linear SCM, or the list of linear SCMs.
+
+    Raises
+    ------
+    NoiseFamilyNotImplemented
+        If the family of noise distributions is not implemented.
+    """
+    if noise not in _noise_families:
+        msg = f"The family of noise distributions {noise} is not implemented !"
+        raise NoiseFamilyNotImplemented(msg)
+
+    rng = np.random.default_rng(random_state)
+    single = nb_scms is None
+    nb_scms = 1 if single else nb_scms
+
+    graphs, sources, targets, orders = _random_edges(
+        nb_vertices, model, nb_parents, nb_scms, ordering, rng
+    )
+    coefficients = _edge_weights(len(graphs), low, high, rng)
+    positions = np.empty_like(orders)
+    np.put_along_axis(positions, orders,
+                      np.arange(nb_vertices)[np.newaxis, :], axis=1)
+    target_positions = positions[graphs, targets]
+    # The structural equations are in causal order, their parents sorted
+    order = np.lexsort((sources, target_positions, graphs))
+    graphs, sources, target_positions, coefficients = (
+        graphs[order], sources[order], target_positions[order],
+        coefficients[order]
+    )
+
+    if isinstance(noise_scale, (tuple, list)):
+        scales = rng.uniform(noise_scale[0], noise_scale[1],
+                             size=(nb_scms, nb_vertices))
+        exogenous_indices = np.arange(nb_vertices)
+    else:
+        scales = np.full((nb_scms, 1), noise_scale)
+        exogenous_indices = np.zeros(nb_vertices, dtype=np.int64)
+    noises = _frozen_noises(noise, scales.ravel())
+
+    scms = []
+    for g, (graph_sources, graph_positions, graph_coefficients) in enumerate(
+            _split_by_graph(graphs, nb_scms, sources, target_positions,
+                            coefficients)):
+        exogenous_variables = noises[g * scales.shape[1]:
+                                     (g + 1) * scales.shape[1]]
+        causal_order = np.array(orders[g])
+        indptr = np.concatenate(([0], np.cumsum(
+            np.bincount(graph_positions, minlength=nb_vertices)
+        )))
+        scms.append(LinearStructuralCausalModel.from_arrays({
+            'name': name,
+            'nb_var': nb_vertices,
+            'indices_lhs': causal_order,
+            'indptr': indptr,
+            'indices_rhs': graph_sources,
+            'coefficients': graph_coefficients,
+            'exogenous_variables': exogenous_variables,
+            'exogenous_indices': exogenous_indices,
+            'causal_order': causal_order,
+        }))
+
+    return scms[0] if single else scms
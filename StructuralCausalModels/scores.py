@@ -0,0 +1,605 @@
+import math
+
+from collections import OrderedDict
+
+import numpy as np
+
+from StructuralCausalModels.linear_fitting import InsufficientData, \
+    InvalidData, SufficientStatistics
+from StructuralCausalModels.memory import deep_sizeof, total_memory_usage
+
+
+# The default number of local scores kept in the cache of a score
+DEFAULT_CACHE_SIZE = 1 << 16
+
+
+class InvalidCacheSize(Exception):
+    """Raised if the size of a cache of local scores is not a positive integer.
+    """
+    pass
+
+
+class InvalidHyperparameters(Exception):
+    """Raised if the hyperparameters of a score are not valid.
+    """
+    pass
+
+
+class DecomposableScore:
+    """A base class for decomposable scores of DAGs.
+
+    A decomposable score of a DAG given some data is the sum of the local
+    scores of its families, the local score of the family of :math:`X_i` only
+    depending on :math:`X_i` and its parents. The scores are log-scores : the
+    higher the score, the better the DAG fits the data.
+
+    The local scores are computed from the sufficient statistics of the data
+    (see SufficientStatistics), and kept in a cache keyed by the variable and
+    its parent set, which holds at most cache_size local scores : when full,
+    the least recently used local score is evicted. Rescoring a DAG after a
+    change of the parent set of some variables (e.g. the addition, removal or
+    reversal of an edge) only computes the local scores of the families
+    changed.
+
+    Subclasses implement _compute_local_score.
+
+    Parameters
+    ----------
+    data : array_like or SufficientStatistics
+        The samples, with one row per sample and column :math:`i` containing
+        the samples of :math:`X_i` (e.g. the dataframe returned by
+        StructuralCausalModel.generate_data), or their sufficient statistics.
+    cache_size : int, optional
+        The maximum number of local scores kept in the cache (default is
+        DEFAULT_CACHE_SIZE). If None, the cache is unbounded.
+
+    Attributes
+    ----------
+    statistics : SufficientStatistics
+        The sufficient statistics of the data.
+    nb_hits : int
+        The number of local scores found in the cache.
+    nb_misses : int
+        The number of local scores computed.
+
+    Raises
+    ------
+    InvalidCacheSize
+        If cache_size is neither None nor a positive integer.
+    InsufficientData
+        If there are no samples.
+    """
+
+    def __init__(self, data, cache_size=DEFAULT_CACHE_SIZE):
+
+        if cache_size is not None and \
+                (not isinstance(cache_size, (int, np.integer)) or
+                 isinstance(cache_size, bool) or cache_size <= 0):
+            msg = "The cache size must be a positive integer !"
+            raise InvalidCacheSize(msg)
+
+        if isinstance(data, SufficientStatistics):
+            self.statistics = data
+        else:
+            self.statistics = SufficientStatistics.from_data(data)
+        if self.statistics.nb_samples == 0:
+            raise InsufficientData("There are no samples to score from !")
+
+        self.cache_size = cache_size
+        self._local_scores = OrderedDict()
+        self.nb_hits = 0
+        self.nb_misses = 0
+
+    @property
+    def nb_var(self):
+        """int: the number of variables."""
+        return self.statistics.nb_var
+
+    def local_score(self, node, parents):
+        """
+        Returns the local score of a variable given a parent set.
+
+        Parameters
+        ----------
+        node : int
+            The index of the variable.
+        parents : iterable
+            The indices of its parents, in any order.
+
+        Returns
+        -------
+        float
+            The local score.
+        """
+        key = (int(node), tuple(sorted(int(parent) for parent in parents)))
+        local_scores = self._local_scores
+        if key in local_scores:
+            self.nb_hits += 1
+            local_scores.move_to_end(key)
+            return local_scores[key]
+
+        self.nb_misses += 1
+        local_score = self._compute_local_score(*key)
+        local_scores[key] = local_score
+        if self.cache_size is not None and len(local_scores) > self.cache_size:
+            # Evicts the least recently used local score
+            local_scores.popitem(last=False)
+
+        return local_score
+
+    def _compute_local_score(self, node, parents):
+        """
+        Computes the local score of a variable given a parent set.
+
+        Parameters
+        ----------
+        node : int
+            The index of the variable.
+        parents : tuple
+            The indices of its parents, in increasing order.
+
+        Returns
+        -------
+        float
+            The local score.
+        """
+        raise NotImplementedError
+
+    def local_scores(self, dag):
+        """
+        Returns the local scores of the families of a DAG.
+
+        Parameters
+        ----------
+        dag : DirectedAcyclicGraph
+            The DAG, whose vertex :math:`i` is the variable :math:`X_i`.
+
+        Returns
+        -------
+        numpy.ndarray
+            The local score of each variable given its parents in the DAG.
+
+        Raises
+        ------
+        InvalidData
+            If the DAG does not have one vertex per variable.
+        """
+        if dag.nb_vertices != self.nb_var:
+            msg = f"The DAG should have {self.nb_var} vertices, one per "
+            msg += "variable !"
+            raise InvalidData(msg)
+
+        return np.asarray([self.local_score(node, parents)
+                           for node, parents in enumerate(dag.parent_lists())])
+
+    def score(self, dag):
+        """
+        Returns the score of a DAG.
+
+        Parameters
+        ----------
+        dag : DirectedAcyclicGraph
+            The DAG, whose vertex :math:`i` is the variable :math:`X_i`.
+
+        Returns
+        -------
+        float
+            The score of the DAG, i.e. the sum of the local scores of its
+            families.
+
+        Raises
+        ------
+        InvalidData
+            If the DAG does not have one vertex per variable.
+        """
+        return float(self.local_scores(dag).sum())
+
+    def score_difference(self, node, parents, new_parents):
+        """
+        Returns the change of the score of a DAG when the parent set of a
+        variable changes.
+
+        Parameters
+        ----------
+        node : int
+            The index of the variable.
+        parents : iterable
+            The indices of its parents before the change.
+        new_parents : iterable
+            The indices of its parents after the change.
+
+        Returns
+        -------
+        float
+            The score after the change minus the score before the change.
+        """
+        return self.local_score(node, new_parents) - \
+            self.local_score(node, parents)
+
+    def local_score_changes(self, node, parents, candidates):
+        """
+        Returns the changes of the local score of a variable when each
+        candidate is added to its parent set, or removed from it if it is a
+        parent.
+
+        Parameters
+        ----------
+        node : int
+            The index of the variable.
+        parents : iterable
+            The indices of its parents.
+        candidates : array_like
+            The indices of the candidates.
+
+        Returns
+        -------
+        numpy.ndarray
+            The change of the local score for each candidate.
+        """
+        parent_set = frozenset(int(parent) for parent in parents)
+        base = self.local_score(node, parent_set)
+        changes = np.empty(len(candidates))
+        for k, candidate in enumerate(candidates):
+            changes[k] = self.local_score(
+                node, parent_set ^ {int(candidate)}
+            ) - base
+
+        return changes
+
+    def cache_info(self):
+        """
+        Returns the statistics of the cache of local scores.
+
+        Returns
+        -------
+        dict
+            The number of local scores found in the cache ('hits'), computed
+            ('misses'), currently in the cache ('size') and the maximum number
+            of local scores in the cache ('max_size').
+        """
+        return {
+            'hits': self.nb_hits,
+            'misses': self.nb_misses,
+            'size': len(self._local_scores),
+            'max_size': self.cache_size,
+        }
+
+    def clear_cache(self):
+        """
+        Discards the local scores in the cache, and its statistics.
+        """
+        self._local_scores = OrderedDict()
+        self.nb_hits = 0
+        self.nb_misses = 0
+
+    def memory_usage(self):
+        """Returns the number of bytes held by the score.
+
+        Returns
+        -------
+        dict
+            The number of bytes held by the sufficient statistics
+            ('statistics') and by the cache of local scores ('cache'),
+            including the Python object overhead (see deep_sizeof), and their
+            sum ('total').
+        """
+        seen = set()
+        usage = {
+            'statistics': deep_sizeof(self.statistics, seen),
+            'cache': deep_sizeof(self._local_scores, seen),
+        }
+
+        return total_memory_usage(usage)
+
+
+class GaussianBICScore(DecomposableScore):
+    """The Bayesian Information Criterion of linear Gaussian DAG models.
+
+    The local score of :math:`X_i` given its parents :math:`Pa_i` is the
+    maximised log-likelihood of the regression of :math:`X_i` onto
+    :math:`Pa_i`, with an intercept and Gaussian residuals, minus
+    :math:`\\lambda \\frac{|Pa_i| + 2}{2} \\log N` where :math:`N` is the
+    number of samples and :math:`\\lambda` the penalty discount :
+
+    .. math::
+        -\\frac{N}{2} \\left( \\log(2 \\pi \\hat{\\sigma}_i^2) + 1 \\right)
+        - \\lambda \\frac{|Pa_i| + 2}{2} \\log N
+
+    where :math:`\\hat{\\sigma}_i^2` is the maximum likelihood estimate of the
+    variance of the residuals.
+
+    Parameters
+    ----------
+    data : array_like or SufficientStatistics
+        The samples, with one row per sample and column :math:`i` containing
+        the samples of :math:`X_i`, or their sufficient statistics.
+    penalty_discount : float, optional
+        The factor :math:`\\lambda` of the penalty on the number of parameters
+        (default is 1).
+    cache_size : int, optional
+        The maximum number of local scores kept in the cache (default is
+        DEFAULT_CACHE_SIZE). If None, the cache is unbounded.
+
+    Raises
+    ------
+    InvalidHyperparameters
+        If the penalty discount is negative.
+    """
+
+    def __init__(self, data, penalty_discount=1.0,
+                 cache_size=DEFAULT_CACHE_SIZE):
+
+        if penalty_discount < 0:
+            msg = "The penalty discount must be non-negative !"
+            raise InvalidHyperparameters(msg)
+
+        super().__init__(data=data, cache_size=cache_size)
+        self.penalty_discount = penalty_discount
+
+    def _compute_local_score(self, node, parents):
+        """
+        Computes the BIC of a variable given a parent set.
+
+        Parameters
+        ----------
+        node : int
+            The index of the variable.
+        parents : tuple
+            The indices of its parents, in increasing order.
+
+        Returns
+        -------
+        float
+            The local score.
+        """
+        nb_samples = self.statistics.nb_samples
+        _, residual_scatter = self.statistics.regress(node, parents)
+        # A variable determined by its parents has an infinite likelihood :
+        # the variance is floored to keep the score finite
+        variance = max(residual_scatter / nb_samples, np.finfo(float).tiny)
+        log_likelihood = -nb_samples / 2 * (np.log(2 * np.pi * variance) + 1)
+        penalty = self.penalty_discount * (len(parents) + 2) / 2 * \
+            np.log(nb_samples)
+
+        return float(log_likelihood - penalty)
+
+    def local_score_changes(self, node, parents, candidates):
+        """
+        Returns the changes of the local score of a variable when each
+        candidate is added to its parent set, or removed from it if it is a
+        parent.
+
+        The residual sums of squares after the addition of each candidate
+        :math:`c` to the parents :math:`P` follow from the scatter matrix
+        :math:`S_{\\cdot \\cdot | P}` of the residuals of the regressions onto
+        :math:`P` :
+        :math:`RSS_{P \\cup \\{c\\}} = RSS_P - S_{c i | P}^2 / S_{c c | P}`.
+        They are computed for all the candidates at once, and not cached ; the
+        removals go through the cache of local scores.
+
+        Parameters
+        ----------
+        node : int
+            The index of the variable.
+        parents : iterable
+            The indices of its parents.
+        candidates : array_like
+            The indices of the candidates.
+
+        Returns
+        -------
+        numpy.ndarray
+            The change of the local score for each candidate.
+        """
+        parents = sorted(int(parent) for parent in parents)
+        candidates = np.asarray(candidates, dtype=np.intp)
+        is_parent = np.isin(candidates, parents)
+        changes = np.empty(len(candidates))
+        changes[is_parent] = super().local_score_changes(
+            node, parents, candidates[is_parent]
+        )
+
+        additions = candidates[~is_parent]
+        if additions.size == 0:
+            return changes
+        scatter_matrix = self.statistics.scatter_matrix
+        nb_samples = self.statistics.nb_samples
+        _, residual_scatter = self.statistics.regress(node, parents)
+        partial_covariances = scatter_matrix[additions, node]
+        partial_variances = scatter_matrix[additions, additions]
+        if parents:
+            gram = scatter_matrix[np.ix_(parents, parents)]
+            moments = scatter_matrix[
+                np.ix_(parents, np.append(additions, node))
+            ]
+            # The coefficients of the regressions of the candidates and of the
+            # variable onto the parents
+            weights = np.linalg.lstsq(gram, moments, rcond=None)[0]
+            partial_covariances = partial_covariances - \
+                moments[:, :-1].T @ weights[:, -1]
+            partial_variances = partial_variances - \
+                np.einsum('ij,ij->j', moments[:, :-1], weights[:, :-1])
+        # Candidates determined by the parents do not change the residuals
+        tiny = np.finfo(float).tiny
+        is_determined = partial_variances <= \
+            1e-12 * np.maximum(scatter_matrix[additions, additions], tiny)
+        reduction = np.where(
+            is_determined, 0.0,
+            partial_covariances ** 2 / np.where(is_determined, 1.0,
+                                                partial_variances)
+        )
+        new_residual_scatter = np.maximum(residual_scatter - reduction, 0.0)
+        variances = np.maximum(residual_scatter / nb_samples, tiny)
+        new_variances = np.maximum(new_residual_scatter / nb_samples, tiny)
+        changes[~is_parent] = (
+            -nb_samples / 2 * np.log(new_variances / variances) -
+            self.penalty_discount / 2 * np.log(nb_samples)
+        )
+
+        return changes
+
+
+class BGeScore(DecomposableScore):
+    """The Bayesian Gaussian equivalent score of linear Gaussian DAG models.
+
+    The BGe score [1]_ is the log of the marginal likelihood of the data under
+    a normal-Wishart prior on the mean and precision matrix of the variables.
+    Its local score of :math:`X_i` given its parents :math:`Pa_i` is
+    :math:`\\log p(D^{Pa_i \\cup \\{X_i\\}}) - \\log p(D^{Pa_i})`, where the
+    marginal likelihood of the data :math:`D^Y` of a set of :math:`l`
+    variables :math:`Y`, with the corrected degrees of freedom of
+    J. Kuipers, G. Moffa and D. Heckerman [2]_, is
+
+    .. math::
+        \\log p(D^Y) = -\\frac{l N}{2} \\log \\pi
+        + \\frac{l}{2} \\log \\frac{\\alpha_\\mu}{\\alpha_\\mu + N}
+        + \\log \\frac{\\Gamma_l((\\alpha_w - n + l + N) / 2)}
+        {\\Gamma_l((\\alpha_w - n + l) / 2)}
+        + \\frac{\\alpha_w - n + l}{2} \\log |T_{0, YY}|
+        - \\frac{\\alpha_w - n + l + N}{2} \\log |T_{N, YY}|
+
+    where :math:`N` is the number of samples, :math:`n` the number of
+    variables, :math:`\\Gamma_l` the multivariate gamma function,
+    :math:`T_0 = t I` with
+    :math:`t = \\frac{\\alpha_\\mu (\\alpha_w - n - 1)}{\\alpha_\\mu + 1}` the
+    prior scale matrix and
+    :math:`T_N = T_0 + S + \\frac{\\alpha_\\mu N}{\\alpha_\\mu + N}
+    (\\nu - \\bar{x})(\\nu - \\bar{x})^T` the posterior scale matrix,
+    :math:`S` being the scatter matrix of the data, :math:`\\bar{x}` its
+    means and :math:`\\nu` the prior mean. Markov equivalent DAGs have the
+    same BGe score.
+
+    Parameters
+    ----------
+    data : array_like or SufficientStatistics
+        The samples, with one row per sample and column :math:`i` containing
+        the samples of :math:`X_i`, or their sufficient statistics.
+    alpha_mu : float, optional
+        The equivalent sample size of the prior on the mean (default is 1).
+    alpha_w : float, optional
+        The degrees of freedom of the prior on the precision matrix, greater
+        than :math:`n + 1` (default is None, in which case it is
+        :math:`n + \\alpha_\\mu + 1`).
+    prior_mean : array_like, optional
+        The prior mean :math:`\\nu` (default is None, in which case it is 0).
+    cache_size : int, optional
+        The maximum number of local scores kept in the cache (default is
+        DEFAULT_CACHE_SIZE). If None, the cache is unbounded.
+
+    Raises
+    ------
+    InvalidHyperparameters
+        If alpha_mu is not positive, if alpha_w is not greater than
+        :math:`n + 1` or if the prior mean does not have one entry per
+        variable.
+
+    Notes
+    -----
+    .. [1] Geiger, D. and Heckerman, D. "Parameter priors for directed acyclic
+       graphical models and the characterization of several probability
+       distributions". *The Annals of Statistics*, volume 30, number 5,
+       pp. 1412-1440, 2002.
+    .. [2] Kuipers, J., Moffa, G. and Heckerman, D. "Addendum on the scoring of
+       Gaussian directed acyclic graphical models". *The Annals of
+       Statistics*, volume 42, number 4, pp. 1689-1691, 2014.
+    """
+
+    def __init__(self, data, alpha_mu=1.0, alpha_w=None, prior_mean=None,
+                 cache_size=DEFAULT_CACHE_SIZE):
+
+        super().__init__(data=data, cache_size=cache_size)
+
+        nb_var = self.nb_var
+        if alpha_w is None:
+            alpha_w = nb_var + alpha_mu + 1
+        if alpha_mu <= 0:
+            raise InvalidHyperparameters("alpha_mu must be positive !")
+        if alpha_w <= nb_var + 1:
+            msg = f"alpha_w must be greater than {nb_var + 1} !"
+            raise InvalidHyperparameters(msg)
+        if prior_mean is None:
+            prior_mean = np.zeros(nb_var)
+        prior_mean = np.asarray(prior_mean, dtype=float)
+        if prior_mean.shape != (nb_var, ):
+            msg = f"The prior mean should have {nb_var} entries, one per "
+            msg += "variable !"
+            raise InvalidHyperparameters(msg)
+
+        self.alpha_mu = alpha_mu
+        self.alpha_w = alpha_w
+        self.prior_mean = prior_mean
+
+        statistics = self.statistics
+        nb_samples = statistics.nb_samples
+        self._prior_scale = alpha_mu * (alpha_w - nb_var - 1) / (alpha_mu + 1)
+        deviation = prior_mean - statistics.means
+        self._posterior_scale_matrix = (
+            self._prior_scale * np.identity(nb_var) +
+            statistics.scatter_matrix +
+            alpha_mu * nb_samples / (alpha_mu + nb_samples) *
+            np.outer(deviation, deviation)
+        )
+
+    def _log_marginal_likelihood(self, variables):
+        """
+        Computes the log of the marginal likelihood of the data of a set of
+        variables.
+
+        Parameters
+        ----------
+        variables : list
+            The indices of the variables.
+
+        Returns
+        -------
+        float
+            The log of the marginal likelihood.
+        """
+        nb_variables = len(variables)
+        if nb_variables == 0:
+            return 0.0
+
+        nb_samples = self.statistics.nb_samples
+        dof = self.alpha_w - self.nb_var + nb_variables
+        posterior_scale_matrix = self._posterior_scale_matrix[
+            np.ix_(variables, variables)
+        ]
+        # The posterior scale matrix is positive definite
+        cholesky_factor = np.linalg.cholesky(posterior_scale_matrix)
+        log_det_posterior = 2 * np.log(np.diag(cholesky_factor)).sum()
+        # log(Gamma_l((dof + N) / 2) / Gamma_l(dof / 2)), the factors
+        # pi^(l (l - 1) / 4) cancelling out
+        log_gamma_ratio = sum(
+            math.lgamma((dof + nb_samples - j) / 2) - math.lgamma((dof - j) / 2)
+            for j in range(nb_variables)
+        )
+
+        return (
+            -nb_variables * nb_samples / 2 * np.log(np.pi) +
+            nb_variables / 2 * np.log(self.alpha_mu /
+                                      (self.alpha_mu + nb_samples)) +
+            log_gamma_ratio +
+            dof / 2 * nb_variables * np.log(self._prior_scale) -
+            (dof + nb_samples) / 2 * log_det_posterior
+        )
+
+    def _compute_local_score(self, node, parents):
+        """
+        Computes the BGe score of a variable given a parent set.
+
+        Parameters
+        ----------
+        node : int
+            The index of the variable.
+        parents : tuple
+            The indices of its parents, in increasing order.
+
+        Returns
+        -------
+        float
+            The local score.
+        """
+        parents = list(parents)
+
+        return float(self._log_marginal_likelihood(parents + [node]) -
+                     self._log_marginal_likelihood(parents))
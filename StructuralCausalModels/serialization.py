@@ -0,0 +1,190 @@
+import importlib
+import sys
+
+from collections import namedtuple
+
+
+class UnregisteredFunction(Exception):
+    """Raised if a function reference does not correspond to a registered
+    function.
+    """
+    pass
+
+
+_registered_functions = dict()
+_registered_names = dict()
+
+
+def register_function(function=None, name=None):
+    """Registers a function so that it is pickled by reference.
+
+    Closures and lambda functions cannot be pickled. Once registered, a
+    function is pickled, as the function of a StructuralEquation, as a
+    FunctionReference ; it must be registered under the same name, at the
+    import of the same module, in the process which unpickles it.
+
+    Can be used as a decorator, with or without arguments.
+
+    Parameters
+    ----------
+    function : callable, optional
+        The function to register (default is None, in which case a decorator
+        is returned).
+    name : str, optional
+        The name under which to register the function (default is None, in
+        which case the qualified name of the function is used).
+
+    Returns
+    -------
+    callable
+        The function registered, or a decorator registering a function.
+    """
+
+    def decorator(func):
+        func_name = name if name is not None else (
+            f"{func.__module__}.{func.__qualname__}"
+        )
+        _registered_functions[func_name] = func
+        _registered_names[func] = FunctionReference(module=func.__module__,
+                                                    name=func_name)
+        return func
+
+    if function is None:
+        return decorator
+
+    return decorator(function)
+
+
+class FunctionReference(namedtuple('FunctionReference', ['module', 'name'])):
+    """A picklable reference to a registered function.
+
+    Parameters
+    ----------
+    module : str
+        The name of the module in which the function is registered.
+    name : str
+        The name under which the function is registered.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def from_function(function):
+        """Returns the reference to a function, if it is registered.
+
+        Parameters
+        ----------
+        function : callable
+            The function.
+
+        Returns
+        -------
+        FunctionReference or None
+            The reference to the function, or None if the function is not
+            registered.
+        """
+        try:
+            return _registered_names.get(function)
+        except TypeError:
+            # Unhashable callable
+            return None
+
+    def resolve(self):
+        """Returns the function referred to.
+
+        Returns
+        -------
+        callable
+            The function.
+
+        Raises
+        ------
+        UnregisteredFunction
+            If no function is registered under the name of the reference.
+        """
+        if self.name not in _registered_functions:
+            importlib.import_module(self.module)
+        if self.name not in _registered_functions:
+            msg = f"No function registered under the name '{self.name}' !"
+            raise UnregisteredFunction(msg)
+
+        return _registered_functions[self.name]
+
+
+class DistributionSpec(namedtuple('DistributionSpec',
+                                  ['name', 'args', 'kwds'])):
+    """A compact, declarative representation of a scipy.stats distribution.
+
+    Pickling a frozen scipy.stats distribution pickles the whole distribution
+    object, which takes several kilobytes ; a DistributionSpec only holds the
+    name of the distribution and its parameters.
+
+    Parameters
+    ----------
+    name : str
+        The name of the distribution in scipy.stats (e.g. 'norm'), or
+        'rv_discrete' for a discrete distribution defined by its values and
+        probabilities.
+    args : tuple
+        The positional parameters of the distribution.
+    kwds : dict
+        The keyword parameters of the distribution.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def from_exogenous_variable(exogenous_variable):
+        """Returns the specification of an exogenous variable, if possible.
+
+        Parameters
+        ----------
+        exogenous_variable : object
+            The exogenous variable.
+
+        Returns
+        -------
+        DistributionSpec or None
+            The specification of the exogenous variable, or None if it is
+            neither a frozen scipy.stats distribution nor a scipy.stats
+            rv_discrete defined by its values and probabilities.
+        """
+        # A scipy.stats distribution can only have been created if scipy.stats
+        # is already imported
+        stats = sys.modules.get('scipy.stats')
+        if stats is None:
+            return None
+
+        if (isinstance(exogenous_variable, stats.rv_discrete) and
+                hasattr(exogenous_variable, 'xk')):
+            values = (exogenous_variable.xk, exogenous_variable.pk)
+            return DistributionSpec(name='rv_discrete',
+                                    args=(),
+                                    kwds={'values': values})
+
+        distribution = getattr(exogenous_variable, 'dist', None)
+        name = getattr(distribution, 'name', None)
+        public_distribution = getattr(stats, str(name), None)
+        if (distribution is None or
+                type(public_distribution) is not type(distribution)):
+            return None
+
+        return DistributionSpec(name=name,
+                                args=tuple(exogenous_variable.args),
+                                kwds=dict(exogenous_variable.kwds))
+
+    def freeze(self):
+        """Returns the distribution specified.
+
+        Returns
+        -------
+        object
+            The frozen scipy.stats distribution (or the scipy.stats
+            rv_discrete) specified.
+        """
+        import scipy.stats
+
+        if self.name == 'rv_discrete':
+            return scipy.stats.rv_discrete(*self.args, **self.kwds)
+
+        return getattr(scipy.stats, self.name)(*self.args, **self.kwds)
@@ -1,8 +1,14 @@
-import copy
+import asyncio
+import functools
+import sys
+
 import numpy as np
-import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
 
 from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.memory import deep_sizeof, total_memory_usage
+from StructuralCausalModels.noise_sampling import NoiseSamplingPlan
 
 
 class InconsistentStructuralCausalModelDefinition(Exception):
@@ -23,6 +29,84 @@ class InvalidIntervention(Exception):
     pass
 
 
+class InvalidExecutor(Exception):
+    """Raised if the executor requested to generate samples is not supported.
+    """
+    pass
+
+
+class ConflictingSamplingArguments(Exception):
+    """Raised if both the samples of the exogenous variables and the seed to
+    draw them are provided.
+    """
+    pass
+
+
+def _spawn_seeds(random_state, nb_streams):
+    """Spawns the seeds of independent random number generators.
+
+    Parameters
+    ----------
+    random_state : int or numpy.random.Generator or None
+        The seed, or a generator from which the root seed is drawn (which
+        advances its state).
+    nb_streams : int
+        The number of random number generators.
+
+    Returns
+    -------
+    list
+        The numpy.random.SeedSequence's of the random number generators.
+    """
+    if isinstance(random_state, np.random.Generator):
+        random_state = int(random_state.integers(2 ** 63))
+
+    return np.random.SeedSequence(random_state).spawn(nb_streams)
+
+
+class _ColumnOverlay:
+    """Column-wise access to samples in which some columns are overridden.
+
+    Reading a column which has not been overridden returns the column of the
+    underlying samples, without copying the other columns ; writing a column
+    overrides it without modifying the underlying samples.
+
+    Parameters
+    ----------
+    base : pandas.DataFrame or numpy.ndarray
+        The underlying samples, column :math:`i` containing the samples of
+        :math:`X_i`.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.shape = base.shape
+        self.overrides = dict()
+        # A dataframe can only have been created if pandas is already imported
+        pandas = sys.modules.get('pandas')
+        self.is_data_frame = (pandas is not None and
+                              isinstance(base, pandas.DataFrame))
+
+    def _column(self, i):
+        if i in self.overrides:
+            return self.overrides[i]
+        if self.is_data_frame:
+            return self.base[i].to_numpy()
+        return self.base[:, i]
+
+    def __getitem__(self, key):
+        rows, columns = key
+        if np.ndim(columns) == 0:
+            return self._column(columns)[rows]
+        return np.column_stack([self._column(i)[rows] for i in columns])
+
+    def __setitem__(self, key, value):
+        rows, column = key
+        if column not in self.overrides:
+            self.overrides[column] = np.empty(self.shape[0])
+        self.overrides[column][rows] = value
+
+
 # TODO allow cycles in init yes/no ?
 # TODO add string representation of Structural Causal Model
 class StructuralCausalModel:
@@ -57,20 +141,188 @@ class StructuralCausalModel:
             msg += 'variables in the SCM !'
             raise InconsistentStructuralCausalModelDefinition(msg)
 
+        self._initialise_attributes(nb_var=nb_var,
+                                    structural_equations=structural_equations,
+                                    name=name)
+
+        # Checks whether the SCM defined may be cyclic
+        self.check_no_cycles()
+
+    def __getstate__(self):
+        """
+        Returns the state of the object to pickle.
+
+        The cached adjacency matrix and noise sampling plan are not pickled, as
+        they are cheap to recompute from the structural equations but may be
+        large.
+
+        Returns
+        -------
+        dict
+            The state of the object.
+        """
+        state = dict(self.__dict__)
+        state['_adjacency_matrix'] = None
+        state['_noise_sampling_plan'] = None
+
+        return state
+
+    @classmethod
+    def _create_without_validation(cls, nb_var, structural_equations, name='',
+                                   causal_order=None):
+        """Creates an SCM without checking that it is consistent and acyclic.
+
+        Only meant to rebuild SCMs which are known to be valid.
+
+        Parameters
+        ----------
+        nb_var : int
+            The number of variables in the SCM.
+        structural_equations : list
+            The list of the structural equations defining the SCM.
+        name : str, optional
+            The name of the SCM (default is '').
+        causal_order : list, optional
+            A causal order of the DAG associated to the SCM, if known (default
+            is None).
+
+        Returns
+        -------
+        StructuralCausalModel
+            The SCM.
+        """
+        scm = cls.__new__(cls)
+        scm._initialise_attributes(nb_var=nb_var,
+                                   structural_equations=structural_equations,
+                                   name=name)
+        if causal_order is not None:
+            scm._causal_order = list(causal_order)
+
+        return scm
+
+    def _initialise_attributes(self, nb_var, structural_equations, name):
+        """Sets the attributes of the SCM, with empty caches.
+
+        Parameters
+        ----------
+        nb_var : int
+            The number of variables in the SCM.
+        structural_equations : list
+            The list of the structural equations defining the SCM.
+        name : str
+            The name of the SCM.
+        """
         self.name = name
         self.nb_var = nb_var
+        # Also creates the (empty) caches
         self.structural_equations = structural_equations
 
-        # Checks whether the SCM defined may be cyclic
-        self.check_no_cycles()
+    @property
+    def structural_equations(self):
+        """list: the structural equations defining the SCM.
+
+        Assigning new structural equations clears the structure cached from the
+        previous ones (adjacency matrix, causal order etc.). The list must not
+        be modified in place : the caches would then be stale.
+        """
+        return self._structural_equations
+
+    @structural_equations.setter
+    def structural_equations(self, new_structural_equations):
+        self._structural_equations = new_structural_equations
+        self._clear_caches()
+
+    def _clear_caches(self):
+        """Clears the structure derived from the structural equations.
+        """
+        # Structure derived from the structural equations. It is computed
+        # lazily and shared, as far as possible, with the SCMs obtained by
+        # intervention on this one.
+        self._adjacency_matrix = None
+        self._equation_positions = None
+        self._causal_order = None
+        self._topological_generations = None
+        self._noise_sampling_plan = None
+
+    def generate_noise(self, nb_samples, random_state=None, profiler=None):
+        """Draws samples from the exogenous variables of the SCM.
+
+        The exogenous variables which are frozen scipy.stats distributions of
+        the same family are sampled together, in a single vectorised call (see
+        NoiseSamplingPlan).
+
+        Parameters
+        ----------
+        nb_samples : int
+            The number of samples to draw.
+        random_state : int or numpy.random.Generator, optional
+            The seed or random number generator to use (default is None).
+        profiler : SamplingProfiler, optional
+            The profiler recording the time spent drawing the samples of each
+            exogenous variable (default is None).
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of shape (nb_samples, nb_var) whose column :math:`i`
+            contains the samples of the exogenous variable of the structural
+            equation which has :math:`X_i` on its left-hand side.
+        """
+
+        if self._noise_sampling_plan is None:
+            self._noise_sampling_plan = NoiseSamplingPlan(
+                self.structural_equations
+            )
 
-    def generate_data(self, nb_samples):
+        return self._noise_sampling_plan.draw(nb_samples=nb_samples,
+                                              nb_var=self.nb_var,
+                                              random_state=random_state,
+                                              profiler=profiler)
+
+    def generate_data(self, nb_samples, noise=None, random_state=None,
+                      executor=None, nb_workers=None, profiler=None):
         """Generates samples from an SCM.
 
+        By default, the structural equations are evaluated one at a time, in a
+        causal order. If an executor is provided, the structural equations of
+        each topological generation (see compute_topological_generations) are
+        evaluated concurrently : each of them writes the samples of its
+        left-hand side variable into its own column of a shared array. In that
+        case, the samples of each exogenous variable are drawn, within the
+        workers, from a random number generator of its own, spawned from
+        random_state ; the samples are then reproducible whatever the number of
+        workers, but differ from the samples generated sequentially from the
+        same random_state.
+
         Parameters
         ----------
         nb_samples : int
             The number of samples to generate.
+        noise : numpy.ndarray, optional
+            The samples of the exogenous variables to use, in the format
+            returned by generate_noise (default is None, in which case they are
+            drawn from the exogenous variables of the SCM).
+        random_state : int or numpy.random.Generator, optional
+            The seed, or the random number generator, to use to draw the
+            samples of the exogenous variables (default is None). If an
+            executor is provided, the generators of the exogenous variables are
+            spawned from a seed drawn from the generator. It may not be
+            provided along with noise.
+        executor : str or concurrent.futures.ThreadPoolExecutor, optional
+            The executor used to evaluate the structural equations of a
+            topological generation concurrently : either 'threads', in which
+            case a thread pool is created for the duration of the call, or an
+            existing thread pool (default is None, in which case the structural
+            equations are evaluated sequentially). The workers write into a
+            shared array, hence process pools are not supported.
+        nb_workers : int, optional
+            The number of worker threads when executor is 'threads' (default is
+            None, in which case the default of ThreadPoolExecutor is used).
+        profiler : SamplingProfiler, optional
+            The profiler recording, for each structural equation, the time
+            spent drawing the samples of its exogenous variable, computing it
+            and writing its samples, as well as the time spent building the
+            dataframe (default is None, in which case nothing is timed).
 
         Returns
         -------
@@ -80,64 +332,668 @@ class StructuralCausalModel:
             The column names correspond to the variables in the SCM. Thus column
             0 contains the samples for :math:`X_0`, column 1 the samples for
             :math:`X_1` etc.
+
+        Raises
+        ------
+        InvalidExecutor
+            If executor is neither 'threads' nor a
+            concurrent.futures.ThreadPoolExecutor.
+        ConflictingSamplingArguments
+            If both noise and random_state are provided.
         """
 
-        index = range(nb_samples)
+        if noise is not None and random_state is not None:
+            msg = 'The samples of the exogenous variables are provided : no '
+            msg += 'random state should be provided to draw them !'
+            raise ConflictingSamplingArguments(msg)
+
+        if executor is None:
+            if noise is None:
+                noise = self.generate_noise(nb_samples,
+                                            random_state=random_state,
+                                            profiler=profiler)
+            values = self._generate_values(noise, profiler=profiler)
+        elif executor == 'threads':
+            with ThreadPoolExecutor(max_workers=nb_workers) as thread_pool:
+                values = self._generate_values_concurrently(
+                    nb_samples, noise, random_state, thread_pool,
+                    profiler=profiler
+                )
+        elif isinstance(executor, ThreadPoolExecutor):
+            values = self._generate_values_concurrently(
+                nb_samples, noise, random_state, executor, profiler=profiler
+            )
+        else:
+            msg = "The executor must be either 'threads' or a "
+            msg += "concurrent.futures.ThreadPoolExecutor !"
+            raise InvalidExecutor(msg)
+
+        import pandas as pd
+
+        if profiler is not None:
+            start = profiler.clock()
+        index = range(values.shape[0])
         columns = [i for i in range(self.nb_var)]
         data = pd.DataFrame(
-            np.empty((nb_samples, self.nb_var,)),
+            values,
             index=index,
             columns=columns
         )
-        data.values[:] = np.nan
+        if profiler is not None:
+            profiler.record_dataframe(profiler.clock() - start)
+
+        return data
+
+    async def iterate_data_async(self, nb_samples, chunk_size=10000,
+                                 random_state=None, executor=None,
+                                 semaphore=None):
+        """Generates samples from an SCM asynchronously, chunk by chunk.
+
+        Each chunk of samples is generated by generate_data in an executor, so
+        that the event loop is never blocked. The chunks are only generated as
+        they are consumed, which provides backpressure ; cancelling the
+        consumer stops the generation after the chunk being generated. A
+        semaphore shared by several sampling requests limits the number of
+        chunks generated at the same time ; as it is only held for the duration
+        of a chunk, concurrent requests take turns instead of starving each
+        other.
+
+        Parameters
+        ----------
+        nb_samples : int
+            The number of samples to generate.
+        chunk_size : int, optional
+            The maximum number of samples in a chunk (default is 10000).
+        random_state : int or numpy.random.Generator, optional
+            The seed, or the random number generator, to use to draw the
+            samples of the exogenous variables (default is None). Each chunk
+            uses its own random number generator, spawned from random_state
+            (from a seed drawn from it if it is a generator).
+        executor : concurrent.futures.Executor, optional
+            The executor in which the chunks are generated (default is None, in
+            which case the default executor of the event loop is used).
+        semaphore : asyncio.Semaphore, optional
+            A semaphore to acquire while generating a chunk (default is None).
+
+        Yields
+        ------
+        pandas.DataFrame
+            A dataframe containing a chunk of samples, in the format returned by
+            generate_data and indexed by the sample numbers.
+        """
+
+        loop = asyncio.get_running_loop()
+        chunk_starts = range(0, nb_samples, chunk_size)
+        seeds = _spawn_seeds(random_state, len(chunk_starts))
+
+        for start, seed in zip(chunk_starts, seeds):
+
+            size = min(chunk_size, nb_samples - start)
+            generate_chunk = functools.partial(
+                self.generate_data,
+                size,
+                random_state=np.random.default_rng(seed)
+            )
+            if semaphore is None:
+                chunk = await loop.run_in_executor(executor, generate_chunk)
+            else:
+                async with semaphore:
+                    chunk = await loop.run_in_executor(executor,
+                                                       generate_chunk)
+            chunk.index = range(start, start + size)
+
+            yield chunk
+
+    async def generate_data_async(self, nb_samples, chunk_size=10000,
+                                  random_state=None, executor=None,
+                                  semaphore=None):
+        """Generates samples from an SCM asynchronously.
+
+        The samples are generated chunk by chunk, without blocking the event
+        loop (see iterate_data_async).
+
+        Parameters
+        ----------
+        nb_samples : int
+            The number of samples to generate.
+        chunk_size : int, optional
+            The maximum number of samples in a chunk (default is 10000).
+        random_state : int or numpy.random.Generator, optional
+            The seed, or the random number generator, to use to draw the
+            samples of the exogenous variables (default is None, see
+            iterate_data_async).
+        executor : concurrent.futures.Executor, optional
+            The executor in which the chunks are generated (default is None, in
+            which case the default executor of the event loop is used).
+        semaphore : asyncio.Semaphore, optional
+            A semaphore to acquire while generating a chunk (default is None).
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe containing the samples, in the format returned by
+            generate_data.
+        """
+
+        chunks = []
+        async for chunk in self.iterate_data_async(nb_samples,
+                                                   chunk_size=chunk_size,
+                                                   random_state=random_state,
+                                                   executor=executor,
+                                                   semaphore=semaphore):
+            chunks.append(chunk)
+
+        if not chunks:
+            return self.generate_data(0)
+
+        import pandas as pd
+
+        return pd.concat(chunks)
+
+    def _generate_values(self, noise, profiler=None):
+        """Generates samples from an SCM, given samples of the exogenous
+        variables.
+
+        Parameters
+        ----------
+        noise : numpy.ndarray
+            The samples of the exogenous variables, in the format returned by
+            generate_noise.
+        profiler : SamplingProfiler, optional
+            The profiler recording the time spent computing each structural
+            equation and writing its samples (default is None).
+
+        Returns
+        -------
+        numpy.ndarray
+            An array whose column :math:`i` contains the samples of :math:`X_i`.
+        """
+
+        # Column-major storage, so that the columns of the variables are
+        # contiguous in memory
+        values = np.full((noise.shape[0], self.nb_var), np.nan, order='F')
 
         ordered_structural_equations = self.order_structural_equations()
+        if profiler is None:
+            for structural_equation in ordered_structural_equations:
+                i = structural_equation.index_lhs
+                values[:, i] = structural_equation.compute(values, noise[:, i])
+            return values
+
         for structural_equation in ordered_structural_equations:
-            data = structural_equation.generate_data(data)
+            u = noise[:, structural_equation.index_lhs]
+            self._compute_profiled(structural_equation, values, u, profiler)
+
+        return values
+
+    @staticmethod
+    def _compute_profiled(structural_equation, values, noise, profiler):
+        """Computes a structural equation and writes its samples, recording the
+        time spent on each step.
+
+        Parameters
+        ----------
+        structural_equation : StructuralEquation
+            The structural equation.
+        values : numpy.ndarray
+            The array of samples of the structural variables.
+        noise : numpy.ndarray
+            The samples of the exogenous variable of the structural equation.
+        profiler : SamplingProfiler
+            The profiler.
+        """
+        i = structural_equation.index_lhs
+        start = profiler.clock()
+        result = structural_equation.compute(values, noise)
+        computed = profiler.clock()
+        values[:, i] = result
+        written = profiler.clock()
+        profiler.record(i, 'function', computed - start,
+                        getattr(result, 'nbytes', 0))
+        profiler.record(i, 'write', written - computed)
+
+    def _generate_values_concurrently(self, nb_samples, noise, random_state,
+                                      executor, profiler=None):
+        """Generates samples from an SCM, evaluating the structural equations of
+        each topological generation concurrently.
+
+        Parameters
+        ----------
+        nb_samples : int
+            The number of samples to generate.
+        noise : numpy.ndarray or None
+            The samples of the exogenous variables, in the format returned by
+            generate_noise, or None to draw them within the workers.
+        random_state : int or numpy.random.Generator or None
+            The seed, or the generator, from which the random number generators
+            of the exogenous variables are spawned.
+        executor : concurrent.futures.ThreadPoolExecutor
+            The thread pool.
+        profiler : SamplingProfiler, optional
+            The profiler recording the time spent drawing the samples of each
+            exogenous variable, computing each structural equation and writing
+            its samples (default is None).
+
+        Returns
+        -------
+        numpy.ndarray
+            An array whose column :math:`i` contains the samples of :math:`X_i`.
+        """
+
+        if noise is not None:
+            nb_samples = noise.shape[0]
+        else:
+            # One independent stream per variable, so that the samples do not
+            # depend on which worker evaluates which structural equation
+            seeds = _spawn_seeds(random_state, self.nb_var)
+
+        values = np.full((nb_samples, self.nb_var), np.nan, order='F')
+
+        def evaluate(structural_equation):
+            i = structural_equation.index_lhs
+            if noise is None:
+                if profiler is not None:
+                    start = profiler.clock()
+                u = structural_equation.generate_noise(
+                    nb_samples, random_state=np.random.default_rng(seeds[i])
+                )
+                if profiler is not None:
+                    profiler.record(i, 'noise', profiler.clock() - start,
+                                    getattr(u, 'nbytes', 0))
+            else:
+                u = noise[:, i]
+            if profiler is None:
+                values[:, i] = structural_equation.compute(values, u)
+            else:
+                self._compute_profiled(structural_equation, values, u,
+                                       profiler)
+
+        positions = self.structural_equation_positions()
+        for generation in self.compute_topological_generations():
+            structural_equations = [self.structural_equations[positions[i]]
+                                    for i in generation]
+            # Consuming the results re-raises the exceptions of the workers
+            list(executor.map(evaluate, structural_equations))
+
+        return values
+
+    def generate_intervention_sweep(self, new_structural_equations,
+                                    nb_samples, noise=None, as_array=False):
+        """Generates samples from many post-intervention SCMs at once.
+
+        All the post-intervention SCMs share the same samples of the exogenous
+        variables (common random numbers). The observational samples are
+        generated once ; then, for each intervention, only the target node and
+        its descendants are re-generated, the other variables being unaffected
+        by the intervention.
+
+        The samples of the exogenous variable of the target node are re-used if
+        the new structural equation has the same exogenous variable as the
+        structural equation it replaces ; otherwise they are drawn from the
+        exogenous variable of the new structural equation.
+
+        Parameters
+        ----------
+        new_structural_equations : list
+            The new structural equations, one per intervention.
+        nb_samples : int
+            The number of samples to generate for each intervention.
+        noise : numpy.ndarray, optional
+            The samples of the exogenous variables to use, in the format
+            returned by generate_noise (default is None, in which case they are
+            drawn from the exogenous variables of the SCM).
+        as_array : bool, optional
+            Whether to return the samples as an array rather than as a
+            dataframe (default is False).
+
+        Returns
+        -------
+        pandas.DataFrame or numpy.ndarray
+            If as_array is False, a dataframe indexed by a MultiIndex whose
+            levels are the position of the intervention in
+            new_structural_equations and the sample number ; the columns
+            correspond to the variables in the SCM. Otherwise, an array of
+            shape (len(new_structural_equations), nb_samples, nb_var).
+
+        Raises
+        ------
+        InvalidIntervention
+            If one of the interventions is invalid.
+        CyclicityWarning
+            If one of the post-intervention SCMs is (highly likely to be)
+            cyclic.
+        """
+
+        for new_structural_equation in new_structural_equations:
+            self._validate_intervention(new_structural_equation)
+
+        if noise is None:
+            noise = self.generate_noise(nb_samples)
+        observational_values = self._generate_values(noise)
+
+        nb_interventions = len(new_structural_equations)
+        values = np.empty((nb_interventions,) + observational_values.shape)
+        values[:] = observational_values
+
+        ordered_descendants = dict()
+        for k, new_structural_equation in enumerate(new_structural_equations):
+            target_node = new_structural_equation.index_lhs
+            if target_node not in ordered_descendants:
+                ordered_descendants[target_node] = \
+                    self._order_descendant_equations(target_node)
+            self._resample_descendants(
+                values=values[k],
+                noise=noise,
+                new_structural_equation=new_structural_equation,
+                ordered_descendant_equations=ordered_descendants[target_node]
+            )
+
+        if as_array:
+            return values
+
+        import pandas as pd
+
+        index = pd.MultiIndex.from_product(
+            [range(nb_interventions), range(noise.shape[0])],
+            names=['intervention', 'sample']
+        )
+        columns = [i for i in range(self.nb_var)]
+        data = pd.DataFrame(
+            values.reshape((-1, self.nb_var)),
+            index=index,
+            columns=columns
+        )
 
         return data
 
+    def resample_after_intervention(self, data, noise,
+                                    new_structural_equation, inplace=False):
+        """Generates the post-intervention samples matching existing samples.
+
+        Given samples from the SCM and the samples of the exogenous variables
+        used to generate them, re-generates the samples of the target of the
+        intervention and of its descendants, in a causal order, re-using the
+        samples of the exogenous variables. The other variables are not
+        affected by the intervention : their samples are neither re-generated
+        nor copied, so that the cost is proportional to the size of the
+        subgraph made of the target node and its descendants.
+
+        The samples of the exogenous variable of the target node are re-used if
+        the new structural equation has the same exogenous variable as the
+        structural equation it replaces ; otherwise they are drawn from the
+        exogenous variable of the new structural equation.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            The samples from the SCM, in the format returned by generate_data.
+        noise : numpy.ndarray
+            The samples of the exogenous variables used to generate data, in
+            the format returned by generate_noise.
+        new_structural_equation : StructuralEquation
+            The new structural equation.
+        inplace : bool, optional
+            Whether to overwrite the re-generated columns of data (default is
+            False).
+
+        Returns
+        -------
+        pandas.DataFrame
+            If inplace is False, a dataframe containing the re-generated samples
+            only, i.e. the samples of the target node and of its descendants ;
+            otherwise, data.
+
+        Raises
+        ------
+        InvalidIntervention
+            If the intervention is invalid.
+        CyclicityWarning
+            If the post-intervention SCM is (highly likely to be) cyclic.
+        """
+
+        self._validate_intervention(new_structural_equation)
+
+        values = _ColumnOverlay(data)
+        self._resample_descendants(
+            values=values,
+            noise=np.asarray(noise),
+            new_structural_equation=new_structural_equation,
+            ordered_descendant_equations=self._order_descendant_equations(
+                new_structural_equation.index_lhs
+            )
+        )
+
+        columns = sorted(values.overrides.keys())
+        if inplace:
+            for i in columns:
+                data[i] = values.overrides[i]
+            return data
+
+        import pandas as pd
+
+        resampled_data = pd.DataFrame(
+            {i: values.overrides[i] for i in columns},
+            index=data.index,
+            columns=columns
+        )
+
+        return resampled_data
+
+    def _order_descendant_equations(self, index):
+        """Returns the structural equations of the descendants of a variable,
+        ordered to follow a causal order.
+
+        Parameters
+        ----------
+        index : int
+            The index of the variable.
+
+        Returns
+        -------
+        list
+            The structural equations which have a descendant of
+            :math:`X_{index}` on their left-hand side, causally ordered.
+        """
+        descendants = set(self.compute_descendants(index))
+        positions = self.structural_equation_positions()
+
+        return [self.structural_equations[positions[i]] for i in
+                self.compute_causal_order() if i in descendants]
+
+    def _resample_descendants(self, values, noise, new_structural_equation,
+                              ordered_descendant_equations):
+        """Re-generates, in place, the samples of the target of an intervention
+        and of its descendants.
+
+        Parameters
+        ----------
+        values : numpy.ndarray or _ColumnOverlay
+            The pre-intervention samples, column :math:`i` containing the
+            samples of :math:`X_i`.
+        noise : numpy.ndarray
+            The samples of the exogenous variables used to generate values.
+        new_structural_equation : StructuralEquation
+            The new structural equation.
+        ordered_descendant_equations : list
+            The structural equations of the descendants of the target node,
+            causally ordered.
+        """
+        target_node = new_structural_equation.index_lhs
+        old_structural_equation = self.structural_equations[
+            self.structural_equation_positions()[target_node]
+        ]
+        if (new_structural_equation.exogenous_variable is
+                old_structural_equation.exogenous_variable):
+            target_noise = noise[:, target_node]
+        else:
+            target_noise = new_structural_equation.generate_noise(
+                values.shape[0]
+            )
+        values[:, target_node] = new_structural_equation.compute(values,
+                                                                 target_noise)
+
+        for structural_equation in ordered_descendant_equations:
+            i = structural_equation.index_lhs
+            values[:, i] = structural_equation.compute(values, noise[:, i])
+
+    def memory_usage(self):
+        """Returns the number of bytes held by the SCM and its caches.
+
+        The caches which have not been filled yet hold no bytes. The objects
+        shared between structural equations (e.g. an exogenous variable used in
+        several structural equations) are counted once.
+
+        Returns
+        -------
+        dict
+            The number of bytes held by the structural equations, including
+            their exogenous variables ('structural_equations'), and by the
+            cached adjacency matrix ('adjacency_matrix'), positions of the
+            structural equations ('equation_positions'), causal order
+            ('causal_order'), topological generations
+            ('topological_generations') and noise sampling plan
+            ('noise_sampling_plan'), including the Python object overhead (see
+            deep_sizeof), and their sum ('total').
+        """
+        seen = set()
+        usage = {
+            'structural_equations': deep_sizeof(self.structural_equations,
+                                                seen),
+            'adjacency_matrix': deep_sizeof(self._adjacency_matrix, seen),
+            'equation_positions': deep_sizeof(self._equation_positions, seen),
+            'causal_order': deep_sizeof(self._causal_order, seen),
+            'topological_generations': deep_sizeof(
+                self._topological_generations, seen
+            ),
+            'noise_sampling_plan': deep_sizeof(self._noise_sampling_plan,
+                                               seen),
+        }
+
+        return total_memory_usage(usage)
+
     def adjacency_matrix(self):
         """Generates the adjacency matrix of the graph corresponding to the SCM.
 
+        The adjacency matrix is computed once and cached. It is shared with the
+        SCMs obtained by intervention, hence it is returned as a read-only
+        array : modifying it raises a ValueError, and a copy (e.g.
+        scm.adjacency_matrix().copy()) must be made to obtain a writeable
+        array.
+
         Returns
         -------
         numpy.ndarray
-            The adjacency matrix of the graph corresponding to the SCM.
+            The adjacency matrix of the graph corresponding to the SCM, as a
+            read-only array.
         """
 
-        nb_nodes = len(self.structural_equations)
-        adjacency_matrix = np.zeros(shape=(nb_nodes, nb_nodes))
+        if self._adjacency_matrix is None:
 
-        for structural_equation in self.structural_equations:
+            nb_nodes = len(self.structural_equations)
+            adjacency_matrix = np.zeros(shape=(nb_nodes, nb_nodes), dtype=int)
 
-            parents = structural_equation.indices_rhs
-            child = structural_equation.index_lhs
+            for structural_equation in self.structural_equations:
 
-            for parent in parents:
+                parents = structural_equation.indices_rhs
+                child = structural_equation.index_lhs
 
-                adjacency_matrix[parent, child] = 1
+                for parent in parents:
 
-        adjacency_matrix = adjacency_matrix.astype(int)
+                    adjacency_matrix[parent, child] = 1
 
-        return adjacency_matrix
+            adjacency_matrix.setflags(write=False)
+            self._adjacency_matrix = adjacency_matrix
 
-    # TODO for large graphs, may be worth avoiding to compute adj. mat several
-    #  times, by making it an attribute set at construction ?
+        return self._adjacency_matrix
+
+    def structural_equation_positions(self):
+        """Returns the position of each structural equation in the SCM.
+
+        Returns
+        -------
+        dict
+            A dictionary whose keys are the indices of the variables on the
+            left-hand sides of the structural equations and whose values are
+            the positions of the corresponding structural equations in
+            the list of structural equations of the SCM.
+        """
+
+        if self._equation_positions is None:
+            self._equation_positions = {
+                eqn.index_lhs: i for i, eqn in
+                enumerate(self.structural_equations)
+            }
+
+        return self._equation_positions
+
+    def compute_descendants(self, index):
+        """Computes the descendants of a variable in the DAG of the SCM.
+
+        Parameters
+        ----------
+        index : int
+            The index of the variable.
+
+        Returns
+        -------
+        list
+            The indices of the (strict) descendants of :math:`X_{index}`, in no
+            particular order.
+        """
+
+        adjacency_matrix = self.adjacency_matrix()
+
+        visited = np.zeros(adjacency_matrix.shape[0], dtype=bool)
+        stack = [index]
+        descendants = []
+        while stack:
+            current_node = stack.pop()
+            for child in np.flatnonzero(adjacency_matrix[current_node]):
+                if not visited[child]:
+                    visited[child] = True
+                    descendants.append(int(child))
+                    stack.append(child)
+
+        return descendants
 
     def compute_causal_order(self):
         """Computes a causal order of the DAG associated to the SCM.
 
+        The causal order is computed once and cached.
+
         Returns
         -------
         list
             A causal order of the DAG associated to the SCM.
         """
-        adjacency_matrix = self.adjacency_matrix()
-        scm_dag = DirectedAcyclicGraph(adjacency_matrix=adjacency_matrix)
-        causal_order = scm_dag.compute_causal_order()
+        if self._causal_order is None:
+            adjacency_matrix = self.adjacency_matrix()
+            scm_dag = DirectedAcyclicGraph(adjacency_matrix=adjacency_matrix)
+            self._causal_order = scm_dag.compute_causal_order()
+
+        return list(self._causal_order)
+
+    def compute_topological_generations(self):
+        """Computes the topological generations of the DAG associated to the
+        SCM.
+
+        The topological generations are computed once and cached.
+
+        Returns
+        -------
+        list
+            The list of the topological generations, each generation being the
+            list of its variables. The variables of a generation only depend on
+            the variables of the previous generations.
+        """
+        if self._topological_generations is None:
+            adjacency_matrix = self.adjacency_matrix()
+            scm_dag = DirectedAcyclicGraph(adjacency_matrix=adjacency_matrix)
+            self._topological_generations = \
+                scm_dag.compute_topological_generations()
 
-        return causal_order
+        return [list(generation) for generation in
+                self._topological_generations]
 
     def order_structural_equations(self):
         """Returns structural equations, ordered to follow a causal order.
@@ -153,11 +1009,12 @@ class StructuralCausalModel:
             The structural equations making up the SCM, causally ordered.
         """
         causal_order = self.compute_causal_order()
-        structural_equation_dic = {eqn.index_lhs: eqn for eqn in
-                                   self.structural_equations}
+        positions = self.structural_equation_positions()
         ordered_structural_equations = []
         for i in causal_order:
-            ordered_structural_equations.append(structural_equation_dic[i])
+            ordered_structural_equations.append(
+                self.structural_equations[positions[i]]
+            )
 
         return ordered_structural_equations
 
@@ -194,12 +1051,58 @@ class StructuralCausalModel:
 
             raise CyclicityWarning(msg)
 
+    def _validate_intervention(self, new_structural_equation):
+        """Checks that an intervention on the SCM is valid.
+
+        Parameters
+        ----------
+        new_structural_equation : StructuralEquation
+            The new structural equation.
+
+        Raises
+        ------
+        InvalidIntervention
+            If the new structural equation does not correspond to an existing
+            one, or if one of the variables on its right-hand side is not in
+            the SCM.
+        CyclicityWarning
+            If the post-intervention SCM is (highly likely to be) cyclic.
+        """
+        target_node = new_structural_equation.index_lhs
+        nodes_and_indices = self.structural_equation_positions()
+
+        if target_node not in nodes_and_indices:
+            # We do not allow interventions to create new (i.e. non previously
+            # existing) nodes in the (DAG associated to the) SCM
+            msg = "The target node does not exist in the SCM !"
+            raise InvalidIntervention(msg)
+
+        new_parents = new_structural_equation.indices_rhs
+        if any(parent not in nodes_and_indices for parent in new_parents):
+            msg = "A variable on the right-hand side of the new structural "
+            msg += "equation does not exist in the SCM !"
+            raise InvalidIntervention(msg)
+
+        # Only the edges pointing to the target node change, hence the
+        # intervention creates a cycle if and only if one of the new parents of
+        # the target node is the target node itself or one of its descendants
+        if target_node in new_parents or not set(new_parents).isdisjoint(
+                self.compute_descendants(target_node)):
+            msg = "The SCM defined is very likely to be cyclic. Beware !"
+            raise CyclicityWarning(msg)
+
     def perform_intervention(self, new_structural_equation):
         """Performs an intervention on the SCM.
 
         Performs an intervention on the SCM by replacing one of its constitutive
         structural equations by a new structural equation.
 
+        The post-intervention SCM is a cheap derived copy of the SCM : it shares
+        the unchanged structural equations and the positions of the structural
+        equations with the pre-intervention SCM. It does not own a copy of the
+        adjacency matrix : its adjacency matrix, causal order and noise sampling
+        plan are only computed if they are requested.
+
         Parameters
         ----------
         new_structural_equation : StructuralEquation
@@ -215,31 +1118,25 @@ class StructuralCausalModel:
         InvalidIntervention
             If the new structural equation does not correspond to an existing
             one i.e. it has :math:`X_{i_0}` on its left-hand side but there is
-            no :math:`X_{i_0}` variable in the SCM.
+            no :math:`X_{i_0}` variable in the SCM, or if one of the variables
+            on its right-hand side is not in the SCM.
         CyclicityWarning
             If the post-intervention SCM is (highly likely to be) cyclic.
         """
 
-        target_node = new_structural_equation.index_lhs
-        nodes_and_indices = dict()
-        for i in range(len(self.structural_equations)):
-            nodes_and_indices[self.structural_equations[i].index_lhs] = i
-        existing_nodes = nodes_and_indices.keys()
+        self._validate_intervention(new_structural_equation)
 
-        if target_node not in existing_nodes:
-            # We do not allow interventions to create new (i.e. non previously
-            # existing) nodes in the (DAG associated to the) SCM
-            msg = "The target node does not exist in the SCM !"
-            raise InvalidIntervention(msg)
-
-        # TODO should also test the variables in the RHS in the new eq are in
-        #  the SCM
+        target_node = new_structural_equation.index_lhs
+        nodes_and_indices = self.structural_equation_positions()
 
         idx_target_node = nodes_and_indices[target_node]
-        new_scm = copy.deepcopy(self)
-        new_scm.structural_equations[idx_target_node] = new_structural_equation
-
-        # Check whether the intervention may have created a cycle in the SCM
-        new_scm.check_no_cycles()
+        new_scm = self.__class__.__new__(self.__class__)
+        new_scm.__dict__.update(self.__dict__)
+        new_structural_equations = list(self.structural_equations)
+        new_structural_equations[idx_target_node] = new_structural_equation
+        # Clears the caches, which are rebuilt lazily
+        new_scm.structural_equations = new_structural_equations
+        # The positions of the structural equations do not change
+        new_scm._equation_positions = self._equation_positions
 
         return new_scm
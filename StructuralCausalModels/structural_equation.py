@@ -1,3 +1,7 @@
+from StructuralCausalModels.serialization import DistributionSpec, \
+    FunctionReference
+
+
 # TODO add string representation of Structural Equation
 class StructuralEquation:
     """A class to represent structural equations.
@@ -30,7 +34,90 @@ class StructuralEquation:
         self.exogenous_variable = exogenous_variable
         self.function = function
 
-    def generate_data(self, data):
+    def __getstate__(self):
+        """
+        Returns the state of the object to pickle.
+
+        Frozen scipy.stats distributions are pickled as DistributionSpec
+        objects, and registered functions (see register_function) as
+        FunctionReference objects.
+
+        Returns
+        -------
+        dict
+            The state of the object.
+        """
+        state = dict(self.__dict__)
+        spec = DistributionSpec.from_exogenous_variable(self.exogenous_variable)
+        if spec is not None:
+            state['exogenous_variable'] = spec
+        reference = FunctionReference.from_function(self.function)
+        if reference is not None:
+            state['function'] = reference
+
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the state of an unpickled object.
+
+        Parameters
+        ----------
+        state : dict
+            The state of the object, as returned by __getstate__.
+        """
+        state = dict(state)
+        if isinstance(state['exogenous_variable'], DistributionSpec):
+            state['exogenous_variable'] = state['exogenous_variable'].freeze()
+        if isinstance(state.get('function'), FunctionReference):
+            state['function'] = state['function'].resolve()
+        self.__dict__.update(state)
+
+    def generate_noise(self, nb_samples, random_state=None):
+        """Draws samples from the exogenous variable of the structural equation.
+
+        Parameters
+        ----------
+        nb_samples : int
+            The number of samples to draw.
+        random_state : int or numpy.random.Generator, optional
+            The seed or random number generator to use (default is None).
+
+        Returns
+        -------
+        numpy.ndarray
+            The samples of the exogenous variable.
+        """
+        if random_state is None:
+            return self.exogenous_variable.rvs(size=nb_samples)
+
+        return self.exogenous_variable.rvs(size=nb_samples,
+                                           random_state=random_state)
+
+    def compute(self, values, noise):
+        """Computes the left-hand side of the structural equation.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            An array containing the samples of the structural variables, with
+            column :math:`j` containing the samples of :math:`X_j`. It must
+            contain data at least for the structural variables on the
+            right-hand side of the structural equation.
+        noise : numpy.ndarray
+            The samples of the exogenous variable.
+
+        Returns
+        -------
+        numpy.ndarray
+            The samples of the structural variable on the left-hand side of the
+            structural equation.
+        """
+        inputs = [values[:, i] for i in self.indices_rhs]
+
+        return self.function(noise, *inputs)
+
+    def generate_data(self, data, noise=None):
         """Generates samples from a structural equation.
 
         Parameters
@@ -41,6 +128,9 @@ class StructuralEquation:
 
             If it contains data for the structural variable on the left-hand
             side of the structural equation, that data will be overwritten.
+        noise : numpy.ndarray, optional
+            The samples of the exogenous variable to use (default is None, in
+            which case they are drawn from the exogenous variable).
 
         Returns
         -------
@@ -48,10 +138,9 @@ class StructuralEquation:
             The samples.
         """
         sample_size = data.shape[0]
+        if noise is None:
+            noise = self.generate_noise(sample_size)
         inputs = [data.loc[:, i].values for i in self.indices_rhs]
-        data.loc[:, self.index_lhs] = self.function(
-            self.exogenous_variable.rvs(size=sample_size),
-            *inputs
-        )
+        data.loc[:, self.index_lhs] = self.function(noise, *inputs)
 
         return data
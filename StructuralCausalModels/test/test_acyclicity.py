@@ -0,0 +1,118 @@
+import pytest
+import numpy as np
+
+from scipy.stats import norm
+
+from StructuralCausalModels.acyclicity import acyclicity, \
+    AcyclicityMethodNotImplemented, log_det_acyclicity
+from StructuralCausalModels.linear_structural_causal_model import \
+    InvalidWeightedAdjacencyMatrix, LinearStructuralCausalModel
+
+
+_methods = ['exponential', 'polynomial', 'log_det']
+
+
+@pytest.fixture
+def acyclic_weights():
+
+    matrix = np.asarray([
+        [0, -0.4, 0.3, 0.2],
+        [0, 0, -0.5, 0],
+        [0, 0, 0, 0],
+        [0, 0.5, 0.1, 0]
+    ])
+    linear_scm = LinearStructuralCausalModel.create_from_coefficient_matrix(
+        matrix=matrix,
+        causal_order=[0, 3, 1, 2],
+        exogenous_variables=[norm()] * 4)
+
+    return linear_scm.coefficient_matrix()
+
+
+@pytest.fixture
+def cyclic_weights(acyclic_weights):
+
+    weights = acyclic_weights.copy()
+    # Closes the cycle 0 -> 3 -> 1 -> 2 -> 0
+    weights[2, 0] = 0.3
+
+    return weights
+
+
+@pytest.mark.parametrize("method", _methods)
+def test_measure_is_zero_on_acyclic_matrices_only(acyclic_weights,
+                                                  cyclic_weights, method):
+
+    value, gradient = acyclicity(acyclic_weights, method=method)
+    assert value == pytest.approx(0, abs=1e-12)
+    np.testing.assert_allclose(gradient, 0, atol=1e-12)
+
+    value, gradient = acyclicity(cyclic_weights, method=method)
+    assert value > 1e-6
+    assert np.abs(gradient).max() > 0
+
+
+@pytest.mark.parametrize("method", _methods)
+def test_gradient_matches_finite_differences(cyclic_weights, method):
+
+    _, gradient = acyclicity(cyclic_weights, method=method)
+    step = 1e-6
+    expected = np.zeros_like(cyclic_weights)
+    for i, j in np.ndindex(*cyclic_weights.shape):
+        shift = np.zeros_like(cyclic_weights)
+        shift[i, j] = step
+        expected[i, j] = (
+            acyclicity(cyclic_weights + shift, method=method)[0] -
+            acyclicity(cyclic_weights - shift, method=method)[0]
+        ) / (2 * step)
+
+    np.testing.assert_allclose(gradient, expected, atol=1e-7)
+
+
+@pytest.mark.parametrize("method", _methods)
+def test_batch_matches_single_matrices(acyclic_weights, cyclic_weights,
+                                       method):
+
+    rng = np.random.default_rng(0)
+    batch = np.stack([acyclic_weights, cyclic_weights,
+                      rng.uniform(-0.3, 0.3, size=(4, 4))])
+    batch = np.stack([batch, -batch])
+    values, gradients = acyclicity(batch, method=method)
+
+    assert values.shape == (2, 3)
+    assert gradients.shape == (2, 3, 4, 4)
+    for index in np.ndindex(2, 3):
+        value, gradient = acyclicity(batch[index], method=method)
+        assert values[index] == pytest.approx(value)
+        np.testing.assert_allclose(gradients[index], gradient, atol=1e-12)
+
+
+def test_log_det_outside_domain(cyclic_weights):
+
+    values, gradients = log_det_acyclicity(
+        np.stack([cyclic_weights, 3 * cyclic_weights])
+    )
+
+    assert np.isfinite(values[0]) and np.isinf(values[1])
+    assert np.isfinite(gradients[0]).all() and np.isnan(gradients[1]).all()
+    value, _ = log_det_acyclicity(3 * cyclic_weights, s=10)
+    assert np.isfinite(value) and value > 0
+
+
+def test_gradient_descent_reduces_measure(cyclic_weights):
+
+    weights = cyclic_weights.copy()
+    initial_value, _ = acyclicity(weights)
+    for _ in range(100):
+        _, gradient = acyclicity(weights)
+        weights -= 0.5 * gradient
+
+    assert acyclicity(weights)[0] < initial_value / 10
+
+
+def test_invalid_arguments_crash(acyclic_weights):
+
+    with pytest.raises(AcyclicityMethodNotImplemented):
+        acyclicity(acyclic_weights, method='spectral')
+    with pytest.raises(InvalidWeightedAdjacencyMatrix):
+        acyclicity(acyclic_weights[:, :3])
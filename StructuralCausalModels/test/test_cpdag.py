@@ -0,0 +1,137 @@
+import pytest
+import numpy as np
+
+from scipy.sparse import csr_matrix, issparse
+
+from StructuralCausalModels.cpdag import compelled_parents, dag_to_cpdag, \
+    dags_to_cpdags
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    InvalidAdjacencyMatrix
+from StructuralCausalModels.orientation import apply_meek_rules
+
+
+def _matrix(nb_vertices, edges):
+
+    matrix = np.zeros((nb_vertices, nb_vertices), dtype=int)
+    for source, target in edges:
+        matrix[source, target] = 1
+
+    return matrix
+
+
+def _v_structures_and_meek_rules(matrix):
+
+    # The CPDAG is the skeleton with the v-structures oriented, closed under
+    # Meek's rules
+    matrix = matrix.astype(bool)
+    skeleton = matrix | matrix.T
+    cpdag = skeleton.copy()
+    for k in range(len(matrix)):
+        parents = np.flatnonzero(matrix[:, k])
+        for i in parents:
+            for j in parents:
+                if i < j and not skeleton[i, j]:
+                    cpdag[k, i] = cpdag[k, j] = False
+
+    return apply_meek_rules(cpdag)
+
+
+@pytest.fixture
+def random_dags():
+
+    rng = np.random.default_rng(0)
+    matrices = []
+    for _ in range(100):
+        upper = np.triu(rng.random((8, 8)) < rng.uniform(0.1, 0.7), k=1)
+        permutation = rng.permutation(8)
+        matrices.append(upper[np.ix_(permutation, permutation)].astype(int))
+
+    return np.stack(matrices)
+
+
+@pytest.mark.parametrize("nb_vertices,edges,expected", [
+    # A chain is reversible
+    (3, [(0, 1), (1, 2)], [(0, 1), (1, 0), (1, 2), (2, 1)]),
+    # A v-structure and its descendant are compelled
+    (4, [(0, 2), (1, 2), (2, 3)], [(0, 2), (1, 2), (2, 3)]),
+    # The edge 0 -> 3 of a diamond with a v-structure at 3 is compelled
+    (4, [(0, 1), (0, 2), (0, 3), (1, 3), (2, 3)],
+     [(0, 1), (1, 0), (0, 2), (2, 0), (0, 3), (1, 3), (2, 3)]),
+])
+def test_known_cpdags(nb_vertices, edges, expected):
+
+    dag = DirectedAcyclicGraph(_matrix(nb_vertices, edges))
+    cpdag = dag_to_cpdag(dag, name='cpdag')
+
+    assert isinstance(cpdag, Graph)
+    assert cpdag.name == 'cpdag'
+    assert cpdag.adjacency_matrix.dtype == np.uint8
+    assert np.array_equal(cpdag.adjacency_matrix,
+                          _matrix(nb_vertices, expected))
+    assert np.array_equal(dag.compute_cpdag().adjacency_matrix,
+                          cpdag.adjacency_matrix)
+
+
+def test_cpdags_match_meek_rules(random_dags):
+
+    for matrix in random_dags:
+        cpdag = dag_to_cpdag(DirectedAcyclicGraph(matrix))
+        assert np.array_equal(cpdag.adjacency_matrix,
+                              _v_structures_and_meek_rules(matrix))
+
+
+def test_batch_matches_single_dags(random_dags):
+
+    cpdags = dags_to_cpdags(random_dags, names=[str(k) for k in range(100)])
+    from_objects = dags_to_cpdags([DirectedAcyclicGraph(matrix)
+                                   for matrix in random_dags[:5]])
+
+    assert len(cpdags) == 100 and cpdags[7].name == '7'
+    for cpdag, matrix in zip(cpdags, random_dags):
+        assert np.array_equal(
+            cpdag.adjacency_matrix,
+            dag_to_cpdag(DirectedAcyclicGraph(matrix)).adjacency_matrix
+        )
+    for cpdag, other in zip(from_objects, cpdags):
+        assert np.array_equal(cpdag.adjacency_matrix, other.adjacency_matrix)
+
+
+def test_markov_equivalent_dags_have_the_same_cpdag():
+
+    # 0 - 1 - 2 is reversible, 1 -> 3 <- 4 is compelled
+    dag_1 = DirectedAcyclicGraph(_matrix(5, [(0, 1), (1, 2), (1, 3), (4, 3)]))
+    dag_2 = DirectedAcyclicGraph(_matrix(5, [(1, 0), (2, 1), (1, 3), (4, 3)]))
+    dag_3 = DirectedAcyclicGraph(_matrix(5, [(0, 1), (1, 2), (3, 1), (4, 3)]))
+
+    assert dag_1.structural_hamming_distance(dag_2) == 2
+    assert dag_to_cpdag(dag_1).structural_hamming_distance(
+        dag_to_cpdag(dag_2)) == 0
+    assert dag_to_cpdag(dag_1).structural_hamming_distance(
+        dag_to_cpdag(dag_3)) == 4
+
+
+def test_sparse_dag(random_dags):
+
+    dag = DirectedAcyclicGraph(csr_matrix(random_dags[0]))
+    cpdag = dag_to_cpdag(dag)
+
+    assert issparse(cpdag.adjacency_matrix)
+    assert np.array_equal(cpdag.adjacency_matrix.toarray(),
+                          _v_structures_and_meek_rules(random_dags[0]))
+    assert all(compelled <= set(parents) for compelled, parents in
+               zip(compelled_parents(dag), dag.parent_lists()))
+
+
+def test_invalid_batches_crash(random_dags):
+
+    cyclic = random_dags[:3].copy()
+    cyclic[1] = _matrix(8, [(0, 1), (1, 2), (2, 0)])
+
+    with pytest.raises(InvalidAdjacencyMatrix):
+        dags_to_cpdags(cyclic)
+    with pytest.raises(InvalidAdjacencyMatrix):
+        dags_to_cpdags(random_dags[:, :, :5])
+    with pytest.raises(InvalidAdjacencyMatrix):
+        dags_to_cpdags([np.zeros((3, 3)), np.zeros((4, 4))])
@@ -1,6 +1,7 @@
 # TODO reorganise and document
 import pytest
 import numpy as np
+import scipy.sparse
 
 from StructuralCausalModels.dag import DirectedAcyclicGraph
 
@@ -66,6 +67,27 @@ def test_validate_directed_acyclic_graph(matrix, expected):
 
     assert (DirectedAcyclicGraph.validate_dag_adjacency_matrix(matrix) ==
             expected)
+    if matrix.ndim == 2:
+        assert (DirectedAcyclicGraph.validate_dag_adjacency_matrix(
+            scipy.sparse.csr_matrix(matrix), block_size=1) == expected)
+
+
+def test_validate_memory_mapped_dag(tmp_path):
+
+    path = str(tmp_path / 'matrix.npy')
+    np.save(path, _large_adj_matrix.astype(np.uint8))
+    matrix = np.load(path, mmap_mode='r')
+
+    dag = DirectedAcyclicGraph(adjacency_matrix=matrix)
+
+    assert dag.compute_causal_order() in _large_adj_matrix_causal_orders
+
+    cyclic_matrix = _large_adj_matrix.copy()
+    cyclic_matrix[5, 1] = 1
+    np.save(path, cyclic_matrix.astype(np.uint8))
+    assert not DirectedAcyclicGraph.validate_dag_adjacency_matrix(
+        np.load(path, mmap_mode='r'), block_size=2
+    )
 
 
 @pytest.mark.parametrize(
@@ -138,3 +160,36 @@ def test_causal_order_to_dag(causal_order, expected_adjacency_matrix):
     actual_adjacency_matrix = dag.adjacency_matrix
 
     assert np.all(actual_adjacency_matrix == expected_adjacency_matrix)
+
+
+@pytest.mark.parametrize(
+    "matrix, expected_generations",
+    [
+        (_small_adj_matrix, [[0], [3], [1], [2]]),
+        (_large_adj_matrix, [[0, 1, 2], [3, 4, 6], [5]]),
+    ]
+)
+def test_compute_topological_generations(matrix, expected_generations):
+
+    dag = DirectedAcyclicGraph(adjacency_matrix=matrix)
+    generations = dag.compute_topological_generations()
+
+    assert [sorted(g) for g in generations] == expected_generations
+
+
+@pytest.mark.parametrize("matrix", [_small_adj_matrix, _large_adj_matrix])
+def test_descendant_bitsets(matrix):
+
+    dag = DirectedAcyclicGraph(adjacency_matrix=matrix)
+    matrix = np.asarray(matrix) != 0
+    nb_vertices = len(matrix)
+    expected = np.identity(nb_vertices, dtype=bool) | matrix
+    for _ in range(nb_vertices):
+        expected |= (expected.astype(int) @ expected.astype(int)) > 0
+    sparse_dag = DirectedAcyclicGraph(scipy.sparse.csr_matrix(matrix))
+
+    for bitsets in [dag.descendant_bitsets(), sparse_dag.descendant_bitsets()]:
+        assert bitsets.shape == (nb_vertices, (nb_vertices + 7) // 8)
+        assert np.array_equal(
+            np.unpackbits(bitsets, axis=1, count=nb_vertices), expected
+        )
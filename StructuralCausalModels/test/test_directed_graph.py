@@ -1,6 +1,7 @@
 # TODO reorganise and document
 import pytest
 import numpy as np
+import scipy.sparse
 
 from StructuralCausalModels.directed_graph import DirectedGraph
 
@@ -23,3 +24,21 @@ def test_validate_directed_graph(matrix, expected):
 
     assert (DirectedGraph.validate_directed_graph_adjacency_matrix(matrix) ==
             expected)
+    assert (DirectedGraph.validate_directed_graph_adjacency_matrix(
+        matrix, block_size=1) == expected)
+    if matrix.ndim == 2:
+        assert (DirectedGraph.validate_directed_graph_adjacency_matrix(
+            scipy.sparse.csr_matrix(matrix)) == expected)
+
+
+def test_parent_lists():
+
+    graph = DirectedGraph(adjacency_matrix=np.asarray([[0, 1, 1],
+                                                       [0, 0, 1],
+                                                       [0, 0, 0]]))
+
+    assert graph.parent_lists() == [(), (0, ), (0, 1)]
+    graph.adjacency_matrix = np.asarray([[0, 0, 0],
+                                         [1, 0, 0],
+                                         [0, 1, 0]])
+    assert graph.parent_lists() == [(1, ), (2, ), ()]
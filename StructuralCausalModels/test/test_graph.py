@@ -1,9 +1,12 @@
 # TODO reorganise and document
 import pytest
 import numpy as np
+import scipy.sparse
 
 from StructuralCausalModels.graph import Graph, EdgeType, \
     ImpossibleEdgeConfiguration
+from StructuralCausalModels.graph_via_edges import GraphViaEdges, \
+    GraphsCannotBeCompared
 
 
 _adjacency_matrix = np.asarray([
@@ -97,6 +100,99 @@ def test_structural_hamming_distance(adjacency_matrix_1, adjacency_matrix_2,
     assert expected_shd == actual_shd
 
 
+@pytest.mark.parametrize("block_size", [None, 1, 3])
+@pytest.mark.parametrize("as_sparse", [False, True])
+def test_structural_hamming_distance_blockwise(block_size, as_sparse):
+
+    rng = np.random.default_rng(0)
+    matrix_1 = (rng.random((10, 10)) < 0.3).astype(int)
+    matrix_2 = (rng.random((10, 10)) < 0.3).astype(int)
+    expected_shd = Graph(matrix_1).edge_representation.\
+        structural_hamming_distance(Graph(matrix_2).edge_representation)
+    if as_sparse:
+        matrix_1 = scipy.sparse.csr_matrix(matrix_1)
+
+    actual_shd = Graph(matrix_1).structural_hamming_distance(
+        Graph(matrix_2), block_size=block_size
+    )
+
+    assert actual_shd == expected_shd
+    assert Graph(scipy.sparse.csr_matrix(matrix_2)).\
+        structural_hamming_distance(Graph(matrix_1)) == expected_shd
+
+
+def test_structural_hamming_distance_custom_penalty():
+
+    graph_1 = Graph(_adjacency_matrix)
+    graph_2 = Graph(_adjacency_matrix.T)
+
+    assert graph_1.structural_hamming_distance(
+        graph_2,
+        penalty_edge_mismatch_func=lambda edge_1, edge_2: 2 * (edge_1 != edge_2)
+    ) == 12
+    assert graph_1.structural_hamming_distance(graph_2) == \
+        GraphViaEdges.structural_hamming_distance(graph_1.edge_representation,
+                                                  graph_2.edge_representation)
+
+
+def test_crash_structural_hamming_distance():
+
+    with pytest.raises(GraphsCannotBeCompared):
+        Graph(np.zeros((2, 2))).structural_hamming_distance(
+            Graph(np.zeros((3, 3)))
+        )
+
+
+@pytest.mark.parametrize("block_size", [None, 1, 3])
+def test_degrees(block_size):
+
+    graph = Graph(adjacency_matrix=_adjacency_matrix)
+
+    np.testing.assert_array_equal(graph.out_degrees(block_size=block_size),
+                                  [3, 1, 0, 2])
+    np.testing.assert_array_equal(graph.in_degrees(block_size=block_size),
+                                  [0, 2, 3, 1])
+
+    sparse_graph = Graph(adjacency_matrix=scipy.sparse.csr_matrix(
+        _adjacency_matrix
+    ))
+    np.testing.assert_array_equal(sparse_graph.out_degrees(), [3, 1, 0, 2])
+    np.testing.assert_array_equal(sparse_graph.in_degrees(), [0, 2, 3, 1])
+
+
+def test_memory_mapped_adjacency_matrix(tmp_path):
+
+    path = str(tmp_path / 'matrix.npy')
+    np.save(path, _adjacency_matrix.astype(np.uint8))
+    matrix = np.load(path, mmap_mode='r')
+
+    graph = Graph(adjacency_matrix=matrix)
+
+    assert graph.adjacency_matrix is matrix
+    assert graph.adjacency_list_representation.adjacency_lists == \
+        _adjacency_lists
+    np.testing.assert_array_equal(graph.in_degrees(block_size=1),
+                                  [0, 2, 3, 1])
+
+
+def test_memory_usage():
+
+    graph = Graph(adjacency_matrix=_adjacency_matrix)
+
+    usage = graph.memory_usage()
+    assert usage['adjacency_lists'] == 0
+    assert usage['edges'] == 0
+    assert usage['adjacency_matrix'] >= _adjacency_matrix.nbytes
+
+    graph.adjacency_list_representation
+    graph.edge_representation
+    usage = graph.memory_usage()
+    assert usage['adjacency_lists'] > 0
+    assert usage['edges'] > usage['adjacency_lists']
+    assert usage['total'] == sum(value for key, value in usage.items()
+                                 if key != 'total')
+
+
 # TODO test further ?
 @pytest.mark.parametrize(
     "adjacency_matrix, expected_adjacency_lists",
@@ -107,6 +203,14 @@ def test_structural_hamming_distance(adjacency_matrix_1, adjacency_matrix_2,
 def test_adjacency_matrix_to_adjacency_lists(adjacency_matrix,
                                              expected_adjacency_lists):
 
+    for matrix in [scipy.sparse.csr_matrix(adjacency_matrix),
+                   scipy.sparse.coo_matrix(adjacency_matrix)]:
+        assert Graph.adjacency_matrix_to_adjacency_lists(matrix) == \
+            expected_adjacency_lists
+    assert Graph.adjacency_matrix_to_adjacency_lists(
+        adjacency_matrix, block_size=3
+    ) == expected_adjacency_lists
+
     actual_adjacency_lists = Graph.adjacency_matrix_to_adjacency_lists(
         adjacency_matrix=adjacency_matrix
     )
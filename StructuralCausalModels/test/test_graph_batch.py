@@ -0,0 +1,251 @@
+import pytest
+import numpy as np
+
+from scipy.sparse import csr_matrix
+
+from StructuralCausalModels.cpdag import dags_to_cpdags
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.directed_graph import DirectedGraph
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_batch import GraphBatch
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    InvalidAdjacencyMatrix
+from StructuralCausalModels.graph_via_edges import GraphsCannotBeCompared
+
+
+@pytest.fixture
+def matrices():
+
+    # Random graphs, some of them directed, some of them acyclic
+    rng = np.random.default_rng(0)
+    matrices = (rng.random((60, 7, 7)) < 0.2).astype(np.uint8)
+    matrices[:20] = np.triu(matrices[:20], k=1)
+    matrices[20:40] &= ~np.swapaxes(matrices[20:40], 1, 2)
+    np.einsum('kii->ki', matrices[20:40])[:] = 0
+
+    return matrices
+
+
+@pytest.fixture(params=[False, True], ids=['bytes', 'bits'])
+def batch(request, matrices):
+
+    return GraphBatch(matrices, names=[f'g{k}' for k in range(60)],
+                      packed=request.param)
+
+
+def test_adjacency_matrices(batch, matrices):
+
+    np.testing.assert_array_equal(batch.adjacency_matrices, matrices)
+    assert len(batch) == batch.nb_graphs == 60
+    assert batch.nb_vertices == 7
+
+
+def test_packed_memory_usage(matrices):
+
+    matrices = np.concatenate([matrices] * 10, axis=2)
+    matrices = np.concatenate([matrices] * 10, axis=1)
+    unpacked = GraphBatch(matrices, validate=False)
+    packed = GraphBatch(matrices, validate=False, packed=True)
+
+    assert packed.memory_usage()['adjacency_matrices'] < \
+        unpacked.memory_usage()['adjacency_matrices'] / 7
+
+
+def test_invalid_adjacency_matrices(matrices):
+
+    matrices = matrices.astype(int)
+    matrices[3, 0, 1] = 2
+
+    with pytest.raises(InvalidAdjacencyMatrix):
+        GraphBatch(matrices)
+    with pytest.raises(InvalidAdjacencyMatrix):
+        GraphBatch(np.zeros((2, 3, 4)))
+    with pytest.raises(InvalidAdjacencyMatrix):
+        GraphBatch(matrices[:3], names=['a', 'b'])
+    np.testing.assert_array_equal(
+        np.flatnonzero(~GraphBatch.validate_binary_matrices(matrices)), [3]
+    )
+
+
+def test_graph_views(batch, matrices):
+
+    graph = batch[5]
+    dag = batch.graph(5, graph_class=DirectedAcyclicGraph)
+
+    assert isinstance(graph, Graph)
+    assert isinstance(dag, DirectedAcyclicGraph)
+    assert graph.name == 'g5'
+    np.testing.assert_array_equal(graph.adjacency_matrix, matrices[5])
+    if not batch.packed:
+        assert np.shares_memory(graph.adjacency_matrix,
+                                batch.adjacency_matrices)
+    assert [g.name for g in batch] == [f'g{k}' for k in range(60)]
+
+
+def test_graph_views_read_only(batch):
+
+    with pytest.raises(ValueError):
+        batch[5].adjacency_matrix[0, 1] = 1
+    with pytest.raises(ValueError):
+        batch.graph(5).adjacency_matrix[0, 1] = 1
+    if not batch.packed:
+        with pytest.raises(ValueError):
+            batch.adjacency_matrices[5, 0, 1] = 1
+
+
+def test_sub_batches(batch, matrices):
+
+    sub_batch = batch[10:20]
+    selected = batch[[0, 2, 4]]
+
+    assert isinstance(sub_batch, GraphBatch)
+    assert sub_batch.names == [f'g{k}' for k in range(10, 20)]
+    np.testing.assert_array_equal(sub_batch.adjacency_matrices,
+                                  matrices[10:20])
+    np.testing.assert_array_equal(selected.adjacency_matrices,
+                                  matrices[[0, 2, 4]])
+    assert selected.names == ['g0', 'g2', 'g4']
+
+
+def test_from_graphs(matrices):
+
+    graphs = [Graph(matrices[0], name='a'), Graph(csr_matrix(matrices[1]))]
+    batch = GraphBatch.from_graphs(graphs)
+
+    assert batch.names == ['a', '']
+    np.testing.assert_array_equal(batch.adjacency_matrices, matrices[:2])
+    with pytest.raises(InvalidAdjacencyMatrix):
+        GraphBatch.from_graphs([Graph(np.zeros((2, 2))),
+                                Graph(np.zeros((3, 3)))])
+
+
+@pytest.mark.parametrize('block_size', [None, 1, 7])
+def test_is_directed_and_is_acyclic(batch, matrices, block_size):
+
+    directed = [DirectedGraph.validate_directed_graph_adjacency_matrix(matrix)
+                for matrix in matrices]
+    acyclic = [DirectedAcyclicGraph.validate_dag_adjacency_matrix(matrix)
+               for matrix in matrices]
+
+    np.testing.assert_array_equal(batch.is_directed(block_size=block_size),
+                                  directed)
+    np.testing.assert_array_equal(batch.is_acyclic(block_size=block_size),
+                                  acyclic)
+    assert batch.is_acyclic()[:20].all()
+    assert not batch.is_acyclic()[40:].any()
+
+
+def test_is_acyclic_long_cycle():
+
+    matrices = np.zeros((3, 6, 6), dtype=np.uint8)
+    for i in range(5):
+        matrices[:, i, i + 1] = 1
+    matrices[1, 5, 0] = 1
+    matrices[2, 5, 3] = 1
+
+    np.testing.assert_array_equal(GraphBatch(matrices).is_acyclic(),
+                                  [True, False, False])
+
+
+def test_degrees(batch, matrices):
+
+    graphs = [Graph(matrix) for matrix in matrices]
+
+    np.testing.assert_array_equal(
+        batch.out_degrees(), [graph.out_degrees() for graph in graphs]
+    )
+    np.testing.assert_array_equal(
+        batch.in_degrees(block_size=4), [graph.in_degrees() for graph in graphs]
+    )
+
+
+def test_degree_statistics(batch, matrices):
+
+    statistics = batch.degree_statistics()
+    in_degrees = matrices.sum(axis=1)
+    out_degrees = matrices.sum(axis=2)
+
+    np.testing.assert_array_equal(statistics['nb_edges'],
+                                  matrices.sum(axis=(1, 2)))
+    np.testing.assert_allclose(statistics['mean_degree'],
+                               matrices.sum(axis=(1, 2)) / 7)
+    np.testing.assert_array_equal(statistics['max_in_degree'],
+                                  in_degrees.max(axis=1))
+    np.testing.assert_array_equal(statistics['max_out_degree'],
+                                  out_degrees.max(axis=1))
+    np.testing.assert_array_equal(
+        statistics['nb_isolated_vertices'],
+        ((in_degrees == 0) & (out_degrees == 0)).sum(axis=1)
+    )
+
+
+@pytest.mark.parametrize('block_size', [None, 3])
+def test_structural_hamming_distances(batch, matrices, block_size):
+
+    others = np.roll(matrices, 1, axis=0)
+    expected = [Graph(matrix).structural_hamming_distance(Graph(other))
+                for matrix, other in zip(matrices, others)]
+
+    np.testing.assert_array_equal(
+        batch.structural_hamming_distances(others, block_size=block_size),
+        expected
+    )
+    np.testing.assert_array_equal(
+        batch.structural_hamming_distances(GraphBatch(others, packed=True)),
+        expected
+    )
+
+
+def test_structural_hamming_distances_to_one_graph(batch, matrices):
+
+    graph = Graph(matrices[0])
+    expected = [Graph(matrix).structural_hamming_distance(graph)
+                for matrix in matrices]
+
+    np.testing.assert_array_equal(batch.structural_hamming_distances(graph),
+                                  expected)
+    np.testing.assert_array_equal(
+        batch.structural_hamming_distances(csr_matrix(matrices[0])), expected
+    )
+    with pytest.raises(GraphsCannotBeCompared):
+        batch.structural_hamming_distances(np.zeros((3, 3)))
+    with pytest.raises(GraphsCannotBeCompared):
+        batch.structural_hamming_distances(matrices[:5])
+
+
+def test_compute_cpdags(batch, matrices):
+
+    dags = batch[:20]
+    cpdags = dags.compute_cpdags(block_size=6)
+    expected = dags_to_cpdags(matrices[:20])
+
+    assert cpdags.packed == batch.packed
+    assert cpdags.names == dags.names
+    for cpdag, expected_cpdag in zip(cpdags, expected):
+        np.testing.assert_array_equal(cpdag.adjacency_matrix,
+                                      expected_cpdag.adjacency_matrix)
+    with pytest.raises(InvalidAdjacencyMatrix):
+        batch[40:].compute_cpdags()
+
+
+@pytest.mark.parametrize('packed', [False, True])
+def test_random_dags(packed):
+
+    batch = GraphBatch.random_dags(50, 12, model='scale_free', nb_parents=2,
+                                   ordering='random', packed=packed,
+                                   random_state=0)
+
+    assert batch.nb_graphs == 50
+    assert batch.packed == packed
+    assert batch.is_acyclic().all()
+    np.testing.assert_array_equal(batch.degree_statistics()['nb_edges'],
+                                  [1 + 2 * 10] * 50)
+
+
+def test_empty_batch():
+
+    batch = GraphBatch(np.zeros((0, 4, 4), dtype=np.uint8))
+
+    assert len(batch) == 0
+    assert batch.is_acyclic().shape == (0,)
+    assert batch.out_degrees().shape == (0, 4)
@@ -26,3 +26,31 @@ def test_can_rebuild_graph_from_matrix(graph_via_adjacency_matrix_example):
     reconstructed = eval(repr(graph_via_adjacency_matrix_example))
 
     assert reconstructed == graph_via_adjacency_matrix_example
+
+
+@pytest.mark.parametrize("block_size", [None, 1, 2, 3])
+@pytest.mark.parametrize("as_sparse", [False, True])
+def test_iterate_transposed_block_pairs(block_size, as_sparse):
+
+    matrix = np.arange(25).reshape(5, 5)
+    if as_sparse:
+        from scipy.sparse import csr_matrix
+        matrix = csr_matrix(matrix)
+    dense_matrix = np.arange(25).reshape(5, 5)
+
+    nb_reads = np.zeros((5, 5), dtype=int)
+    for row_start, column_start, block, transposed_block in \
+            GraphViaAdjacencyMatrix.iterate_transposed_block_pairs(
+                matrix, block_size=block_size):
+        assert row_start <= column_start
+        rows = slice(row_start, row_start + block.shape[0])
+        columns = slice(column_start, column_start + block.shape[1])
+        np.testing.assert_array_equal(block, dense_matrix[rows, columns])
+        np.testing.assert_array_equal(transposed_block,
+                                      dense_matrix[columns, rows].T)
+        nb_reads[rows, columns] += 1
+        nb_reads[columns, rows] += 1
+
+    # Each entry is read once, or twice in the blocks on the diagonal
+    assert np.all(nb_reads >= 1)
+    assert np.all(nb_reads <= 2)
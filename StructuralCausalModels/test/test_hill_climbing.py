@@ -0,0 +1,170 @@
+import pytest
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+from scipy.stats import norm
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.hill_climbing import HillClimbingSearch
+from StructuralCausalModels.linear_fitting import InvalidData
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.scores import BGeScore, DecomposableScore, \
+    GaussianBICScore
+from StructuralCausalModels.structural_causal_model import InvalidExecutor
+
+
+@pytest.fixture
+def coefficient_matrix():
+
+    matrix = np.zeros((8, 8))
+    for source, target, weight in [(0, 1, 1.5), (0, 2, -1), (1, 3, 1),
+                                   (2, 3, 1.2), (3, 4, -0.8), (5, 4, 1),
+                                   (4, 6, 1.5), (7, 6, -1)]:
+        matrix[source, target] = weight
+
+    return matrix
+
+
+@pytest.fixture
+def data(coefficient_matrix):
+
+    nb_var = coefficient_matrix.shape[0]
+    linear_scm = LinearStructuralCausalModel.create_from_coefficient_matrix(
+        matrix=coefficient_matrix,
+        causal_order=list(range(nb_var)),
+        exogenous_variables=[norm() for _ in range(nb_var)])
+
+    return linear_scm.generate_data(5000, random_state=0).to_numpy()
+
+
+def _transitive_closure(adjacency_matrix):
+
+    closure = adjacency_matrix.astype(bool)
+    for _ in range(adjacency_matrix.shape[0]):
+        closure = closure | ((closure.astype(int) @ closure) > 0)
+
+    return closure
+
+
+@pytest.mark.parametrize("score_class", [GaussianBICScore, BGeScore])
+def test_tabu_search_recovers_markov_equivalent_dag(data, coefficient_matrix,
+                                                    score_class):
+
+    score = score_class(data)
+    # Hill climbing on the BIC gets stuck with an extra edge between 1 and 2,
+    # which the tabu search removes
+    search = HillClimbingSearch(score, tabu_length=10, max_non_improving=30)
+    dag = search.fit(name='learnt')
+    true_dag = DirectedAcyclicGraph(
+        adjacency_matrix=(coefficient_matrix != 0).astype(int)
+    )
+    skeleton = (dag.adjacency_matrix + dag.adjacency_matrix.T) != 0
+    true_skeleton = (coefficient_matrix + coefficient_matrix.T) != 0
+
+    assert dag.name == 'learnt'
+    assert DirectedAcyclicGraph.validate_dag_adjacency_matrix(
+        dag.adjacency_matrix)
+    assert search.best_score == pytest.approx(score.score(dag))
+    assert search.best_score >= score.score(true_dag) - 1e-6
+    assert np.array_equal(skeleton, true_skeleton)
+
+
+def test_reachability_is_maintained(data):
+
+    search = HillClimbingSearch(GaussianBICScore(data))
+    search.fit()
+
+    assert search.moves
+    assert np.array_equal(
+        search._reachability,
+        _transitive_closure(search._adjacency_matrix)
+    )
+    assert np.array_equal(
+        HillClimbingSearch.reachability_matrix(search._adjacency_matrix),
+        search._reachability
+    )
+
+
+def test_batched_score_changes_match_local_scores(data):
+
+    score = GaussianBICScore(data)
+    candidates = np.asarray([0, 1, 2, 4, 6, 7])
+    parents = (1, 4, 7)
+
+    np.testing.assert_allclose(
+        score.local_score_changes(5, parents, candidates),
+        DecomposableScore.local_score_changes(score, 5, parents, candidates)
+    )
+
+
+@pytest.mark.parametrize("executor", ['processes', 'thread_pool'])
+def test_executors_give_same_dag(data, executor):
+
+    expected_search = HillClimbingSearch(GaussianBICScore(data))
+    expected_dag = expected_search.fit()
+
+    if executor == 'thread_pool':
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            search = HillClimbingSearch(GaussianBICScore(data),
+                                        executor=pool, nb_workers=2)
+            dag = search.fit()
+    else:
+        search = HillClimbingSearch(GaussianBICScore(data),
+                                    executor=executor, nb_workers=2)
+        dag = search.fit()
+
+    assert np.array_equal(dag.adjacency_matrix, expected_dag.adjacency_matrix)
+    assert search.best_score == pytest.approx(expected_search.best_score)
+
+
+def test_max_parents_and_max_iter(data):
+
+    score = GaussianBICScore(data)
+    dag = HillClimbingSearch(score, max_parents=1).fit()
+    assert dag.in_degrees().max() <= 1
+
+    search = HillClimbingSearch(score, max_iter=3)
+    dag = search.fit()
+    assert len(search.moves) == 3
+    assert np.count_nonzero(dag.adjacency_matrix) == 3
+
+
+def test_tabu_search_does_not_worsen_hill_climbing(data):
+
+    score = GaussianBICScore(data)
+    hill_climbing = HillClimbingSearch(score)
+    hill_climbing.fit()
+    tabu_search = HillClimbingSearch(score, tabu_length=5,
+                                     max_non_improving=5)
+    dag = tabu_search.fit()
+
+    assert tabu_search.best_score >= hill_climbing.best_score - 1e-6
+    assert tabu_search.best_score == pytest.approx(score.score(dag))
+
+
+def test_search_from_initial_dag(data, coefficient_matrix):
+
+    score = GaussianBICScore(data)
+    nb_var = coefficient_matrix.shape[0]
+    # The reversed true DAG
+    initial_dag = DirectedAcyclicGraph(
+        adjacency_matrix=(coefficient_matrix.T != 0).astype(int)
+    )
+    search = HillClimbingSearch(score)
+    dag = search.fit(initial_dag=initial_dag)
+
+    assert search.best_score >= score.score(initial_dag)
+    with pytest.raises(InvalidData):
+        search.fit(initial_dag=DirectedAcyclicGraph(
+            adjacency_matrix=np.zeros((nb_var - 1, nb_var - 1), dtype=int)
+        ))
+    assert DirectedAcyclicGraph.validate_dag_adjacency_matrix(
+        dag.adjacency_matrix)
+
+
+def test_invalid_executor_crashes(data):
+
+    with pytest.raises(InvalidExecutor):
+        HillClimbingSearch(GaussianBICScore(data), executor='threads')
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+import pytest
+
+import StructuralCausalModels
+
+
+# Generous budget (in seconds) for importing the package and its graph and SCM
+# classes, which is dominated by the import of numpy ; importing pandas and
+# scipy as well would take several times as long
+_import_time_budget = 1.0
+
+_import_script = """
+import sys
+import time
+
+start = time.perf_counter()
+import StructuralCausalModels
+from StructuralCausalModels import DirectedAcyclicGraph, \\
+    LinearStructuralCausalModel, load_graph, register_function
+elapsed = time.perf_counter() - start
+
+heavy_modules = sorted(
+    module for module in ('pandas', 'scipy') if module in sys.modules
+)
+print(elapsed)
+print(','.join(heavy_modules))
+"""
+
+
+def _run_import_script():
+
+    # Imports the package from the directory containing it
+    root_directory = os.path.dirname(
+        os.path.dirname(os.path.abspath(StructuralCausalModels.__file__))
+    )
+    result = subprocess.run([sys.executable, '-c', _import_script],
+                            capture_output=True, text=True, check=True,
+                            cwd=root_directory)
+    elapsed, heavy_modules = result.stdout.split('\n')[:2]
+
+    return float(elapsed), heavy_modules
+
+
+def test_import_does_not_load_pandas_or_scipy():
+
+    _, heavy_modules = _run_import_script()
+
+    assert heavy_modules == ''
+
+
+def test_import_time_budget():
+
+    # The best of a few runs, to be robust to a busy machine
+    elapsed = min(_run_import_script()[0] for _ in range(3))
+
+    assert elapsed < _import_time_budget
+
+
+@pytest.mark.parametrize("name", StructuralCausalModels.__all__)
+def test_lazy_attributes(name):
+
+    assert getattr(StructuralCausalModels, name) is not None
+    assert name in dir(StructuralCausalModels)
+
+
+def test_missing_attribute():
+
+    with pytest.raises(AttributeError):
+        StructuralCausalModels.NotAClass
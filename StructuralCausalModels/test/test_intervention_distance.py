@@ -0,0 +1,164 @@
+import itertools
+
+import pytest
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.graph_via_edges import GraphsCannotBeCompared
+from StructuralCausalModels.intervention_distance import \
+    structural_intervention_distance, structural_intervention_distances
+from StructuralCausalModels.structural_causal_model import InvalidExecutor
+
+
+def _descendants(matrix):
+
+    descendants = np.identity(len(matrix), dtype=bool) | (matrix != 0)
+    for _ in range(len(matrix)):
+        descendants |= (descendants.astype(int) @ descendants) > 0
+
+    return descendants
+
+
+def _d_separated(matrix, i, j, conditioning_set):
+
+    # i and j are d-separated if they are separated in the moral graph of the
+    # ancestors of i, j and the conditioning set
+    descendants = _descendants(matrix)
+    ancestors = descendants[:, [i, j] + list(conditioning_set)].any(axis=1)
+    moral = (matrix != 0) & ancestors[:, np.newaxis] & ancestors
+    for k in range(len(matrix)):
+        parents = np.flatnonzero(moral[:, k])
+        moral[np.ix_(parents, parents)] = True
+    moral |= moral.T
+    reached = {i}
+    stack = [i]
+    while stack:
+        for neighbour in np.flatnonzero(moral[stack.pop()]):
+            if neighbour not in reached and neighbour not in conditioning_set:
+                reached.add(neighbour)
+                stack.append(neighbour)
+
+    return j not in reached
+
+
+def _brute_force_sid(true_matrix, estimate):
+
+    descendants = _descendants(true_matrix)
+    sid = 0
+    for i, j in itertools.permutations(range(len(true_matrix)), 2):
+        parents = set(np.flatnonzero(estimate[:, i]))
+        if j in parents:
+            sid += descendants[i, j]
+            continue
+        # The vertices on causal paths from i to j, and their descendants
+        causal = [w for w in range(len(true_matrix))
+                  if w != i and descendants[i, w] and descendants[w, j]]
+        forbidden = descendants[causal].any(axis=0)
+        if any(forbidden[list(parents)]):
+            sid += 1
+            continue
+        # The proper back-door graph
+        backdoor = true_matrix.copy()
+        backdoor[i, causal] = 0
+        sid += not _d_separated(backdoor, i, j, parents)
+
+    return sid
+
+
+def _random_dag(rng, nb_vertices, density):
+
+    upper = np.triu(rng.random((nb_vertices, nb_vertices)) < density, k=1)
+    permutation = rng.permutation(nb_vertices)
+
+    return upper[np.ix_(permutation, permutation)].astype(np.uint8)
+
+
+@pytest.fixture
+def random_pairs():
+
+    rng = np.random.default_rng(0)
+    pairs = []
+    for _ in range(60):
+        nb_vertices = int(rng.integers(2, 8))
+        pairs.append((_random_dag(rng, nb_vertices, rng.uniform(0.1, 0.8)),
+                      _random_dag(rng, nb_vertices, rng.uniform(0.1, 0.8))))
+
+    return pairs
+
+
+def test_sid_matches_brute_force(random_pairs):
+
+    for true_matrix, estimate in random_pairs:
+        true_dag = DirectedAcyclicGraph(true_matrix)
+        assert structural_intervention_distance(true_dag, estimate) == \
+            _brute_force_sid(true_matrix, estimate)
+
+
+def test_known_distances():
+
+    # 0 -> 1 -> 2 with 0 -> 2
+    true_dag = DirectedAcyclicGraph(
+        np.asarray([[0, 1, 1], [0, 0, 1], [0, 0, 0]])
+    )
+    # Every pair of the empty graph is confounded or has a direct effect, but
+    # the interventions on 0 are inferred correctly
+    empty = DirectedAcyclicGraph(np.zeros((3, 3)))
+    # Reversing 1 -> 2 makes 2 a parent of 1 : the effect of 1 on 2 is
+    # missed, and the effect of 2 on 1 is not adjusted for 0
+    reversed_edge = DirectedAcyclicGraph(
+        np.asarray([[0, 1, 1], [0, 0, 0], [0, 1, 0]])
+    )
+
+    assert true_dag.structural_intervention_distance(true_dag) == 0
+    assert true_dag.structural_intervention_distance(empty) == 4
+    assert true_dag.structural_intervention_distance(reversed_edge) == 2
+    # The SID is not symmetric
+    assert empty.structural_intervention_distance(true_dag) == 0
+
+
+def test_markov_equivalent_estimates_can_have_different_distances():
+
+    # The chain 0 -> 1 -> 2 against the Markov equivalent 0 <- 1 -> 2
+    chain = DirectedAcyclicGraph(np.asarray([[0, 1, 0], [0, 0, 1], [0, 0, 0]]))
+    fork = np.asarray([[0, 0, 0], [1, 0, 1], [0, 0, 0]])
+
+    assert chain.structural_intervention_distance(chain) == 0
+    assert chain.structural_hamming_distance(
+        DirectedAcyclicGraph(fork)) == 1
+    assert structural_intervention_distance(chain, fork) == 3
+
+
+@pytest.mark.parametrize("executor", [None, 'processes', 'threads'])
+def test_batch_matches_single_estimates(executor):
+
+    rng = np.random.default_rng(1)
+    true_matrix = _random_dag(rng, 12, 0.3)
+    true_dag = DirectedAcyclicGraph(true_matrix)
+    estimates = np.stack([_random_dag(rng, 12, 0.3) for _ in range(7)])
+    estimates[0] = true_matrix
+    if executor == 'threads':
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            distances = structural_intervention_distances(
+                true_dag, estimates, executor=pool, nb_workers=3
+            )
+    else:
+        distances = structural_intervention_distances(
+            true_dag, list(estimates), executor=executor, nb_workers=2
+        )
+
+    assert distances[0] == 0
+    assert distances == [structural_intervention_distance(true_dag, estimate)
+                         for estimate in estimates]
+
+
+def test_invalid_arguments_crash():
+
+    true_dag = DirectedAcyclicGraph(np.zeros((3, 3)))
+
+    with pytest.raises(GraphsCannotBeCompared):
+        structural_intervention_distance(true_dag, np.zeros((4, 4)))
+    with pytest.raises(InvalidExecutor):
+        structural_intervention_distances(true_dag, [np.zeros((3, 3))],
+                                          executor='threads')
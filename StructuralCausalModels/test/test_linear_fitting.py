@@ -0,0 +1,150 @@
+import pytest
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from scipy.stats import norm
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.linear_fitting import InsufficientData, \
+    InvalidData, LinearStructuralCausalModelFitter, SufficientStatistics
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.structural_causal_model import InvalidExecutor
+
+
+_coefficient_matrix = np.asarray([
+    [0, -2, 4, 2],
+    [0, 0, -8, 0],
+    [0, 0, 0, 0],
+    [0, 0.5, 1.5, 0]
+])
+
+
+@pytest.fixture
+def linear_scm():
+
+    exogenous_variables = [norm(loc=1, scale=2), norm(loc=-1, scale=0.5),
+                           norm(scale=1), norm(loc=3, scale=1.5)]
+
+    return LinearStructuralCausalModel.create_from_coefficient_matrix(
+        matrix=_coefficient_matrix,
+        causal_order=[0, 3, 1, 2],
+        exogenous_variables=exogenous_variables)
+
+
+@pytest.fixture
+def dag():
+
+    return DirectedAcyclicGraph(
+        adjacency_matrix=(_coefficient_matrix != 0).astype(int)
+    )
+
+
+@pytest.fixture
+def data(linear_scm):
+
+    return linear_scm.generate_data(20000, random_state=0)
+
+
+def test_sufficient_statistics_chunks(data):
+
+    statistics = SufficientStatistics(nb_var=4)
+    for start in range(0, len(data), 3000):
+        statistics.update(data.iloc[start:start + 3000])
+    values = data.to_numpy()
+
+    assert statistics.nb_samples == len(data)
+    np.testing.assert_allclose(statistics.means, values.mean(axis=0))
+    np.testing.assert_allclose(statistics.covariance(ddof=1),
+                               np.cov(values, rowvar=False))
+
+    merged = SufficientStatistics.from_data(values[:5000]).merge(
+        SufficientStatistics.from_data(values[5000:])
+    )
+    np.testing.assert_allclose(merged.scatter_matrix,
+                               statistics.scatter_matrix)
+
+
+def test_crash_sufficient_statistics():
+
+    statistics = SufficientStatistics(nb_var=3)
+    with pytest.raises(InvalidData):
+        statistics.update(np.zeros((10, 2)))
+    with pytest.raises(InvalidData):
+        statistics.merge(SufficientStatistics(nb_var=2))
+    with pytest.raises(InsufficientData):
+        statistics.covariance()
+
+
+@pytest.mark.parametrize("executor", [None, 'threads'])
+def test_fit(linear_scm, dag, data, executor):
+
+    fitter = LinearStructuralCausalModelFitter(dag, executor=executor)
+    fitted_scm = fitter.fit(data, name='fitted')
+
+    assert isinstance(fitted_scm, LinearStructuralCausalModel)
+    assert fitted_scm.name == 'fitted'
+    np.testing.assert_allclose(fitted_scm.coefficient_matrix(),
+                               _coefficient_matrix, atol=0.05)
+    np.testing.assert_allclose(fitted_scm.mean(), linear_scm.mean(),
+                               rtol=0.05, atol=0.1)
+    np.testing.assert_allclose(fitted_scm.covariance(),
+                               linear_scm.covariance(), rtol=0.05, atol=0.1)
+
+
+def test_streaming_fit_matches_batch_fit(dag, data):
+
+    fitter = LinearStructuralCausalModelFitter(dag)
+    for start in range(0, len(data), 7000):
+        fitter.partial_fit(data.iloc[start:start + 7000])
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        batch_parameters = LinearStructuralCausalModelFitter(
+            dag, executor=executor
+        ).partial_fit(data).estimate_parameters()
+
+    for streamed, batch in zip(fitter.estimate_parameters(),
+                               batch_parameters):
+        np.testing.assert_allclose(streamed, batch)
+
+
+def test_fit_matches_least_squares(dag, data):
+
+    coefficients, intercepts, variances = LinearStructuralCausalModelFitter(
+        dag
+    ).partial_fit(data).estimate_parameters()
+
+    values = data.to_numpy()
+    design = np.column_stack([np.ones(len(values)), values[:, [0, 3]]])
+    solution, residuals = np.linalg.lstsq(design, values[:, 1],
+                                          rcond=None)[:2]
+    np.testing.assert_allclose(coefficients[[0, 3], 1], solution[1:])
+    assert intercepts[1] == pytest.approx(solution[0])
+    assert variances[1] == pytest.approx(residuals[0] / len(values))
+
+
+def test_collinear_parents():
+
+    dag = DirectedAcyclicGraph(
+        adjacency_matrix=np.asarray([[0, 0, 1], [0, 0, 1], [0, 0, 0]])
+    )
+    x = np.random.default_rng(0).normal(size=100)
+    data = np.column_stack([x, x, 2 * x])
+
+    coefficients, _, variances = LinearStructuralCausalModelFitter(
+        dag
+    ).partial_fit(data).estimate_parameters()
+
+    np.testing.assert_allclose(coefficients[[0, 1], 2], [1, 1])
+    assert variances[2] == pytest.approx(0, abs=1e-12)
+
+
+def test_crash_fitter(dag):
+
+    with pytest.raises(InsufficientData):
+        LinearStructuralCausalModelFitter(dag).estimate_parameters()
+    with pytest.raises(InvalidExecutor):
+        LinearStructuralCausalModelFitter(dag, executor='processes')
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(InvalidExecutor):
+            LinearStructuralCausalModelFitter(dag, executor=executor)
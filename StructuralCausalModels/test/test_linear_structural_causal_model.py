@@ -2,11 +2,14 @@
 import pytest
 import numpy as np
 
-from scipy.stats import randint
+from scipy.stats import randint, norm
 
 from StructuralCausalModels.linear_structural_causal_model import \
     LinearStructuralCausalModel, InvalidWeightedAdjacencyMatrix, \
-    InvalidNumberOfExogenousVariables
+    InvalidNumberOfExogenousVariables, NonLinearStructuralEquation
+from StructuralCausalModels.linear_structural_equation import \
+    LinearStructuralEquation
+from StructuralCausalModels.structural_equation import StructuralEquation
 
 
 _constant_0 = 1
@@ -69,6 +72,30 @@ def linear_scm_data_generation_function(nb_samples, matrix_coefficients,
     return data
 
 
+@pytest.fixture
+def gaussian_exogenous_variables():
+
+    exogenous_variables = [norm(loc=1, scale=1),
+                           norm(loc=0, scale=2),
+                           norm(loc=-1, scale=0.5),
+                           norm(loc=3, scale=1.5)]
+
+    return exogenous_variables
+
+
+@pytest.fixture
+def gaussian_linear_scm(matrix_coefficients, causal_order,
+                        gaussian_exogenous_variables):
+
+    linear_scm = LinearStructuralCausalModel.create_from_coefficient_matrix(
+        name='gaussian linear scm',
+        matrix=matrix_coefficients,
+        causal_order=causal_order,
+        exogenous_variables=gaussian_exogenous_variables)
+
+    return linear_scm
+
+
 @pytest.fixture
 def non_directed_graph_weighted_adjacency_matrix():
 
@@ -121,3 +148,70 @@ def test_incorrect_number_of_exogenous_variables_crashes(matrix_coefficients,
             matrix=matrix_coefficients,
             causal_order=causal_order,
             exogenous_variables=exogenous_variables[:-1])
+
+
+def test_coefficient_matrix(gaussian_linear_scm, matrix_coefficients):
+
+    assert np.equal(gaussian_linear_scm.coefficient_matrix(),
+                    matrix_coefficients).all()
+    sparse_matrix = gaussian_linear_scm.coefficient_matrix(sparse=True)
+    assert np.equal(sparse_matrix.toarray(), matrix_coefficients).all()
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_closed_form_moments(gaussian_linear_scm, matrix_coefficients,
+                             gaussian_exogenous_variables, sparse):
+
+    inverse = np.linalg.inv(np.identity(4) - matrix_coefficients)
+    exogenous_means = np.asarray([u.mean() for u in
+                                  gaussian_exogenous_variables])
+    exogenous_variances = np.asarray([u.var() for u in
+                                      gaussian_exogenous_variables])
+
+    assert np.allclose(gaussian_linear_scm.mean(sparse=sparse),
+                       inverse.T @ exogenous_means)
+    assert np.allclose(gaussian_linear_scm.covariance(sparse=sparse),
+                       inverse.T @ np.diag(exogenous_variances) @ inverse)
+    assert np.allclose(gaussian_linear_scm.total_effects(sparse=sparse),
+                       inverse)
+
+
+def test_closed_form_moments_match_samples(gaussian_linear_scm):
+
+    data = gaussian_linear_scm.generate_data(200000, random_state=0).values
+
+    assert np.allclose(gaussian_linear_scm.mean(), data.mean(axis=0),
+                       atol=0.1)
+    assert np.allclose(gaussian_linear_scm.covariance(), np.cov(data.T),
+                       rtol=0.05, atol=0.2)
+
+
+def test_closed_form_moments_after_hard_intervention(
+        gaussian_linear_scm, matrix_coefficients, gaussian_exogenous_variables):
+
+    equation = LinearStructuralEquation.create_hard_intervention(3, 2.5)
+    intervened_scm = gaussian_linear_scm.perform_intervention(equation)
+
+    intervened_matrix = matrix_coefficients.copy()
+    intervened_matrix[:, 3] = 0
+    inverse = np.linalg.inv(np.identity(4) - intervened_matrix)
+    exogenous_means = np.asarray([u.mean() for u in
+                                  gaussian_exogenous_variables])
+    exogenous_means[3] = 2.5
+    exogenous_variances = np.asarray([u.var() for u in
+                                      gaussian_exogenous_variables])
+    exogenous_variances[3] = 0
+
+    assert np.allclose(intervened_scm.mean(), inverse.T @ exogenous_means)
+    assert np.allclose(intervened_scm.covariance(),
+                       inverse.T @ np.diag(exogenous_variances) @ inverse)
+    assert np.allclose(intervened_scm.generate_data(10).loc[:, 3], 2.5)
+
+
+def test_moments_of_non_linear_equations_crash(gaussian_linear_scm):
+
+    equation = StructuralEquation(3, [0], norm(), lambda u, x: u + x ** 2)
+    intervened_scm = gaussian_linear_scm.perform_intervention(equation)
+
+    with pytest.raises(NonLinearStructuralEquation):
+        intervened_scm.covariance()
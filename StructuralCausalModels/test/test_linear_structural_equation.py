@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+
+from scipy.stats import randint
+
+from StructuralCausalModels.linear_structural_equation import \
+    LinearStructuralEquation, InvalidLinearStructuralEquation
+
+
+def test_linear_structural_equation():
+
+    equation = LinearStructuralEquation(index_lhs=2,
+                                        indices_rhs=[0, 1],
+                                        coefficients=[2, -3],
+                                        exogenous_variable=randint(1, 2))
+    values = np.asarray([[1., 2., np.nan],
+                         [0., -1., np.nan]])
+
+    actual = equation.compute(values, equation.generate_noise(2))
+
+    assert np.equal(actual, np.asarray([-3., 4.])).all()
+
+
+def test_hard_intervention():
+
+    equation = LinearStructuralEquation.create_hard_intervention(1, -0.5)
+
+    actual = equation.compute(np.empty((5, 2)), equation.generate_noise(5))
+
+    assert equation.indices_rhs == []
+    assert np.equal(actual, -0.5).all()
+
+
+def test_mismatched_coefficients_crash():
+
+    with pytest.raises(InvalidLinearStructuralEquation):
+        LinearStructuralEquation(index_lhs=2,
+                                 indices_rhs=[0, 1],
+                                 coefficients=[2],
+                                 exogenous_variable=randint(1, 2))
+
+
+def test_kernel_matches_function():
+
+    equation = LinearStructuralEquation(index_lhs=0,
+                                        indices_rhs=[3, 1, 2],
+                                        coefficients=[0.5, -1, 2],
+                                        exogenous_variable=randint(0, 1))
+    values = np.random.default_rng(0).normal(size=(50, 4))
+    noise = np.arange(50.)
+
+    expected = (noise + 0.5 * values[:, 3] - values[:, 1] +
+                2 * values[:, 2])
+
+    assert np.allclose(equation.compute(values, noise), expected)
+    assert np.allclose(equation.function(noise, values[:, 3], values[:, 1],
+                                         values[:, 2]),
+                       expected)
@@ -0,0 +1,133 @@
+import itertools
+import math
+
+import pytest
+import numpy as np
+
+from scipy.sparse import csr_matrix
+
+from StructuralCausalModels.cpdag import dag_to_cpdag
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.markov_equivalence import \
+    consistent_extensions, InvalidCPDAG, markov_equivalence_class_size
+
+
+def _undirected(nb_vertices, edges):
+
+    matrix = np.zeros((nb_vertices, nb_vertices), dtype=np.uint8)
+    for source, target in edges:
+        matrix[source, target] = matrix[target, source] = 1
+
+    return Graph(matrix)
+
+
+def _brute_force_size(cpdag):
+
+    # The orientations of the skeleton along every permutation of the vertices
+    # whose CPDAG is the CPDAG
+    matrix = cpdag.adjacency_matrix != 0
+    skeleton = matrix | matrix.T
+    nb_vertices = len(matrix)
+    dags = set()
+    for permutation in itertools.permutations(range(nb_vertices)):
+        position = np.empty(nb_vertices, dtype=int)
+        position[list(permutation)] = np.arange(nb_vertices)
+        dag = skeleton & (position[:, np.newaxis] < position[np.newaxis, :])
+        dag = DirectedAcyclicGraph(dag.astype(np.uint8), validate=False)
+        if np.array_equal(dag_to_cpdag(dag).adjacency_matrix,
+                          cpdag.adjacency_matrix):
+            dags.add(dag.adjacency_matrix.tobytes())
+
+    return len(dags)
+
+
+@pytest.fixture
+def random_cpdags():
+
+    rng = np.random.default_rng(0)
+    cpdags = []
+    for _ in range(40):
+        nb_vertices = int(rng.integers(3, 7))
+        upper = np.triu(rng.random((nb_vertices, nb_vertices)) <
+                        rng.uniform(0.2, 0.9), k=1)
+        permutation = rng.permutation(nb_vertices)
+        matrix = upper[np.ix_(permutation, permutation)].astype(np.uint8)
+        cpdags.append(dag_to_cpdag(DirectedAcyclicGraph(matrix)))
+
+    return cpdags
+
+
+@pytest.mark.parametrize("nb_vertices,edges,expected", [
+    # A clique
+    (4, itertools.combinations(range(4), 2), 24),
+    # A tree
+    (5, [(0, 1), (1, 2), (1, 3), (3, 4)], 5),
+    # Two triangles sharing an edge
+    (4, [(0, 1), (0, 2), (1, 2), (1, 3), (2, 3)], 10),
+    # Two components, multiplied
+    (6, [(0, 1), (1, 2), (3, 4), (4, 5), (3, 5)], 18),
+])
+def test_known_sizes(nb_vertices, edges, expected):
+
+    cpdag = _undirected(nb_vertices, edges)
+    dags = list(consistent_extensions(cpdag))
+
+    assert markov_equivalence_class_size(cpdag) == expected
+    assert len(dags) == expected
+    assert len({dag.adjacency_matrix.tobytes() for dag in dags}) == expected
+
+
+def test_sizes_match_brute_force(random_cpdags):
+
+    for cpdag in random_cpdags:
+        assert markov_equivalence_class_size(cpdag) == \
+            _brute_force_size(cpdag)
+
+
+def test_extensions_are_markov_equivalent(random_cpdags):
+
+    for cpdag in random_cpdags:
+        dags = list(consistent_extensions(cpdag))
+        assert len(dags) == markov_equivalence_class_size(cpdag)
+        assert len({dag.adjacency_matrix.tobytes() for dag in dags}) == \
+            len(dags)
+        for dag in dags:
+            assert isinstance(dag, DirectedAcyclicGraph)
+            assert DirectedAcyclicGraph.validate_dag_adjacency_matrix(
+                dag.adjacency_matrix)
+            assert np.array_equal(dag_to_cpdag(dag).adjacency_matrix,
+                                  cpdag.adjacency_matrix)
+
+
+def test_extensions_are_lazy():
+
+    # A clique of 12 vertices has 12! orientations
+    cpdag = _undirected(12, itertools.combinations(range(12), 2))
+    dags = list(itertools.islice(consistent_extensions(cpdag), 5))
+
+    assert len({dag.adjacency_matrix.tobytes() for dag in dags}) == 5
+    assert markov_equivalence_class_size(cpdag) == math.factorial(12)
+
+
+def test_directed_cpdag_and_sparse_cpdag():
+
+    dag = DirectedAcyclicGraph(np.asarray([[0, 1, 0], [0, 0, 0], [0, 1, 0]]))
+    cpdag = dag_to_cpdag(dag)
+    sparse_cpdag = Graph(csr_matrix(_undirected(
+        5, [(0, 1), (0, 2), (1, 2), (2, 3), (3, 4)]).adjacency_matrix))
+
+    assert markov_equivalence_class_size(cpdag) == 1
+    assert [np.array_equal(extension.adjacency_matrix, dag.adjacency_matrix)
+            for extension in consistent_extensions(cpdag)] == [True]
+    assert markov_equivalence_class_size(sparse_cpdag) == \
+        len(list(consistent_extensions(sparse_cpdag))) == 10
+
+
+def test_non_chordal_component_crashes():
+
+    # A cycle of length 4 is not chordal
+    with pytest.raises(InvalidCPDAG):
+        markov_equivalence_class_size(
+            _undirected(4, [(0, 1), (1, 2), (2, 3), (3, 0)])
+        )
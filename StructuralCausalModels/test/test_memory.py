@@ -0,0 +1,93 @@
+import sys
+import pytest
+import numpy as np
+import scipy.sparse
+
+from StructuralCausalModels.graph_via_adjacency_lists import \
+    GraphViaAdjacencyLists
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    GraphViaAdjacencyMatrix
+from StructuralCausalModels.graph_via_edges import EdgeType, GraphViaEdges
+from StructuralCausalModels.memory import deep_sizeof
+
+
+def test_deep_sizeof_containers():
+
+    items = [1000, 2000]
+    container = {'a': items, 'b': (items, 'abc')}
+
+    expected = (sys.getsizeof(container) + sys.getsizeof('a') +
+                sys.getsizeof('b') + sys.getsizeof(items) +
+                sys.getsizeof(1000) + sys.getsizeof(2000) +
+                sys.getsizeof((items, 'abc')) + sys.getsizeof('abc'))
+
+    # The list shared between the entries is counted once
+    assert deep_sizeof(container) == expected
+
+
+def test_deep_sizeof_shared_objects_not_counted():
+
+    edges = {(0, 1): EdgeType.FORWARD}
+
+    assert deep_sizeof(edges) == (sys.getsizeof(edges) +
+                                  deep_sizeof((0, 1)))
+    assert deep_sizeof(None) == 0
+    assert deep_sizeof(test_deep_sizeof_containers) == 0
+    assert deep_sizeof(len) == 0
+
+
+def test_deep_sizeof_arrays():
+
+    array = np.zeros(1000)
+
+    assert deep_sizeof(array) >= array.nbytes
+    # A view holds the data of its base
+    assert deep_sizeof(array[10:]) >= array.nbytes
+    assert deep_sizeof([array, array[10:]]) < 2 * array.nbytes
+    sparse_matrix = scipy.sparse.csr_matrix(np.eye(100))
+    assert deep_sizeof(sparse_matrix) >= (sparse_matrix.data.nbytes +
+                                          sparse_matrix.indices.nbytes +
+                                          sparse_matrix.indptr.nbytes)
+
+
+def test_deep_sizeof_seen():
+
+    items = [1000, 2000]
+    seen = set()
+
+    assert deep_sizeof(items, seen) > 0
+    assert deep_sizeof(items, seen) == 0
+
+
+def test_memory_usage_representations(tmp_path):
+
+    matrix = np.ones((50, 50), dtype=np.uint8)
+    np.fill_diagonal(matrix, 0)
+
+    adjacency_matrix_usage = GraphViaAdjacencyMatrix(matrix).memory_usage()
+    assert adjacency_matrix_usage >= matrix.nbytes
+
+    path = str(tmp_path / 'matrix.npy')
+    np.save(path, matrix)
+    memory_mapped_usage = GraphViaAdjacencyMatrix(
+        np.load(path, mmap_mode='r')
+    ).memory_usage()
+    assert memory_mapped_usage < matrix.nbytes
+
+    adjacency_lists = [[j for j in range(50) if j != i] for i in range(50)]
+    lists_usage = GraphViaAdjacencyLists(50, adjacency_lists).memory_usage()
+    assert lists_usage > 50 * 49 * 8
+
+    edges = {(i, j): EdgeType.UNDIRECTED if i != j else EdgeType.NONE
+             for i in range(50) for j in range(i, 50)}
+    edges_usage = GraphViaEdges(edges).memory_usage()
+    assert edges_usage > 10 * adjacency_matrix_usage
+
+
+@pytest.mark.parametrize("nb_vertices", [1, 10])
+def test_memory_usage_empty_lists(nb_vertices):
+
+    graph = GraphViaAdjacencyLists(nb_vertices,
+                                   [[] for _ in range(nb_vertices)])
+
+    assert graph.memory_usage() >= nb_vertices * sys.getsizeof([])
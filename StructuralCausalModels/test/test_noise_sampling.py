@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+
+from scipy.stats import norm, t, randint, rv_discrete
+
+from StructuralCausalModels.noise_sampling import NoiseSamplingPlan
+from StructuralCausalModels.structural_equation import StructuralEquation
+
+
+@pytest.fixture
+def structural_equations():
+
+    exogenous_variables = [
+        norm(loc=1, scale=2),
+        t(df=10),
+        norm(loc=-5, scale=0.1),
+        randint(low=3, high=4),
+        t(df=5, loc=1),
+        rv_discrete(values=([0.5], [1.0])),
+        norm()
+    ]
+    equations = [StructuralEquation(i, [], u, lambda v: v) for i, u in
+                 enumerate(exogenous_variables)]
+
+    return equations
+
+
+def test_grouping(structural_equations):
+
+    plan = NoiseSamplingPlan(structural_equations)
+
+    groups = {(distribution.name, shapes): indices.tolist() for
+              distribution, shapes, indices, _, _ in plan.groups}
+
+    assert groups == {('norm', ()): [0, 2, 6],
+                      ('t', (10.,)): [1],
+                      ('randint', (3., 4.)): [3],
+                      ('t', (5.,)): [4]}
+    assert [eqn.index_lhs for eqn in plan.ungrouped_equations] == [5]
+
+
+def test_draw(structural_equations):
+
+    plan = NoiseSamplingPlan(structural_equations)
+
+    noise = plan.draw(nb_samples=100000, nb_var=7, random_state=0)
+
+    assert noise.shape == (100000, 7)
+    assert np.allclose(noise.mean(axis=0)[[0, 2, 6]], [1, -5, 0], atol=0.05)
+    assert np.allclose(noise.std(axis=0)[[0, 2, 6]], [2, 0.1, 1], rtol=0.05)
+    assert np.equal(noise[:, 3], 3).all()
+    assert np.equal(noise[:, 5], 0.5).all()
+
+
+def test_draw_is_reproducible(structural_equations):
+
+    plan = NoiseSamplingPlan(structural_equations)
+
+    noise_1 = plan.draw(nb_samples=10, nb_var=7, random_state=42)
+    noise_2 = plan.draw(nb_samples=10, nb_var=7, random_state=42)
+
+    assert np.equal(noise_1, noise_2).all()
@@ -0,0 +1,40 @@
+import pytest
+import numpy as np
+
+from StructuralCausalModels.orientation import apply_meek_rules
+
+
+def _matrix(nb_vertices, directed_edges, undirected_edges):
+
+    matrix = np.zeros((nb_vertices, nb_vertices), dtype=int)
+    for source, target in directed_edges:
+        matrix[source, target] = 1
+    for source, target in undirected_edges:
+        matrix[source, target] = matrix[target, source] = 1
+
+    return matrix
+
+
+@pytest.mark.parametrize("nb_vertices,directed,undirected,expected", [
+    # R1 : 0 -> 1 - 2 gives 1 -> 2, and then 2 -> 3
+    (4, [(0, 1)], [(1, 2), (2, 3)], [(0, 1), (1, 2), (2, 3)]),
+    # R2 : 0 -> 1 -> 2 and 0 - 2 gives 0 -> 2
+    (3, [(0, 1), (1, 2)], [(0, 2)], [(0, 1), (1, 2), (0, 2)]),
+    # R3 : 0 - 1 -> 3, 0 - 2 -> 3 and 0 - 3 gives 0 -> 3
+    (4, [(1, 3), (2, 3)], [(0, 1), (0, 2), (0, 3)],
+     [(1, 3), (2, 3), (0, 3), (0, 1), (1, 0), (0, 2), (2, 0)]),
+])
+def test_meek_rules(nb_vertices, directed, undirected, expected):
+
+    matrix = apply_meek_rules(_matrix(nb_vertices, directed, undirected))
+
+    assert matrix.dtype == np.uint8
+    assert np.array_equal(matrix, _matrix(nb_vertices, expected, []))
+
+
+def test_undirected_graph_is_unchanged():
+
+    # A chain and a triangle have no compelled edge
+    matrix = _matrix(6, [], [(0, 1), (1, 2), (3, 4), (4, 5), (3, 5)])
+
+    assert np.array_equal(apply_meek_rules(matrix), matrix)
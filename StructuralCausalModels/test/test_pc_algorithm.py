@@ -0,0 +1,159 @@
+import pytest
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+
+from scipy.stats import norm
+
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_via_edges import EdgeType
+from StructuralCausalModels.linear_fitting import InsufficientData
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.pc_algorithm import FisherZTest, PCAlgorithm
+from StructuralCausalModels.scores import InvalidCacheSize
+from StructuralCausalModels.structural_causal_model import InvalidExecutor
+
+
+@pytest.fixture
+def coefficient_matrix():
+
+    matrix = np.zeros((8, 8))
+    for source, target, weight in [(0, 1, 1.5), (0, 2, -1), (1, 3, 1),
+                                   (2, 3, 1.2), (3, 4, -0.8), (5, 4, 1),
+                                   (4, 6, 1.5), (7, 6, -1)]:
+        matrix[source, target] = weight
+
+    return matrix
+
+
+@pytest.fixture
+def data(coefficient_matrix):
+
+    nb_var = coefficient_matrix.shape[0]
+    linear_scm = LinearStructuralCausalModel.create_from_coefficient_matrix(
+        matrix=coefficient_matrix,
+        causal_order=list(range(nb_var)),
+        exogenous_variables=[norm() for _ in range(nb_var)])
+
+    return linear_scm.generate_data(5000, random_state=0).to_numpy()
+
+
+@pytest.fixture
+def cpdag():
+
+    # The v-structures 1 -> 3 <- 2, 3 -> 4 <- 5 and 4 -> 6 <- 7 are compelled,
+    # the edges out of 0 are reversible
+    matrix = np.zeros((8, 8), dtype=int)
+    for source, target in [(0, 1), (1, 0), (0, 2), (2, 0), (1, 3), (2, 3),
+                           (3, 4), (5, 4), (4, 6), (7, 6)]:
+        matrix[source, target] = 1
+
+    return matrix
+
+
+def test_pc_learns_cpdag(data, cpdag):
+
+    learner = PCAlgorithm(data)
+    graph = learner.fit(name='learnt')
+
+    assert isinstance(graph, Graph)
+    assert graph.name == 'learnt'
+    assert np.array_equal(graph.adjacency_matrix, cpdag)
+    matrix = graph.adjacency_matrix
+    assert Graph.compute_edge_type(matrix[0, 1], matrix[1, 0]) == \
+        EdgeType.UNDIRECTED
+    assert Graph.compute_edge_type(matrix[1, 3], matrix[3, 1]) == \
+        EdgeType.FORWARD
+    assert learner.separating_sets[(1, 2)] == (0,)
+    assert learner.separating_sets[(0, 3)] == (1, 2)
+
+
+@pytest.mark.parametrize("executor,batch_size", [
+    (None, 1), (None, 7), ('processes', 16), ('threads', 5)
+])
+def test_result_does_not_depend_on_batches(data, cpdag, executor,
+                                           batch_size):
+
+    reference = PCAlgorithm(data)
+    reference.fit()
+    if executor == 'threads':
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            learner = PCAlgorithm(data, batch_size=batch_size, executor=pool,
+                                  nb_workers=2)
+            graph = learner.fit()
+    else:
+        learner = PCAlgorithm(data, batch_size=batch_size, executor=executor,
+                              nb_workers=2)
+        graph = learner.fit()
+
+    assert np.array_equal(graph.adjacency_matrix, cpdag)
+    assert learner.separating_sets == reference.separating_sets
+
+
+def test_max_conditioning_set_size(data):
+
+    learner = PCAlgorithm(data, max_conditioning_set_size=0)
+    learner.fit()
+
+    assert all(len(separating_set) == 0
+               for separating_set in learner.separating_sets.values())
+    # 0 and 3 are only separated by {1, 2}
+    assert learner.skeleton[0, 3] == 1
+
+
+def test_p_values_match_partial_correlations(data):
+
+    test = FisherZTest(data)
+    rng = np.random.default_rng(0)
+    for i, j, conditioning_set in [(0, 3, (1, 2)), (1, 2, ()), (4, 6, (3,)),
+                                   (5, 7, (4, 6, 0))]:
+        residuals = []
+        for k in (i, j):
+            design = np.column_stack([np.ones(len(data)),
+                                      data[:, list(conditioning_set)]])
+            weights = np.linalg.lstsq(design, data[:, k], rcond=None)[0]
+            residuals.append(data[:, k] - design @ weights)
+        partial_correlation = np.corrcoef(*residuals)[0, 1]
+        statistic = np.sqrt(len(data) - len(conditioning_set) - 3) * \
+            np.abs(np.arctanh(partial_correlation))
+        conditioning_set = tuple(rng.permutation(conditioning_set))
+
+        assert test.p_value(i, j, conditioning_set) == \
+            pytest.approx(2 * norm.sf(statistic), rel=1e-6, abs=1e-300)
+        assert test.p_value(j, i, conditioning_set) == \
+            test.p_value(i, j, conditioning_set)
+
+
+def test_cache_is_reused(data):
+
+    test = FisherZTest(data, cache_size=4)
+    test.p_values([(0, 1, ()), (1, 0, ()), (0, 2, (1,)), (0, 2, (1,))])
+
+    assert test.cache_info() == {'hits': 0, 'misses': 2, 'size': 2,
+                                 'max_size': 4}
+
+    learner = PCAlgorithm(test)
+    learner.fit()
+    nb_misses = test.nb_misses
+    learner.fit()
+
+    assert test.nb_misses - nb_misses < nb_misses
+    assert test.cache_info()['size'] == 4
+
+
+def test_not_enough_samples(data):
+
+    test = FisherZTest(data[:5])
+
+    assert np.isnan(test.p_value(0, 1, (2, 3)))
+    with pytest.raises(InsufficientData):
+        FisherZTest(data[:1])
+
+
+def test_invalid_arguments_crash(data):
+
+    with pytest.raises(InvalidExecutor):
+        PCAlgorithm(data, executor='threads')
+    with pytest.raises(InvalidCacheSize):
+        FisherZTest(data, cache_size=0)
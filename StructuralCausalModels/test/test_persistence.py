@@ -0,0 +1,288 @@
+import io
+import pytest
+import numpy as np
+
+from scipy.sparse import issparse
+from scipy.stats import norm, t
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.directed_graph import DirectedGraph
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_via_adjacency_matrix import \
+    InvalidAdjacencyMatrix
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.linear_structural_equation import \
+    LinearStructuralEquation
+from StructuralCausalModels.persistence import _compute_checksum, \
+    InvalidFile, UnsupportedExogenousVariable, load_graph, load_graph_csr, \
+    load_linear_structural_causal_model, save_graph, save_graph_csr, \
+    save_linear_structural_causal_model
+from StructuralCausalModels.structural_causal_model import CyclicityWarning
+
+
+@pytest.fixture
+def linear_scm():
+
+    matrix = np.asarray([
+        [0, -2, 4, 2],
+        [0, 0, -8, 0],
+        [0, 0, 0, 0],
+        [0, 0.5, 1.5, 0]
+    ])
+    exogenous_variables = [norm(loc=1, scale=2), t(df=4)] + [norm()] * 2
+
+    return LinearStructuralCausalModel.create_from_coefficient_matrix(
+        name='linear scm',
+        matrix=matrix,
+        causal_order=[0, 3, 1, 2],
+        exogenous_variables=exogenous_variables)
+
+
+def _round_trip(save, load, obj):
+
+    file = io.BytesIO()
+    save(file, obj)
+    file.seek(0)
+
+    return load(file)
+
+
+def _tamper(save, obj, key, value):
+    """Saves an object and overwrites one of the arrays of the file."""
+
+    file = io.BytesIO()
+    save(file, obj)
+    file.seek(0)
+    with np.load(file) as npz_file:
+        contents = {k: npz_file[k] for k in npz_file.files}
+    contents[key] = value
+    tampered_file = io.BytesIO()
+    np.savez(tampered_file, **contents)
+    tampered_file.seek(0)
+
+    return tampered_file
+
+
+def test_checksum_of_non_contiguous_arrays():
+
+    matrix = np.arange(12, dtype=np.int32).reshape(3, 4)
+    checksum = _compute_checksum({'a': matrix.T, 'b': np.zeros((0, 3))}, '')
+
+    assert checksum == _compute_checksum(
+        {'a': matrix.T.copy(), 'b': np.zeros((0, 3))}, ''
+    )
+    assert checksum != _compute_checksum(
+        {'a': matrix.T.copy()[::-1], 'b': np.zeros((0, 3))}, ''
+    )
+
+
+@pytest.mark.parametrize(
+    "graph_class,matrix",
+    [
+        (Graph, np.asarray([[0, 1, 0], [1, 0, 1], [0, 1, 0]])),
+        (DirectedGraph, np.asarray([[0, 1, 0], [0, 0, 1], [1, 0, 0]])),
+        (DirectedAcyclicGraph, np.asarray([[0, 0, 1], [1, 0, 1], [0, 0, 0]])),
+        (DirectedAcyclicGraph, np.zeros((0, 0))),
+    ]
+)
+def test_graph_round_trip(graph_class, matrix):
+
+    graph = graph_class(adjacency_matrix=matrix, name='g')
+    loaded_graph = _round_trip(save_graph, load_graph, graph)
+
+    assert type(loaded_graph) is graph_class
+    assert loaded_graph.name == 'g'
+    assert issparse(loaded_graph.adjacency_matrix)
+    np.testing.assert_array_equal(loaded_graph.adjacency_matrix.toarray(),
+                                  matrix)
+
+
+def test_dag_causal_order_reused():
+
+    dag = DirectedAcyclicGraph(
+        adjacency_matrix=np.asarray([[0, 0, 1], [1, 0, 1], [0, 0, 0]])
+    )
+    loaded_dag = _round_trip(save_graph, load_graph, dag)
+
+    assert loaded_dag._cache['causal_order'] == [1, 0, 2]
+    assert loaded_dag.compute_causal_order() == [1, 0, 2]
+
+
+def test_tampered_graph_validated():
+
+    dag = DirectedAcyclicGraph(
+        adjacency_matrix=np.asarray([[0, 0, 1], [1, 0, 1], [0, 0, 0]])
+    )
+    # Replaces the edge 0 -> 2 by the edge 0 -> 1, which creates a cycle
+    file = _tamper(save_graph, dag, 'indices', np.asarray([1, 0, 2]))
+    with pytest.raises(InvalidAdjacencyMatrix):
+        load_graph(file)
+
+
+def test_malformed_graph():
+
+    dag = DirectedAcyclicGraph(
+        adjacency_matrix=np.asarray([[0, 0, 1], [1, 0, 1], [0, 0, 0]])
+    )
+    file = _tamper(save_graph, dag, 'indices', np.asarray([2, 0, 2, 1]))
+    with pytest.raises(InvalidFile):
+        load_graph(file)
+    file = _tamper(save_graph, dag, 'indices', np.asarray([2, 0, 3]))
+    with pytest.raises(InvalidFile):
+        load_graph(file)
+
+
+@pytest.mark.parametrize("block_size", [None, 1, 2])
+def test_graph_csr_round_trip(tmp_path, block_size):
+
+    matrix = np.asarray([[0, 0, 1, 1], [1, 0, 1, 0], [0, 0, 0, 0],
+                         [0, 0, 1, 0]])
+    dag = DirectedAcyclicGraph(adjacency_matrix=matrix, name='dag')
+    save_graph_csr(str(tmp_path), dag, block_size=block_size)
+
+    loaded_dag = load_graph_csr(str(tmp_path))
+
+    assert type(loaded_dag) is DirectedAcyclicGraph
+    assert loaded_dag.name == 'dag'
+    # The arrays are memory-mapped rather than copied
+    assert not loaded_dag.adjacency_matrix.indices.flags.owndata
+    np.testing.assert_array_equal(loaded_dag.adjacency_matrix.toarray(),
+                                  matrix)
+    assert loaded_dag.compute_causal_order() == [1, 0, 3, 2]
+    assert loaded_dag.structural_hamming_distance(dag) == 0
+    # The loaded graph can be saved again, e.g. in the .npz format
+    assert _round_trip(save_graph, load_graph, loaded_dag).\
+        structural_hamming_distance(dag) == 0
+
+
+def test_invalid_graph_csr(tmp_path):
+
+    save_graph_csr(str(tmp_path),
+                   DirectedGraph(np.asarray([[0, 1], [0, 0]])))
+    np.save(str(tmp_path / 'indices.npy'), np.asarray([0], dtype=np.int32))
+
+    with pytest.raises(InvalidAdjacencyMatrix):
+        load_graph_csr(str(tmp_path))
+    with pytest.raises(InvalidFile):
+        load_graph_csr(str(tmp_path / 'missing'))
+
+
+def test_wrong_kind(linear_scm):
+
+    file = io.BytesIO()
+    save_linear_structural_causal_model(file, linear_scm)
+    file.seek(0)
+    with pytest.raises(InvalidFile):
+        load_graph(file)
+
+
+def test_linear_scm_round_trip(linear_scm):
+
+    loaded_scm = _round_trip(save_linear_structural_causal_model,
+                             load_linear_structural_causal_model,
+                             linear_scm)
+
+    assert loaded_scm.name == 'linear scm'
+    np.testing.assert_array_equal(loaded_scm.coefficient_matrix(),
+                                  linear_scm.coefficient_matrix())
+    assert loaded_scm.compute_causal_order() == \
+        linear_scm.compute_causal_order()
+    assert loaded_scm.compute_topological_generations() == \
+        linear_scm.compute_topological_generations()
+
+    noise = linear_scm.generate_noise(100, random_state=0)
+    np.testing.assert_array_equal(loaded_scm.generate_noise(100,
+                                                            random_state=0),
+                                  noise)
+    np.testing.assert_allclose(loaded_scm.generate_data(100, noise=noise),
+                               linear_scm.generate_data(100, noise=noise))
+
+
+def test_hard_intervention_round_trip(linear_scm):
+
+    intervened_scm = linear_scm.perform_intervention(
+        LinearStructuralEquation.create_hard_intervention(index_lhs=1,
+                                                          value=3.0)
+    )
+    loaded_scm = _round_trip(save_linear_structural_causal_model,
+                             load_linear_structural_causal_model,
+                             intervened_scm)
+
+    data = loaded_scm.generate_data(10, random_state=0)
+    np.testing.assert_array_equal(data[1], 3.0)
+
+
+def test_tampered_linear_scm_validated(linear_scm):
+
+    coefficients = linear_scm.to_arrays()['coefficients']
+    file = _tamper(save_linear_structural_causal_model, linear_scm,
+                   'coefficients', 2 * coefficients)
+
+    # The checksum does not match but the linear SCM is still valid
+    loaded_scm = load_linear_structural_causal_model(file)
+    np.testing.assert_array_equal(loaded_scm.coefficient_matrix(),
+                                  2 * linear_scm.coefficient_matrix())
+
+
+def test_tampered_cyclic_linear_scm(linear_scm):
+
+    # Swaps the parents 3 and 1 of X_2, so that X_3 := ... X_1 and
+    # X_1 := ... X_3 form a cycle
+    representation = linear_scm.to_arrays()
+    file = _tamper(save_linear_structural_causal_model, linear_scm,
+                   'indices_rhs', representation['indices_rhs'][::-1].copy())
+    with pytest.raises(CyclicityWarning):
+        load_linear_structural_causal_model(file)
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ('indices_rhs', [1, 2, 7, 2]),
+        ('indices_lhs', [-1, 1, 2, 3]),
+        ('indptr', [0, 3, 4, 4, 5]),
+        ('exogenous_indices', [0, 1, 2, 9]),
+        ('causal_order', [0, 0, 1, 2]),
+    ]
+)
+def test_malformed_linear_scm(linear_scm, key, value):
+
+    file = _tamper(save_linear_structural_causal_model, linear_scm, key,
+                   np.asarray(value))
+    with pytest.raises(InvalidFile):
+        load_linear_structural_causal_model(file)
+
+
+def test_numpy_distribution_parameters(linear_scm):
+
+    scm = linear_scm.perform_intervention(
+        LinearStructuralEquation(index_lhs=0,
+                                 indices_rhs=[],
+                                 coefficients=[],
+                                 exogenous_variable=t(np.int64(3),
+                                                      scale=np.float32(2)))
+    )
+    loaded_scm = _round_trip(save_linear_structural_causal_model,
+                             load_linear_structural_causal_model, scm)
+
+    exogenous_variable = loaded_scm.structural_equations[0].exogenous_variable
+    assert exogenous_variable.args == (3,)
+    assert exogenous_variable.kwds == {'scale': 2.0}
+
+
+def test_unsupported_exogenous_variable(linear_scm):
+
+    class Noise:
+
+        def rvs(self, size=None, random_state=None):
+            return np.zeros(size)
+
+    scm = linear_scm.perform_intervention(
+        LinearStructuralEquation(index_lhs=0,
+                                 indices_rhs=[],
+                                 coefficients=[],
+                                 exogenous_variable=Noise())
+    )
+    with pytest.raises(UnsupportedExogenousVariable):
+        save_linear_structural_causal_model(io.BytesIO(), scm)
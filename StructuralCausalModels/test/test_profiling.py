@@ -0,0 +1,111 @@
+import time
+import pytest
+import numpy as np
+
+from scipy.stats import norm, t
+
+from StructuralCausalModels.profiling import EquationProfile, \
+    InvalidProfilingStage, SamplingProfiler
+from StructuralCausalModels.structural_causal_model import \
+    StructuralCausalModel
+from StructuralCausalModels.structural_equation import StructuralEquation
+
+
+class _ListNoise:
+    """An exogenous variable which is not a frozen scipy.stats distribution."""
+
+    def rvs(self, size=None, random_state=None):
+        return np.ones(size)
+
+
+@pytest.fixture
+def scm():
+
+    def slow_function(u, x):
+        time.sleep(0.05)
+        return u + x
+
+    equations = [
+        StructuralEquation(0, [], norm(), lambda u: u),
+        StructuralEquation(1, [0], norm(scale=2), slow_function),
+        StructuralEquation(2, [0, 1], t(df=3), lambda u, x, y: u + x - y),
+        StructuralEquation(3, [2], _ListNoise(), lambda u, x: u * x),
+    ]
+
+    return StructuralCausalModel(nb_var=4, structural_equations=equations)
+
+
+@pytest.mark.parametrize("executor", [None, 'threads'])
+def test_generate_data_profiled(scm, executor):
+
+    nb_samples = 100
+    profiler = SamplingProfiler()
+
+    scm.generate_data(nb_samples, random_state=0, executor=executor,
+                      profiler=profiler)
+    report = profiler.report()
+
+    assert [profile['index_lhs'] for profile in report][0] == 1
+    assert report[0]['function_time'] >= 0.05
+    assert sorted(profiler.profiles.keys()) == [0, 1, 2, 3]
+    for profile in report:
+        assert profile['nb_calls'] == 1
+        assert profile['noise_bytes'] == 8 * nb_samples
+        assert profile['function_bytes'] == 8 * nb_samples
+        assert profile['total_time'] == pytest.approx(
+            profile['noise_time'] + profile['function_time'] +
+            profile['write_time']
+        )
+        assert profile['noise_time'] > 0
+    assert profiler.dataframe_time > 0
+
+
+def test_profiling_does_not_change_samples(scm):
+
+    data = scm.generate_data(50, random_state=1)
+    profiled_data = scm.generate_data(50, random_state=1,
+                                      profiler=SamplingProfiler())
+
+    np.testing.assert_array_equal(data.values, profiled_data.values)
+
+
+def test_callback_and_accumulation(scm):
+
+    measurements = []
+    profiler = SamplingProfiler(
+        callback=lambda *measurement: measurements.append(measurement)
+    )
+
+    noise = scm.generate_noise(10, random_state=0)
+    scm.generate_data(10, noise=noise, profiler=profiler)
+    scm.generate_data(10, noise=noise, profiler=profiler)
+
+    # No noise is drawn when it is provided
+    assert sorted({stage for _, stage, _, _ in measurements}) == \
+        ['function', 'write']
+    assert len(measurements) == 2 * 2 * 4
+    assert all(profile.nb_calls == 2 for profile in profiler.profiles.values())
+
+    profiler.reset()
+    assert profiler.profiles == dict()
+    assert profiler.dataframe_time == 0
+
+
+def test_to_dataframe(scm):
+
+    profiler = SamplingProfiler()
+    scm.generate_data(10, profiler=profiler)
+
+    report = profiler.to_dataframe()
+
+    assert list(report.index)[0] == 1
+    assert list(report.columns) == [
+        key for key in EquationProfile(0).to_dict().keys()
+        if key != 'index_lhs'
+    ]
+
+
+def test_crash_record():
+
+    with pytest.raises(InvalidProfilingStage):
+        SamplingProfiler().record(0, 'pandas', 1.0)
@@ -0,0 +1,292 @@
+import pytest
+import numpy as np
+
+from scipy.sparse import issparse, triu
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph, InvalidOrdering
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.random_graphs import _pairs_from_ranks, \
+    GraphModelNotImplemented, InvalidNumberOfParents, \
+    NoiseFamilyNotImplemented, random_dag_adjacency_matrices, random_dags, \
+    random_linear_scms, random_weights
+
+
+MODELS = ['erdos_renyi', 'fixed_in_degree', 'scale_free']
+
+
+@pytest.mark.parametrize('nb_vertices', [2, 3, 10, 101])
+def test_pairs_from_ranks(nb_vertices):
+
+    ranks = np.arange(nb_vertices * (nb_vertices - 1) // 2)
+    sources, targets = _pairs_from_ranks(ranks, nb_vertices)
+    expected_sources, expected_targets = np.triu_indices(nb_vertices, k=1)
+
+    np.testing.assert_array_equal(sources, expected_sources)
+    np.testing.assert_array_equal(targets, expected_targets)
+
+
+def test_pairs_from_ranks_large():
+
+    nb_vertices = 10 ** 6
+    nb_pairs = nb_vertices * (nb_vertices - 1) // 2
+    ranks = np.array([0, nb_vertices - 2, nb_vertices - 1, nb_pairs - 1])
+    sources, targets = _pairs_from_ranks(ranks, nb_vertices)
+
+    np.testing.assert_array_equal(sources, [0, 0, 1, nb_vertices - 2])
+    np.testing.assert_array_equal(targets, [1, nb_vertices - 1, 2,
+                                            nb_vertices - 1])
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_random_dag_adjacency_matrices_natural_order(model):
+
+    matrices = random_dag_adjacency_matrices(20, model=model, nb_parents=2,
+                                             nb_graphs=50, random_state=0)
+
+    assert matrices.shape == (50, 20, 20)
+    assert matrices.dtype == np.uint8
+    assert set(np.unique(matrices)) <= {0, 1}
+    # The edges go forward in the natural order
+    np.testing.assert_array_equal(matrices, np.triu(matrices, k=1))
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_random_dag_adjacency_matrices_ordering(model):
+
+    ordering = np.random.default_rng(0).permutation(15)
+    matrices = random_dag_adjacency_matrices(15, model=model, nb_parents=2,
+                                             nb_graphs=10, ordering=ordering,
+                                             random_state=1)
+
+    permuted = matrices[:, ordering][:, :, ordering]
+    np.testing.assert_array_equal(permuted, np.triu(permuted, k=1))
+    for matrix in matrices:
+        order = DirectedAcyclicGraph(matrix).compute_causal_order()
+        assert len(order) == 15
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_random_dag_adjacency_matrices_random_ordering(model):
+
+    matrices = random_dag_adjacency_matrices(12, model=model, nb_parents=2,
+                                             nb_graphs=20, ordering='random',
+                                             random_state=2)
+
+    for matrix in matrices:
+        DirectedAcyclicGraph.validate_dag_adjacency_matrix(matrix)
+    # The orderings differ between the graphs
+    assert np.triu(matrices, k=1).sum() < matrices.sum()
+
+
+def test_erdos_renyi_expected_number_of_parents():
+
+    matrices = random_dag_adjacency_matrices(50, nb_parents=3, nb_graphs=200,
+                                             random_state=0)
+
+    assert matrices.sum(axis=1).mean() == pytest.approx(3, rel=0.05)
+
+
+@pytest.mark.parametrize('model', ['fixed_in_degree', 'scale_free'])
+def test_number_of_parents(model):
+
+    matrices = random_dag_adjacency_matrices(30, model=model, nb_parents=3,
+                                             nb_graphs=20, random_state=0)
+
+    np.testing.assert_array_equal(
+        matrices.sum(axis=1),
+        np.broadcast_to(np.minimum(np.arange(30), 3), (20, 30))
+    )
+
+
+def test_scale_free_hubs():
+
+    scale_free = random_dag_adjacency_matrices(
+        300, model='scale_free', nb_parents=2, nb_graphs=10, random_state=0
+    )
+    fixed = random_dag_adjacency_matrices(
+        300, model='fixed_in_degree', nb_parents=2, nb_graphs=10,
+        random_state=0
+    )
+
+    assert scale_free.sum(axis=2).max(axis=1).mean() > \
+        2 * fixed.sum(axis=2).max(axis=1).mean()
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_random_dag_adjacency_matrices_sparse(model):
+
+    dense = random_dag_adjacency_matrices(25, model=model, nb_parents=2,
+                                          nb_graphs=4, ordering='random',
+                                          random_state=3)
+    sparse = random_dag_adjacency_matrices(25, model=model, nb_parents=2,
+                                           nb_graphs=4, ordering='random',
+                                           sparse=True, random_state=3)
+
+    assert len(sparse) == 4
+    for dense_matrix, sparse_matrix in zip(dense, sparse):
+        assert issparse(sparse_matrix)
+        np.testing.assert_array_equal(sparse_matrix.toarray(), dense_matrix)
+
+
+def test_random_dag_adjacency_matrices_single():
+
+    matrix = random_dag_adjacency_matrices(10, random_state=0)
+    sparse_matrix = random_dag_adjacency_matrices(10, sparse=True,
+                                                  random_state=0)
+
+    assert matrix.shape == (10, 10)
+    np.testing.assert_array_equal(sparse_matrix.toarray(), matrix)
+
+
+def test_random_dag_adjacency_matrices_large_sparse():
+
+    matrix = random_dag_adjacency_matrices(100000, nb_parents=1, sparse=True,
+                                           random_state=0)
+
+    assert matrix.shape == (100000, 100000)
+    assert matrix.nnz == pytest.approx(100000, rel=0.05)
+    assert triu(matrix, k=1).nnz == matrix.nnz
+
+
+def test_random_dag_adjacency_matrices_reproducible():
+
+    first = random_dag_adjacency_matrices(20, model='scale_free',
+                                          nb_graphs=3, ordering='random',
+                                          random_state=5)
+    second = random_dag_adjacency_matrices(20, model='scale_free',
+                                           nb_graphs=3, ordering='random',
+                                           random_state=5)
+
+    np.testing.assert_array_equal(first, second)
+
+
+def test_random_dag_adjacency_matrices_errors():
+
+    with pytest.raises(GraphModelNotImplemented):
+        random_dag_adjacency_matrices(10, model='small_world')
+    with pytest.raises(InvalidNumberOfParents):
+        random_dag_adjacency_matrices(10, nb_parents=5)
+    with pytest.raises(InvalidOrdering):
+        random_dag_adjacency_matrices(3, ordering=[0, 0, 1])
+
+
+@pytest.mark.parametrize('nb_vertices', [0, 1])
+@pytest.mark.parametrize('model', MODELS)
+def test_random_dag_adjacency_matrices_no_edges(model, nb_vertices):
+
+    matrices = random_dag_adjacency_matrices(nb_vertices, model=model,
+                                             nb_graphs=2, random_state=0)
+
+    assert matrices.shape == (2, nb_vertices, nb_vertices)
+    assert not matrices.any()
+
+
+def test_random_dags():
+
+    dag = random_dags(10, nb_parents=2, name='dag', random_state=0)
+    dags = random_dags(10, nb_parents=2, nb_graphs=3, sparse=True,
+                       random_state=0)
+
+    assert isinstance(dag, DirectedAcyclicGraph)
+    assert dag.name == 'dag'
+    assert len(dags) == 3
+    for graph in dags:
+        assert isinstance(graph, DirectedAcyclicGraph)
+        assert issparse(graph.adjacency_matrix)
+
+
+def test_random_weights():
+
+    matrices = random_dag_adjacency_matrices(10, nb_parents=2, nb_graphs=5,
+                                             random_state=0)
+    weights = random_weights(matrices, low=0.5, high=2.0, random_state=0)
+
+    np.testing.assert_array_equal(weights != 0, matrices != 0)
+    assert np.all(np.abs(weights[matrices != 0]) >= 0.5)
+    assert np.all(np.abs(weights[matrices != 0]) <= 2.0)
+    assert (weights < 0).any() and (weights > 0).any()
+
+
+def test_random_weights_sparse():
+
+    matrices = random_dag_adjacency_matrices(10, nb_parents=2, nb_graphs=2,
+                                             sparse=True, random_state=0)
+    weights = random_weights(matrices, random_state=0)
+
+    for matrix, weight in zip(matrices, weights):
+        assert issparse(weight)
+        np.testing.assert_array_equal(weight.toarray() != 0,
+                                      matrix.toarray() != 0)
+
+
+@pytest.mark.parametrize('noise', ['gaussian', 'uniform', 'laplace',
+                                   'gumbel', 'exponential'])
+def test_random_linear_scms_noise(noise):
+
+    scm = random_linear_scms(5, nb_parents=1, noise=noise, noise_scale=2.0,
+                             random_state=0)
+    data = np.asarray(scm.generate_data(20000, random_state=0))
+    # The exogenous variables are centred, of standard deviation 2
+    exogenous = data - data @ scm.coefficient_matrix()
+
+    assert isinstance(scm, LinearStructuralCausalModel)
+    np.testing.assert_allclose(exogenous.mean(axis=0), 0, atol=0.1)
+    np.testing.assert_allclose(exogenous.std(axis=0), 2, rtol=0.05)
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_random_linear_scms(model):
+
+    scms = random_linear_scms(12, model=model, nb_parents=2, nb_scms=4,
+                              ordering='random', low=1.0, high=3.0,
+                              noise_scale=(0.5, 1.5), random_state=0,
+                              name='scm')
+
+    assert len(scms) == 4
+    for scm in scms:
+        coefficients = scm.coefficient_matrix()
+        nonzero = np.abs(coefficients[coefficients != 0])
+        assert scm.name == 'scm'
+        assert np.all((nonzero >= 1.0) & (nonzero <= 3.0))
+        # The causal order given is consistent with the graph
+        causal_order = scm.compute_causal_order()
+        permuted = coefficients[causal_order][:, causal_order]
+        np.testing.assert_array_equal(permuted, np.triu(permuted, k=1))
+        DirectedAcyclicGraph.validate_dag_adjacency_matrix(coefficients != 0)
+
+
+def test_random_linear_scms_same_graphs():
+
+    matrices = random_dag_adjacency_matrices(10, nb_parents=2, nb_graphs=3,
+                                             ordering='random', random_state=7)
+    scms = random_linear_scms(10, nb_parents=2, nb_scms=3, ordering='random',
+                              random_state=7)
+
+    for matrix, scm in zip(matrices, scms):
+        np.testing.assert_array_equal(scm.coefficient_matrix() != 0,
+                                      matrix != 0)
+
+
+def test_random_linear_scms_errors():
+
+    with pytest.raises(NoiseFamilyNotImplemented):
+        random_linear_scms(5, noise='cauchy')
+
+
+def test_random_linear_scms_noise_scales():
+
+    scms = random_linear_scms(6, nb_parents=1, nb_scms=2,
+                              noise_scale=(0.5, 1.5), random_state=0)
+
+    for scm in scms:
+        data = np.asarray(scm.generate_data(40000, random_state=0))
+        exogenous = data - data @ scm.coefficient_matrix()
+        variables = [equation.index_lhs
+                     for equation in scm.structural_equations]
+        scales = np.array([equation.exogenous_variable.std()
+                           for equation in scm.structural_equations])
+        assert np.all((scales >= 0.5) & (scales <= 1.5))
+        assert len(set(scales)) == 6
+        np.testing.assert_allclose(exogenous[:, variables].std(axis=0),
+                                   scales, rtol=0.05)
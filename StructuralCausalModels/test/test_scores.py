@@ -0,0 +1,161 @@
+import pytest
+import numpy as np
+
+from scipy.stats import norm
+
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.linear_fitting import InsufficientData, \
+    InvalidData, SufficientStatistics
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.scores import BGeScore, GaussianBICScore, \
+    InvalidCacheSize, InvalidHyperparameters
+
+
+_coefficient_matrix = np.asarray([
+    [0, 1.5, 0, 0],
+    [0, 0, -2, 0],
+    [0, 0, 0, 0],
+    [0, 0, 1, 0]
+])
+
+
+@pytest.fixture
+def data():
+
+    linear_scm = LinearStructuralCausalModel.create_from_coefficient_matrix(
+        matrix=_coefficient_matrix,
+        causal_order=[0, 3, 1, 2],
+        exogenous_variables=[norm(loc=1), norm(scale=0.5), norm(scale=2),
+                             norm(loc=-1)])
+
+    return linear_scm.generate_data(2000, random_state=0).to_numpy()
+
+
+@pytest.fixture
+def true_dag():
+
+    return DirectedAcyclicGraph(
+        adjacency_matrix=(_coefficient_matrix != 0).astype(int)
+    )
+
+
+def _dag(edges, nb_vertices=4):
+
+    matrix = np.zeros((nb_vertices, nb_vertices), dtype=int)
+    for source, target in edges:
+        matrix[source, target] = 1
+
+    return DirectedAcyclicGraph(adjacency_matrix=matrix)
+
+
+@pytest.mark.parametrize("score_class", [GaussianBICScore, BGeScore])
+def test_markov_equivalent_dags_have_same_score(data, score_class):
+
+    score = score_class(data)
+    # 0 -> 1 -> 2 <- 3 and 0 <- 1 -> 2 <- 3 are Markov equivalent, unlike
+    # 0 -> 1 <- 2 <- 3
+    dag = _dag([(0, 1), (1, 2), (3, 2)])
+    equivalent_dag = _dag([(1, 0), (1, 2), (3, 2)])
+    other_dag = _dag([(0, 1), (2, 1), (3, 2)])
+
+    assert score.score(dag) == pytest.approx(score.score(equivalent_dag))
+    assert score.score(dag) != pytest.approx(score.score(other_dag))
+
+
+@pytest.mark.parametrize("score_class", [GaussianBICScore, BGeScore])
+def test_true_dag_scores_best(data, true_dag, score_class):
+
+    score = score_class(data)
+    empty_dag = _dag([])
+    missing_edge_dag = _dag([(0, 1), (1, 2)])
+    extra_edge_dag = _dag([(0, 1), (1, 2), (3, 2), (0, 3)])
+
+    assert score.score(true_dag) > score.score(empty_dag)
+    assert score.score(true_dag) > score.score(missing_edge_dag)
+    assert score.score(true_dag) > score.score(extra_edge_dag)
+
+
+def test_bic_local_score(data):
+
+    score = GaussianBICScore(data, penalty_discount=2.0)
+    nb_samples = data.shape[0]
+    regressors = np.column_stack([np.ones(nb_samples), data[:, [1, 3]]])
+    residuals = data[:, 2] - regressors @ np.linalg.lstsq(
+        regressors, data[:, 2], rcond=None)[0]
+    variance = residuals @ residuals / nb_samples
+    expected = -nb_samples / 2 * (np.log(2 * np.pi * variance) + 1) - \
+        2.0 * 4 / 2 * np.log(nb_samples)
+
+    assert score.local_score(2, [3, 1]) == pytest.approx(expected)
+
+
+def test_scores_from_sufficient_statistics(data, true_dag):
+
+    statistics = SufficientStatistics(nb_var=4)
+    statistics.update(data[:1000]).update(data[1000:])
+
+    assert BGeScore(statistics).score(true_dag) == \
+        pytest.approx(BGeScore(data).score(true_dag))
+
+
+def test_rescoring_only_computes_changed_families(data, true_dag):
+
+    score = BGeScore(data)
+    score.score(true_dag)
+    assert score.cache_info()['misses'] == 4
+
+    # Adds the edge 0 -> 3 : only the family of 3 changes
+    score.score(_dag([(0, 1), (1, 2), (3, 2), (0, 3)]))
+    assert score.cache_info()['misses'] == 5
+    assert score.cache_info()['hits'] == 3
+    assert score.score_difference(3, [], [0]) == pytest.approx(
+        score.local_score(3, [0]) - score.local_score(3, [])
+    )
+
+
+def test_least_recently_used_local_score_is_evicted(data):
+
+    score = GaussianBICScore(data, cache_size=2)
+    score.local_score(0, [])
+    score.local_score(1, [0])
+    score.local_score(0, [])
+    score.local_score(2, [1])
+    assert score.cache_info()['size'] == 2
+
+    # (1, [0]) was evicted, (0, []) was not
+    score.local_score(0, [])
+    assert score.nb_misses == 3
+    score.local_score(1, [0])
+    assert score.nb_misses == 4
+
+    score.clear_cache()
+    assert score.cache_info() == {'hits': 0, 'misses': 0, 'size': 0,
+                                  'max_size': 2}
+    assert score.memory_usage()['cache'] > 0
+
+
+@pytest.mark.parametrize("cache_size", [0, -1, 2.5, True])
+def test_invalid_cache_size_crashes(data, cache_size):
+
+    with pytest.raises(InvalidCacheSize):
+        GaussianBICScore(data, cache_size=cache_size)
+
+
+@pytest.mark.parametrize("hyperparameters", [
+    {'alpha_mu': 0},
+    {'alpha_w': 5},
+    {'prior_mean': np.zeros(3)},
+])
+def test_invalid_bge_hyperparameters_crash(data, hyperparameters):
+
+    with pytest.raises(InvalidHyperparameters):
+        BGeScore(data, **hyperparameters)
+
+
+def test_invalid_data_crashes(data):
+
+    with pytest.raises(InsufficientData):
+        GaussianBICScore(np.zeros((0, 4)))
+    with pytest.raises(InvalidData):
+        GaussianBICScore(data).score(_dag([], nb_vertices=3))
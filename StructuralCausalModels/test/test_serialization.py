@@ -0,0 +1,130 @@
+import pickle
+import pytest
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from scipy.stats import norm, t, randint, rv_discrete
+
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.serialization import DistributionSpec, \
+    FunctionReference, UnregisteredFunction, register_function
+from StructuralCausalModels.structural_causal_model import \
+    StructuralCausalModel
+from StructuralCausalModels.structural_equation import StructuralEquation
+
+
+_add = register_function(lambda u, x: u + x, name='test_serialization.add')
+
+
+@register_function
+def _identity(u, *args):
+    return u
+
+
+@pytest.fixture
+def linear_scm():
+
+    matrix = np.asarray([
+        [0, -2, 4, 2],
+        [0, 0, -8, 0],
+        [0, 0, 0, 0],
+        [0, 0.5, 1.5, 0]
+    ])
+    exogenous_variables = [norm(loc=1, scale=2), t(df=4)] + [norm()] * 2
+
+    scm = LinearStructuralCausalModel.create_from_coefficient_matrix(
+        name='linear scm',
+        matrix=matrix,
+        causal_order=[0, 3, 1, 2],
+        exogenous_variables=exogenous_variables)
+
+    return scm
+
+
+def _generate_data(scm, noise):
+
+    return scm.generate_data(noise.shape[0], noise=noise).values
+
+
+@pytest.mark.parametrize(
+    "exogenous_variable",
+    [norm(loc=1, scale=2), t(10, loc=-1), randint(low=3, high=5),
+     rv_discrete(values=([0.5, 2.], [0.25, 0.75]))]
+)
+def test_distribution_spec(exogenous_variable):
+
+    spec = DistributionSpec.from_exogenous_variable(exogenous_variable)
+    restored = pickle.loads(pickle.dumps(spec)).freeze()
+
+    assert restored.mean() == exogenous_variable.mean()
+    assert restored.var() == exogenous_variable.var()
+    assert len(pickle.dumps(spec)) < 500
+
+
+def test_function_reference():
+
+    reference = FunctionReference.from_function(_add)
+
+    assert reference.resolve() is _add
+    assert FunctionReference.from_function(lambda u: u) is None
+    with pytest.raises(UnregisteredFunction):
+        FunctionReference(module=__name__, name='unknown').resolve()
+
+
+def test_pickle_scm_with_registered_functions():
+
+    equations = [StructuralEquation(0, [], randint(1, 2), _identity),
+                 StructuralEquation(1, [0], norm(), _add)]
+    scm = StructuralCausalModel(nb_var=2, structural_equations=equations)
+    noise = scm.generate_noise(10)
+
+    restored = pickle.loads(pickle.dumps(scm))
+
+    assert restored.structural_equations[1].function is _add
+    assert np.equal(_generate_data(restored, noise),
+                    _generate_data(scm, noise)).all()
+
+
+def test_pickle_linear_scm(linear_scm):
+
+    linear_scm.compute_causal_order()
+    noise = linear_scm.generate_noise(10)
+
+    arrays = linear_scm.to_arrays()
+    restored = pickle.loads(pickle.dumps(linear_scm))
+
+    assert isinstance(restored, LinearStructuralCausalModel)
+    assert restored.name == linear_scm.name
+    assert len(arrays['exogenous_variables']) == 3
+    exogenous_variables = {eqn.index_lhs: eqn.exogenous_variable for eqn in
+                           restored.structural_equations}
+    assert exogenous_variables[2] is exogenous_variables[3]
+    assert restored.compute_causal_order() == [0, 3, 1, 2]
+    assert np.equal(_generate_data(restored, noise),
+                    _generate_data(linear_scm, noise)).all()
+    assert np.allclose(restored.covariance(), linear_scm.covariance())
+
+
+def test_linear_scm_from_arrays_shares_arrays(linear_scm):
+
+    arrays = linear_scm.to_arrays()
+
+    restored = LinearStructuralCausalModel.from_arrays(arrays)
+
+    for eqn in restored.structural_equations:
+        if eqn.parent_indices.size:
+            assert eqn.coefficients.base is arrays['coefficients']
+            assert eqn.parent_indices.base is arrays['indices_rhs']
+
+
+def test_linear_scm_in_process_pool(linear_scm):
+
+    noise = linear_scm.generate_noise(10)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(_generate_data, [linear_scm] * 2,
+                                    [noise] * 2))
+
+    for result in results:
+        assert np.allclose(result, _generate_data(linear_scm, noise))
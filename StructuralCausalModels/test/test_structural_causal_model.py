@@ -1,12 +1,16 @@
 # TODO reorganise and document
+import asyncio
 import pytest
 import numpy as np
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 from scipy.stats import randint, t
 
 from StructuralCausalModels.structural_equation import StructuralEquation
 from StructuralCausalModels.structural_causal_model import \
-    StructuralCausalModel, InvalidIntervention
+    StructuralCausalModel, InvalidIntervention, CyclicityWarning, \
+    InvalidExecutor, ConflictingSamplingArguments
 
 _constant_0 = 1
 _constant_1 = 2
@@ -230,6 +234,19 @@ def post_intervention_deterministic_scm_adjacency_matrix():
     return adjacency_matrix
 
 
+@pytest.fixture
+def cyclic_new_structural_equation():
+
+    # X_0 = X_2 + epsilon_0, where epsilon_0 = 0
+    def f_0(u, z):
+        return u + z
+    constant_0 = 0
+    epsilon_0 = randint(low=constant_0, high=(constant_0 + 1))
+    equation_0 = StructuralEquation(0, [2], epsilon_0, f_0)
+
+    return equation_0
+
+
 @pytest.fixture
 def invalid_new_structural_equation():
 
@@ -309,3 +326,364 @@ def test_invalid_intervention(deterministic_scm,
     with pytest.raises(InvalidIntervention):
 
         deterministic_scm.perform_intervention(invalid_new_structural_equation)
+
+
+def test_invalid_intervention_unknown_parent(deterministic_scm):
+
+    equation = StructuralEquation(2, [7], randint(low=0, high=1),
+                                  lambda u, x: u + x)
+
+    with pytest.raises(InvalidIntervention):
+
+        deterministic_scm.perform_intervention(equation)
+
+
+def test_cyclic_intervention(deterministic_scm,
+                             cyclic_new_structural_equation):
+
+    with pytest.raises(CyclicityWarning):
+
+        deterministic_scm.perform_intervention(cyclic_new_structural_equation)
+
+
+def test_perform_intervention_shares_structure(
+        deterministic_scm, new_structural_equation,
+        deterministic_scm_adjacency_matrix,
+        post_intervention_deterministic_scm_adjacency_matrix):
+
+    original_equations = list(deterministic_scm.structural_equations)
+    deterministic_scm.compute_causal_order()
+
+    new_scm = deterministic_scm.perform_intervention(new_structural_equation)
+
+    # The post-intervention SCM does not own an adjacency matrix until it is
+    # requested
+    assert new_scm._adjacency_matrix is None
+    assert new_scm._causal_order is None
+
+    # The unchanged structural equations are shared, not copied
+    for old_eqn, new_eqn in zip(deterministic_scm.structural_equations,
+                                new_scm.structural_equations):
+        if old_eqn.index_lhs == 2:
+            assert new_eqn is new_structural_equation
+        else:
+            assert new_eqn is old_eqn
+
+    # The pre-intervention SCM is left untouched
+    assert deterministic_scm.structural_equations == original_equations
+    assert np.equal(deterministic_scm.adjacency_matrix(),
+                    deterministic_scm_adjacency_matrix).all()
+    assert np.equal(new_scm.adjacency_matrix(),
+                    post_intervention_deterministic_scm_adjacency_matrix).all()
+    assert (new_scm.structural_equation_positions() is
+            deterministic_scm.structural_equation_positions())
+
+
+def test_adjacency_matrix_is_read_only(deterministic_scm):
+
+    adjacency_matrix = deterministic_scm.adjacency_matrix()
+
+    with pytest.raises(ValueError):
+        adjacency_matrix[0, 0] = 1
+    assert adjacency_matrix.copy().flags.writeable
+
+
+def test_assigning_structural_equations_clears_caches(
+        deterministic_scm, new_structural_equation,
+        post_intervention_deterministic_scm_adjacency_matrix):
+
+    deterministic_scm.compute_causal_order()
+    deterministic_scm.structural_equation_positions()
+
+    structural_equations = [
+        new_structural_equation if eqn.index_lhs == 2 else eqn
+        for eqn in deterministic_scm.structural_equations
+    ]
+    deterministic_scm.structural_equations = structural_equations
+
+    assert deterministic_scm.structural_equations is structural_equations
+    assert np.equal(deterministic_scm.adjacency_matrix(),
+                    post_intervention_deterministic_scm_adjacency_matrix).all()
+    causal_order = deterministic_scm.compute_causal_order()
+    adjacency_matrix = deterministic_scm.adjacency_matrix()
+    for position, i in enumerate(causal_order):
+        assert not adjacency_matrix[causal_order[position:], i].any()
+
+
+def test_compute_descendants(general_scm_example_1):
+
+    assert sorted(general_scm_example_1.compute_descendants(1)) == [3, 4, 5]
+    assert sorted(general_scm_example_1.compute_descendants(2)) == [5, 6]
+    assert general_scm_example_1.compute_descendants(5) == []
+
+
+def test_generate_data_from_noise(general_scm_example_1, nb_samples):
+
+    noise = general_scm_example_1.generate_noise(nb_samples)
+
+    data_1 = general_scm_example_1.generate_data(nb_samples, noise=noise)
+    data_2 = general_scm_example_1.generate_data(nb_samples, noise=noise)
+
+    assert noise.shape == (nb_samples, general_scm_example_1.nb_var)
+    assert np.equal(data_1.values, data_2.values).all()
+    assert np.equal(data_1.loc[:, 0].values, noise[:, 0]).all()
+
+
+def test_generate_intervention_sweep(
+        deterministic_scm, new_structural_equation, nb_samples,
+        deterministic_scm_data_generation_function,
+        post_intervention_deterministic_scm_data_generation_function):
+
+    # Re-assigning X_2 with its own structural equation leaves the SCM as is
+    idx = deterministic_scm.structural_equation_positions()[2]
+    same_structural_equation = deterministic_scm.structural_equations[idx]
+
+    data = deterministic_scm.generate_intervention_sweep(
+        new_structural_equations=[new_structural_equation,
+                                  same_structural_equation],
+        nb_samples=nb_samples
+    )
+
+    assert data.index.names == ['intervention', 'sample']
+    assert np.equal(
+        data.loc[0].values,
+        post_intervention_deterministic_scm_data_generation_function
+    ).all()
+    assert np.equal(data.loc[1].values,
+                    deterministic_scm_data_generation_function).all()
+
+
+def test_generate_intervention_sweep_common_random_numbers(
+        general_scm_example_1, nb_samples):
+
+    scm = general_scm_example_1
+    equations = [
+        StructuralEquation(index_lhs=4,
+                           indices_rhs=[1],
+                           exogenous_variable=eqn.exogenous_variable,
+                           function=lambda u, x: u - x)
+        for eqn in scm.structural_equations if eqn.index_lhs == 4
+    ]
+    equations.append(
+        StructuralEquation(index_lhs=2,
+                           indices_rhs=[0],
+                           exogenous_variable=scm.structural_equations[
+                               2].exogenous_variable,
+                           function=lambda u, x: u + 3 * x)
+    )
+    noise = scm.generate_noise(nb_samples)
+
+    values = scm.generate_intervention_sweep(equations, nb_samples,
+                                             noise=noise, as_array=True)
+
+    assert values.shape == (2, nb_samples, scm.nb_var)
+    for k, equation in enumerate(equations):
+        expected = scm.perform_intervention(equation).generate_data(
+            nb_samples, noise=noise).values
+        assert np.allclose(values[k], expected)
+
+
+def test_resample_after_intervention(general_scm_example_1, nb_samples):
+
+    scm = general_scm_example_1
+    equation = StructuralEquation(index_lhs=4,
+                                  indices_rhs=[1],
+                                  exogenous_variable=scm.structural_equations[
+                                      4].exogenous_variable,
+                                  function=lambda u, x: u - 2 * x)
+    noise = scm.generate_noise(nb_samples)
+    data = scm.generate_data(nb_samples, noise=noise)
+    original_data = data.copy()
+
+    resampled_data = scm.resample_after_intervention(data, noise, equation)
+
+    expected_data = scm.perform_intervention(equation).generate_data(
+        nb_samples, noise=noise)
+    # Only X_4 and its descendant X_5 are re-generated
+    assert list(resampled_data.columns) == [4, 5]
+    assert np.allclose(resampled_data.values, expected_data.loc[:, [4, 5]])
+    assert data.equals(original_data)
+
+    scm.resample_after_intervention(data, noise, equation, inplace=True)
+
+    assert np.allclose(data.values, expected_data.values)
+
+
+def test_generate_data_with_threads(deterministic_scm, nb_samples,
+                                    deterministic_scm_data_generation_function):
+
+    actual_data = deterministic_scm.generate_data(nb_samples,
+                                                  executor='threads',
+                                                  nb_workers=2).values
+
+    expected_data = deterministic_scm_data_generation_function
+
+    assert np.equal(actual_data, expected_data).all()
+
+
+def test_generate_data_with_threads_matches_sequential(general_scm_example_1,
+                                                       nb_samples):
+
+    noise = general_scm_example_1.generate_noise(nb_samples)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        actual_data = general_scm_example_1.generate_data(
+            nb_samples, noise=noise, executor=executor)
+    expected_data = general_scm_example_1.generate_data(nb_samples,
+                                                        noise=noise)
+
+    assert np.allclose(actual_data.values, expected_data.values)
+
+
+def test_generate_data_with_threads_is_reproducible(general_scm_example_1,
+                                                    nb_samples):
+
+    data = [
+        general_scm_example_1.generate_data(nb_samples,
+                                            random_state=7,
+                                            executor='threads',
+                                            nb_workers=nb_workers).values
+        for nb_workers in [1, 4, 4]
+    ]
+
+    assert np.equal(data[0], data[1]).all()
+    assert np.equal(data[1], data[2]).all()
+
+
+def test_generate_data_with_threads_and_generator(general_scm_example_1,
+                                                  nb_samples):
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        data = [
+            general_scm_example_1.generate_data(
+                nb_samples, random_state=np.random.default_rng(7),
+                executor=executor
+            ).values
+            for _ in range(2)
+        ]
+
+    assert data[0].shape == (nb_samples, general_scm_example_1.nb_var)
+    assert np.equal(data[0], data[1]).all()
+
+
+def test_generate_data_async_with_generator(general_scm_example_1):
+
+    data_1 = asyncio.run(general_scm_example_1.generate_data_async(
+        25, chunk_size=10, random_state=np.random.default_rng(3)))
+    data_2 = asyncio.run(general_scm_example_1.generate_data_async(
+        25, chunk_size=10, random_state=np.random.default_rng(3)))
+
+    assert data_1.equals(data_2)
+
+
+def test_generate_data_with_invalid_executor_crashes(general_scm_example_1,
+                                                     nb_samples):
+
+    with pytest.raises(InvalidExecutor):
+        general_scm_example_1.generate_data(nb_samples, executor='processes')
+
+
+def test_generate_data_with_process_pool_crashes(general_scm_example_1,
+                                                 nb_samples):
+
+    # The workers write into a shared array, which a process pool cannot do
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(InvalidExecutor):
+            general_scm_example_1.generate_data(nb_samples, executor=executor)
+
+
+def test_generate_data_with_noise_and_random_state_crashes(
+        general_scm_example_1, nb_samples):
+
+    noise = general_scm_example_1.generate_noise(nb_samples)
+
+    with pytest.raises(ConflictingSamplingArguments):
+        general_scm_example_1.generate_data(nb_samples, noise=noise,
+                                            random_state=0)
+
+
+def test_compute_topological_generations(general_scm_example_1):
+
+    generations = general_scm_example_1.compute_topological_generations()
+
+    assert [sorted(g) for g in generations] == [[0, 1, 2], [3, 4, 6], [5]]
+
+
+def test_generate_data_async(general_scm_example_1):
+
+    data_1 = asyncio.run(general_scm_example_1.generate_data_async(
+        25, chunk_size=10, random_state=3))
+    data_2 = asyncio.run(general_scm_example_1.generate_data_async(
+        25, chunk_size=10, random_state=3))
+
+    assert data_1.shape == (25, general_scm_example_1.nb_var)
+    assert list(data_1.index) == list(range(25))
+    assert data_1.equals(data_2)
+
+
+def test_generate_data_async_does_not_block_event_loop(
+        deterministic_scm, deterministic_scm_data_generation_function):
+
+    async def run():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        ticker_task = asyncio.create_task(ticker())
+        semaphore = asyncio.Semaphore(1)
+        results = await asyncio.gather(*[
+            deterministic_scm.generate_data_async(1000, chunk_size=100,
+                                                  semaphore=semaphore)
+            for _ in range(3)
+        ])
+        ticker_task.cancel()
+
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+
+    assert len(ticks) >= 10
+    for data in results:
+        assert np.equal(data.values,
+                        deterministic_scm_data_generation_function).all()
+
+
+def test_iterate_data_async_cancellation(general_scm_example_1):
+
+    chunks = []
+
+    async def consume():
+        async for chunk in general_scm_example_1.iterate_data_async(
+                1000, chunk_size=10):
+            chunks.append(chunk)
+            await asyncio.sleep(3600)
+
+    async def run():
+        task = asyncio.create_task(consume())
+        while not chunks:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert len(chunks) == 1
+
+
+def test_memory_usage(deterministic_scm):
+
+    usage = deterministic_scm.memory_usage()
+    assert usage['structural_equations'] > 0
+    assert usage['causal_order'] == 0
+
+    deterministic_scm.generate_data(10)
+    filled_usage = deterministic_scm.memory_usage()
+    assert filled_usage['causal_order'] > 0
+    assert filled_usage['noise_sampling_plan'] > 0
+    assert filled_usage['total'] > usage['total']
+    assert filled_usage['structural_equations'] == \
+        usage['structural_equations']
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def random_dag_adjacency_matrix(nb_vertices, density, random_state=0):
+    """Draws the adjacency matrix of a random DAG.
+
+    The edges of the DAG all follow the natural order of the vertices, and each
+    is present with probability density.
+
+    Parameters
+    ----------
+    nb_vertices : int
+        The number of vertices in the DAG.
+    density : float
+        The probability that there is an edge :math:`X_i \\longrightarrow X_j`,
+        for :math:`i < j`.
+    random_state : int, optional
+        The seed of the random number generator (default is 0).
+
+    Returns
+    -------
+    numpy.ndarray
+        The adjacency matrix, of bytes.
+    """
+    rng = np.random.default_rng(random_state)
+    matrix = np.zeros((nb_vertices, nb_vertices), dtype=np.uint8)
+    for start in range(0, nb_vertices, 1000):
+        block = rng.random((min(1000, nb_vertices - start), nb_vertices))
+        matrix[start:start + block.shape[0]] = block < density
+    return np.triu(matrix, k=1)
+
+
+def random_coefficient_matrix(nb_vertices, density, random_state=0):
+    """Draws the coefficient matrix of a random linear SCM.
+
+    Parameters
+    ----------
+    nb_vertices : int
+        The number of variables in the linear SCM.
+    density : float
+        The probability that a variable is a parent of another variable which
+        comes after it in the natural order.
+    random_state : int, optional
+        The seed of the random number generator (default is 0).
+
+    Returns
+    -------
+    numpy.ndarray
+        The coefficient matrix, whose non-zero coefficients are drawn uniformly
+        in :math:`[-2, -0.5] \\cup [0.5, 2]`.
+    """
+    rng = np.random.default_rng(random_state)
+    matrix = random_dag_adjacency_matrix(nb_vertices, density, random_state)
+    signs = rng.choice([-1.0, 1.0], size=matrix.shape)
+
+    return matrix * signs * rng.uniform(0.5, 2, size=matrix.shape)
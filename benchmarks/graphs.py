@@ -0,0 +1,281 @@
+"""Benchmarks of the construction and analysis of graphs."""
+import numpy as np
+import scipy.sparse
+
+from StructuralCausalModels.cpdag import dag_to_cpdag, dags_to_cpdags
+from StructuralCausalModels.dag import DirectedAcyclicGraph
+from StructuralCausalModels.graph import Graph
+from StructuralCausalModels.graph_batch import GraphBatch
+from StructuralCausalModels.intervention_distance import \
+    structural_intervention_distance, structural_intervention_distances
+from StructuralCausalModels.markov_equivalence import \
+    consistent_extensions, markov_equivalence_class_size
+from StructuralCausalModels.random_graphs import \
+    random_dag_adjacency_matrices
+
+from .common import random_dag_adjacency_matrix
+
+
+# Expected number of children of a vertex
+_nb_children = 3
+
+
+class GraphConstruction:
+    """Constructing a Graph, and accessing its representations."""
+
+    params = ([100, 1000, 5000, 20000], ['dense', 'sparse'])
+    param_names = ['nb_vertices', 'storage']
+
+    def setup(self, nb_vertices, storage):
+        if storage == 'dense' and nb_vertices > 5000:
+            # Too large to hold densely in the memory of a benchmark runner
+            raise NotImplementedError
+        matrix = random_dag_adjacency_matrix(nb_vertices,
+                                             _nb_children / nb_vertices)
+        self.matrix = (scipy.sparse.csr_matrix(matrix) if storage == 'sparse'
+                       else matrix)
+
+    def time_construction(self, nb_vertices, storage):
+        Graph(adjacency_matrix=self.matrix)
+
+    def time_adjacency_lists(self, nb_vertices, storage):
+        Graph(adjacency_matrix=self.matrix).adjacency_list_representation
+
+    def time_degrees(self, nb_vertices, storage):
+        graph = Graph(adjacency_matrix=self.matrix, validate=False)
+        graph.in_degrees()
+        graph.out_degrees()
+
+    def peakmem_construction(self, nb_vertices, storage):
+        Graph(adjacency_matrix=self.matrix).adjacency_list_representation
+
+
+class DAGValidation:
+    """Checking that an adjacency matrix defines a DAG."""
+
+    params = ([100, 500, 2000], [0.01, 0.1])
+    param_names = ['nb_vertices', 'density']
+
+    def setup(self, nb_vertices, density):
+        self.matrix = random_dag_adjacency_matrix(nb_vertices, density)
+        self.sparse_matrix = scipy.sparse.csr_matrix(self.matrix)
+
+    def time_validate_dag_adjacency_matrix(self, nb_vertices, density):
+        DirectedAcyclicGraph.validate_dag_adjacency_matrix(self.matrix)
+
+    def time_validate_sparse_dag_adjacency_matrix(self, nb_vertices, density):
+        DirectedAcyclicGraph.validate_dag_adjacency_matrix(self.sparse_matrix)
+
+
+class KahnAlgorithm:
+    """Computing a causal order of a DAG."""
+
+    params = [100, 1000, 5000, 20000]
+    param_names = ['nb_vertices']
+
+    def setup(self, nb_vertices):
+        matrix = random_dag_adjacency_matrix(nb_vertices,
+                                             _nb_children / nb_vertices)
+        self.dag = DirectedAcyclicGraph(
+            adjacency_matrix=scipy.sparse.csr_matrix(matrix), validate=False
+        )
+        # The adjacency lists are built once, outside of the timings
+        self.dag.adjacency_list_representation
+
+    def time_kahn_algorithm(self, nb_vertices):
+        self.dag.kahn_algorithm()
+
+
+class StructuralHammingDistance:
+    """Comparing two graphs."""
+
+    params = ([100, 1000, 5000], ['dense', 'sparse'])
+    param_names = ['nb_vertices', 'storage']
+
+    def setup(self, nb_vertices, storage):
+        density = _nb_children / nb_vertices
+        matrices = [random_dag_adjacency_matrix(nb_vertices, density, seed)
+                    for seed in [0, 1]]
+        if storage == 'sparse':
+            matrices = [scipy.sparse.csr_matrix(m) for m in matrices]
+        self.graph_1, self.graph_2 = [Graph(adjacency_matrix=m, validate=False)
+                                      for m in matrices]
+
+    def time_structural_hamming_distance(self, nb_vertices, storage):
+        self.graph_1.structural_hamming_distance(self.graph_2)
+
+    def track_structural_hamming_distance(self, nb_vertices, storage):
+        # The distance itself, to detect changes in the results
+        return self.graph_1.structural_hamming_distance(self.graph_2)
+
+
+class EdgeBasedStructuralHammingDistance:
+    """Comparing two graphs edge by edge, under a custom penalty scheme."""
+
+    params = [100, 300]
+    param_names = ['nb_vertices']
+
+    def setup(self, nb_vertices):
+        density = _nb_children / nb_vertices
+        self.graph_1, self.graph_2 = [
+            Graph(adjacency_matrix=random_dag_adjacency_matrix(nb_vertices,
+                                                               density, seed))
+            for seed in [0, 1]
+        ]
+        # The edge representations are built once, outside of the timings
+        self.graph_1.edge_representation
+        self.graph_2.edge_representation
+
+    def time_structural_hamming_distance(self, nb_vertices):
+        self.graph_1.structural_hamming_distance(
+            self.graph_2,
+            penalty_edge_mismatch_func=lambda edge_1, edge_2: float(
+                edge_1 != edge_2
+            )
+        )
+
+
+class CPDAG:
+    """Computing the CPDAG of a DAG."""
+
+    params = ([1000, 20000], ['dense', 'sparse'])
+    param_names = ['nb_vertices', 'storage']
+
+    def setup(self, nb_vertices, storage):
+        if storage == 'dense' and nb_vertices > 5000:
+            raise NotImplementedError
+        matrix = random_dag_adjacency_matrix(nb_vertices,
+                                             _nb_children / nb_vertices)
+        if storage == 'sparse':
+            matrix = scipy.sparse.csr_matrix(matrix)
+        self.dag = DirectedAcyclicGraph(adjacency_matrix=matrix,
+                                        validate=False)
+
+    def time_dag_to_cpdag(self, nb_vertices, storage):
+        dag_to_cpdag(self.dag)
+
+
+class BatchedCPDAGs:
+    """Computing the CPDAGs of a batch of small DAGs."""
+
+    params = ([100, 1000], [10, 30])
+    param_names = ['nb_graphs', 'nb_vertices']
+
+    def setup(self, nb_graphs, nb_vertices):
+        self.matrices = np.stack([
+            random_dag_adjacency_matrix(nb_vertices, 0.3, seed)
+            for seed in range(nb_graphs)
+        ])
+
+    def time_dags_to_cpdags(self, nb_graphs, nb_vertices):
+        dags_to_cpdags(self.matrices)
+
+
+class MarkovEquivalenceClass:
+    """Counting and enumerating the DAGs of a Markov equivalence class."""
+
+    params = [100, 1000]
+    param_names = ['nb_vertices']
+
+    def setup(self, nb_vertices):
+        # The CPDAG of a DAG without v-structures is undirected
+        rng = np.random.default_rng(0)
+        matrix = np.zeros((nb_vertices, nb_vertices), dtype=np.uint8)
+        for vertex in range(1, nb_vertices):
+            parent = rng.integers(vertex)
+            matrix[parent, vertex] = 1
+            # The parents of the parent keep the parents a clique
+            matrix[matrix[:, parent] != 0, vertex] = 1
+        self.cpdag = dag_to_cpdag(DirectedAcyclicGraph(matrix))
+
+    def time_markov_equivalence_class_size(self, nb_vertices):
+        markov_equivalence_class_size(self.cpdag)
+
+    def time_first_extensions(self, nb_vertices):
+        for _ in zip(range(100), consistent_extensions(self.cpdag)):
+            pass
+
+
+class StructuralInterventionDistance:
+    """Comparing estimated DAGs to a true DAG with the SID."""
+
+    params = ([100, 1000], [1, 10])
+    param_names = ['nb_vertices', 'nb_estimates']
+    timeout = 300
+
+    def setup(self, nb_vertices, nb_estimates):
+        density = _nb_children / nb_vertices
+        self.true_dag = DirectedAcyclicGraph(
+            adjacency_matrix=random_dag_adjacency_matrix(nb_vertices, density),
+            validate=False
+        )
+        self.estimates = [random_dag_adjacency_matrix(nb_vertices, density,
+                                                      seed)
+                          for seed in range(1, nb_estimates + 1)]
+
+    def time_structural_intervention_distances(self, nb_vertices,
+                                               nb_estimates):
+        structural_intervention_distances(self.true_dag, self.estimates)
+
+    def track_structural_intervention_distance(self, nb_vertices,
+                                               nb_estimates):
+        # The distance itself, to detect changes in the results
+        return structural_intervention_distance(self.true_dag,
+                                                self.estimates[0])
+
+
+class RandomDAGs:
+    """Drawing random DAGs."""
+
+    params = ([1000, 100000], ['erdos_renyi', 'fixed_in_degree', 'scale_free'],
+              ['dense', 'sparse'])
+    param_names = ['nb_vertices', 'model', 'storage']
+
+    def setup(self, nb_vertices, model, storage):
+        if storage == 'dense' and nb_vertices > 5000:
+            raise NotImplementedError
+
+    def time_random_dag_adjacency_matrices(self, nb_vertices, model, storage):
+        random_dag_adjacency_matrices(nb_vertices, model=model, nb_parents=2,
+                                      ordering='random',
+                                      sparse=storage == 'sparse',
+                                      random_state=0)
+
+
+class BatchedRandomDAGs:
+    """Drawing a batch of small random DAGs."""
+
+    params = ([100, 1000], ['erdos_renyi', 'fixed_in_degree', 'scale_free'])
+    param_names = ['nb_graphs', 'model']
+
+    def time_random_dag_adjacency_matrices(self, nb_graphs, model):
+        random_dag_adjacency_matrices(20, model=model, nb_parents=2,
+                                      nb_graphs=nb_graphs, ordering='random',
+                                      random_state=0)
+
+
+class BatchedGraphOperations:
+    """Validating and comparing a batch of small graphs."""
+
+    params = ([1000, 10000], [False, True])
+    param_names = ['nb_graphs', 'packed']
+
+    def setup(self, nb_graphs, packed):
+        matrices = random_dag_adjacency_matrices(20, nb_parents=2,
+                                                 nb_graphs=nb_graphs,
+                                                 ordering='random',
+                                                 random_state=0)
+        self.batch = GraphBatch(matrices, validate=False, packed=packed)
+        self.other = np.roll(matrices, 1, axis=0)
+
+    def time_is_acyclic(self, nb_graphs, packed):
+        self.batch.is_acyclic()
+
+    def time_degree_statistics(self, nb_graphs, packed):
+        self.batch.degree_statistics()
+
+    def time_structural_hamming_distances(self, nb_graphs, packed):
+        self.batch.structural_hamming_distances(self.other)
+
+    def peakmem_batch(self, nb_graphs, packed):
+        GraphBatch(self.other, validate=False, packed=packed)
@@ -0,0 +1,112 @@
+"""Benchmarks of the creation, sampling and manipulation of SCMs."""
+import numpy as np
+
+from scipy.stats import norm
+
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.linear_structural_equation import \
+    LinearStructuralEquation
+from StructuralCausalModels.random_graphs import random_linear_scms
+
+from .common import random_coefficient_matrix
+
+
+def _create_linear_scm(nb_var, nb_parents):
+    matrix = random_coefficient_matrix(nb_var, min(1.0, nb_parents / nb_var))
+
+    return LinearStructuralCausalModel.create_from_coefficient_matrix(
+        matrix=matrix,
+        causal_order=list(range(nb_var)),
+        exogenous_variables=[norm(scale=1 + i % 3) for i in range(nb_var)]
+    )
+
+
+class LinearSCMCreation:
+    """Creating a linear SCM from its coefficient matrix."""
+
+    params = ([10, 100, 500], [1, 5])
+    param_names = ['nb_var', 'nb_parents']
+
+    def setup(self, nb_var, nb_parents):
+        self.matrix = random_coefficient_matrix(
+            nb_var, min(1.0, nb_parents / nb_var)
+        )
+        self.exogenous_variables = [norm()] * nb_var
+
+    def time_create_from_coefficient_matrix(self, nb_var, nb_parents):
+        LinearStructuralCausalModel.create_from_coefficient_matrix(
+            matrix=self.matrix,
+            causal_order=list(range(nb_var)),
+            exogenous_variables=self.exogenous_variables
+        )
+
+
+class RandomLinearSCMs:
+    """Drawing random linear SCMs."""
+
+    params = ([10, 100, 500], [1, 100])
+    param_names = ['nb_var', 'nb_scms']
+
+    def time_random_linear_scms(self, nb_var, nb_scms):
+        random_linear_scms(nb_var, nb_parents=2, nb_scms=nb_scms,
+                           ordering='random', noise_scale=(0.5, 1.5),
+                           random_state=0)
+
+
+class DataGeneration:
+    """Sampling from a linear SCM."""
+
+    params = ([10, 100], [1, 5], [100, 10000, 100000])
+    param_names = ['nb_var', 'nb_parents', 'nb_samples']
+
+    def setup(self, nb_var, nb_parents, nb_samples):
+        self.scm = _create_linear_scm(nb_var, nb_parents)
+        # The caches (causal order, noise sampling plan) are filled outside of
+        # the timings
+        self.scm.generate_data(1, random_state=0)
+        self.noise = self.scm.generate_noise(nb_samples, random_state=0)
+
+    def time_generate_data(self, nb_var, nb_parents, nb_samples):
+        self.scm.generate_data(nb_samples, random_state=0)
+
+    def time_generate_data_from_noise(self, nb_var, nb_parents, nb_samples):
+        self.scm.generate_data(nb_samples, noise=self.noise)
+
+    def time_generate_noise(self, nb_var, nb_parents, nb_samples):
+        self.scm.generate_noise(nb_samples, random_state=0)
+
+    def peakmem_generate_data(self, nb_var, nb_parents, nb_samples):
+        self.scm.generate_data(nb_samples, random_state=0)
+
+
+class Intervention:
+    """Intervening on a linear SCM, and sampling after the intervention."""
+
+    params = [10, 100, 500]
+    param_names = ['nb_var']
+
+    def setup(self, nb_var):
+        self.scm = _create_linear_scm(nb_var, 3)
+        self.scm.compute_causal_order()
+        self.scm.adjacency_matrix()
+        self.target = self.scm.compute_causal_order()[nb_var // 2]
+        self.intervention = LinearStructuralEquation.create_hard_intervention(
+            index_lhs=self.target, value=1.0
+        )
+        self.noise = self.scm.generate_noise(1000, random_state=0)
+        self.data = self.scm.generate_data(1000, noise=self.noise)
+
+    def time_perform_intervention(self, nb_var):
+        self.scm.perform_intervention(self.intervention)
+
+    def time_resample_after_intervention(self, nb_var):
+        self.scm.resample_after_intervention(self.data, self.noise,
+                                             self.intervention)
+
+    def track_mean_after_intervention(self, nb_var):
+        # The mean of the variable intervened upon, to detect changes in the
+        # results
+        return float(np.mean(self.scm.perform_intervention(
+            self.intervention
+        ).generate_data(10, random_state=0)[self.target]))
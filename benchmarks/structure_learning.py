@@ -0,0 +1,69 @@
+"""Benchmarks of the scoring and learning of DAGs from data."""
+import numpy as np
+
+from scipy.stats import norm
+
+from StructuralCausalModels.hill_climbing import HillClimbingSearch
+from StructuralCausalModels.linear_fitting import SufficientStatistics
+from StructuralCausalModels.linear_structural_causal_model import \
+    LinearStructuralCausalModel
+from StructuralCausalModels.pc_algorithm import PCAlgorithm
+from StructuralCausalModels.scores import GaussianBICScore
+
+from .common import random_coefficient_matrix
+
+
+def _sufficient_statistics(nb_var, nb_parents, nb_samples=2000):
+    matrix = random_coefficient_matrix(nb_var, min(1.0, nb_parents / nb_var))
+    linear_scm = LinearStructuralCausalModel.create_from_coefficient_matrix(
+        matrix=matrix,
+        causal_order=list(range(nb_var)),
+        exogenous_variables=[norm() for _ in range(nb_var)]
+    )
+    data = linear_scm.generate_data(nb_samples, random_state=0).to_numpy()
+
+    return SufficientStatistics.from_data(data)
+
+
+class HillClimbing:
+    """Learning a DAG by hill climbing on the BIC, from the empty DAG."""
+
+    params = ([50, 200, 1000], [1, 2])
+    param_names = ['nb_var', 'nb_parents']
+    timeout = 300
+
+    def setup(self, nb_var, nb_parents):
+        self.statistics = _sufficient_statistics(nb_var, nb_parents)
+
+    def time_fit(self, nb_var, nb_parents):
+        HillClimbingSearch(GaussianBICScore(self.statistics)).fit()
+
+
+class LocalScoreChanges:
+    """Computing the changes of the BIC for toggling every edge into a
+    family."""
+
+    params = ([200, 2000], [0, 5])
+    param_names = ['nb_var', 'nb_parents']
+
+    def setup(self, nb_var, nb_parents):
+        self.score = GaussianBICScore(_sufficient_statistics(nb_var, 1))
+        self.parents = tuple(range(1, nb_parents + 1))
+        self.candidates = np.arange(1, nb_var)
+
+    def time_local_score_changes(self, nb_var, nb_parents):
+        self.score.local_score_changes(0, self.parents, self.candidates)
+
+
+class PC:
+    """Learning a CPDAG with the PC algorithm."""
+
+    params = ([50, 200], [1, 2])
+    param_names = ['nb_var', 'nb_parents']
+    timeout = 300
+
+    def setup(self, nb_var, nb_parents):
+        self.statistics = _sufficient_statistics(nb_var, nb_parents)
+
+    def time_fit(self, nb_var, nb_parents):
+        PCAlgorithm(self.statistics).fit()
@@ -23,13 +23,16 @@ setup(
         'Topic :: Scientific/Engineering :: Information Analysis',
         'Intended Audience :: Science/Research',
     ],
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks']),
     # TODO should pytest and pytest-cov not be separate ?
-    install_requires=['numpy', 'scipy', 'pandas', 'pytest', 'pytest-cov'],
+    # scipy.linalg.expm computes the exponentials of batches of matrices
+    # since scipy 1.9
+    install_requires=['numpy', 'scipy >= 1.9', 'pandas', 'pytest',
+                      'pytest-cov'],
     docs_extras=[
         'Sphinx >= 3.5.3',
         'numpy >= 1.20.1',
-        'scipy > 1.6.2',
+        'scipy >= 1.9',
         'pandas >= 1.2.3',
         'pytest >= 6.2.2',
         'pytest-cov>=2.11.1',